@@ -30,6 +30,13 @@ from bpy.types import Menu, Operator, UIList, AddonPreferences
 
 # from . import patterns
 # from . import chunk_operations
+import os, sys
+
+# modules in mp don't use blender, worker processes import them as top level modules
+MP_PATH = os.path.join(os.path.dirname(__file__), 'mp')
+if MP_PATH not in sys.path:
+    sys.path.append(MP_PATH)
+
 from cam import ui, ops, utils, simple, polygon_utils_cam  # , post_processors
 import numpy
 
@@ -114,11 +121,18 @@ class CamAddonPreferences(AddonPreferences):
         default=False,
     )
 
+    worker_processes: IntProperty(
+        name="Worker processes",
+        description="Number of processes computing paths of big operations and chains, 0 uses all CPU cores",
+        default=0, min=0, max=256,
+    )
+
     def draw(self, context):
         layout = self.layout
         layout.label(text="Use experimental features when you want to help development of Blender CAM:")
 
         layout.prop(self, "experimental")
+        layout.prop(self, "worker_processes")
 
 
 class machineSettings(bpy.types.PropertyGroup):
@@ -701,6 +715,9 @@ class camOperation(bpy.types.PropertyGroup):
                                                description='For roughing and finishing in one pass: mills material in climb mode, then steps back and goes between 2 last chunks back',
                                                default=False, update=updateRest)
     stay_low: bpy.props.BoolProperty(name="Stay low if possible", default=True, update=updateRest)
+    optimize_order: bpy.props.BoolProperty(name="Optimize path order",
+                                           description='Shortens moves between paths after sorting them, by milling runs of paths in reverse order. Slower with many paths',
+                                           default=False, update=updateRest)
     merge_dist: bpy.props.FloatProperty(name="Merge distance - EXPERIMENTAL", default=0.0, min=0.0000, max=0.1,
                                         precision=PRECISION, unit="LENGTH", update=updateRest)
     # optimization and performance
@@ -877,6 +894,10 @@ class camChain(bpy.types.PropertyGroup):  # chain is just a set of operations wh
     filename: bpy.props.StringProperty(name="File name", default="Chain")  # filename of
     valid: bpy.props.BoolProperty(name="Valid", description="True if whole chain is ok for calculation", default=True);
     computing: bpy.props.BoolProperty(name="Computing right now", description="", default=False)
+    parallel: bpy.props.BoolProperty(name="Compute in parallel",
+                                     description="Compute operations which don't use paths of other operations "
+                                                 "at the same time in background. File has to be saved before.",
+                                     default=False)
     operations: bpy.props.CollectionProperty(type=opReference)  # this is to hold just operation names.
 
 
@@ -957,7 +978,7 @@ class AddPresetCamOperation(bl_operators.presets.AddPresetBase, Operator):
             and prop!='name_property'):
                 d.append(prop)
     '''
-    preset_values = ['o.use_layers', 'o.duration', 'o.chipload', 'o.material_from_model', 'o.stay_low', 'o.carve_depth',
+    preset_values = ['o.use_layers', 'o.duration', 'o.chipload', 'o.material_from_model', 'o.stay_low', 'o.optimize_order', 'o.carve_depth',
                      'o.dist_along_paths', 'o.source_image_crop_end_x', 'o.source_image_crop_end_y', 'o.material_size',
                      'o.material_radius_around_model', 'o.use_limit_curve', 'o.cut_type', 'o.use_exact',
                      'o.exact_subdivide_edges', 'o.minz_from_ob', 'o.free_movement_height',
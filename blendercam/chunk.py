@@ -20,6 +20,7 @@
 # ***** END GPL LICENCE BLOCK *****
 
 
+import numpy
 import shapely
 from shapely.geometry import polygon as spolygon
 from shapely import ops
@@ -168,8 +169,7 @@ class camPathChunk:
         closest = None
         testlist = []
         testlist.extend(self.children)
-        tested = []
-        tested.extend(self.children)
+        tested = set(self.children)
         ch = None
         while len(testlist) > 0:
             chtest = testlist.pop()
@@ -181,7 +181,7 @@ class camPathChunk:
                     if child.sorted == False:
                         if child not in tested:
                             testlist.append(child)
-                            tested.append(child)
+                            tested.add(child)
                         cango = False
 
                 if cango:
@@ -707,6 +707,198 @@ def parentChild(parents, children, o):
                 child.parents.append(parent)
 
 
+# number of following chunks tried for reversal by optimizeChunkOrder
+TWO_OPT_WINDOW = 50
+TWO_OPT_PASSES = 5
+
+
+class chunkGrid:
+    '''
+    grid of points where chunks can be entered, finds the closest one to a position.
+    only chunks which can be milled now are added, chunks are removed when they get sorted.
+    '''
+
+    def __init__(self, chunks, o):
+        self.o = o
+        self.order = {}
+        self.available = set()
+        self.pointless = []  # chunks without points, these go first
+        self.cells = {}
+        self.live = 0
+        n = 0
+        minx = miny = float('inf')
+        maxx = maxy = -float('inf')
+        for i, ch in enumerate(chunks):
+            self.order[ch] = i
+            for p in self.entryPoints(ch):
+                minx = min(minx, p[0])
+                miny = min(miny, p[1])
+                maxx = max(maxx, p[0])
+                maxy = max(maxy, p[1])
+                n += 1
+        if n > 0:
+            # about 2 points in a cell when they are spread evenly
+            size = max(maxx - minx, maxy - miny)
+            self.cellsize = max(sqrt((maxx - minx) * (maxy - miny) * 2 / n), size / n, 1e-6)
+            self.bounds = self.cell((minx, miny)) + self.cell((maxx, maxy))
+        else:
+            self.cellsize = 1
+            self.bounds = (0, 0, 0, 0)
+
+    def entryPoints(self, ch):
+        # points where the chunk can start, as dist() of the chunk measures them
+        if len(ch.points) == 0:
+            return ()
+        if ch.closed:
+            return ch.points
+        if self.o.movement_type == 'MEANDER':
+            return (ch.points[0], ch.points[-1])
+        return (ch.points[0],)
+
+    def cell(self, p):
+        return (int(floor(p[0] / self.cellsize)), int(floor(p[1] / self.cellsize)))
+
+    def add(self, ch):
+        if ch in self.available:
+            return
+        self.available.add(ch)
+        points = self.entryPoints(ch)
+        if len(points) == 0:
+            self.pointless.append(ch)
+        for p in points:
+            self.cells.setdefault(self.cell(p), []).append((p[0], p[1], ch))
+        self.live += len(points)
+
+    def remove(self, ch):
+        # points stay in the cells until a search finds them
+        if ch in self.available:
+            self.available.remove(ch)
+            self.live -= len(self.entryPoints(ch))
+            if ch in self.pointless:
+                self.pointless.remove(ch)
+
+    def closestBruteForce(self, pos):
+        best = None
+        for ch in self.available:
+            for p in self.entryPoints(ch):
+                d = dist2d(pos, p)
+                if best is None or (d, self.order[ch]) < best[:2]:
+                    best = (d, self.order[ch], ch)
+        return best
+
+    def closest(self, pos):
+        '''closest available chunk, the first one in the chunk list when more are in the same distance'''
+        if self.pointless:
+            return self.pointless[0]
+        if len(self.available) == 0:
+            return None
+        cx, cy = self.cell(pos)
+        minx, miny, maxx, maxy = self.bounds
+        rings = max(abs(cx - minx), abs(cx - maxx), abs(cy - miny), abs(cy - maxy))
+        best = None
+        searched = 0
+        for r in range(rings + 1):
+            # points in ring r are at least (r - 1) cells far
+            if best is not None and (r - 1) * self.cellsize > best[0]:
+                break
+            if searched > self.live + 16:
+                # far from all points, a scan of them is faster
+                best = self.closestBruteForce(pos)
+                break
+            if r == 0:
+                ring = [(cx, cy)]
+            else:
+                ring = [(x, y) for x in range(cx - r, cx + r + 1) for y in (cy - r, cy + r)]
+                ring.extend((x, y) for x in (cx - r, cx + r) for y in range(cy - r + 1, cy + r))
+            searched += len(ring)
+            for key in ring:
+                points = self.cells.get(key)
+                if points is None:
+                    continue
+                points = [p for p in points if p[2] in self.available]
+                if points:
+                    self.cells[key] = points
+                else:
+                    del self.cells[key]
+                searched += len(points)
+                for x, y, ch in points:
+                    d = dist2d(pos, (x, y))
+                    if best is None or (d, self.order[ch]) < best[:2]:
+                        best = (d, self.order[ch], ch)
+        if best is None:
+            return None
+        return best[2]
+
+
+def chunksAirTravel(chunks, pos=(0, 0, 0)):
+    '''length of moves between chunks in the xy plane'''
+    d = 0
+    for ch in chunks:
+        if len(ch.points) > 0:
+            d += dist2d(pos, ch.points[0])
+            pos = ch.points[-1]
+    return d
+
+
+def optimizeChunkOrder(chunks, o, pos=(0, 0, 0)):
+    '''
+    2-opt for sorted chunks: reverses runs of following chunks where it shortens moves between them.
+    a reversed run is milled backwards, so it can only contain closed chunks ending where they start
+    or chunks of meander movement, and no chunk together with its child.
+    '''
+    n = len(chunks)
+    if n < 2 or any(len(ch.points) == 0 for ch in chunks):
+        return chunks
+    chunks = list(chunks)
+    starts = numpy.array([ch.points[0][:2] for ch in chunks], dtype=float)
+    ends = numpy.array([ch.points[-1][:2] for ch in chunks], dtype=float)
+    if o.movement_type == 'MEANDER':
+        reversible = [not ch.closed or (starts[i] == ends[i]).all() for i, ch in enumerate(chunks)]
+    else:
+        reversible = [ch.closed and (starts[i] == ends[i]).all() for i, ch in enumerate(chunks)]
+    # index of the first chunk which can't be reversed from each position on
+    stops = [n] * (n + 1)
+    for i in range(n - 1, -1, -1):
+        stops[i] = stops[i + 1] if reversible[i] else i
+    position = {ch: i for i, ch in enumerate(chunks)}
+    origin = numpy.array(pos[:2], dtype=float)
+
+    def dist(a, b):
+        return numpy.sqrt(((a - b) ** 2).sum(axis=-1))
+
+    for p in range(TWO_OPT_PASSES):
+        improved = False
+        for i in range(n):
+            last = min(stops[i], i + TWO_OPT_WINDOW, n)
+            if last <= i:
+                continue
+            # reversal of chunks i..j-1 for each j
+            js = numpy.arange(i + 1, last + 1)
+            before = origin if i == 0 else ends[i - 1]
+            delta = dist(before, ends[js - 1]) - dist(before, starts[i])
+            inner = js < n
+            following = starts[js[inner]]
+            delta[inner] += dist(starts[i], following) - dist(ends[js[inner] - 1], following)
+            for k in numpy.argsort(delta, kind='stable'):
+                if delta[k] > -1e-9:
+                    break
+                j = js[k]
+                if any(i <= position.get(child, -1) < j for ch in chunks[i:j] for child in ch.children):
+                    continue
+                chunks[i:j] = chunks[i:j][::-1]
+                starts[i:j], ends[i:j] = ends[i:j][::-1].copy(), starts[i:j][::-1].copy()
+                for m in range(i, j):
+                    ch = chunks[m]
+                    if not ch.closed:
+                        ch.reverse()
+                    position[ch] = m
+                improved = True
+                break
+        if not improved:
+            break
+    return chunks
+
+
 def chunksToShapely(chunks):  # this does more cleve chunks to Poly with hierarchies... ;)
     # print ('analyzing paths')
     # verts=[]
@@ -23,6 +23,7 @@ import numpy
 import math
 import time
 import random
+from collections import OrderedDict
 
 import curve_simplify
 import mathutils
@@ -33,6 +34,15 @@ from cam.simple import *
 from cam import chunk
 from cam.chunk import *
 
+from camsampling import getSampleImageArray
+from camoffset import offsetImage
+import camsimulation
+
+# kept simulations by their name, see generateSimulationImage;
+# each holds a heightmap of the stock, so only the last used ones are kept
+simulations = OrderedDict()
+max_kept_simulations = 3
+
 
 def getCircle(r, z):
     car = numpy.array((0), dtype=float)
@@ -76,38 +86,22 @@ def getCutterArray(operation, pixsize):
     # res+=1
     # m=res/2
     m = res / 2.0
-    car = numpy.array((0), dtype=float)
-    car.resize(res, res)
-    car.fill(-10)
+    car = numpy.full((res, res), -10.0)
 
-    v = mathutils.Vector((0, 0, 0))
     ps = pixsize
+    # distances of pixel centers from the cutter axis
+    coords = (numpy.arange(res) + 0.5 - m) * ps
+    d = numpy.hypot(coords[:, None], coords[None, :])
+    inside = d <= r
     if type == 'END':
-        for a in range(0, res):
-            v.x = (a + 0.5 - m) * ps
-            for b in range(0, res):
-                v.y = (b + 0.5 - m) * ps
-                if (v.length <= r):
-                    car.itemset((a, b), 0)
+        car[inside] = 0
     elif type == 'BALL' or type == 'BALLNOSE':
-        for a in range(0, res):
-            v.x = (a + 0.5 - m) * ps
-            for b in range(0, res):
-                v.y = (b + 0.5 - m) * ps
-                if (v.length <= r):
-                    z = sin(acos(v.length / r)) * r - r
-                    car.itemset((a, b), z)  # [a,b]=z
+        car[inside] = numpy.sin(numpy.arccos(d[inside] / r)) * r - r
 
     elif type == 'VCARVE':
         angle = operation.cutter_tip_angle
         s = math.tan(math.pi * (90 - angle / 2) / 180)
-        for a in range(0, res):
-            v.x = (a + 0.5 - m) * ps
-            for b in range(0, res):
-                v.y = (b + 0.5 - m) * ps
-                if v.length <= r:
-                    z = (-v.length * s)
-                    car.itemset((a, b), z)
+        car[inside] = -d[inside] * s
     elif type == 'CUSTOM':
         cutob = bpy.data.objects[operation.cutter_object_name]
         scale = ((cutob.dimensions.x / cutob.scale.x) / 2) / r  #
@@ -230,30 +224,9 @@ def offsetArea(o, samples):
         if o.inverse:
             sourceArray = -sourceArray + minz
         print(o.offset_image.shape)
-        comparearea = o.offset_image[m: width - cwidth + m, m:height - cwidth + m]
-        # i=0
-        for x in range(0, cwidth):  # cwidth):
-            text = "Offsetting depth " + str(int(x * 100 / cwidth))
-            # o.operator.report({"INFO"}, text)
-            progress('offset ', int(x * 100 / cwidth))
-            for y in range(0,
-                           cwidth):  # TODO:OPTIMIZE THIS - this can run much faster when the areas won't be created each run????tests dont work now
-                if cutterArray[x, y] > -10:
-                    # i+=1
-                    # progress(i)
-                    # winner
-                    numpy.maximum(sourceArray[x: width - cwidth + x, y: height - cwidth + y] + cutterArray[x, y],
-                                  comparearea, comparearea)
-                    # contest of performance
-                    '''
-					if bpy.app.debug_value==0 :#original
-						comparearea=numpy.maximum(sourceArray[  x : width-cwidth+x ,y : height-cwidth+y]+cutterArray[x,y],comparearea)
-					elif bpy.app.debug_value==1:
-						narea = numpy.maximum(sourceArray[  x : width-cwidth+x ,y : height-cwidth+y]+cutterArray[x,y],comparearea)
-						comparearea = narea
-					elif bpy.app.debug_value==3:
-						numpy.maximum(sourceArray[  x : width-cwidth+x ,y : height-cwidth+y]+cutterArray[x,y],comparearea, comparearea)
-						'''
+        # grayscale dilation of the image by the cutter, in tiles, see camoffset.py
+        comparearea = offsetImage(sourceArray, cutterArray, progress=lambda p: progress('offset ', p),
+                                  processes=getWorkerCount(), executable=getWorkerExecutable())
 
         o.offset_image[m: width - cwidth + m, m:height - cwidth + m] = comparearea
         # progress('offseting done')
@@ -521,49 +494,12 @@ def imageEdgeSearch_online(o, ar, zimage):  # search edges for pencil strategy,
     return chunks
 
 
-def simCutterSpot(xs, ys, z, cutterArray, si, getvolume=False):
-    '''simulates a cutter cutting into stock, taking away the volume, and optionally returning the volume that has been milled. This is now used for feedrate tweaking.'''
-    # xs=int(xs)
-    # ys=int(ys)
-    m = int(cutterArray.shape[0] / 2)
-    size = cutterArray.shape[0]
-    if xs > m and xs < si.shape[0] - m and ys > m and ys < si.shape[1] - m:  # whole cutter in image there
-        if getvolume:
-            volarray = si[xs - m:xs - m + size, ys - m:ys - m + size].copy()
-        si[xs - m:xs - m + size, ys - m:ys - m + size] = numpy.minimum(si[xs - m:xs - m + size, ys - m:ys - m + size],
-                                                                       cutterArray + z)
-        if getvolume:
-            volarray = si[xs - m:xs - m + size, ys - m:ys - m + size] - volarray
-            vsum = abs(volarray.sum())
-            # print(vsum)
-            return vsum
-
-    elif xs > -m and xs < si.shape[0] + m and ys > -m and ys < si.shape[
-        1] + m:  # part of cutter in image, for extra large cutters
-
-        startx = max(0, xs - m)
-        starty = max(0, ys - m)
-        endx = min(si.shape[0], xs - m + size)
-        endy = min(si.shape[0], ys - m + size)
-        castartx = max(0, m - xs)
-        castarty = max(0, m - ys)
-        caendx = min(size, si.shape[0] - xs + m)
-        caendy = min(size, si.shape[1] - ys + m)
-        # print(startx,endx,starty,endy,castartx,caendx,castarty, caendy)
-        if getvolume:
-            volarray = si[startx:endx, starty:endy].copy()
-        si[startx:endx, starty:endy] = numpy.minimum(si[startx:endx, starty:endy],
-                                                     cutterArray[castartx:caendx, castarty:caendy] + z)
-        if getvolume:
-            volarray = si[startx:endx, starty:endy] - volarray
-            vsum = abs(volarray.sum())
-            # print(vsum)
-            return vsum
-
-    return 0
-
-
-def generateSimulationImage(operations, limits):
+def generateSimulationImage(operations, limits, name=None):
+    '''
+    simulates milling of operations into stock, returns heights of the simulated stock above its bottom.
+    with name the simulation is kept, when it runs again only operations which changed are simulated again
+    and the stock changes only where they cut.
+    '''
     minx, miny, minz, maxx, maxy, maxz = limits
     # print(minx,miny,minz,maxx,maxy,maxz)
     sx = maxx - minx
@@ -576,176 +512,131 @@ def generateSimulationImage(operations, limits):
     resy = ceil(sy / simulation_detail) + 2 * borderwidth
     # resx=ceil(sx/o.pixsize)+2*o.borderwidth
     # resy=ceil(sy/o.pixsize)+2*o.borderwidth
-    # create array in which simulation happens, similar to an image to be painted in.
-    si = numpy.array((0.1), dtype=float)
-    si.resize(resx, resy)
-    si.fill(maxz)
-
+    frame = (resx, resy, minx, miny, maxz, simulation_detail, borderwidth)
+    if name is not None and name in simulations and simulations[name][0] == frame:
+        simulation = simulations[name][1]
+        simulations.move_to_end(name)
+    else:
+        # stock heightmap in which the simulation happens, similar to an image to be painted in.
+        simulation = camsimulation.Simulation((resx, resy), maxz)
+        if name is not None:
+            simulations[name] = (frame, simulation)
+            simulations.move_to_end(name)
+            while len(simulations) > max_kept_simulations:
+                simulations.popitem(last=False)
+
+    paths = []
     for o in operations:
         ob = bpy.data.objects["cam_path_{}".format(o.name)]
+        verts = ob.data.vertices
+        points = numpy.empty(len(verts) * 3)
+        verts.foreach_get('co', points)
+        points = points.reshape((-1, 3))
+        # x, y in pixels of the heightmap
+        points[:, 0] = (points[:, 0] - minx) / simulation_detail + borderwidth
+        points[:, 1] = (points[:, 1] - miny) / simulation_detail + borderwidth
+        radius = (o.cutter_diameter / 2 + o.skin) / simulation_detail
+        cutter = camsimulation.prepareCutter(getCutterArray(o, simulation_detail), radius)
+        paths.append((points, cutter, o.do_simulation_feedrate))
+
+    volumes = simulation.update(paths, lambda i, perc: progress('simulation ' + operations[i].name, perc))
+
+    for o, path, volume in zip(operations, paths, volumes):
+        if not o.do_simulation_feedrate:
+            continue
+        ob = bpy.data.objects["cam_path_{}".format(o.name)]
         m = ob.data
-        verts = m.vertices
 
-        if o.do_simulation_feedrate:
-            kname = 'feedrates'
-            m.use_customdata_edge_crease = True
+        kname = 'feedrates'
+        m.use_customdata_edge_crease = True
 
-            if m.shape_keys is None or m.shape_keys.key_blocks.find(kname) == -1:
+        if m.shape_keys is None or m.shape_keys.key_blocks.find(kname) == -1:
+            ob.shape_key_add()
+            if len(m.shape_keys.key_blocks) == 1:
                 ob.shape_key_add()
-                if len(m.shape_keys.key_blocks) == 1:
-                    ob.shape_key_add()
-                shapek = m.shape_keys.key_blocks[-1]
-                shapek.name = kname
+            shapek = m.shape_keys.key_blocks[-1]
+            shapek.name = kname
+        else:
+            shapek = m.shape_keys.key_blocks[kname]
+        shapek.data[0].co = (0.0, 0, 0)
+
+        # lengths of segments ending in each point
+        points = path[0].copy()
+        points[:, :2] *= simulation_detail
+        lengths = numpy.linalg.norm(points[1:] - points[:-1], axis=1).tolist()
+        for i in range(1, len(points)):
+            # volume removed by the segment, in heights summed over pixels
+            l = lengths[i - 1]
+            if l > 0:
+                load = volume[i] / l
             else:
-                shapek = m.shape_keys.key_blocks[kname]
-            shapek.data[0].co = (0.0, 0, 0)
-        # print(len(shapek.data))
-        # print(len(verts_rotations))
-
-        # for i,co in enumerate(verts_rotations):#TODO: optimize this. this is just rewritten too many times...
-        # print(r)
-        #	shapek.data[i].co=co
-
-        totalvolume = 0.0
-
-        cutterArray = getCutterArray(o, simulation_detail)
-        # cb=cutterArray<-1
-        # cutterArray[cb]=1
-        cutterArray = -cutterArray
-        mid = int(cutterArray.shape[0] / 2)
-        size = cutterArray.shape[0]
-        # print(si.shape)
-        # for ch in chunks:
-        lasts = verts[1].co
-        perc = -1
-        vtotal = len(verts)
-        dropped = 0
-
-        xs = 0
-        ys = 0
-
-        for i, vert in enumerate(verts):
-            if perc != int(100 * i / vtotal):
-                perc = int(100 * i / vtotal)
-                progress('simulation', perc)
-            # progress('simulation ',int(100*i/l))
-
-            if i > 0:
-                volume = 0
-                volume_partial = 0
-                s = vert.co
-                v = s - lasts
-
-                l = v.length
-                if (lasts.z < maxz or s.z < maxz) and not (
-                        v.x == 0 and v.y == 0 and v.z > 0):  # only simulate inside material, and exclude lift-ups
-                    if (
-                            v.x == 0 and v.y == 0 and v.z < 0):  # if the cutter goes straight down, we don't have to interpolate.
-                        pass;
+                load = 0
 
-                    elif v.length > simulation_detail:  # and not :
-
-                        v.length = simulation_detail
-                        lastxs = xs
-                        lastys = ys
-                        while v.length < l:
-                            xs = int((
-                                                 lasts.x + v.x - minx) / simulation_detail + borderwidth + simulation_detail / 2)  # -middle
-                            ys = int((
-                                                 lasts.y + v.y - miny) / simulation_detail + borderwidth + simulation_detail / 2)  # -middle
-                            z = lasts.z + v.z
-                            # print(z)
-                            if lastxs != xs or lastys != ys:
-                                volume_partial = simCutterSpot(xs, ys, z, cutterArray, si, o.do_simulation_feedrate)
-                                if o.do_simulation_feedrate:
-                                    totalvolume += volume
-                                    volume += volume_partial
-                                lastxs = xs
-                                lastys = ys
-                            else:
-                                dropped += 1
-                            v.length += simulation_detail
-
-                    xs = int((s.x - minx) / simulation_detail + borderwidth + simulation_detail / 2)  # -middle
-                    ys = int((s.y - miny) / simulation_detail + borderwidth + simulation_detail / 2)  # -middle
-                    volume_partial = simCutterSpot(xs, ys, s.z, cutterArray, si, o.do_simulation_feedrate)
-                if o.do_simulation_feedrate:  # compute volumes and write data into shapekey.
-                    volume += volume_partial
-                    totalvolume += volume
-                    if l > 0:
-                        load = volume / l
-                    else:
-                        load = 0
+            # this will show the shapekey as debugging graph and will use same data to estimate parts with heavy load
+            if l != 0:
+                shapek.data[i].co.y = (load) * 0.000002
+            else:
+                shapek.data[i].co.y = shapek.data[i - 1].co.y
+            shapek.data[i].co.x = shapek.data[i - 1].co.x + l * 0.04
+            shapek.data[i].co.z = 0
+
+        # smoothing ,but only backward!
+        xcoef = shapek.data[len(shapek.data) - 1].co.x / len(shapek.data)
+        for a in range(0, 10):
+            # print(shapek.data[-1].co)
+            nvals = []
+            val1 = 0  #
+            val2 = 0
+            w1 = 0  #
+            w2 = 0
 
-                    # this will show the shapekey as debugging graph and will use same data to estimate parts with heavy load
-                    if l != 0:
-                        shapek.data[i].co.y = (load) * 0.000002
-                    else:
-                        shapek.data[i].co.y = shapek.data[i - 1].co.y
-                    shapek.data[i].co.x = shapek.data[i - 1].co.x + l * 0.04
-                    shapek.data[i].co.z = 0
-                lasts = s
-
-        # print('dropped '+str(dropped))
-        if o.do_simulation_feedrate:  # smoothing ,but only backward!
-            xcoef = shapek.data[len(shapek.data) - 1].co.x / len(shapek.data)
-            for a in range(0, 10):
-                # print(shapek.data[-1].co)
-                nvals = []
-                val1 = 0  #
-                val2 = 0
-                w1 = 0  #
-                w2 = 0
-
-                for i, d in enumerate(shapek.data):
-                    val = d.co.y
-
-                    if i > 1:
-                        d1 = shapek.data[i - 1].co
-                        val1 = d1.y
-                        if d1.x - d.co.x != 0:
-                            w1 = 1 / (abs(d1.x - d.co.x) / xcoef)
-
-                    if i < len(shapek.data) - 1:
-                        d2 = shapek.data[i + 1].co
-                        val2 = d2.y
-                        if d2.x - d.co.x != 0:
-                            w2 = 1 / (abs(d2.x - d.co.x) / xcoef)
-
-                    # print(val,val1,val2,w1,w2)
-
-                    val = (val + val1 * w1 + val2 * w2) / (1.0 + w1 + w2)
-                    nvals.append(val)
-                for i, d in enumerate(shapek.data):
-                    d.co.y = nvals[i]
-
-            # apply mapping - convert the values to actual feedrates.
-            total_load = 0
-            max_load = 0
             for i, d in enumerate(shapek.data):
-                total_load += d.co.y
-                max_load = max(max_load, d.co.y)
-            normal_load = total_load / len(shapek.data)
+                val = d.co.y
+
+                if i > 1:
+                    d1 = shapek.data[i - 1].co
+                    val1 = d1.y
+                    if d1.x - d.co.x != 0:
+                        w1 = 1 / (abs(d1.x - d.co.x) / xcoef)
 
-            thres = 0.5
+                if i < len(shapek.data) - 1:
+                    d2 = shapek.data[i + 1].co
+                    val2 = d2.y
+                    if d2.x - d.co.x != 0:
+                        w2 = 1 / (abs(d2.x - d.co.x) / xcoef)
 
-            scale_graph = 0.05  # warning this has to be same as in export in utils!!!!
+                # print(val,val1,val2,w1,w2)
 
-            totverts = len(shapek.data)
+                val = (val + val1 * w1 + val2 * w2) / (1.0 + w1 + w2)
+                nvals.append(val)
             for i, d in enumerate(shapek.data):
-                if d.co.y > normal_load:
-                    d.co.z = scale_graph * max(0.3,
-                                               normal_load / d.co.y)  # original method was : max(0.4,1-2*(d.co.y-max_load*thres)/(max_load*(1-thres)))
-                else:
-                    d.co.z = scale_graph * 1
-                if i < totverts - 1:
-                    m.edges[i].crease = d.co.y / (normal_load * 4)
+                d.co.y = nvals[i]
+
+        # apply mapping - convert the values to actual feedrates.
+        total_load = 0
+        max_load = 0
+        for i, d in enumerate(shapek.data):
+            total_load += d.co.y
+            max_load = max(max_load, d.co.y)
+        normal_load = total_load / len(shapek.data)
+
+        thres = 0.5
+
+        scale_graph = 0.05  # warning this has to be same as in export in utils!!!!
+
+        totverts = len(shapek.data)
+        for i, d in enumerate(shapek.data):
+            if d.co.y > normal_load:
+                d.co.z = scale_graph * max(0.3,
+                                           normal_load / d.co.y)  # original method was : max(0.4,1-2*(d.co.y-max_load*thres)/(max_load*(1-thres)))
+            else:
+                d.co.z = scale_graph * 1
+            if i < totverts - 1:
+                m.edges[i].crease = d.co.y / (normal_load * 4)
 
     # d.co.z*=0.01#debug
 
-    o = operations[0]
-    si = si[borderwidth:-borderwidth, borderwidth:-borderwidth]
-    si += -minz
+    si = simulation.heightmap.heights[borderwidth:-borderwidth, borderwidth:-borderwidth] - minz
 
     # print(si.shape[0],si.shape[1])
 
@@ -753,6 +644,13 @@ def generateSimulationImage(operations, limits):
     return si
 
 
+def simulationChanged(name):
+    '''whether the kept simulation changed since the last call, see generateSimulationImage'''
+    if name not in simulations:
+        return True
+    return len(simulations[name][1].heightmap.takeDirty()) > 0
+
+
 def crazyPath(
         o):  # TODO: try to do something with this  stuff, it's just a stub. It should be a greedy adaptive algorithm. started another thing below.
     MAX_BEND = 0.1  # in radians...#TODO: support operation chains ;)
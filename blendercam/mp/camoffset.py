@@ -0,0 +1,221 @@
+# blender CAM camoffset.py (c) 2012 Vilem Novak
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.	See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ***** END GPL LICENCE BLOCK *****
+
+# offset of the z-buffer image by the cutter, which is a grayscale dilation of the image by the cutter array.
+# result[i, j] = max(source[i + x, j + y] + cutter[x, y]) over cutter pixels with cutter[x, y] > -10,
+# for i < width - cwidth, j < height - cwidth, as the pixel by pixel loop of offsetArea computed it.
+#
+# - the cutter is split to runs of pixels in its rows. Dilation by a flat run is a sliding maximum
+#   along the row, computed with the van Herk/Gil-Werman algorithm in 3 passes for any run length,
+#   so a flat cutter costs about 3 passes per distinct run length and 1 per run instead of 1 per pixel.
+# - for other cutters, pixels are applied in order of their height. Their contribution is limited by
+#   the flat dilation + height of the pixel, once no pixel can get higher the rest of the cutter is skipped.
+# - the image is processed in tiles, so memory stays bounded for big images,
+#   tiles can be computed by a pool of processes.
+# Doesn't use blender, see camsampling.py.
+
+import multiprocessing
+
+import numpy
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # python < 3.8
+    shared_memory = None
+
+# size of the computed part of the image in one tile, in pixels
+TILE_SIZE = 256
+# cutter pixels applied between checks whether the rest of the cutter can change the result
+CHECK_STEP = 16
+# smaller images are computed faster than worker processes start
+PARALLEL_MIN_TILES = 4
+
+
+def slidingMax(a, w):
+    '''maximum of windows of w pixels along rows of a 2d array, result[:, j] = a[:, j:j + w].max(axis=1)'''
+    rows, n = a.shape
+    if w == 1:
+        return a.copy()
+    count = n - w + 1
+    blocks = -(-n // w)
+    padded = numpy.full((rows, blocks * w), -numpy.inf)
+    padded[:, :n] = a
+    padded = padded.reshape((rows, blocks, w))
+    # prefix maxima from block starts, suffix maxima to block ends
+    prefix = numpy.maximum.accumulate(padded, axis=2).reshape((rows, blocks * w))
+    suffix = numpy.maximum.accumulate(padded[:, :, ::-1], axis=2)[:, :, ::-1].reshape((rows, blocks * w))
+    return numpy.maximum(suffix[:, :count], prefix[:, w - 1:w - 1 + count])
+
+
+def cutterRuns(mask):
+    '''(row, start, length) of each run of True pixels in rows of the cutter mask'''
+    runs = []
+    for x, row in enumerate(mask):
+        edges = numpy.flatnonzero(numpy.diff(numpy.concatenate(([False], row, [False])).astype(numpy.int8)))
+        for start, end in zip(edges[::2].tolist(), edges[1::2].tolist()):
+            runs.append((x, start, end - start))
+    return runs
+
+
+def flatDilation(source, runs, shape):
+    '''maximum of source under the cutter given by runs, for all positions of a result of shape'''
+    result = numpy.full(shape, -numpy.inf)
+    rowmaxima = {}
+    for x, start, length in runs:
+        if length not in rowmaxima:
+            rowmaxima[length] = slidingMax(source, length)
+        numpy.maximum(result, rowmaxima[length][x:x + shape[0], start:start + shape[1]], out=result)
+    return result
+
+
+def prepareCutter(cutter):
+    '''cutter array with its mask, runs and pixels sorted by height, as offsetTile needs them'''
+    cutter = numpy.asarray(cutter, dtype=numpy.float64)
+    mask = cutter > -10
+    values = cutter[mask]
+    xs, ys = numpy.nonzero(mask)
+    order = numpy.argsort(-values, kind='stable')
+    return {
+        'cutter': cutter,
+        'mask': mask,
+        'runs': cutterRuns(mask),
+        'flat': len(values) > 0 and (values == values[0]).all(),
+        'order': (xs[order].tolist(), ys[order].tolist()),
+    }
+
+
+def offsetTile(source, prepared, shape):
+    '''offset of one tile; source includes the border the cutter needs'''
+    cutter = prepared['cutter']
+    limit = flatDilation(source, prepared['runs'], shape)
+    if prepared['flat']:
+        return numpy.maximum(limit + cutter[prepared['mask']][0], -10)
+
+    result = numpy.full(shape, -10.0)
+    # part of the tile where pixels can still get higher
+    x0, y0, x1, y1 = 0, 0, shape[0], shape[1]
+    xs, ys = prepared['order']
+    for k in range(len(xs)):
+        x = xs[k]
+        y = ys[k]
+        c = cutter[x, y]
+        if k % CHECK_STEP == 0:
+            # cutter pixels are sorted by height, the rest can't get above the flat dilation + c
+            active = result[x0:x1, y0:y1] < limit[x0:x1, y0:y1] + c
+            rows = numpy.flatnonzero(active.any(axis=1))
+            if len(rows) == 0:
+                break
+            cols = numpy.flatnonzero(active.any(axis=0))
+            x0, x1, y0, y1 = x0 + rows[0], x0 + rows[-1] + 1, y0 + cols[0], y0 + cols[-1] + 1
+        area = result[x0:x1, y0:y1]
+        numpy.maximum(source[x + x0:x + x1, y + y0:y + y1] + c, area, out=area)
+    return result
+
+
+def offsetTiles(source, prepared, result, tiles, tilesize):
+    '''compute tiles of the result, given by their corners'''
+    cwidth = prepared['cutter'].shape[0]
+    rw, rh = result.shape
+    for tx, ty in tiles:
+        shape = (min(tilesize, rw - tx), min(tilesize, rh - ty))
+        tilesource = source[tx:tx + shape[0] + cwidth - 1, ty:ty + shape[1] + cwidth - 1]
+        result[tx:tx + shape[0], ty:ty + shape[1]] = offsetTile(tilesource, prepared, shape)
+
+
+####worker processes
+# state of a worker process, set once by initWorker
+_worker = {}
+
+
+def initWorker(sourcename, sourceshape, resultname, resultshape, cutter, tilesize):
+    '''attach the source image and the result shared by the main process'''
+    sourceblock = shared_memory.SharedMemory(name=sourcename)
+    resultblock = shared_memory.SharedMemory(name=resultname)
+    _worker['blocks'] = (sourceblock, resultblock)
+    _worker['source'] = numpy.ndarray(sourceshape, dtype=numpy.float64, buffer=sourceblock.buf)
+    _worker['result'] = numpy.ndarray(resultshape, dtype=numpy.float64, buffer=resultblock.buf)
+    _worker['prepared'] = prepareCutter(cutter)
+    _worker['tilesize'] = tilesize
+
+
+def offsetBatch(tiles):
+    '''compute tiles in a worker process, straight into the shared result'''
+    offsetTiles(_worker['source'], _worker['prepared'], _worker['result'], tiles, _worker['tilesize'])
+    return len(tiles)
+
+
+def offsetImageParallel(source, cutter, tiles, resultshape, tilesize, processes, executable, progress):
+    blocks = []
+    try:
+        sourceblock = shared_memory.SharedMemory(create=True, size=max(source.nbytes, 1))
+        blocks.append(sourceblock)
+        numpy.ndarray(source.shape, dtype=numpy.float64, buffer=sourceblock.buf)[...] = source
+        resultblock = shared_memory.SharedMemory(create=True, size=max(8 * resultshape[0] * resultshape[1], 1))
+        blocks.append(resultblock)
+        result = numpy.ndarray(resultshape, dtype=numpy.float64, buffer=resultblock.buf)
+
+        context = multiprocessing.get_context('spawn')
+        if executable is not None:
+            context.set_executable(executable)
+        # tiles spread over batches, several batches per process keep the load balanced
+        batches = [tiles[i::processes * 4] for i in range(min(len(tiles), processes * 4))]
+        with context.Pool(processes, initializer=initWorker,
+                          initargs=(sourceblock.name, source.shape, resultblock.name, resultshape, cutter,
+                                    tilesize)) as pool:
+            done = 0
+            for count in pool.imap_unordered(offsetBatch, batches):
+                done += count
+                if progress is not None:
+                    progress(int(done * 100 / len(tiles)))
+        return result.copy()
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def offsetImage(source, cutter, tilesize=TILE_SIZE, progress=None, processes=1, executable=None):
+    '''
+    dilation of source by cutter array, for positions where the whole cutter is inside the image.
+    returns array of shape (width - cwidth, height - cwidth), values not lower than -10.
+    progress is called with percentage of done tiles.
+    with processes > 1 tiles are computed by a pool of processes, executable is their python interpreter.
+    '''
+    source = numpy.ascontiguousarray(source, dtype=numpy.float64)
+    cutter = numpy.asarray(cutter, dtype=numpy.float64)
+    width, height = source.shape
+    cwidth = cutter.shape[0]
+    rw, rh = max(width - cwidth, 0), max(height - cwidth, 0)
+    if not (cutter > -10).any() or rw == 0 or rh == 0:
+        return numpy.full((rw, rh), -10.0)
+
+    tiles = [(tx, ty) for tx in range(0, rw, tilesize) for ty in range(0, rh, tilesize)]
+    if processes > 1 and len(tiles) >= PARALLEL_MIN_TILES and shared_memory is not None:
+        return offsetImageParallel(source, cutter, tiles, (rw, rh), tilesize, min(processes, len(tiles)),
+                                   executable, progress)
+
+    result = numpy.full((rw, rh), -10.0)
+    prepared = prepareCutter(cutter)
+    for n, tile in enumerate(tiles):
+        if progress is not None:
+            progress(int(n * 100 / len(tiles)))
+        offsetTiles(source, prepared, result, [tile], tilesize)
+    return result
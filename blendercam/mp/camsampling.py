@@ -0,0 +1,364 @@
+# blender CAM camsampling.py (c) 2012 Vilem Novak
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.	See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ***** END GPL LICENCE BLOCK *****
+
+# sampling of pattern chunks on the offset image and splitting them to layers.
+# This module must not import bpy, mathutils or anything from the cam package:
+# worker processes run in plain python and import it as a top level module,
+# the addon puts this directory on sys.path for that.
+
+import math
+import multiprocessing
+
+import numpy
+import shapely
+from shapely import geometry as sgeometry
+from shapely import prepared
+from shapely import wkb
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # python < 3.8
+    shared_memory = None
+
+
+def getSampleImageArray(xs, ys, sarray, minz):
+    '''getSampleImage for arrays of image coordinates, bilinear interpolation, -10 outside of the image'''
+    xs = numpy.asarray(xs, dtype=numpy.float64)
+    ys = numpy.asarray(ys, dtype=numpy.float64)
+    z = numpy.full(xs.shape, -10.0)
+    sx, sy = sarray.shape
+    inside = (xs >= 0) & (xs <= sx - 1) & (ys >= 0) & (ys <= sy - 1)
+    x = xs[inside]
+    y = ys[inside]
+    minx = numpy.floor(x).astype(numpy.intp)
+    miny = numpy.floor(y).astype(numpy.intp)
+    # on the last row/column the weight of the next one is 0
+    maxx = numpy.minimum(minx + 1, sx - 1)
+    maxy = numpy.minimum(miny + 1, sy - 1)
+    fx = x - minx
+    fy = y - miny
+    sa = sarray[minx, miny] * (1 - fx) + sarray[maxx, miny] * fx
+    sb = sarray[minx, maxy] * (1 - fx) + sarray[maxx, maxy] * fx
+    z[inside] = sa * (1 - fy) + sb * fy
+    return z
+
+
+def polygonContainsPoints(p, x, y):
+    '''boolean array, True where point (x[i], y[i]) is inside shapely polygon p'''
+    x = numpy.asarray(x, dtype=numpy.float64)
+    y = numpy.asarray(y, dtype=numpy.float64)
+    try:  # shapely 2
+        return shapely.contains_xy(p, x, y)
+    except AttributeError:
+        pass
+    try:  # shapely 1.x built with numpy
+        from shapely import vectorized
+        return vectorized.contains(p, x, y)
+    except ImportError:
+        pp = prepared.prep(p)
+        return numpy.fromiter((pp.contains(sgeometry.Point(px, py)) for px, py in zip(x.tolist(), y.tolist())),
+                              dtype=bool, count=len(x))
+
+
+def sampleImagePoints(x, y, image, params):
+    '''z of the offset image under points x, y in world coordinates, not limited by minz'''
+    pixsize = params['pixsize']
+    coordoffset = params['borderwidth'] + pixsize / 2  # -m
+    xs = (x - params['minx']) / pixsize + coordoffset
+    ys = (y - params['miny']) / pixsize + coordoffset
+    return getSampleImageArray(xs, ys, image, params['minz']) + params['skin']
+
+
+def isVerticalLimit(v1, v2, limit):
+    '''simple.isVerticalLimit without mathutils, for protect_vertical option'''
+    dx, dy, dz = v1[0] - v2[0], v1[1] - v2[1], v1[2] - v2[2]
+    if abs(dz) > 0:
+        # angle of the segment to the -z axis
+        a = math.acos(max(-1.0, min(1.0, -dz / math.sqrt(dx * dx + dy * dy + dz * dz))))
+        if a > math.pi / 2:
+            a = abs(a - math.pi)
+        if a < limit:
+            if v1[2] > v2[2]:
+                return (v2[0], v2[1], v1[2]), v2
+            else:
+                return v1, (v1[0], v1[1], v2[2])
+    return v1, v2
+
+
+def betweenSample(v1, v2, splitz, verticallimit=None):
+    """point where path segment v1-v2 crosses height splitz"""
+    if verticallimit is not None:
+        v1, v2 = isVerticalLimit(v1, v2, verticallimit)
+    v1 = tuple(v1)
+    v2 = tuple(v2)
+    if v2[2] == v1[2]:
+        return v1
+    ratio = (splitz - v1[2]) / (v2[2] - v1[2])
+    return tuple(a + (b - a) * ratio for a, b in zip(v1, v2))
+
+
+def layerTransitionOps(samples, k, layers, inlayer, below, changed, lastlayer, verticallimit=None):
+    """
+    operations on the parts of all layers for sample k, where the path goes from one layer to another.
+    returns list per layer of (operation, point), operation being
+    'append', 'insert' (before the last point), 'first' or 'end' (of the part)
+    """
+    ops = [[] for l in layers]
+    lastsample = tuple(samples[k - 1])
+    newsample = tuple(samples[k])
+    for i, l in enumerate(layers):
+        if inlayer[i, k]:
+            if changed[i, k]:
+                currentlayer = i
+                last = lastlayer[k]
+                growing = currentlayer < last
+                r = range(currentlayer, last) if growing else range(last, currentlayer)
+                for li, ls in enumerate(r):
+                    betweensample = betweenSample(lastsample, newsample, layers[ls][1], verticallimit)
+                    if growing:
+                        ops[ls].append(('insert' if li > 0 else 'append', betweensample))
+                        ops[ls + 1].append(('append', betweensample))
+                    else:
+                        ops[ls].append(('insert', betweensample))
+                        ops[ls + 1].append(('first', betweensample))
+            ops[i].append(('append', newsample))
+        elif below[i, k]:
+            ops[i].append(('append', (newsample[0], newsample[1], l[1])))
+        else:
+            ops[i].append(('end', None))
+    return ops
+
+
+def splitSamplesToLayers(samples, layers, verticallimit=None):
+    """
+    split sampled pattern chunk, (N, 3) array, into parts for each layer.
+    samples above a layer end its part, samples below are lifted to its bottom,
+    where the path goes from layer to layer, points on the layer border are added.
+    verticallimit is the protect_vertical_limit angle, None when not protecting verticals.
+    returns list per layer of lists of point lists.
+    """
+    count = len(samples)
+    nlayers = len(layers)
+    tops = numpy.array([l[0] for l in layers], dtype=numpy.float64)[:, None]
+    bottoms = numpy.array([l[1] for l in layers], dtype=numpy.float64)[:, None]
+    z = samples[:, 2]
+    inlayer = (bottoms <= z) & (z <= tops)
+    below = ~inlayer & (bottoms > z)
+    above = ~inlayer & ~below
+
+    # last of the layers the previous sample is in, -1 for none
+    lastlayer = numpy.full(count, -1)
+    if count > 1:
+        anylayer = inlayer[:, :-1].any(axis=0)
+        lastlayer[1:] = numpy.where(anylayer, nlayers - 1 - numpy.argmax(inlayer[::-1, :-1], axis=0), -1)
+    changed = inlayer & (lastlayer >= 0) & (numpy.arange(nlayers)[:, None] != lastlayer)
+    special = changed.any(axis=0)
+    transitions = {k: layerTransitionOps(samples, k, layers, inlayer, below, changed, lastlayer, verticallimit)
+                   for k in numpy.flatnonzero(special).tolist()}
+
+    layerparts = []
+    for i in range(nlayers):
+        points = samples.copy()
+        numpy.maximum(points[:, 2], bottoms[i, 0], out=points[:, 2])
+        # each run of samples above the layer ends the current part once
+        ends = above[i] & ~special
+        prev_free = numpy.ones(count, dtype=bool)
+        prev_free[1:] = ~ends[:-1] | special[:-1]
+        breaks = numpy.flatnonzero((ends & prev_free) | special).tolist()
+
+        parts = []
+        current = []
+        pos = 0
+        for b in breaks + [count]:
+            if b > pos:
+                keep = ~above[i, pos:b]
+                current.extend(map(tuple, points[pos:b][keep].tolist()))
+            if b == count:
+                break
+            if special[b]:
+                for op, point in transitions[b][i]:
+                    if op == 'append':
+                        current.append(point)
+                    elif op == 'insert':
+                        current.insert(-1, point)
+                    elif op == 'first':
+                        current.insert(0, point)
+                    elif current:
+                        parts.append(current)
+                        current = []
+            elif current:
+                parts.append(current)
+                current = []
+            pos = b + 1
+        if current:
+            parts.append(current)
+        layerparts.append(parts)
+    return layerparts
+
+
+def sampleImageChunk(points, image, ambient, params):
+    '''sample (N, 3) array of pattern chunk points on the offset image, z=1 outside of ambient'''
+    samples = numpy.array(points, dtype=numpy.float64).reshape((-1, 3))
+    x = samples[:, 0]
+    y = samples[:, 1]
+    inside = polygonContainsPoints(ambient, x, y)
+    z = numpy.ones(len(samples))
+    z[inside] = numpy.maximum(sampleImagePoints(x[inside], y[inside], image, params), params['minz'])
+    samples[:, 2] = z
+    return samples
+
+
+####worker processes
+# state of a worker process, set once by initWorker
+_worker = {}
+
+
+def initWorker(imagename, imageshape, imagedtype, ambientname, ambientsize, params):
+    '''attach the offset image and ambient shared by the main process'''
+    imageblock = shared_memory.SharedMemory(name=imagename)
+    ambientblock = shared_memory.SharedMemory(name=ambientname)
+    _worker['blocks'] = (imageblock, ambientblock)
+    _worker['image'] = numpy.ndarray(imageshape, dtype=imagedtype, buffer=imageblock.buf)
+    _worker['ambient'] = wkb.loads(bytes(ambientblock.buf[:ambientsize]))
+    _worker['params'] = params
+
+
+def packLayerParts(layerparts):
+    '''layer parts as (points array, part lengths) per layer, arrays pickle much faster than tuples'''
+    packed = []
+    for parts in layerparts:
+        points = numpy.array([p for part in parts for p in part], dtype=numpy.float64).reshape((-1, 3))
+        packed.append((points, [len(part) for part in parts]))
+    return packed
+
+
+def unpackLayerParts(packed):
+    layerparts = []
+    for points, lengths in packed:
+        flat = list(map(tuple, points.tolist()))
+        parts = []
+        pos = 0
+        for n in lengths:
+            parts.append(flat[pos:pos + n])
+            pos += n
+        layerparts.append(parts)
+    return layerparts
+
+
+def sampleBatch(batch):
+    '''sample pattern chunks of one batch and split them to layers, in a worker process'''
+    image = _worker['image']
+    ambient = _worker['ambient']
+    params = _worker['params']
+    results = []
+    for points in batch:
+        samples = sampleImageChunk(points, image, ambient, params)
+        results.append(packLayerParts(splitSamplesToLayers(samples, params['layers'], params['verticallimit'])))
+    return results
+
+
+def workerReady():
+    return 'image' in _worker
+
+
+def poolAvailable():
+    return shared_memory is not None
+
+
+def splitBatches(chunkpoints, count):
+    '''split list of point arrays to about count consecutive batches of similar number of points'''
+    total = sum(len(points) for points in chunkpoints)
+    size = max(1, total // max(count, 1))
+    batches = []
+    batch = []
+    n = 0
+    for points in chunkpoints:
+        batch.append(points)
+        n += len(points)
+        if n >= size:
+            batches.append(batch)
+            batch = []
+            n = 0
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+# seconds, starting blender's python with numpy and shapely can take a while
+STARTUP_TIMEOUT = 60
+
+
+class SamplingPool:
+    '''
+    pool of worker processes sampling pattern chunks on one offset image.
+    The image and ambient polygon are put into shared memory once, workers attach them when starting.
+    executable is the python interpreter for the workers, Blender's python when running inside Blender.
+    '''
+
+    def __init__(self, image, ambient, params, processes, executable=None):
+        image = numpy.ascontiguousarray(image)
+        ambientdata = wkb.dumps(ambient)
+        self.blocks = []
+        self.pool = None
+        try:
+            imageblock = shared_memory.SharedMemory(create=True, size=max(image.nbytes, 1))
+            self.blocks.append(imageblock)
+            numpy.ndarray(image.shape, dtype=image.dtype, buffer=imageblock.buf)[...] = image
+            ambientblock = shared_memory.SharedMemory(create=True, size=max(len(ambientdata), 1))
+            self.blocks.append(ambientblock)
+            ambientblock.buf[:len(ambientdata)] = ambientdata
+
+            context = multiprocessing.get_context('spawn')
+            if executable is not None:
+                context.set_executable(executable)
+            self.pool = context.Pool(processes, initializer=initWorker,
+                                     initargs=(imageblock.name, image.shape, image.dtype.str,
+                                               ambientblock.name, len(ambientdata), params))
+            # a worker which can't start is restarted by the pool forever, rather fail here
+            self.pool.apply_async(workerReady).get(timeout=STARTUP_TIMEOUT)
+        except BaseException:
+            self.close()
+            raise
+        self.processes = processes
+
+    def sample(self, chunkpoints):
+        '''layer parts of each of the pattern chunks, (N, 3) arrays, in their order'''
+        # several batches per process keep the load balanced
+        batches = splitBatches(chunkpoints, self.processes * 4)
+        for batchparts in self.pool.imap(sampleBatch, batches):
+            for packed in batchparts:
+                yield unpackLayerParts(packed)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
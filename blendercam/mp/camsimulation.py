@@ -0,0 +1,372 @@
+# blender CAM camsimulation.py (c) 2012 Vilem Novak
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.	See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ***** END GPL LICENCE BLOCK *****
+
+# simulation of stock removal in a heightmap.
+# - the heightmap is a float32 array split to tiles. Tiles lowered by a path are tracked,
+#   each path keeps its own heightmap only in tiles where it cut, so after paths change only they
+#   are simulated again and the stock is combined again only in tiles where they cut, before or now.
+# - segments of paths are stamped as the cutter swept along them: for longer segments the lowest point
+#   of the spinning cutter over each pixel is computed from the distance of the pixel from the segment,
+#   short segments are stamped as cutter spots every pixel.
+# - removed volume is measured for each segment, for feedrate optimization.
+# Doesn't use blender, see camsampling.py.
+
+import hashlib
+
+import numpy
+
+TILE_SIZE = 64
+# segments shorter than this, in pixels, are stamped as cutter spots
+SWEEP_MIN_LENGTH = 4
+# longer segments are swept in parts of this length, so the swept region stays small
+SWEEP_MAX_LENGTH = 64
+# step of distances in the cutter profile, in pixels
+PROFILE_STEP = 0.25
+
+
+class TiledHeightmap:
+    '''
+    heights of the stock in a float32 array split to square tiles.
+    tracks tiles which were lowered and dirty tiles, which changed since they were last taken.
+    '''
+
+    def __init__(self, shape, top, tilesize=TILE_SIZE):
+        self.shape = tuple(shape)
+        self.top = top
+        self.tilesize = tilesize
+        self.heights = numpy.full(self.shape, top, dtype=numpy.float32)
+        tilecount = (-(-self.shape[0] // tilesize), -(-self.shape[1] // tilesize))
+        self.touched = numpy.zeros(tilecount, dtype=bool)
+        self.dirty = numpy.zeros(tilecount, dtype=bool)
+
+    def tileRegion(self, key):
+        t = self.tilesize
+        return slice(key[0] * t, (key[0] + 1) * t), slice(key[1] * t, (key[1] + 1) * t)
+
+    def lower(self, x0, y0, values, getvolume=False):
+        '''lowers heights of the region starting at x0, y0 to values where they are lower, returns the removed volume'''
+        x1 = x0 + values.shape[0]
+        y1 = y0 + values.shape[1]
+        region = self.heights[x0:x1, y0:y1]
+        if getvolume:
+            before = region.sum(dtype=numpy.float64)
+        numpy.minimum(region, values, out=region)
+        t = self.tilesize
+        tiles = slice(x0 // t, (x1 - 1) // t + 1), slice(y0 // t, (y1 - 1) // t + 1)
+        self.touched[tiles] = True
+        self.dirty[tiles] = True
+        if getvolume:
+            return before - region.sum(dtype=numpy.float64)
+        return 0
+
+    def getTiles(self):
+        '''copies of the lowered tiles by their index'''
+        return {key: self.heights[self.tileRegion(key)].copy() for key in zip(*numpy.nonzero(self.touched))}
+
+    def lowerTiles(self, tiles):
+        '''lowers heights to tiles from getTiles of another heightmap of the same shape'''
+        for key, tile in tiles.items():
+            region = self.heights[self.tileRegion(key)]
+            numpy.minimum(region, tile, out=region)
+            self.touched[key] = True
+            self.dirty[key] = True
+
+    def takeDirty(self):
+        '''indices of tiles changed since the last call'''
+        keys = list(zip(*numpy.nonzero(self.dirty)))
+        self.dirty[:] = False
+        return keys
+
+
+def prepareCutter(cutter, radius):
+    '''
+    cutter array from getCutterArray with its radius in pixels, for stamping.
+    the profile are heights of the spinning cutter above its tip by distance from its axis,
+    at each distance it removes material down to its lowest point around the axis.
+    '''
+    cutter = numpy.asarray(cutter, dtype=numpy.float32)
+    inside = cutter > -10
+    heights = numpy.where(inside, -cutter, numpy.float32(numpy.inf))
+    res = cutter.shape[0]
+    coords = numpy.arange(res) + 0.5 - res / 2
+    d = numpy.hypot(coords[:, None], coords[None, :])[inside]
+    pixeldistances, inverse = numpy.unique(d, return_inverse=True)
+    pixelheights = numpy.full(len(pixeldistances), numpy.inf)
+    numpy.minimum.at(pixelheights, inverse.ravel(), heights[inside])
+
+    distances = numpy.linspace(0, radius, max(int(numpy.ceil(radius / PROFILE_STEP)), 1) + 1)
+    if len(pixeldistances) > 0:
+        profile = numpy.interp(distances, pixeldistances, pixelheights)
+    else:
+        profile = numpy.full(len(distances), numpy.inf)
+    # heights of the cutter over a pixel by distance of the pixel from a segment and offset of the axis
+    # along the segment, both sampled as the distances
+    reach = numpy.interp(numpy.hypot(distances[:, None], distances[None, :]), distances, profile, right=numpy.inf)
+    return {
+        'heights': heights,
+        'radius': radius,
+        'distances': distances,
+        'profile': profile,
+        'reach': reach,
+    }
+
+
+def lowestOffsets(cutter, slope):
+    '''
+    offsets along a segment of the lowest cutter points by distance of a pixel from it, for a segment
+    rising by slope. The offset is where the cutter height - abs(slope) * offset is lowest.
+    '''
+    distances = cutter['distances']
+    heights = cutter['reach'] - abs(slope) * distances[None, :]
+    rows = numpy.arange(len(distances))
+    j = numpy.argmin(heights, axis=1)
+    # the lowest point between the sampled offsets, from a parabola through the heights around it
+    inner = numpy.flatnonzero((j > 0) & (j < len(distances) - 1))
+    a = heights[inner, j[inner] - 1]
+    b = heights[inner, j[inner]]
+    c = heights[inner, j[inner] + 1]
+    curvature = a - 2 * b + c
+    valid = numpy.isfinite(curvature) & (curvature > 0)
+    shift = numpy.zeros(len(rows))
+    shift[inner[valid]] = 0.5 * (a - c)[valid] / curvature[valid]
+    offsets = distances[j] + shift * (distances[1] - distances[0])
+    # lowest at the edge of the cutter, which is between the samples
+    last = len(distances) - 1
+    edge = (j == last) | numpy.isinf(heights[rows, numpy.minimum(j + 1, last)])
+    radius = cutter['radius']
+    offsets[edge] = numpy.sqrt(numpy.maximum(radius * radius - distances[edge] ** 2, 0))
+    return offsets
+
+
+def sweepEnvelope(p0, p1, cutter, x0, x1, y0, y1):
+    '''
+    lowest height of the cutter moving straight from p0 to p1 over pixels of the region, inf where it doesn't reach.
+    a pixel in distance v from the segment and u along it is reached by the cutter point in distance
+    sqrt(w * w + v * v) from the axis, when the axis is u - w along the segment.
+    '''
+    distances = cutter['distances']
+    qx = numpy.arange(x0, x1) + 0.5 - p0[0]
+    qy = numpy.arange(y0, y1) + 0.5 - p0[1]
+    length = numpy.hypot(p1[0] - p0[0], p1[1] - p0[1])
+    ex = (p1[0] - p0[0]) / length
+    ey = (p1[1] - p0[1]) / length
+    u = qx[:, None] * ex + qy[None, :] * ey
+    v = numpy.abs(qx[:, None] * ey - qy[None, :] * ex)
+    slope = (p1[2] - p0[2]) / length
+    if slope == 0:
+        w = numpy.clip(0, u - length, u)
+    else:
+        # the profile is convex for the usual cutters, so the lowest point in the segment is the closest one
+        # to the lowest point of the whole line. Squares of offsets are linear in squares of distances
+        # for flat, ball and v cutters, so they are interpolated.
+        offsets = numpy.sqrt(numpy.interp(v * v, distances * distances, lowestOffsets(cutter, slope) ** 2))
+        w = numpy.clip(numpy.copysign(offsets, slope), u - length, u)
+    # rounding mustn't get pixels at the edge out of the cutter
+    d = numpy.sqrt(w * w + v * v) * (1 - 1e-9)
+    return p0[2] + slope * (u - w) + numpy.interp(d, distances, cutter['profile'], right=numpy.inf)
+
+
+def lowerHeightmaps(heightmaps, x0, y0, values, getvolume=False):
+    '''lowers heightmaps to values of a region, which can be partly out of them, returns the volume removed from the first'''
+    shape = heightmaps[0].shape
+    cx0 = max(0, -x0)
+    cy0 = max(0, -y0)
+    cx1 = min(values.shape[0], shape[0] - x0)
+    cy1 = min(values.shape[1], shape[1] - y0)
+    if cx1 <= cx0 or cy1 <= cy0:
+        return 0
+    values = values[cx0:cx1, cy0:cy1]
+    volume = heightmaps[0].lower(x0 + cx0, y0 + cy0, values, getvolume)
+    for heightmap in heightmaps[1:]:
+        heightmap.lower(x0 + cx0, y0 + cy0, values)
+    return volume
+
+
+def stampSpots(heightmaps, spots, cutter, getvolume=False):
+    '''lowers heightmaps by the cutter standing at spots, returns the volume removed from the first heightmap'''
+    if len(spots) == 0:
+        return 0
+    heights = cutter['heights']
+    res = heights.shape[0]
+    spots = numpy.asarray(spots)
+    corners = numpy.rint(spots[:, :2] - res / 2).astype(int)
+    x0, y0 = corners.min(axis=0)
+    x1, y1 = corners.max(axis=0) + res
+    # the spots are put together first, so heightmaps are lowered only once
+    values = numpy.full((x1 - x0, y1 - y0), numpy.inf, dtype=numpy.float32)
+    last = None
+    for (x, y), z in zip((corners - (x0, y0)).tolist(), spots[:, 2].tolist()):
+        if (x, y) == last and z >= lastz:
+            continue
+        region = values[x:x + res, y:y + res]
+        numpy.minimum(region, heights + numpy.float32(z), out=region)
+        last = (x, y)
+        lastz = z
+    return lowerHeightmaps(heightmaps, x0, y0, values, getvolume)
+
+
+def segmentSpots(p0, p1):
+    '''spots every pixel of a segment, without p0'''
+    count = max(int(numpy.ceil(numpy.hypot(p1[0] - p0[0], p1[1] - p0[1]))), 1)
+    return [p0 + (p1 - p0) * (k / count) for k in range(1, count + 1)]
+
+
+def sweepSegment(heightmaps, p0, p1, cutter, getvolume=False):
+    '''lowers heightmaps by the cutter moving from p0 to p1, returns the volume removed from the first heightmap'''
+    length = numpy.hypot(p1[0] - p0[0], p1[1] - p0[1])
+    radius = cutter['radius']
+    volume = 0
+    parts = int(numpy.ceil(length / SWEEP_MAX_LENGTH))
+    for k in range(parts):
+        a = p0 + (p1 - p0) * (k / parts)
+        b = p0 + (p1 - p0) * ((k + 1) / parts)
+        x0 = int(numpy.floor(min(a[0], b[0]) - radius))
+        y0 = int(numpy.floor(min(a[1], b[1]) - radius))
+        x1 = int(numpy.ceil(max(a[0], b[0]) + radius))
+        y1 = int(numpy.ceil(max(a[1], b[1]) + radius))
+        values = sweepEnvelope(a, b, cutter, x0, x1, y0, y1).astype(numpy.float32)
+        volume += lowerHeightmaps(heightmaps, x0, y0, values, getvolume)
+    return volume
+
+
+def simulatePath(points, cutter, heightmaps, getvolume=False, progress=None):
+    '''
+    lowers heightmaps by the cutter moving along points, rows of x, y in pixels and z.
+    Only moves below the top of the first heightmap are stamped, lift ups are skipped.
+    returns the volume removed from the first heightmap by each segment, in pixels * height,
+    at the index of the point the segment ends in.
+    '''
+    points = numpy.asarray(points, dtype=numpy.float64)
+    volumes = numpy.zeros(len(points))
+    top = heightmaps[0].top
+    below = points[:, 2] < top
+    lengths = numpy.hypot(*(points[1:, :2] - points[:-1, :2]).T)
+    # spots of short segments, stamped together. The spot in the start of a segment
+    # was stamped with the previous segment.
+    spots = []
+    perc = -1
+    for i in range(1, len(points)):
+        if progress is not None and perc != int(100 * i / len(points)):
+            perc = int(100 * i / len(points))
+            progress(perc)
+        if not (below[i - 1] or below[i]):
+            continue
+        p0 = points[i - 1]
+        p1 = points[i]
+        length = lengths[i - 1]
+        if length == 0:
+            if p1[2] < p0[2]:  # the cutter goes straight down, only the end counts
+                spots.append(p1)
+        elif length < SWEEP_MIN_LENGTH:
+            spots.extend(segmentSpots(p0, p1))
+        else:
+            volumes[i] = stampSpots(heightmaps, spots, cutter, getvolume)
+            spots = []
+            volumes[i] += sweepSegment(heightmaps, p0, p1, cutter, getvolume)
+            continue
+        if getvolume or len(spots) >= SWEEP_MAX_LENGTH:
+            volumes[i] = stampSpots(heightmaps, spots, cutter, getvolume)
+            spots = []
+    stampSpots(heightmaps, spots, cutter)
+    return volumes
+
+
+def pathKey(points, cutter):
+    '''key for checking whether a path changed'''
+    h = hashlib.sha1(numpy.ascontiguousarray(points, dtype=numpy.float64).tobytes())
+    h.update(cutter['heights'].tobytes())
+    h.update(numpy.float64(cutter['radius']).tobytes())
+    return h.hexdigest()
+
+
+class Simulation:
+    '''
+    stock heightmap after milling paths one after another.
+    keeps the heightmap of each path alone in tiles where it cut, so when paths change only they are simulated again
+    and only tiles where they cut, before or now, are combined again.
+    '''
+
+    def __init__(self, shape, top, tilesize=TILE_SIZE):
+        self.heightmap = TiledHeightmap(shape, top, tilesize)
+        self.paths = []  # key, tiles and volumes of each simulated path
+
+    def simulatePath(self, points, cutter, key, previous, getvolume, progress):
+        heightmap = self.heightmap
+        envelope = TiledHeightmap(heightmap.shape, heightmap.top, heightmap.tilesize)
+        if getvolume:
+            # stock left by previous paths, the volume is removed from it
+            stock = TiledHeightmap(heightmap.shape, heightmap.top, heightmap.tilesize)
+            for path in previous:
+                stock.lowerTiles(path['tiles'])
+            volumes = simulatePath(points, cutter, [stock, envelope], True, progress)
+        else:
+            simulatePath(points, cutter, [envelope], False, progress)
+            volumes = None
+        return {'key': key, 'tiles': envelope.getTiles(), 'volumes': volumes}
+
+    def update(self, paths, progress=None):
+        '''
+        simulates paths given as (points, cutter, getvolume), points are rows of x, y in pixels and z,
+        cutter is from prepareCutter. Paths which didn't change aren't simulated again, unless their
+        volume is needed and paths before them changed.
+        returns removed volumes of segments of paths with getvolume, see simulatePath, None for other paths.
+        progress is called with index of the path and percentage of its points.
+        '''
+        old = self.paths
+        new = []
+        changed = False
+        for i, (points, cutter, getvolume) in enumerate(paths):
+            key = pathKey(points, cutter)
+            same = i < len(old) and old[i]['key'] == key
+            changed = changed or not same
+            if same and (old[i]['volumes'] is not None or not getvolume) and not (changed and getvolume):
+                new.append(old[i])
+                continue
+            pathprogress = None
+            if progress is not None:
+                pathprogress = lambda p, i=i: progress(i, p)
+            new.append(self.simulatePath(points, cutter, key, new, getvolume, pathprogress))
+
+        # combine the stock again in tiles where removed or new paths cut
+        oldids = set(id(path) for path in old)
+        newids = set(id(path) for path in new)
+        tiles = set()
+        for path in old:
+            if id(path) not in newids:
+                tiles.update(path['tiles'])
+        for path in new:
+            if id(path) not in oldids:
+                tiles.update(path['tiles'])
+        heightmap = self.heightmap
+        for key in tiles:
+            region = heightmap.heights[heightmap.tileRegion(key)]
+            region.fill(heightmap.top)
+            for path in new:
+                tile = path['tiles'].get(key)
+                if tile is not None:
+                    numpy.minimum(region, tile, out=region)
+            heightmap.dirty[key] = True
+        heightmap.touched[:] = False
+        for path in new:
+            for key in path['tiles']:
+                heightmap.touched[key] = True
+        self.paths = new
+        return [path['volumes'] for path in new]
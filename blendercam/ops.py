@@ -23,7 +23,7 @@
 from pprint import pprint
 
 import bpy
-import subprocess, os, sys, threading
+import subprocess, os, sys, threading, time
 import cam
 from cam import utils, pack, polygon_utils_cam, chunk, simple
 from bpy.props import *
@@ -122,6 +122,20 @@ def timer_update(context):
 #		if area.type == 'PROPERTIES':
 #			area.tag_redraw()
 
+def startBackgroundOperation(index, stdout=subprocess.PIPE, env=None):
+    '''start blender in background computing operation with this index in the saved file'''
+    bpath = bpy.app.binary_path
+    fpath = bpy.data.filepath
+
+    for p in bpy.utils.script_paths():
+        scriptpath = p + os.sep + 'addons' + os.sep + 'cam' + os.sep + 'backgroundop.py'
+        print(scriptpath)
+        if os.path.isfile(scriptpath):
+            break
+    return subprocess.Popen([bpath, '-b', fpath, '-P', scriptpath, '--', '-o=' + str(index)],
+                            bufsize=1, stdout=stdout, stdin=subprocess.PIPE, env=env)
+
+
 class PathsBackground(bpy.types.Operator):
     '''calculate CAM paths in background. File has to be saved before.'''
     bl_idname = "object.calculate_cam_paths_background"
@@ -143,16 +157,7 @@ class PathsBackground(bpy.types.Operator):
         # bpy.ops.wm.save_mainfile()#this has to be replaced with passing argument or pickle stuff..
         # picklepath=getCachePath(o)+'init.pickle'
 
-        bpath = bpy.app.binary_path
-        fpath = bpy.data.filepath
-
-        for p in bpy.utils.script_paths():
-            scriptpath = p + os.sep + 'addons' + os.sep + 'cam' + os.sep + 'backgroundop.py'
-            print(scriptpath)
-            if os.path.isfile(scriptpath):
-                break
-        proc = subprocess.Popen([bpath, '-b', fpath, '-P', scriptpath, '--', '-o=' + str(s.cam_active_operation)],
-                                bufsize=1, stdout=subprocess.PIPE, stdin=subprocess.PIPE)
+        proc = startBackgroundOperation(s.cam_active_operation)
 
         tcom = threadCom(o, proc)
         readthread = threading.Thread(target=threadread, args=([tcom]), daemon=True)
@@ -301,6 +306,61 @@ def getChainOperations(chain):
     return chop
 
 
+def getOperationInputNames(o):
+    '''names of objects the operation is computed from'''
+    names = {o.object_name, o.curve_object, o.curve_object1}
+    if o.geometry_source == 'GROUP' and o.group_name in bpy.data.collections:
+        names.update(ob.name for ob in bpy.data.collections[o.group_name].objects)
+    if o.use_limit_curve:
+        names.add(o.limit_curve)
+    return names
+
+
+def getIndependentOperations(chainops):
+    '''chain operations which don't use paths of other operations in the chain'''
+    pathnames = {"cam_path_{}".format(o.name) for o in chainops}
+    independent = []
+    for o in chainops:
+        used = getOperationInputNames(o) & pathnames
+        used.discard("cam_path_{}".format(o.name))
+        if not used:
+            independent.append(o)
+    return independent
+
+
+def calculateBackgroundOperations(operations, workers):
+    '''
+    compute operations at the same time in background blender processes, at most workers at once,
+    and wait for them. Returns operations which failed.
+    '''
+    s = bpy.context.scene
+    env = dict(os.environ)
+    # cores are shared by the processes, don't let each of them start a process per core
+    env['CAM_WORKER_PROCESSES'] = str(max(1, workers // max(1, len(operations))))
+    todo = list(operations)
+    running = []
+    failed = []
+    while todo or running:
+        while todo and len(running) < workers:
+            o = todo.pop(0)
+            picklepath = simple.getCachePath(o) + '.pickle'
+            if os.path.isfile(picklepath):
+                os.remove(picklepath)
+            print('\nCalculating path in background :' + o.name)
+            proc = startBackgroundOperation(s.cam_operations.find(o.name), stdout=subprocess.DEVNULL, env=env)
+            running.append((o, proc))
+        time.sleep(0.1)
+        for o, proc in running[:]:
+            if proc.poll() is None:
+                continue
+            running.remove((o, proc))
+            if os.path.isfile(simple.getCachePath(o) + '.pickle'):
+                utils.reload_paths(o)
+            else:
+                failed.append(o)
+    return failed
+
+
 class PathsChain(bpy.types.Operator):
     '''calculate a chain and export the gcode alltogether. '''
     bl_idname = "object.calculate_cam_paths_chain"
@@ -314,8 +374,20 @@ class PathsChain(bpy.types.Operator):
         chainops = getChainOperations(chain)
         meshes = []
 
+        computed = set()
+        if chain.parallel:
+            # background processes read the saved file
+            if bpy.data.filepath == '' or bpy.data.is_dirty:
+                self.report({'WARNING'}, "Save the file to compute the chain in parallel")
+            else:
+                independent = getIndependentOperations(chainops)
+                failed = calculateBackgroundOperations(independent, simple.getWorkerCount())
+                computed = {o.name for o in independent} - {o.name for o in failed}
+
         # if len(chainops)<4:
         for i in range(0, len(chainops)):
+            if chainops[i].name in computed:
+                continue
             s.cam_active_operation = s.cam_operations.find(chainops[i].name)
             bpy.ops.object.calculate_cam_path()
 
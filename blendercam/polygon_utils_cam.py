@@ -30,6 +30,8 @@ from shapely.geometry import polygon as spolygon
 from shapely import ops
 from shapely import geometry as sgeometry
 
+from camsampling import polygonContainsPoints
+
 SHAPELY = True
 
 
@@ -175,6 +175,22 @@ def getCachePath(o):
     return iname
 
 
+def getWorkerCount():
+    '''number of processes for path calculation, CAM_WORKER_PROCESSES environment variable overrides the preferences'''
+    count = os.environ.get('CAM_WORKER_PROCESSES')
+    if count:
+        return max(1, int(count))
+    count = bpy.context.preferences.addons['cam'].preferences.worker_processes
+    if count == 0:
+        count = os.cpu_count() or 1
+    return count
+
+
+def getWorkerExecutable():
+    '''python interpreter for worker processes, sys.executable is blender itself before 2.91'''
+    return getattr(bpy.app, 'binary_path_python', None) or sys.executable
+
+
 def safeFileName(name):  # for export gcode
     valid_chars = "-_.()%s%s" % (string.ascii_letters, string.digits)
     filename = ''.join(c for c in name if c in valid_chars)
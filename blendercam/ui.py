@@ -276,6 +276,7 @@ class CAM_CHAINS_Panel(CAMButtonsPanel, bpy.types.Panel):
 
                 layout.prop(chain, 'name')
                 layout.prop(chain, 'filename')
+                layout.prop(chain, 'parallel')
 
 
 class CAM_OPERATIONS_Panel(CAMButtonsPanel, bpy.types.Panel):
@@ -576,6 +577,7 @@ class CAM_MOVEMENT_Panel(CAMButtonsPanel, bpy.types.Panel):
                 layout.prop(ao, 'stay_low')
                 if ao.stay_low:
                     layout.prop(ao, 'merge_dist')
+                layout.prop(ao, 'optimize_order')
                 layout.prop(ao, 'protect_vertical')
                 if ao.protect_vertical:
                     layout.prop(ao, 'protect_vertical_limit')
@@ -42,7 +42,6 @@ from cam import chunk
 from cam.chunk import *
 from cam import collision
 from cam.collision import *
-# import multiprocessing
 from cam import simple
 from cam.simple import *
 from cam import pattern
@@ -51,6 +50,8 @@ from cam import polygon_utils_cam
 from cam.polygon_utils_cam import *
 from cam import image_utils
 from cam.image_utils import *
+import camsampling
+from camsampling import splitSamplesToLayers
 from cam.nc import nc
 from cam.nc import iso
 from cam.opencamlib.opencamlib import oclSample, oclSamplePoints, oclResampleChunks, oclGetWaterline
@@ -63,6 +64,9 @@ from shapely import affinity, prepared
 # from shapely.geometry import * not possible until Polygon libs gets out finally..
 SHAPELY = True
 
+# smaller operations are sampled faster than worker processes start
+PARALLEL_MIN_SAMPLES = 20000
+
 
 def positionObject(operation):
     ob = bpy.data.objects[operation.object_name]
@@ -367,57 +371,83 @@ def samplePathLow(o, ch1, ch2, dosample):
     return bpath
 
 
-# def threadedSampling():#not really possible at all without running more blenders for same operation :( python!
+def getSamplingParams(o, layers, minz):
+    '''operation settings needed for image sampling, as plain values which can be sent to worker processes'''
+    return {
+        'minx': o.min.x,
+        'miny': o.min.y,
+        'pixsize': o.pixsize,
+        'borderwidth': o.borderwidth,
+        'skin': o.skin,
+        'minz': minz,
+        'layers': [tuple(l) for l in layers],
+        'verticallimit': o.protect_vertical_limit if o.protect_vertical else None,
+    }
+
+
+def samplePatternChunk(o, patternchunk, params):
+    """(N, 3) array of sampled points of the pattern chunk, z=1 outside of ambient"""
+    minz = params['minz']
+    samples = numpy.array([s[:3] for s in patternchunk.points], dtype=numpy.float64).reshape((-1, 3))
+    if not o.use_exact:
+        return camsampling.sampleImageChunk(samples, o.offset_image, o.ambient, params)
+    x = samples[:, 0]
+    y = samples[:, 1]
+    inside = polygonContainsPoints(o.ambient, x, y)
+    z = numpy.ones(len(samples))
+    if o.use_opencamlib:
+        z[inside] = samples[inside, 2]
+    else:
+        # search only near the depth of the last sample, it saves about 30% of sampling time
+        cutter = o.cutter_shape
+        cutterdepth = cutter.dimensions.z / 2
+        lastz = None
+        for k, (px, py, pin) in enumerate(zip(x.tolist(), y.tolist(), inside.tolist())):
+            if pin:
+                if lastz is not None:
+                    pz = getSampleBullet(cutter, px, py, cutterdepth, 1, lastz - o.dist_along_paths)
+                    if pz < minz - 1:
+                        pz = getSampleBullet(cutter, px, py, cutterdepth, lastz - o.dist_along_paths, minz)
+                else:
+                    pz = getSampleBullet(cutter, px, py, cutterdepth, 1, minz)
+                z[k] = max(pz, minz)
+            lastz = z[k]
+    z[inside] = numpy.maximum(z[inside], minz)
+    samples[:, 2] = z
+    return samples
+
+
 # samples in both modes now - image and bullet collision too.
+# each pattern chunk is sampled and split to layers as whole arrays,
+# in image mode big operations are sampled by a pool of processes.
 def sampleChunks(o, pathSamples, layers):
     #
-    minx, miny, minz, maxx, maxy, maxz = o.min.x, o.min.y, o.min.z, o.max.x, o.max.y, o.max.z
     getAmbient(o)
 
     if o.use_exact:  # prepare collision world
         if o.use_opencamlib:
             oclSample(o, pathSamples)
-            cutterdepth = 0
         else:
             if o.update_bullet_collision_tag:
                 prepareBulletCollision(o)
 
                 o.update_bullet_collision_tag = False
-            # print (o.ambient)
-            cutter = o.cutter_shape
-            cutterdepth = cutter.dimensions.z / 2
     else:
         if o.strategy != 'WATERLINE':  # or prepare offset image, but not in some strategies.
             prepareArea(o)
 
-        pixsize = o.pixsize
-
-        coordoffset = o.borderwidth + pixsize / 2  # -m
-
-        res = ceil(o.cutter_diameter / o.pixsize)
-        m = res / 2
-
-    t = time.time()
-    # print('sampling paths')
-
     totlen = 0;  # total length of all chunks, to estimate sampling time.
     for ch in pathSamples:
         totlen += len(ch.points)
     layerchunks = []
     minz = o.minz - 0.000001  # correction for image method problems
-    layeractivechunks = []
+    params = getSamplingParams(o, layers, minz)
     lastrunchunks = []
 
     for l in layers:
         layerchunks.append([])
-        layeractivechunks.append(camPathChunk([]))
         lastrunchunks.append([])
 
-    zinvert = 0
-    if o.inverse:
-        ob = bpy.data.objects[o.object_name]
-        zinvert = ob.location.z + maxz  # ob.bound_box[6][2]
-
     n = 0
     last_percent = -1
     # timing for optimisation
@@ -425,155 +455,54 @@ def sampleChunks(o, pathSamples, layers):
     sortingtime = timinginit()
     totaltime = timinginit()
     timingstart(totaltime)
-    lastz = minz
-    for patternchunk in pathSamples:
-        thisrunchunks = []
-        for l in layers:
-            thisrunchunks.append([])
-        lastlayer = None
-        currentlayer = None
-        lastsample = None
-        # threads_count=4
 
-        # for t in range(0,threads):
+    pool = None
+    workers = getWorkerCount()
+    # bullet collision and opencamlib need blender, only image sampling goes to other processes.
+    if (workers > 1 and not o.use_exact and o.strategy != 'WATERLINE' and totlen >= PARALLEL_MIN_SAMPLES
+            and camsampling.poolAvailable()):
+        try:
+            pool = camsampling.SamplingPool(o.offset_image, o.ambient, params, workers, getWorkerExecutable())
+        except Exception as e:
+            print('sampling processes failed to start, sampling here', e)
+    if pool is not None:
+        print('sampling in %i processes' % workers)
+        sampled = pool.sample([numpy.array([s[:3] for s in ch.points], dtype=numpy.float64).reshape((-1, 3))
+                               for ch in pathSamples])
+    else:
+        sampled = (splitSamplesToLayers(samplePatternChunk(o, ch, params), params['layers'], params['verticallimit'])
+                   for ch in pathSamples)
 
-        for s in patternchunk.points:
-            if o.strategy != 'WATERLINE' and int(100 * n / totlen) != last_percent:
-                last_percent = int(100 * n / totlen)
+    try:
+        for patternchunk in pathSamples:
+            if o.strategy != 'WATERLINE' and int(100 * n / max(totlen, 1)) != last_percent:
+                last_percent = int(100 * n / max(totlen, 1))
                 progress('sampling paths ', last_percent)
-            n += 1
-            x = s[0]
-            y = s[1]
-            if not o.ambient.contains(sgeometry.Point(x, y)):
-                newsample = (x, y, 1)
-            else:
-                if o.use_opencamlib and o.use_exact:
-                    z = s[2]
-                    if minz > z:
-                        z = minz
-                    newsample = (x, y, z)
-                ####sampling
-                elif o.use_exact and not o.use_opencamlib:
-
-                    if lastsample != None:  # this is an optimalization, search only for near depths to the last sample. Saves about 30% of sampling time.
-                        z = getSampleBullet(cutter, x, y, cutterdepth, 1,
-                                            lastsample[2] - o.dist_along_paths)  # first try to the last sample
-                        if z < minz - 1:
-                            z = getSampleBullet(cutter, x, y, cutterdepth, lastsample[2] - o.dist_along_paths, minz)
-                    else:
-                        z = getSampleBullet(cutter, x, y, cutterdepth, 1, minz)
-
-                # print(z)
-                # here we have
-                else:
-                    timingstart(samplingtime)
-                    xs = (x - minx) / pixsize + coordoffset
-                    ys = (y - miny) / pixsize + coordoffset
-                    timingadd(samplingtime)
-                    # if o.inverse:
-                    #  z=layerstart
-                    z = getSampleImage((xs, ys), o.offset_image, minz) + o.skin
-                # if minz>z and o.ambient.isInside(x,y):
-                #	z=minz;
-                ################################
-                # handling samples
-                ############################################
-
-                if minz > z:
-                    z = minz
-                newsample = (x, y, z)
-            # z=max(minz,z)
-
-            # if sampled:# and (not o.inverse or (o.inverse)):uh what was this? disabled
-            #	newsample=(x,y,z)
-
-            # elif o.ambient_behaviour=='ALL' and not o.inverse:#handle ambient here, this should be obsolete,
-            #	newsample=(x,y,minz)
-            for i, l in enumerate(layers):
-                terminatechunk = False
-
-                ch = layeractivechunks[i]
-                # print(i,l)
-                # print(l[1],l[0])
-
-                if l[1] <= newsample[2] <= l[0]:
-                    lastlayer = None  # rather the last sample here ? has to be set to None, since sometimes lastsample vs lastlayer didn't fit and did ugly ugly stuff....
-                    if lastsample != None:
-                        for i2, l2 in enumerate(layers):
-                            if l2[1] <= lastsample[2] <= l2[0]:
-                                lastlayer = i2
-
-                    currentlayer = i
-                    if lastlayer != None and lastlayer != currentlayer:  # and lastsample[2]!=newsample[2]:#sampling for sorted paths in layers- to go to the border of the sampled layer at least...there was a bug here, but should be fixed.
-                        if currentlayer < lastlayer:
-                            growing = True
-                            r = range(currentlayer, lastlayer)
-                            spliti = 1
-                        else:
-                            r = range(lastlayer, currentlayer)
-                            growing = False
-                            spliti = 0
-                        # print(r)
-                        li = 0
-                        for ls in r:
-                            splitz = layers[ls][1]
-                            # print(ls)
-
-                            v1 = lastsample
-                            v2 = newsample
-                            if o.protect_vertical:
-                                v1, v2 = isVerticalLimit(v1, v2, o.protect_vertical_limit)
-                            v1 = Vector(v1)
-                            v2 = Vector(v2)
-                            # print(v1,v2)
-                            ratio = (splitz - v1.z) / (v2.z - v1.z)
-                            # print(ratio)
-                            betweensample = v1 + (v2 - v1) * ratio
-
-                            # ch.points.append(betweensample.to_tuple())
-
-                            if growing:
-                                if li > 0:
-                                    layeractivechunks[ls].points.insert(-1, betweensample.to_tuple())
-                                else:
-                                    layeractivechunks[ls].points.append(betweensample.to_tuple())
-                                layeractivechunks[ls + 1].points.append(betweensample.to_tuple())
-                            else:
-                                # print(v1,v2,betweensample,lastlayer,currentlayer)
-                                layeractivechunks[ls].points.insert(-1, betweensample.to_tuple())
-                                layeractivechunks[ls + 1].points.insert(0, betweensample.to_tuple())
-
-                            li += 1
-                    # this chunk is terminated, and allready in layerchunks /
-
-                    # ch.points.append(betweensample.to_tuple())#
-                    ch.points.append(newsample)
-                elif l[1] > newsample[2]:
-                    ch.points.append((newsample[0], newsample[1], l[1]))
-                elif l[0] < newsample[2]:  # terminate chunk
-                    terminatechunk = True
-
-                if terminatechunk:
-                    if len(ch.points) > 0:
-                        layerchunks[i].append(ch)
-                        thisrunchunks[i].append(ch)
-                        layeractivechunks[i] = camPathChunk([])
-            lastsample = newsample
-
-        for i, l in enumerate(layers):
-            ch = layeractivechunks[i]
-            if len(ch.points) > 0:
-                layerchunks[i].append(ch)
-                thisrunchunks[i].append(ch)
-                layeractivechunks[i] = camPathChunk([])
-
-            # PARENTING
-            if o.strategy == 'PARALLEL' or o.strategy == 'CROSS' or o.strategy == 'OUTLINEFILL':
-                timingstart(sortingtime)
-                parentChildDist(thisrunchunks[i], lastrunchunks[i], o)
-                timingadd(sortingtime)
-
-        lastrunchunks = thisrunchunks
+            n += len(patternchunk.points)
+
+            timingstart(samplingtime)
+            layerparts = next(sampled)
+            timingadd(samplingtime)
+
+            thisrunchunks = []
+            for i, parts in enumerate(layerparts):
+                thisrunchunks.append([])
+                for points in parts:
+                    ch = camPathChunk([])
+                    ch.points = points
+                    layerchunks[i].append(ch)
+                    thisrunchunks[i].append(ch)
+
+                # PARENTING
+                if o.strategy == 'PARALLEL' or o.strategy == 'CROSS' or o.strategy == 'OUTLINEFILL':
+                    timingstart(sortingtime)
+                    parentChildDist(thisrunchunks[i], lastrunchunks[i], o)
+                    timingadd(sortingtime)
+
+            lastrunchunks = thisrunchunks
+    finally:
+        if pool is not None:
+            pool.close()
 
     # print(len(layerchunks[i]))
     progress('checking relations between paths')
@@ -914,10 +843,13 @@ def doSimulation(name, operations):
         getOperationSources(o)
     limits = getBoundsMultiple(
         operations)  # this is here because some background computed operations still didn't have bounds data
-    i = image_utils.generateSimulationImage(operations, limits)
+    i = image_utils.generateSimulationImage(operations, limits, name)
     cp = getCachePath(operations[0])[:-len(operations[0].name)] + name
     iname = cp + '_sim.exr'
 
+    if not image_utils.simulationChanged(name) and os.path.isfile(iname) and 'csim_' + name in bpy.data.objects:
+        print('simulation of ' + name + ' did not change')
+        return
     numpysave(i, iname)
     i = bpy.data.images.load(iname)
     createSimulationObject(name, operations, i)
@@ -1571,87 +1503,76 @@ def connectChunksLow(chunks, o):
     return connectedchunks
 
 
-def getClosest(o, pos, chunks):
-    # ch=-1
-    mind = 10000
-    d = 100000000000
-    ch = None
-    for chtest in chunks:
-        cango = True
-        for child in chtest.children:  # here was chtest.getNext==chtest, was doing recursion error and slowing down.
-            if child.sorted == False:
-                cango = False
-                break;
-        if cango:
-            d = chtest.dist(pos, o)
-            if d < mind:
-                ch = chtest
-                mind = d
-    return ch
-
-
 def sortChunks(chunks, o):
+    '''
+    orders chunks to mill them one after another, each time taking the closest chunk which can be milled,
+    so children are milled before their parents. Closest chunks are found in a grid of their start points.
+    '''
     if o.strategy != 'WATERLINE':
         progress('sorting paths')
-    sys.setrecursionlimit(100000)  # the getNext() function of CamPathChunk was running out of recursion limits.
+    t = time.time()
     sortedchunks = []
-    chunks_to_resample = []
+    grid = chunkGrid(chunks, o)
+    # number of children which have to be milled before each chunk. Children which aren't sorted here don't wait,
+    # these would block the chunk for ever
+    waiting = {}
+    for ch in chunks:
+        waiting[ch] = 0
+    for ch in chunks:
+        if not ch.sorted:
+            for parent in ch.parents:
+                if parent in waiting:
+                    waiting[parent] += 1
+    for ch in chunks:
+        if waiting[ch] <= 0:
+            grid.add(ch)
 
     lastch = None
-    i = len(chunks)
     pos = (0, 0, 0)
-    # for ch in chunks:
-    #	ch.getNext()#this stores the unsortedchildren properties
-    # print('numofchunks')
-    # print(len(chunks))
-    while len(chunks) > 0:
+    while len(sortedchunks) < len(waiting):
         ch = None
-        if len(sortedchunks) == 0 or len(
-                lastch.parents) == 0:  # first chunk or when there are no parents -> parents come after children here...
-            ch = getClosest(o, pos, chunks)
-        elif len(lastch.parents) > 0:  # looks in parents for next candidate, recursively
-            # get siblings here
-            # siblings=[]
-            # for chs in lastch.parents:
-            #	siblings.extend(chs.children)
-            # ch = getClosest(o,pos,siblings)
-            # if ch==None:
-            #	ch = getClosest(o,pos,chunks)
+        if lastch is not None:  # looks in parents for next candidate, parents come after children here
             for parent in lastch.parents:
                 ch = parent.getNextClosest(o, pos)
-                if ch != None:
+                if ch is not None and ch in grid.available:
                     break
-            if ch == None:
-                ch = getClosest(o, pos, chunks)
-        #	break
-        # pass;
-        if ch is not None:  # found next chunk, append it to list
-            # only adaptdist the chunk if it has not been sorted before
-            if not ch.sorted:
-                ch.adaptdist(pos, o)
-                ch.sorted = True
-            # print(len(ch.parents),'children')
-            chunks.remove(ch)
-            sortedchunks.append(ch)
-            lastch = ch
-            pos = lastch.points[-1]
-        # print(i, len(chunks))
-        # experimental fix for infinite loop problem
-        # else:
-        # THIS PROBLEM WASN'T HERE AT ALL. but keeping it here, it might fix the problems somwhere else:)
-        # can't find chunks close enough and still some chunks left
-        # to be sorted. For now just move the remaining chunks over to
-        # the sorted list.
-        # This fixes an infinite loop condition that occurs sometimes.
-        # This is a bandaid fix: need to find the root cause of this problem
-        # suspect it has to do with the sorted flag?
-        # print("no chunks found closest. Chunks not sorted: ", len(chunks))
-        # sortedchunks.extend(chunks)
-        # chunks[:] = []
-
-        i -= 1
-
-    sys.setrecursionlimit(1000)
+                ch = None
+        if ch is None:
+            ch = grid.closest(pos)
+        if ch is None:
+            # left chunks wait for each other, which shouldn't happen. Sort them without their hierarchy.
+            left = [ch for ch in chunks if waiting[ch] > 0]
+            if len(left) == 0:
+                break
+            for ch in left:
+                waiting[ch] = 0
+                grid.add(ch)
+            continue
+        # only adaptdist the chunk if it has not been sorted before
+        if not ch.sorted:
+            ch.adaptdist(pos, o)
+            ch.sorted = True
+            for parent in ch.parents:
+                if parent in waiting and waiting[parent] > 0:
+                    waiting[parent] -= 1
+                    if waiting[parent] == 0:
+                        grid.add(parent)
+        grid.remove(ch)
+        waiting[ch] = -1
+        sortedchunks.append(ch)
+        lastch = ch
+        if len(ch.points) > 0:
+            pos = ch.points[-1]
+    chunks[:] = []
+
+    travel = chunksAirTravel(sortedchunks)
+    if o.optimize_order:
+        sortedchunks = optimizeChunkOrder(sortedchunks, o)
+        print('sorted %i paths in %.3f s, moves between paths %.4f m, %.4f m after optimization' % (
+            len(sortedchunks), time.time() - t, travel, chunksAirTravel(sortedchunks)))
+    else:
+        print('sorted %i paths in %.3f s, moves between paths %.4f m' % (len(sortedchunks), time.time() - t, travel))
+
     if o.strategy != 'DRILL' and o.strategy != 'OUTLINEFILL':  # THIS SHOULD AVOID ACTUALLY MOST STRATEGIES, THIS SHOULD BE DONE MANUALLY, BECAUSE SOME STRATEGIES GET SORTED TWICE.
         sortedchunks = connectChunksLow(sortedchunks, o)
     return sortedchunks
@@ -31,6 +31,7 @@ from sverchok.utils.logging import info, error
 from sverchok.node_tree import SverchCustomTreeNode, SvNodeTreeCommon
 from sverchok.data_structure import get_other_socket, updateNode, match_long_repeat
 from sverchok.core.update_system import make_tree_from_nodes, do_update
+from sverchok.core.socket_data import SvNoDataError, reset_socket_cache
 from sverchok.core.monad_properties import SvIntPropertySettingsGroup, SvFloatPropertySettingsGroup
 
 
@@ -45,6 +46,9 @@ socket_types = [
 
 reverse_lookup = {'outputs': 'inputs', 'inputs': 'outputs'}
 
+# monad name: (signature of monad tree, update list, batch safe)
+monad_update_cache = {}
+
 
 
 def make_valid_identifier(name):
@@ -293,6 +297,7 @@ class SverchGroupTree(NodeTree, SvNodeTreeCommon):
 
 
     def update(self):
+        monad_update_cache.pop(self.name, None)
         affected_trees = {instance.id_data for instance in self.instances}
         for tree in affected_trees:
             tree.update()
@@ -414,6 +419,36 @@ class SverchGroupTree(NodeTree, SvNodeTreeCommon):
 
 
 
+def get_monad_update_list(monad):
+    """
+    Update list of the nodes needed for output node of the monad, and whether
+    all of them are batch safe: declare
+
+        sv_batch_safe = True
+
+    which means that the node processes each object of its inputs on its own
+    and outputs one object per object of the longest input, so that
+    processing a stacked list of objects is the same as processing them one
+    by one and joining the results.
+
+    The list is cached until nodes or links of the monad tree are changed.
+    """
+    # relinking keeps the number of links, so their endpoints are compared
+    links = tuple((link.from_node.name, link.from_socket.identifier, link.to_node.name, link.to_socket.identifier)
+                  for link in monad.links)
+    signature = (tuple(monad.nodes.keys()), links)
+    cached = monad_update_cache.get(monad.name)
+    if cached is not None and cached[0] == signature:
+        return cached[1], cached[2]
+
+    out_node = monad.output_node
+    ul = make_tree_from_nodes([out_node.name], monad, down=False)
+    nodes = monad.nodes
+    batch_safe = all(getattr(nodes[name], "sv_batch_safe", False) for name in ul)
+    monad_update_cache[monad.name] = (signature, ul, batch_safe)
+    return ul, batch_safe
+
+
 def split_list(data, size=1):
     size = max(1, int(size))
     return (data[i:i+size] for i in range(0, len(data), size))
@@ -538,9 +573,7 @@ class SvGroupNodeExp:
             data = socket.sv_get(deepcopy=False)
             in_node.outputs[index].sv_set(data)
 
-        #  get update list
-        #  could be cached
-        ul = make_tree_from_nodes([out_node.name], monad, down=False)
+        ul, _ = get_monad_update_list(monad)
         do_update(ul, monad.nodes)
         # set output sockets correctly
         for index, socket in enumerate(self.outputs):
@@ -550,11 +583,7 @@ class SvGroupNodeExp:
 
     def process_vectorize(self):
         monad = self.monad
-        in_node = monad.input_node
-        out_node = monad.output_node
-        ul = make_tree_from_nodes([out_node.name], monad, down=False)
-
-        data_out = [[] for s in self.outputs]
+        ul, batch_safe = get_monad_update_list(monad)
 
         data_in = match_long_repeat([s.sv_get(deepcopy=False) for s in self.inputs])
         if self.split:
@@ -565,7 +594,54 @@ class SvGroupNodeExp:
 
         monad["current_total"] = len(data_in[0])
 
+        data_out = None
+        if batch_safe:
+            data_out = self.process_batch(ul, data_in)
+        if data_out is None:
+            data_out = self.process_elements(ul, data_in)
+
+        for idx, socket in enumerate(self.outputs):
+            if socket.is_linked:
+                socket.sv_set(data_out[idx])
 
+    def process_batch(self, ul, data_in):
+        """
+        Process all objects of the inputs by one pass of the monad tree.
+        Returns data for output sockets, or None if the monad did not output
+        one object per object of the inputs.
+        """
+        monad = self.monad
+        in_node = monad.input_node
+        out_node = monad.output_node
+        total = len(data_in[0])
+
+        # so that outputs of a failed pass are not taken for results
+        reset_socket_cache(monad)
+        for idx, data in enumerate(data_in):
+            socket = in_node.outputs[idx]
+            if socket.is_linked:
+                socket.sv_set(data)
+        monad["current_index"] = 0
+        do_update(ul, monad.nodes)
+
+        data_out = []
+        for s in out_node.inputs[:-1]:
+            try:
+                data = s.sv_get(deepcopy=False)
+            except SvNoDataError:
+                return None
+            if len(data) != total:
+                return None
+            data_out.append(data)
+        return data_out
+
+    def process_elements(self, ul, data_in):
+        """Process objects of the inputs one by one"""
+        monad = self.monad
+        in_node = monad.input_node
+        out_node = monad.output_node
+
+        data_out = [[] for s in self.outputs]
         for master_idx, data in enumerate(zip(*data_in)):
             for idx, d in enumerate(data):
                 socket = in_node.outputs[idx]
@@ -575,10 +651,7 @@ class SvGroupNodeExp:
             do_update(ul, monad.nodes)
             for idx, s in enumerate(out_node.inputs[:-1]):
                 data_out[idx].extend(s.sv_get(deepcopy=False))
-
-        for idx, socket in enumerate(self.outputs):
-            if socket.is_linked:
-                socket.sv_set(data_out[idx])
+        return data_out
 
 
     # ----------- loop (iterate 2)
@@ -590,10 +663,9 @@ class SvGroupNodeExp:
         out_node = monad.output_node
 
         for index, data in enumerate(sockets_data_in):
-            in_node.outputs[index].sv_set(data)        
-
+            in_node.outputs[index].sv_set(data)
 
-        ul = make_tree_from_nodes([out_node.name], monad, down=False)
+        ul, _ = get_monad_update_list(monad)
         do_update(ul, monad.nodes)
 
         # set output sockets correctly
@@ -16,8 +16,17 @@
 #
 # ##### END GPL LICENSE BLOCK #####
 
+import hashlib
+from itertools import chain
+
+import numpy as np
+from mathutils import Vector, Matrix, Quaternion, Euler, Color
+
 from sverchok import data_structure
-from sverchok.utils.logging import warning, info
+from sverchok.utils.array_data import SvRaggedArray, arrays_to_lists
+from sverchok.utils.lazy_lists import SvLazyList, has_lazy_data, lazy_to_lists
+from sverchok.utils.matrix_array import SvMatrixArray
+from sverchok.utils.logging import warning, info, debug
 
 #####################################
 # socket data cache                 #
@@ -28,21 +37,174 @@ sentinel = object()
 # socket cache
 socket_data_cache = {}
 
+# content hashes of output sockets, per tree and per node,
+# used by incremental updates to find out which data really changed
+socket_hash_cache = {}
+
+# socket data converted to lists for nodes which are not array aware,
+# per tree and per output socket, with the array data it was made from
+socket_list_cache = {}
+
 # faster than builtin deep copy for us.
 # useful for our limited case
 # we should be able to specify vectors here to get them create
 # or stop destroying them when in vector socket.
 
 
+def _is_flat_tuple(item):
+    return isinstance(item, tuple) and not (item and isinstance(item[0], (list, tuple)))
+
+
 def sv_deep_copy(lst):
-    """return deep copied data of list/tuple structure"""
+    """return deep copied data of list/tuple structure
+
+    Flat tuples are shared with the cached data, as they always were,
+    but a level of nothing but tuples (f.ex. vertices) is copied with
+    one slice instead of a call per tuple.
+    """
     if isinstance(lst, (list, tuple)):
-        if lst and not isinstance(lst[0], (list, tuple)):
+        if not lst:
+            return lst[:]
+        first = lst[0]
+        if not isinstance(first, (list, tuple)):
             return lst[:]
+        if _is_flat_tuple(first) and _is_flat_tuple(lst[-1]) and set(map(type, lst)) == {tuple}:
+            return list(lst)
         return [sv_deep_copy(l) for l in lst]
     return lst
 
 
+# types whose repr() describes the value exactly,
+# so repr() of a nested list of them can be used as content hash
+_plain_types = (float, int, bool, str, type(None),
+                np.floating, np.integer, np.bool_,
+                Vector, Matrix, Quaternion, Euler, Color)
+
+
+def _is_plain_nested(data):
+    """
+    True if data is nested lists and tuples of _plain_types only; all of it
+    is checked, arrays in the middle of a list would be truncated by repr()
+    """
+    level = [data]
+    while level:
+        types = set(map(type, level))
+        if types <= {list, tuple}:
+            level = list(chain.from_iterable(level))
+        else:
+            return all(issubclass(t, _plain_types) for t in types)
+    return True
+
+
+def _update_hash(hasher, data):
+    if isinstance(data, np.ndarray):
+        if data.dtype.hasobject:
+            raise TypeError("Can't hash object arrays")
+        hasher.update(str((data.dtype.str, data.shape)).encode())
+        hasher.update(np.ascontiguousarray(data).tobytes())
+    elif isinstance(data, SvRaggedArray):
+        hasher.update(b'R')
+        _update_hash(hasher, data.offsets)
+        _update_hash(hasher, data.indices)
+    elif isinstance(data, SvMatrixArray):
+        hasher.update(b'M')
+        _update_hash(hasher, data.array)
+    elif isinstance(data, SvLazyList):
+        hasher.update(repr((data.count, data.mode, data.start)).encode())
+        _update_hash(hasher, data.base)
+    elif isinstance(data, (list, tuple)):
+        # checking types level by level is much faster than
+        # hashing each item, and usually all of them are plain
+        if _is_plain_nested(data):
+            hasher.update(repr(data).encode())
+        else:
+            hasher.update(b'[%d' % len(data))
+            for item in data:
+                _update_hash(hasher, item)
+            hasher.update(b']')
+    elif isinstance(data, _plain_types):
+        hasher.update(repr(data).encode())
+    else:
+        # objects, bmeshes and such can change without changing identity
+        raise TypeError("Can't hash %s" % type(data))
+
+
+def sv_data_hash(data):
+    """
+    return content hash of socket data,
+    or None if data contains something that can't be hashed reliably;
+    such data should be considered as changed each time
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    try:
+        _update_hash(hasher, data)
+    except TypeError:
+        return None
+    return hasher.digest()
+
+
+def update_socket_hashes(node):
+    """
+    Hash data written by node to its linked outputs.
+    Returns set of socket ids whose data is changed
+    since previous call for this node.
+    """
+    global socket_hash_cache
+    ng = node.id_data.name
+    tree_data = socket_data_cache.get(ng, {})
+    tree_hashes = socket_hash_cache.setdefault(ng, {})
+    old_hashes = tree_hashes.get(node.name, {})
+    new_hashes = {}
+    changed = set()
+    for socket in node.outputs:
+        if not socket.is_linked:
+            continue
+        s_id = socket.socket_id
+        data = tree_data.get(s_id, sentinel)
+        digest = None if data is sentinel else sv_data_hash(data)
+        new_hashes[s_id] = digest
+        if digest is None or old_hashes.get(s_id) != digest:
+            changed.add(s_id)
+    tree_hashes[node.name] = new_hashes
+    return changed
+
+
+def has_socket_hashes(node):
+    """True if node was evaluated by incremental update and not invalidated since"""
+    return node.name in socket_hash_cache.get(node.id_data.name, {})
+
+
+def forget_socket_hashes(node):
+    """Mark data of node as unknown for incremental update"""
+    tree_hashes = socket_hash_cache.get(node.id_data.name)
+    if tree_hashes:
+        tree_hashes.pop(node.name, None)
+
+
+def outputs_arrays(node):
+    """
+    True if numpy arrays in outputs of the node are array data, to be
+    converted for other nodes, and not asked for by its numpy output option
+    """
+    return getattr(node, "sv_array_aware", False) and not getattr(node, "output_numpy", False)
+
+
+def get_socket_lists(s_ng, s_id, data, numpy_arrays):
+    """
+    Socket data with array items converted to lists, converted once
+    for all readers of the output socket. Numpy arrays from nodes with
+    a numpy output option are wanted as they are, only the ones array
+    aware nodes output by themselves are converted (numpy_arrays).
+    """
+    cached = socket_list_cache.get(s_ng, {}).get(s_id)
+    if cached is not None and cached[0] is data:
+        return cached[1]
+    lists = arrays_to_lists(data, numpy_arrays)
+    if lists is not data:
+        socket_list_cache.setdefault(s_ng, {})[s_id] = (data, lists)
+    return lists
+
+
 # Build string for showing in socket label
 def SvGetSocketInfo(socket):
     """returns string to show in socket label"""
@@ -77,9 +239,9 @@ def SvSetSocket(socket, out):
             warning(f"{socket.node.name} setting unconncted socket: {socket.name}")
     s_id = socket.socket_id
     s_ng = socket.id_data.name
-    if s_ng not in socket_data_cache:
-        socket_data_cache[s_ng] = {}
-    socket_data_cache[s_ng][s_id] = out
+    # setdefault is atomic, nodes can be processed by parallel update
+    socket_data_cache.setdefault(s_ng, {})[s_id] = out
+    socket_list_cache.get(s_ng, {}).pop(s_id, None)
 
 
 def SvGetSocket(socket, deepcopy=True):
@@ -97,6 +259,16 @@ def SvGetSocket(socket, deepcopy=True):
             raise LookupError
         if s_id in socket_data_cache[s_ng]:
             out = socket_data_cache[s_ng][s_id]
+            if not getattr(socket.node, "sv_array_aware", False):
+                out = get_socket_lists(s_ng, s_id, out, outputs_arrays(other.node))
+            if isinstance(out, SvMatrixArray):
+                # implicit conversions expect mathutils matrices too
+                if not getattr(socket.node, "sv_matrix_aware", False) or socket.bl_idname != other.bl_idname:
+                    out = out.to_matrices()
+            if has_lazy_data(out):
+                # implicit conversions expect plain lists too
+                if not getattr(socket.node, "sv_lazy_aware", False) or socket.bl_idname != other.bl_idname:
+                    out = lazy_to_lists(out)
             if deepcopy:
                 return sv_deep_copy(out)
             else:
@@ -164,4 +336,7 @@ def reset_socket_cache(ng):
     Reset socket cache either for node group.
     """
     global socket_data_cache
+    global socket_hash_cache
     socket_data_cache[ng.name] = {}
+    socket_hash_cache[ng.name] = {}
+    socket_list_cache[ng.name] = {}
@@ -17,15 +17,23 @@
 # ##### END GPL LICENSE BLOCK #####
 
 import collections
+import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
 
 import bpy
 from mathutils import Vector
 
 from sverchok import data_structure
-from sverchok.core.socket_data import SvNoDataError, reset_socket_cache
+from sverchok.core.socket_data import (
+    SvNoDataError, reset_socket_cache,
+    update_socket_hashes, has_socket_hashes, forget_socket_hashes)
 from sverchok.utils.logging import debug, info, warning, error, exception
-from sverchok.utils.profile import profile
+from sverchok.utils.profile import profile, get_node_profile
+from sverchok.utils.disk_cache import (
+    process_cached, get_disk_cache, cache_entry, process_entry, store_cached)
 import sverchok
 
 import traceback
@@ -320,10 +328,56 @@ def reset_error_nodes(ng):
         del ng["error nodes"]
 
 
+def process_node(node, cache=None):
+    """Process node, through the disk cache (the configured one by default) if the node uses it"""
+    if not process_cached(node, cache):
+        node.process()
+
+
+def process_node_uncached(node):
+    node.process()
+
+
+def process_node_timed(node, process=process_node):
+    """Process node by process(node), return start time, duration and id of the thread"""
+    start = time.perf_counter()
+    if hasattr(node, "process"):
+        node_profile = get_node_profile()
+        if node_profile is not None:
+            node_profile.process_node(node, process)
+        else:
+            process(node)
+    return start, time.perf_counter() - start, threading.get_ident()
+
+
+def has_changed_inputs(node, changed_sockets):
+    """
+    Check if node has to be processed during incremental update:
+    one of its inputs is linked to a socket which got new data,
+    or the node has no valid data from previous evaluation.
+    """
+    if not has_socket_hashes(node):
+        return True
+    linked = False
+    for socket in node.inputs:
+        if socket.is_linked:
+            other = socket.other
+            if not other:
+                return True
+            linked = True
+            if other.socket_id in changed_sockets:
+                return True
+    # nodes without links are reached through wifi dependencies,
+    # we can't know about their data, so process them
+    return not linked
+
+
 @profile(section="UPDATE")
-def do_update_general(node_list, nodes, procesed_nodes=set()):
+def do_update_general(node_list, nodes, procesed_nodes=set(), incremental=False):
     """
-    General update function for node set
+    General update function for node set.
+    If incremental is True, the first node of node_list is always processed,
+    other nodes are processed only if data in their inputs has changed.
     """
     global graphs
     timings = []
@@ -332,18 +386,25 @@ def do_update_general(node_list, nodes, procesed_nodes=set()):
     
     total_time = 0
     done_nodes = set(procesed_nodes)
+    changed_sockets = set()
 
-    for node_name in node_list:
+    for idx, node_name in enumerate(node_list):
         if node_name in done_nodes:
             continue
         try:
             node = nodes[node_name]
-            start = time.perf_counter()
-            if hasattr(node, "process"):
-                node.process()
-            delta = time.perf_counter() - start
+            if incremental and idx > 0 and not has_changed_inputs(node, changed_sockets):
+                if data_structure.DEBUG_MODE:
+                    debug("Skipped unchanged %s", node_name)
+                continue
+            start, delta, _ = process_node_timed(node)
             total_time += delta
 
+            if incremental:
+                changed_sockets.update(update_socket_hashes(node))
+            else:
+                forget_socket_hashes(node)
+
             if data_structure.DEBUG_MODE:
                 debug("Processed  %s in: %.4f", node_name, delta)
 
@@ -352,6 +413,7 @@ def do_update_general(node_list, nodes, procesed_nodes=set()):
 
         except Exception as err:
             ng = nodes.id_data
+            forget_socket_hashes(nodes[node_name])
             update_error_nodes(ng, node_name, err)
             #traceback.print_tb(err.__traceback__)
             exception("Node %s had exception: %s", node_name, err)
@@ -364,11 +426,136 @@ def do_update_general(node_list, nodes, procesed_nodes=set()):
     return timings
 
 
-def do_update(node_list, nodes):
+def is_thread_safe_node(node):
+    """
+    Nodes which parallel update may process on a worker thread: nodes declaring
+    sv_thread_safe = True. Their process only computes output data from input data
+    and doesn't change blender data, all other nodes are processed in main thread.
+    """
+    return getattr(node, "sv_thread_safe", False)
+
+
+def schedule_nodes(node_names, dependencies, dispatch, finished, failed, threads=0):
+    """
+    Run work of all node_names, each one after work of all its dependencies
+    ({name: set of names}, names not in node_names are ignored) has finished.
+    dispatch(name) is called when the name is ready and returns (work, on_worker):
+    work() runs on a thread pool if on_worker is set, in the calling thread otherwise.
+    dispatch, finished(name, result of work) and failed(name, exception) are always
+    called in the calling thread. Names depending on a failed one are not run.
+    """
+    name_set = set(node_names)
+    waiting = {name: {dep for dep in dependencies.get(name, ()) if dep in name_set} for name in node_names}
+    dependents = collections.defaultdict(set)
+    for name, node_deps in waiting.items():
+        for dep in node_deps:
+            dependents[dep].add(name)
+
+    main_queue = collections.deque()
+    futures = {}
+
+    def done(name, result):
+        finished(name, result)
+        for dependent in dependents[name]:
+            waiting[dependent].discard(name)
+            if not waiting[dependent]:
+                schedule(dependent)
+
+    def schedule(name):
+        work, on_worker = dispatch(name)
+        if on_worker:
+            futures[executor.submit(work)] = name
+        else:
+            main_queue.append((name, work))
+
+    with ThreadPoolExecutor(max_workers=threads or os.cpu_count()) as executor:
+        for name in node_names:
+            if not waiting[name]:
+                schedule(name)
+        while futures or main_queue:
+            while main_queue:
+                name, work = main_queue.popleft()
+                try:
+                    result = work()
+                except Exception as err:
+                    failed(name, err)
+                else:
+                    done(name, result)
+            if not futures:
+                continue
+            finished_futures, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in finished_futures:
+                name = futures.pop(future)
+                try:
+                    result = future.result()
+                except Exception as err:
+                    failed(name, err)
+                else:
+                    done(name, result)
+
+
+def do_update_parallel(update_lists, nodes, threads=0):
+    """
+    Update node sets on a thread pool.
+    A node is submitted as soon as all its dependencies are processed,
+    so independent node sets and independent branches of one set run
+    concurrently. Only thread safe nodes go to the pool, see is_thread_safe_node;
+    preferences, disk cache keys and entries are read in the main thread.
+    If a node fails, nodes depending on it are not processed.
+    """
+    global graphs
+    graph = []
+    gather = graph.append
+
+    ng = nodes.id_data
+    node_names = [name for node_list in update_lists for name in node_list]
+    wall_start = time.perf_counter()
+    cache = get_disk_cache()
+    pending_store = {}
+
+    def dispatch(name):
+        node = nodes[name]
+        if not is_thread_safe_node(node):
+            return partial(process_node_timed, node, partial(process_node, cache=cache)), False
+        key = cache_entry(node, cache)
+        if key is not None:
+            if cache.has_entry(key):
+                return partial(process_node_timed, node, partial(process_entry, cache=cache, key=key)), False
+            # processed on the pool, stored by finished() in main thread
+            pending_store[name] = key
+        return partial(process_node_timed, node, process_node_uncached), True
+
+    def finished(name, result):
+        start, delta, thread = result
+        node = nodes[name]
+        if name in pending_store:
+            store_cached(node, cache, pending_store.pop(name))
+        gather({"name": name, "bl_idname": node.bl_idname,
+                "start": start, "duration": delta, "thread": thread})
+        forget_socket_hashes(node)
+        if data_structure.DEBUG_MODE:
+            debug("Processed  %s in: %.4f", name, delta)
+
+    def failed(name, err):
+        pending_store.pop(name, None)
+        forget_socket_hashes(nodes[name])
+        update_error_nodes(ng, name, err)
+        exception("Node %s had exception: %s", name, err)
+
+    schedule_nodes(node_names, make_dep_dict(ng), dispatch, finished, failed, threads)
+
+    graphs.append(graph)
+    if data_structure.DEBUG_MODE:
+        total_time = sum(item["duration"] for item in graph)
+        debug("Parallel update of %s nodes in: %.4f seconds (%.4f seconds of node time)",
+              len(graph), time.perf_counter() - wall_start, total_time)
+
+
+def do_update(node_list, nodes, incremental=False):
     if data_structure.HEAT_MAP:
         do_update_heat_map(node_list, nodes)
     else:
-        do_update_general(node_list, nodes)
+        do_update_general(node_list, nodes, incremental=incremental)
 
 def build_update_list(ng=None):
     """
@@ -442,7 +629,7 @@ def process_from_node(node):
         nodes = ng.nodes
         if not ng.sv_process:
             return
-        do_update(update_list, nodes)
+        do_update(update_list, nodes, incremental=ng.sv_incremental)
     else:
         process_tree(ng)
 
@@ -469,6 +656,9 @@ def process_tree(ng=None):
         if not update_list:
             build_update_list(ng)
             update_list = update_cache.get(ng.name)
+        if ng.sv_parallel and not data_structure.HEAT_MAP:
+            do_update_parallel(update_list, ng.nodes, ng.sv_threads)
+            return
         for l in update_list:
             do_update(l, ng.nodes)
     else:
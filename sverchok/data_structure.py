@@ -26,6 +26,7 @@ from mathutils import Vector, Matrix
 import numpy as np
 
 from sverchok.utils.logging import info
+from sverchok.utils.matrix_array import SvMatrixArray
 
 DEBUG_MODE = False
 HEAT_MAP = False
@@ -548,8 +549,15 @@ def Matrix_listing(prop):
 
 def Matrix_generate(prop):
     """Generate Matrix() data from Sverchok data"""
+    if isinstance(prop, SvMatrixArray):
+        return prop.to_matrices()
+    if isinstance(prop, np.ndarray):
+        return SvMatrixArray(prop).to_matrices()
     mat_out = []
     for i, matrix in enumerate(prop):
+        if isinstance(matrix, Matrix):
+            mat_out.append(matrix.copy())
+            continue
         unit = Matrix()
         for k, m in enumerate(matrix):
             # [Matrix0, Matrix1, ... ]
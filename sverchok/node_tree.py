@@ -97,12 +97,16 @@ def throttle_tree_update(node):
 
     that's it. 
 
+    the previous state is restored afterwards, so updates suspended
+    by the caller (f.ex. while a tree is imported) stay suspended.
     """
+    ng = node.id_data
+    previous_state = ng.skip_tree_update
     try:
-        node.id_data.skip_tree_update = True
+        ng.skip_tree_update = True
         yield node
     finally:
-        node.id_data.skip_tree_update = False
+        ng.skip_tree_update = previous_state
 
 
 def throttled(func):
@@ -217,6 +221,15 @@ class SverchCustomTree(NodeTree, SvNodeTreeCommon):
     sv_show: BoolProperty(name="Show", default=True, description='Show this layout', update=turn_off_ng)
     sv_bake: BoolProperty(name="Bake", default=True, description='Bake this layout')
     sv_process: BoolProperty(name="Process", default=True, description='Process layout')
+    sv_incremental: BoolProperty(
+        name="Skip unchanged", default=False,
+        description='On partial updates, skip nodes whose input data did not change')
+    sv_parallel: BoolProperty(
+        name="Parallel", default=False,
+        description='Process independent parts of the layout on several threads, for nodes which support it')
+    sv_threads: IntProperty(
+        name="Threads", default=0, min=0,
+        description='Number of threads for parallel processing, 0 means number of CPU cores')
     sv_user_colors: StringProperty(default="")
 
     tree_link_count: IntProperty(name='keep track of current link count', default=0)
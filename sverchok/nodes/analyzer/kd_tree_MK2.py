@@ -17,11 +17,10 @@
 # ##### END GPL LICENSE BLOCK #####
 
 import bpy
-import mathutils
 from bpy.props import FloatProperty, EnumProperty, IntProperty
 from sverchok.node_tree import SverchCustomTreeNode
 from sverchok.data_structure import (updateNode, match_long_repeat as mlr)
-from sverchok.utils.sv_KDT_utils import kdt_closest_verts_range, kdt_closest_verts_find_n
+from sverchok.utils.sv_KDT_utils import kdt_find_range, kdt_find_n
 
 class SvKDTreeNodeMK2(bpy.types.Node, SverchCustomTreeNode):
     '''
@@ -40,8 +39,8 @@ class SvKDTreeNodeMK2(bpy.types.Node, SverchCustomTreeNode):
     ]
 
     func_dict = {
-        'find_n': kdt_closest_verts_find_n,
-        'find_range': kdt_closest_verts_range
+        'find_n': kdt_find_n,
+        'find_range': kdt_find_range
         }
 
     number : IntProperty(
@@ -58,7 +57,7 @@ class SvKDTreeNodeMK2(bpy.types.Node, SverchCustomTreeNode):
         updateNode(self, context)
 
     mode : EnumProperty(
-        items=modes, description="mathutils kdtree metods",
+        items=modes, description="kdtree metods",
         default="find_n", update=update_mode)
 
     def draw_buttons(self, context, layout):
@@ -85,19 +84,23 @@ class SvKDTreeNodeMK2(bpy.types.Node, SverchCustomTreeNode):
         if not (any(s.is_linked for s in so) and si[0].is_linked):
             return
         V1, V2, N, R = mlr([i.sv_get() for i in si])
-        out = []
+        out_co, out_ind, out_dist = [], [], []
         Co, ind, dist = so
         find_n = self.mode == "find_n"
         func = self.func_dict[self.mode]
         for v, v2, k in zip(V1, V2, (N if find_n else R)):
-            func(v, v2, k, out)
+            # one tree per object, all its find vertices queried at once
+            co, index, distance = func(v, v2, k)
+            out_co.extend([[tuple(c) for c in cs] for cs in co])
+            out_ind.extend(index)
+            out_dist.extend(distance)
 
         if Co.is_linked:
-            Co.sv_set([[i[0][:] for i in i2] for i2 in out])
+            Co.sv_set(out_co)
         if ind.is_linked:
-            ind.sv_set([[i[1] for i in i2] for i2 in out])
+            ind.sv_set(out_ind)
         if dist.is_linked:
-            dist.sv_set([[i[2] for i in i2] for i2 in out])
+            dist.sv_set(out_dist)
 
 
 def register():
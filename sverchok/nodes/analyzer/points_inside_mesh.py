@@ -16,18 +16,15 @@
 #
 # ##### END GPL LICENSE BLOCK #####
 
-import random
-
 import bpy
 import bmesh
-from mathutils import Vector
-from mathutils.kdtree import KDTree
 from mathutils.bvhtree import BVHTree
 from mathutils.noise import seed_set, random_unit_vector
 
 from sverchok.node_tree import SverchCustomTreeNode
 from sverchok.data_structure import updateNode
 from sverchok.utils.sv_bmesh_utils import bmesh_from_pydata
+from sverchok.utils.sv_bvh_utils import points_inside_mesh, points_inside_by_normals
 
 
 def generate_random_unitvectors():
@@ -39,62 +36,15 @@ def generate_random_unitvectors():
 directions = generate_random_unitvectors()
 
 
-def get_points_in_mesh(points, verts, faces, eps=0.0, num_samples=3):
-    mask_inside = []
-
-    bvh = BVHTree.FromPolygons(verts, faces, all_triangles=False, epsilon=eps)
-
-    for direction in directions[:num_samples]:
-        samples = []
-        mask = samples.append
-
-        for point in points:
-            hit = bvh.ray_cast(point, direction)
-            if hit[0]:
-                v = hit[1].dot(direction)
-                mask(not v < 0.0)
-            else:
-                mask(False)
-
-        mask_inside.append(samples)
-
-    if len(mask_inside) == 1:
-        return mask_inside[0]
-    else:
-        mask_totals = []
-        oversample = mask_totals.append
-        num_points = len(points)
-
-        # exactly what the criteria should be here is not clear, this seems enough.
-        for i in range(num_points):
-            fsum = sum(mask_inside[j][i] for j in range(num_samples))
-
-            if num_samples == 2:
-                oversample(fsum >= 1)
-            elif num_samples == 3:
-                oversample(fsum >= 2)
-            elif num_samples == 4:
-                oversample(fsum >= 3)
-            elif num_samples == 5:
-                oversample(fsum >= 4)
-            elif num_samples == 6:
-                oversample(fsum >= 4)
-        return mask_totals
+def get_points_in_mesh(points, verts, faces, num_samples=3):
+    """inside/outside by parity of ray crossings, voted over num_samples directions"""
+    return points_inside_mesh(points, verts, faces, directions[:num_samples]).tolist()
 
 
 def are_inside(points, bm):
-    mask_inside = []
-    mask = mask_inside.append
     bvh = BVHTree.FromBMesh(bm, epsilon=0.0001)
-
-    # return points on polygons
-    for point in points:
-        fco, normal, _, _ = bvh.find_nearest(point)
-        p2 = fco - Vector(point)
-        v = p2.dot(normal)
-        mask(not v < 0.0)  # addp(v >= 0.0) ?
-
-    return mask_inside
+    # the nearest point on polygons is in front of its normal
+    return points_inside_by_normals(bvh, points).tolist()
 
 
 class SvPointInside(bpy.types.Node, SverchCustomTreeNode):
@@ -110,7 +60,9 @@ class SvPointInside(bpy.types.Node, SverchCustomTreeNode):
         description="offers different approaches to finding internal points",
         default="algo 1", update=updateNode
     )
-    epsilon_bvh: bpy.props.FloatProperty(update=updateNode, default=0.0, min=0.0, max=1.0, description="fudge value")
+    # deprecated: the crossings test doesn't build a BVH tree; kept so that
+    # files and scripts setting it still load
+    epsilon_bvh: bpy.props.FloatProperty(default=0.0, min=0.0, max=1.0, description="fudge value (not used)")
     num_samples: bpy.props.IntProperty(min=1, max=6, default=3)
 
     def sv_init(self, context):
@@ -124,7 +76,6 @@ class SvPointInside(bpy.types.Node, SverchCustomTreeNode):
 
         layout.prop(self, 'selected_algo', expand=True)
         if self.selected_algo == 'algo 2':
-            layout.prop(self, 'epsilon_bvh', text='Epsilon')
             layout.prop(self, 'num_samples', text='Samples')
 
 
@@ -142,7 +93,7 @@ class SvPointInside(bpy.types.Node, SverchCustomTreeNode):
                 mask.append(are_inside(pts_in, bm))
             elif self.selected_algo == 'algo 2':
                 mask.append(
-                    get_points_in_mesh(pts_in, verts, faces, self.epsilon_bvh, self.num_samples)
+                    get_points_in_mesh(pts_in, verts, faces, self.num_samples)
                 )
 
         self.outputs['mask'].sv_set(mask)
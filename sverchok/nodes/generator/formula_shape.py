@@ -18,10 +18,12 @@
 
 import bpy
 import ast
+import numpy as np
 from bpy.props import IntProperty, FloatProperty, EnumProperty
 
 from sverchok.node_tree import SverchCustomTreeNode
-from sverchok.data_structure import updateNode
+from sverchok.data_structure import updateNode, node_id
+from sverchok.utils.expression import compile_expression
 
 import bpy, math, cmath, mathutils
 from math import acos, acosh, asin, asinh, atan, atan2, \
@@ -341,16 +343,35 @@ class SvFormulaShapeNode(bpy.types.Node, SverchCustomTreeNode):
     
     def makeverts(self, vert, f, XX, YY, ZZ, fx,fy,fz, X_X, Y_Y, Z_Z, i_over):
         ''' main function '''
+        n_id = node_id(self)
+        # evaluation order of one step; "XX = XX" and so on do nothing
+        steps = [(name, compile_expression(string, n_id))
+                 for name, string in (('i', i_over), ('XX', X_X), ('YY', Y_Y), ('ZZ', Z_Z),
+                                      ('X', fx), ('Y', fy), ('Z', fz))
+                 if string.strip() != name]
+
+        # if no formula uses a value which is assigned later in the step
+        # (that is, a value from previous step), all steps can be done at once
+        assigned = [name for name, _ in steps]
+        independent = all(not expr.variables.intersection(assigned[k:])
+                          for k, (_, expr) in enumerate(steps))
+        if independent:
+            arrays = dict(n=np.arange(vert, dtype=np.float64), f=f, XX=XX, YY=YY, ZZ=ZZ)
+            for name, expr in steps:
+                values = expr.eval_arrays(arrays, vert)
+                if values is None:
+                    break
+                arrays[name] = values
+            else:
+                return [list(zip(*[arrays[name].tolist() for name in 'XYZ']))]
+
+        env = dict(f=f, XX=XX, YY=YY, ZZ=ZZ)
         out=[]
         for n in range(vert):
-            i = eval(i_over)
-            XX = eval(X_X)
-            YY = eval(Y_Y)
-            ZZ = eval(Z_Z)
-            X = eval(fx)
-            Y = eval(fy)
-            Z = eval(fz)
-            out.append((X,Y,Z))
+            env['n'] = n
+            for name, expr in steps:
+                env[name] = eval(expr.code, globals(), env)
+            out.append((env['X'],env['Y'],env['Z']))
         return [out]
 
     def sv_init(self, context):
@@ -20,17 +20,19 @@ import bpy
 from bpy.props import IntProperty, EnumProperty
 
 from sverchok.node_tree import SverchCustomTreeNode
-from sverchok.data_structure import (match_short, match_long_cycle, updateNode,
-                                     match_long_repeat, match_cross2)
+from sverchok.data_structure import updateNode, match_cross2
+from sverchok.utils.lazy_lists import (
+        lazy_match_short, lazy_match_long_cycle, lazy_match_long_repeat, lazy_levels, lazy_depth)
 
 #
 # List Match Node by Linus Yng
 #
 
+# shorter lists are matched by views, not copies (see utils/lazy_lists.py)
 func_dict = {
-    'SHORT': match_short,
-    'CYCLE': match_long_cycle,
-    'REPEAT': match_long_repeat,
+    'SHORT': lazy_match_short,
+    'CYCLE': lazy_match_long_cycle,
+    'REPEAT': lazy_match_long_repeat,
     'XREF': match_cross2
 }
 
@@ -40,6 +42,7 @@ class ListMatchNode(bpy.types.Node, SverchCustomTreeNode):
     bl_label = 'List Match'
     bl_icon = 'OUTLINER_OB_EMPTY'
     sv_icon = 'SV_LIST_MATCH'
+    sv_lazy_aware = True
 
     level: IntProperty(
         name='level', description='Choose level of data (see help)',
@@ -119,16 +122,18 @@ class ListMatchNode(bpy.types.Node, SverchCustomTreeNode):
             # get data
             for socket in self.inputs:
                 if socket.is_linked:
-                    lsts.append(socket.sv_get())
+                    lsts.append(socket.sv_get(deepcopy=False))
 
             out = self.match(lsts, self.level, func_dict[self.mode], func_dict[self.mode_final])
+            # views are made at levels up to the matched one
+            depth = max([self.level - 1] + [lazy_depth(lst) for lst in lsts])
 
             # output into linked sockets s
             for i, socket in enumerate(self.outputs):
                 if i == len(out):  # never write to last socket
                     break
                 if socket.is_linked:
-                    socket.sv_set(out[i])
+                    socket.sv_set(lazy_levels(out[i], depth))
 
 
 def register():
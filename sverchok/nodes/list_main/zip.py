@@ -22,6 +22,7 @@ from bpy.props import BoolProperty, IntProperty, StringProperty
 from sverchok.node_tree import SverchCustomTreeNode
 from sverchok.data_structure import changable_sockets, multi_socket, updateNode
 from sverchok.utils.listutils import preobrazovatel
+from sverchok.utils.lazy_lists import is_list, lazy_levels, lazy_depth, lazy_to_lists
 
 
 class ZipNode(bpy.types.Node, SverchCustomTreeNode):
@@ -30,6 +31,7 @@ class ZipNode(bpy.types.Node, SverchCustomTreeNode):
     bl_label = 'List Zip'
     bl_icon = 'OUTLINER_OB_EMPTY'
     sv_icon = 'SV_LIST_ZIP'
+    sv_lazy_aware = True
 
     level: IntProperty(name='level', default=1, min=1, update=updateNode)
     typ: StringProperty(name='typ', default='')
@@ -69,21 +71,28 @@ class ZipNode(bpy.types.Node, SverchCustomTreeNode):
             slots = []
             for socket in self.inputs:
                 if socket.is_linked:
-                    slots.append(socket.sv_get())
+                    data = socket.sv_get(deepcopy=False)
+                    slots.append(lazy_to_lists(data) if self.unwrap else data)
             if len(slots) < 2:
                 return
             output = self.myZip(slots, self.level)
             if self.unwrap:
                 output = preobrazovatel(output, [2, 3])
+            else:
+                # zipped items are one level deeper than in inputs,
+                # items which are not lists get wrapped once more
+                depth = max(lazy_depth(slot) for slot in slots)
+                if depth >= 0:
+                    output = lazy_levels(output, depth + 2)
             self.outputs[0].sv_set(output)
 
     def myZip(self, list_all, level, level2=0):
         if level == level2:
-            if isinstance(list_all, (list, tuple)):
+            if is_list(list_all):
                 list_lens = []
                 list_res = []
                 for l in list_all:
-                    if isinstance(l, (list, tuple)):
+                    if is_list(l):
                         list_lens.append(len(l))
                     else:
                         list_lens.append(0)
@@ -99,14 +108,14 @@ class ZipNode(bpy.types.Node, SverchCustomTreeNode):
             else:
                 return False
         elif level > level2:
-            if isinstance(list_all, (list, tuple)):
+            if is_list(list_all):
                 list_res = []
                 list_tr = self.myZip(list_all, level, level2+1)
                 if list_tr is False:
                     list_tr = list_all
                 t = []
                 for tr in list_tr:
-                    if isinstance(list_tr, (list, tuple)):
+                    if is_list(list_tr):
                         list_tl = self.myZip(tr, level, level2+1)
                         if list_tl is False:
                             list_tl = list_tr
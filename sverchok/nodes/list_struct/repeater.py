@@ -21,6 +21,7 @@ from bpy.props import BoolProperty, IntProperty, StringProperty
 
 from sverchok.node_tree import SverchCustomTreeNode
 from sverchok.data_structure import (updateNode, changable_sockets)
+from sverchok.utils.lazy_lists import SvLazyList, lazy_levels, lazy_depth
 
 
 class ListRepeaterNode(bpy.types.Node, SverchCustomTreeNode):
@@ -29,6 +30,7 @@ class ListRepeaterNode(bpy.types.Node, SverchCustomTreeNode):
     bl_label = 'List Repeater'
     bl_icon = 'OUTLINER_OB_EMPTY'
     sv_icon = 'SV_LIST_REPEATER'
+    sv_lazy_aware = True
 
     level: IntProperty(name='level', default=1, min=0, update=updateNode)
     number: IntProperty(name='number', default=1, min=1, update=updateNode)
@@ -53,7 +55,7 @@ class ListRepeaterNode(bpy.types.Node, SverchCustomTreeNode):
 
     def process(self):
         if self.inputs['Data'].is_linked:
-            data = self.inputs['Data'].sv_get()
+            data = self.inputs['Data'].sv_get(deepcopy=False)
 
             if self.inputs['Number'].is_linked:
                 tmp = self.inputs['Number'].sv_get()
@@ -71,7 +73,10 @@ class ListRepeaterNode(bpy.types.Node, SverchCustomTreeNode):
                 else:
                     out = out_
 
-                self.outputs['Data'].sv_set(out)
+                # repeated items are views at the chosen level,
+                # views the data had are one level deeper now
+                depth = max(self.level - 1, lazy_depth(data) + 1)
+                self.outputs['Data'].sv_set(lazy_levels(out, depth))
 
     def count(self, data, level, number, cou=0):
         if level:
@@ -80,10 +85,8 @@ class ListRepeaterNode(bpy.types.Node, SverchCustomTreeNode):
                 out.append(self.count(obj, level - 1, number, idx))
 
         else:
-            out = []
             indx = min(cou, len(number) - 1)
-            for i in range(int(number[indx])):
-                out.append(data)
+            out = SvLazyList([data], max(int(number[indx]), 0))
         return out
 
 
@@ -16,13 +16,13 @@
 #
 # ##### END GPL LICENSE BLOCK #####
 import numpy as np
-from collections import deque
 
 import bpy
 from bpy.props import BoolProperty, IntProperty, StringProperty
 
 from sverchok.node_tree import SverchCustomTreeNode
 from sverchok.data_structure import (updateNode, changable_sockets)
+from sverchok.utils.lazy_lists import rotate_view, lazy_levels, lazy_depth, lazy_to_lists
 
 
 class ShiftNodeMK2(bpy.types.Node, SverchCustomTreeNode):
@@ -31,6 +31,7 @@ class ShiftNodeMK2(bpy.types.Node, SverchCustomTreeNode):
     bl_label = 'List Shift'
     bl_icon = 'OUTLINER_OB_EMPTY'
     sv_icon = 'SV_LIST_SHIFT'
+    sv_lazy_aware = True
 
     shift_c: IntProperty(name='Shift', default=0, update=updateNode)
     enclose: BoolProperty(name='check_tail', default=True, update=updateNode)
@@ -62,39 +63,29 @@ class ShiftNodeMK2(bpy.types.Node, SverchCustomTreeNode):
         if not self.outputs["data"].is_linked:
             return
 
-        data = self.inputs['data'].sv_get()
+        data = self.inputs['data'].sv_get(deepcopy=False)
         number = self.inputs["shift"].sv_get()[0][0]
 
         if self.selected_mode == 'np':
-            dat = np.array(data)
+            dat = np.array(lazy_to_lists(data))
             # levelsOfList replacement:
             depth = dat.ndim #len(np.shape(dat))-1
             # roll with enclose (we need case of declose and vectorization)
             output = np.roll(dat, number, axis=min(self.level, depth)).tolist()
 
         elif self.selected_mode == 'py':
-            output = []
-
+            # rotated lists are views of the input ones
             if self.level == 0:
-                d = deque(data)
-                d.rotate(number)
-                output = list(d)
+                output = rotate_view(data, number)
 
             elif self.level == 1:
-                for sublist in data:
-                    d = deque(sublist)
-                    d.rotate(number)
-                    output.append(list(d))
+                output = [rotate_view(sublist, number) for sublist in data]
 
             elif self.level > 1:
                 # likely vectors or polygons... so going with list .
-                for sublist in data:
-                    sub_output = []
-                    for subsublist in sublist:
-                        d = deque(subsublist)
-                        d.rotate(number)
-                        sub_output.append(list(d))
-                    output.append(sub_output)
+                output = [[rotate_view(subsublist, number) for subsublist in sublist] for sublist in data]
+
+            output = lazy_levels(output, max(min(self.level, 2) - 1, lazy_depth(data)))
 
 
         self.outputs['data'].sv_set(output)
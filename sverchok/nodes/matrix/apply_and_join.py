@@ -18,10 +18,12 @@
 
 import bpy
 from bpy.props import BoolProperty
-from mathutils import Matrix, Vector
+import numpy as np
 from sverchok.node_tree import SverchCustomTreeNode
-from sverchok.data_structure import (Matrix_generate, updateNode) #, fullList_deep_copy)
-from sverchok.utils.sv_mesh_utils import mesh_join
+from sverchok.data_structure import updateNode
+from sverchok.utils.array_data import SvRaggedArray, tile_ragged
+from sverchok.utils.matrix_array import matrices_to_array, apply_to_vertices
+from sverchok.utils.sv_mesh_utils import mesh_join, mesh_join_np
 
 
 class SvMatrixApplyJoinNode(bpy.types.Node, SverchCustomTreeNode):
@@ -35,6 +37,8 @@ class SvMatrixApplyJoinNode(bpy.types.Node, SverchCustomTreeNode):
     bl_label = 'Matrix Apply'
     bl_icon = 'OUTLINER_OB_EMPTY'
     sv_icon = 'SV_MATRIX_APPLY_JOIN'
+    sv_array_aware = True
+    sv_matrix_aware = True
 
     do_join: BoolProperty(name='Join', default=True, update=updateNode)
 
@@ -54,28 +58,65 @@ class SvMatrixApplyJoinNode(bpy.types.Node, SverchCustomTreeNode):
     def process(self):
         if not self.inputs['Matrices'].is_linked:
             return
-        vertices = self.inputs['Vertices'].sv_get()
-        matrices = self.inputs['Matrices'].sv_get()
+        vertices = self.inputs['Vertices'].sv_get(deepcopy=False)
+        matrices = self.inputs['Matrices'].sv_get(deepcopy=False)
 
+        # vertex arrays in, vertex arrays out; lists stay lists for other consumers
+        use_arrays = len(vertices) > 0 and isinstance(vertices[0], np.ndarray)
+        matrices = matrices_to_array(matrices)
         n = len(matrices)
-        result_vertices = (vertices*n)[:n]
 
-        outV = []
-        for i, i2 in zip(matrices, result_vertices):
-            outV.append([(i @ Vector(v))[:] for v in i2])
-
-        edges = self.inputs['Edges'].sv_get(default=[[]])
-        faces = self.inputs['Faces'].sv_get(default=[[]])
+        edges = self.inputs['Edges'].sv_get(default=[[]], deepcopy=False)
+        faces = self.inputs['Faces'].sv_get(default=[[]], deepcopy=False)
         result_edges = (edges * n)[:n]
         result_faces = (faces * n)[:n]
+
+        if self.do_join and len(vertices) == len(edges) == len(faces) == 1:
+            # n instances of one mesh, joined
+            moved = apply_to_vertices(matrices, np.asarray(vertices[0], dtype=np.float64).reshape((-1, 3)))
+            count = moved.shape[1]
+            moved = moved.reshape((-1, 3))
+            edges = tile_ragged(as_ragged(edges[0]), n, count)
+            faces = tile_ragged(as_ragged(faces[0]), n, count)
+            if use_arrays:
+                self.outputs['Edges'].sv_set([edges])
+                self.outputs['Faces'].sv_set([faces])
+                self.outputs['Vertices'].sv_set([moved])
+            else:
+                self.outputs['Edges'].sv_set([edges.to_lists()])
+                self.outputs['Faces'].sv_set([faces.to_lists()])
+                self.outputs['Vertices'].sv_set([list(map(tuple, moved.tolist()))])
+            return
+
+        # object k is transformed by matrices k, k + len(vertices), ...
+        outV = [None] * n
+        for k, verts in enumerate(vertices[:n]):
+            idx = np.arange(k, n, len(vertices))
+            moved = apply_to_vertices(matrices[idx], np.asarray(verts, dtype=np.float64).reshape((-1, 3)))
+            if use_arrays:
+                for i, item in zip(idx.tolist(), moved):
+                    outV[i] = item
+            else:
+                for i, item in zip(idx.tolist(), moved.tolist()):
+                    outV[i] = list(map(tuple, item))
+        if not vertices:
+            outV = []
+
         if self.do_join:
-            outV, result_edges, result_faces = mesh_join(outV, result_edges, result_faces)
+            if use_arrays:
+                outV, result_edges, result_faces = mesh_join_np(outV, result_edges, result_faces)
+            else:
+                outV, result_edges, result_faces = mesh_join(outV, result_edges, result_faces)
             outV, result_edges, result_faces = [outV], [result_edges], [result_faces]
         self.outputs['Edges'].sv_set(result_edges)
         self.outputs['Faces'].sv_set(result_faces)
         self.outputs['Vertices'].sv_set(outV)
 
 
+def as_ragged(items):
+    return items if isinstance(items, SvRaggedArray) else SvRaggedArray.from_lists(items)
+
+
 def register():
     bpy.utils.register_class(SvMatrixApplyJoinNode)
 
@@ -18,7 +18,8 @@
 
 import bpy
 from sverchok.node_tree import SverchCustomTreeNode
-from sverchok.data_structure import (Vector_generate, matrixdef, updateNode)
+from sverchok.data_structure import updateNode
+from sverchok.utils.matrix_array import SvMatrixArray, matrix_def_array
 
 
 class MatrixDeformNode(bpy.types.Node, SverchCustomTreeNode):
@@ -27,6 +28,7 @@ class MatrixDeformNode(bpy.types.Node, SverchCustomTreeNode):
     bl_label = 'Matrix Deform'
     bl_icon = 'OUTLINER_OB_EMPTY'
     sv_icon = 'SV_MATRIX_DEFORM'
+    sv_matrix_aware = True
 
     def sv_init(self, context):
         self.inputs.new('SvMatrixSocket', "Original")
@@ -40,18 +42,18 @@ class MatrixDeformNode(bpy.types.Node, SverchCustomTreeNode):
         O,L,S,R,A = self.inputs
         Om = self.outputs[0]
         if Om.is_linked:
-            orig = O.sv_get()
+            orig = O.sv_get(deepcopy=False)
 
             if L.is_linked:
-                loc = Vector_generate(L.sv_get())
+                loc = L.sv_get(deepcopy=False)
             else:
                 loc = [[]]
             if S.is_linked:
-                scale = Vector_generate(S.sv_get())
+                scale = S.sv_get(deepcopy=False)
             else:
                 scale = [[]]
             if R.is_linked:
-                rot = Vector_generate(R.sv_get())
+                rot = R.sv_get(deepcopy=False)
             else:
                 rot = [[]]
 
@@ -59,13 +61,13 @@ class MatrixDeformNode(bpy.types.Node, SverchCustomTreeNode):
             # ability to add vector & vector difference instead of only rotation values
             if A.is_linked:
                 if A.links[0].from_socket.bl_idname == 'SvVerticesSocket':
-                    rotA = Vector_generate(A.sv_get())
+                    rotA = A.sv_get(deepcopy=False)
                     angle = [[]]
                 else:
-                    angle = A.sv_get()
+                    angle = A.sv_get(deepcopy=False)
                     rotA = [[]]
-            matrixes_ = matrixdef(orig, loc, scale, rot, angle, rotA)
-            Om.sv_set(matrixes_)
+            matrixes_ = matrix_def_array(orig, loc, scale, rot, angle, rotA)
+            Om.sv_set(SvMatrixArray(matrixes_))
 
 
 def register():
@@ -17,10 +17,12 @@
 # ##### END GPL LICENSE BLOCK #####
 
 import bpy
+import numpy as np
 from mathutils import Matrix
 
 from sverchok.node_tree import SverchCustomTreeNode
-from sverchok.data_structure import (updateNode, fullList)
+from sverchok.data_structure import updateNode
+from sverchok.utils.matrix_array import SvMatrixArray, matrices_to_array, interpolate, repeat_last_index
 
 
 # Matrix are assumed to be in format
@@ -36,6 +38,7 @@ class MatrixInterpolationNode(bpy.types.Node, SverchCustomTreeNode):
     bl_label = 'Matrix Interpolation'
     bl_icon = 'OUTLINER_OB_EMPTY'
     sv_icon = 'SV_MATRIX_INTERPOLATION'
+    sv_matrix_aware = True
 
     factor_: bpy.props.FloatProperty(
         name='Factor', description='Interpolation', default=0.5, min=0.0, max=1.0, update=updateNode)
@@ -51,25 +54,22 @@ class MatrixInterpolationNode(bpy.types.Node, SverchCustomTreeNode):
         if not self.outputs['C'].is_linked:
             return
         id_mat = [Matrix.Identity(4)]
-        A = self.inputs['A'].sv_get(default=id_mat)
-        B = self.inputs['B'].sv_get(default=id_mat)
-        factor = self.inputs['Factor'].sv_get()
+        A = matrices_to_array(self.inputs['A'].sv_get(default=id_mat, deepcopy=False))
+        B = matrices_to_array(self.inputs['B'].sv_get(default=id_mat, deepcopy=False))
+        factor = self.inputs['Factor'].sv_get(deepcopy=False)
 
-
-        matrixes_ = []
-        # match inputs, first matrix A and B using fullList
+        # match inputs, first matrix A and B repeating the last one,
         # then extend the factor list if necessary,
         # A and B should control length of list, not interpolation lists
         max_l = max(len(A), len(B))
-        fullList(A, max_l)
-        fullList(B, max_l)
-        if len(factor) < max_l:
-            fullList(factor, max_l)
-        for i in range(max_l):
-            for k in range(len(factor[i])):
-                matrixes_.append(A[i].lerp(B[i], factor[i][k]))
-
-        self.outputs['C'].sv_set(matrixes_)
+        factor = [factor[i] for i in repeat_last_index(len(factor), max_l)]
+        counts = [len(f) for f in factor]
+        pairs = np.repeat(np.arange(max_l), counts)
+        A = A[repeat_last_index(len(A), max_l)][pairs]
+        B = B[repeat_last_index(len(B), max_l)][pairs]
+        factors = np.fromiter((f for fs in factor for f in fs), dtype=np.float64, count=len(pairs))
+
+        self.outputs['C'].sv_set(SvMatrixArray(interpolate(A, B, factors)))
 
 
 def register():
@@ -17,10 +17,10 @@
 # ##### END GPL LICENSE BLOCK #####
 
 import bpy
-import mathutils
 from bpy.props import FloatProperty, FloatVectorProperty
 from sverchok.node_tree import SverchCustomTreeNode
-from sverchok.data_structure import (matrixdef, Vector_generate, updateNode)
+from sverchok.data_structure import updateNode
+from sverchok.utils.matrix_array import SvMatrixArray, matrix_def_array, identity_matrices
 
 
 class SvMatrixGenNodeMK2(bpy.types.Node, SverchCustomTreeNode):
@@ -54,30 +54,27 @@ class SvMatrixGenNodeMK2(bpy.types.Node, SverchCustomTreeNode):
         Ma = self.outputs[0]
         if not Ma.is_linked:
             return
-        loc = Vector_generate(L.sv_get())
-        scale = Vector_generate(S.sv_get())
-        rot = Vector_generate(R.sv_get())
+        loc = L.sv_get(deepcopy=False)
+        scale = S.sv_get(deepcopy=False)
+        rot = R.sv_get(deepcopy=False)
         rotA, angle = [[]], [[0.0]]
 
         # ability to add vector & vector difference instead of only rotation values
         if A.is_linked:
             if A.links[0].from_socket.bl_idname == 'SvVerticesSocket':
-                rotA = Vector_generate(A.sv_get())
+                rotA = A.sv_get(deepcopy=False)
                 angle = [[]]
             elif A.links[0].from_socket.bl_idname == 'SvStringsSocket':
-                angle = A.sv_get()
+                angle = A.sv_get(deepcopy=False)
                 rotA = [[]]
         else:
-            angle = A.sv_get()
+            angle = A.sv_get(deepcopy=False)
             rotA = [[]]
 
         max_l = max(len(loc[0]), len(scale[0]), len(rot[0]), len(angle[0]), len(rotA[0]))
-        orig = []
-        for l in range(max_l):
-            M = mathutils.Matrix()
-            orig.append(M)
-        matrixes_ = matrixdef(orig, loc, scale, rot, angle, rotA)
-        Ma.sv_set(matrixes_)
+        orig = identity_matrices(max_l)
+        matrixes_ = matrix_def_array(orig, loc, scale, rot, angle, rotA)
+        Ma.sv_set(SvMatrixArray(matrixes_))
 
 
 def register():
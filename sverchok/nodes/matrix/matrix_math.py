@@ -19,11 +19,13 @@
 import bpy
 from bpy.props import IntProperty, FloatProperty, BoolProperty, EnumProperty
 
+import numpy as np
 from mathutils import Matrix
-from functools import reduce
 
 from sverchok.node_tree import SverchCustomTreeNode
-from sverchok.data_structure import (updateNode, match_long_repeat)
+from sverchok.data_structure import updateNode
+from sverchok.utils.matrix_array import (
+    SvMatrixArray, compose, invert, decompose, translation_matrices, scale_matrices)
 
 operationItems = [
     ("MULTIPLY", "Multiply", "Multiply two matrices", 0),
@@ -47,6 +49,7 @@ class SvMatrixMathNode(bpy.types.Node, SverchCustomTreeNode):
     bl_label = 'Matrix Math'
     bl_icon = 'OUTLINER_OB_EMPTY'
     sv_icon = 'SV_MATRIX_MATH'
+    sv_matrix_aware = True
 
     def update_operation(self, context):
         self.label = "Matrix " + self.operation.title()
@@ -124,47 +127,32 @@ class SvMatrixMathNode(bpy.types.Node, SverchCustomTreeNode):
             row.prop(self, "filter_s", toggle=True, text="S")
 
     def operation_filter(self, a):
-        T, R, S = a.decompose()
+        T, R, S = decompose(a)
+        count = len(T)
 
-        if self.filter_t:
-            mat_t = Matrix().Identity(4)
-        else:
-            mat_t = Matrix().Translation(T)
-
-        if self.filter_r:
-            mat_r = Matrix().Identity(4)
-        else:
-            mat_r = R.to_matrix().to_4x4()
-
-        if self.filter_s:
-            mat_s = Matrix().Identity(4)
-        else:
-            mat_s = Matrix().Identity(4)
-            mat_s[0][0] = S[0]
-            mat_s[1][1] = S[1]
-            mat_s[2][2] = S[2]
-
-        m = mat_t @ mat_r @ mat_s
+        m = translation_matrices(np.zeros((count, 3)) if self.filter_t else T)
+        if not self.filter_r:
+            m[:, :3, :3] = R
+        if not self.filter_s:
+            m = m @ scale_matrices(S)
 
         return m
 
     def operation_basis(self, a):
-        T, R, S = a.decompose()
+        T, R, S = decompose(a)
 
-        rot = R.to_matrix().to_4x4()
-        Rx = (rot[0][0], rot[1][0], rot[2][0])
-        Ry = (rot[0][1], rot[1][1], rot[2][1])
-        Rz = (rot[0][2], rot[1][2], rot[2][2])
+        # columns of the rotation matrices
+        Rx, Ry, Rz = R[:, :, 0], R[:, :, 1], R[:, :, 2]
 
         return Rx, Ry, Rz
 
     def get_operation(self):
         if self.operation == "MULTIPLY":
-            return lambda l: reduce((lambda a, b: a @ b), l)
+            return lambda l: compose(*l)
         elif self.operation == "FILTER":
             return self.operation_filter
         elif self.operation == "INVERT":
-            return lambda a: a.inverted()
+            return invert
         elif self.operation == "BASIS":
             return self.operation_basis
 
@@ -189,43 +177,36 @@ class SvMatrixMathNode(bpy.types.Node, SverchCustomTreeNode):
 
         I = []  # collect the inputs from the connected sockets
         for s in filter(lambda s: s.is_linked, self.inputs):
-            I.append(s.sv_get(default=id_mat))
+            I.append(s.sv_get(default=id_mat, deepcopy=False))
 
         operation = self.get_operation()
 
         if self.operation in {"MULTIPLY"}:  # multiple input operations
             if self.prePost == "PRE":  # A op B : keep input order
-                parameters = match_long_repeat(I)
+                parameters = I
             else:  # B op A : reverse input order
-                parameters = match_long_repeat(I[::-1])
+                parameters = I[::-1]
 
-            matrixList = [operation(params) for params in zip(*parameters)]
+            matrixList = operation(parameters)
 
-            outputs['C'].sv_set(matrixList)
+            outputs['C'].sv_set(SvMatrixArray(matrixList))
 
         else:  # single input operations
             parameters = I[0]
           #  print("parameters=", parameters)
 
             if self.operation == "BASIS":
-                xList = []
-                yList = []
-                zList = []
-                for a in parameters:
-                    Rx, Ry, Rz = operation(a)
-                    xList.append(Rx)
-                    yList.append(Ry)
-                    zList.append(Rz)
-                outputs['X'].sv_set(xList)
-                outputs['Y'].sv_set(yList)
-                outputs['Z'].sv_set(zList)
+                xList, yList, zList = operation(parameters)
+                outputs['X'].sv_set(list(map(tuple, xList.tolist())))
+                outputs['Y'].sv_set(list(map(tuple, yList.tolist())))
+                outputs['Z'].sv_set(list(map(tuple, zList.tolist())))
 
                 outputs['C'].sv_set(parameters)
 
             else:  # INVERSE / FILTER
-                matrixList = [operation(a) for a in parameters]
+                matrixList = operation(parameters)
 
-                outputs['C'].sv_set(matrixList)
+                outputs['C'].sv_set(SvMatrixArray(matrixList))
 
 
 def register():
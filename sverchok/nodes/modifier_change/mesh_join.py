@@ -18,8 +18,11 @@
 
 import bpy
 
+import numpy as np
+
 from sverchok.node_tree import SverchCustomTreeNode
-from sverchok.utils.sv_mesh_utils import mesh_join
+from sverchok.utils.array_data import SvRaggedArray
+from sverchok.utils.sv_mesh_utils import mesh_join, mesh_join_np
 
 
 class SvMeshJoinNode(bpy.types.Node, SverchCustomTreeNode):
@@ -28,6 +31,8 @@ class SvMeshJoinNode(bpy.types.Node, SverchCustomTreeNode):
     bl_label = 'Mesh Join'
     bl_icon = 'OUTLINER_OB_EMPTY'
     sv_icon = 'SV_MESH_JOIN'
+    sv_array_aware = True
+    sv_thread_safe = True
 
     def sv_init(self, context):
         self.inputs.new('SvVerticesSocket', 'Vertices')
@@ -44,6 +49,14 @@ class SvMeshJoinNode(bpy.types.Node, SverchCustomTreeNode):
             verts = Vertices.sv_get()
             poly_edge = PolyEdge.sv_get(default=[[]])
 
+            # keep array data as arrays, joining them without python loops
+            if isinstance(verts[0], np.ndarray) or isinstance(poly_edge[0], SvRaggedArray):
+                verts_out, _, poly_edge_out = mesh_join_np(verts, [], poly_edge if PolyEdge.is_linked else [])
+                if PolyEdge.is_linked:
+                    PolyEdge_out.sv_set([poly_edge_out])
+                Vertices_out.sv_set([verts_out])
+                return
+
             if PolyEdge.is_linked:
                 verts_out, _, poly_edge_out = mesh_join(verts, [], poly_edge)
                 PolyEdge_out.sv_set([poly_edge_out])
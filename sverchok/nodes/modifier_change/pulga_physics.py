@@ -19,13 +19,17 @@
 import ast
 from numpy import array
 import bpy
-from bpy.props import IntProperty, StringProperty, BoolProperty, FloatProperty, FloatVectorProperty
+from bpy.props import IntProperty, StringProperty, BoolProperty, FloatProperty, FloatVectorProperty, EnumProperty
 from sverchok.node_tree import SverchCustomTreeNode
 from sverchok.data_structure import updateNode, node_id, match_long_repeat
 from sverchok.utils.pulga_physics_core import pulga_system_init
+from sverchok.utils.logging import debug
 
 FILE_NAME = 'pulga_Memory '
 
+# node_id: (particles, average pairs tested, average pairs touching) of last update
+pairs_stats = {}
+
 
 def check_past_file(location):
     '''read text-block and parse values'''
@@ -380,6 +384,27 @@ class SvPulgaPhysicsNode(bpy.types.Node, SverchCustomTreeNode):
         default=False,
         update=updateNode)
 
+    broad_phase_items = [
+        ("GRID", "Grid", "Look for touching particles in uniform grid cells", 0),
+        ("KDTREE", "KD Tree", "Look for touching particles with KD-tree", 1),
+        ("ALL", "All Pairs", "Test every pair of particles", 2)]
+
+    broad_phase : EnumProperty(name="Broad Phase",
+        description="How to find pairs of particles for collision and fit (attraction always tests all pairs)",
+        items=broad_phase_items,
+        default="GRID",
+        update=updateNode)
+
+    auto_cell_size : BoolProperty(name="Auto Cell Size",
+        description="Use the largest particle diameter as size of grid cell",
+        default=True,
+        update=updateNode)
+
+    cell_size : FloatProperty(name="Cell Size",
+        description="Size of grid cell",
+        default=1.0, min=0.001, precision=3,
+        update=updateNode)
+
     def sv_init(self, context):
 
         '''create sockets'''
@@ -437,6 +462,15 @@ class SvPulgaPhysicsNode(bpy.types.Node, SverchCustomTreeNode):
         '''draw buttons on the N-panel'''
         self.draw_buttons(context, layout)
         layout.prop(self, "output_numpy", toggle=False)
+        layout.prop(self, "broad_phase")
+        if self.broad_phase == 'GRID':
+            layout.prop(self, "auto_cell_size")
+            if not self.auto_cell_size:
+                layout.prop(self, "cell_size")
+        stats = pairs_stats.get(node_id(self))
+        if stats:
+            layout.label(text="Particles: {0}, pairs tested: {1:.0f}".format(*stats))
+            layout.label(text="Pairs touching: {2:.0f}".format(*stats))
 
 
     def get_data(self):
@@ -470,6 +504,7 @@ class SvPulgaPhysicsNode(bpy.types.Node, SverchCustomTreeNode):
         gates_dict["b_box"] = si["Bounding Box"].is_linked
         gates_dict["output"] = self.output_numpy
         gates_dict["apply_f"] = True
+        gates_dict["broad_phase"] = [self.broad_phase, 0.0 if self.auto_cell_size else self.cell_size]
 
         return gates_dict
 
@@ -522,18 +557,27 @@ class SvPulgaPhysicsNode(bpy.types.Node, SverchCustomTreeNode):
             gates_dict = self.fill_gates_dict()
             data, past, from_file = self.get_global_cache()
             temp_id = 0
+            stats = []
             for par in zip(*params):
                 cache = self.get_local_cache(past, data, from_file, temp_id)
                 par_dict = {}
                 for idx, p in enumerate(self.sorted_props):
                     par_dict[p[0]] = par[idx]
-                cache_new = pulga_system_init(par_dict, par, gates_dict, out_lists, cache)
+                cache_new = pulga_system_init(par_dict, par, gates_dict, out_lists, cache, stats)
 
                 if self.accumulative:
                     self.accumulativity_set_data(cache_new, temp_id)
 
                 temp_id += 1
 
+            if stats:
+                particles, tested, touching = array(stats).mean(axis=0)
+                pairs_stats[node_id(self)] = (int(particles), tested, touching)
+                debug("%s: %s broad phase, %d pairs tested, %d touching per iteration",
+                      self.name, self.broad_phase, tested, touching)
+            else:
+                pairs_stats.pop(node_id(self), None)
+
         if so['Vertices'].is_linked:
             so['Vertices'].sv_set(verts_out)
         if so['Rads'].is_linked:
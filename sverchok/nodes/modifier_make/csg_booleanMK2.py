@@ -17,34 +17,40 @@
 # ##### END GPL LICENSE BLOCK #####
 
 import bpy
-import sys
 from bpy.props import EnumProperty, BoolProperty
 from sverchok.node_tree import SverchCustomTreeNode
 from sverchok.data_structure import updateNode, match_long_cycle as mlr
-from sverchok.utils.csg_core import CSG
+from sverchok.utils.csg_core import CSGMesh
 
 
 def Boolean(VA, PA, VB, PB, operation):
-    a = CSG.Obj_from_pydata(VA, PA)
-    b = CSG.Obj_from_pydata(VB, PB)
-    faces = []
-    vertices = []
+    a = CSGMesh.from_pydata(VA, PA)
+    b = CSGMesh.from_pydata(VB, PB)
     if operation == 'DIFF':
-        polygons = a.subtract(b).toPolygons()
+        result = a.subtract(b)
     elif operation == 'JOIN':
-        polygons = a.union(b).toPolygons()
+        result = a.union(b)
     elif operation == 'ITX':
-        polygons = a.intersect(b).toPolygons()
-    for polygon in polygons:
-        indices = []
-        for v in polygon.vertices:
-            pos = [v.pos.x, v.pos.y, v.pos.z]
-            if pos not in vertices:
-                vertices.append(pos)
-            index = vertices.index(pos)
-            indices.append(index)
-        faces.append(indices)
-    return [vertices, faces]
+        result = a.intersect(b)
+    return list(result.to_pydata())
+
+
+def BooleanAll(verts, polys, operation):
+    """
+    Final result of applying operation to all objects one by one.
+    Union of all objects and subtraction of union of the rest from the first
+    object are done in one batch.
+    """
+    meshes = [CSGMesh.from_pydata(v, p) for v, p in zip(verts, polys)]
+    if operation == 'JOIN':
+        result = CSGMesh.union_all(meshes)
+    elif operation == 'DIFF':
+        result = meshes[0].subtract(CSGMesh.union_all(meshes[1:]))
+    else:
+        result = meshes[0]
+        for mesh in meshes[1:]:
+            result = result.intersect(mesh)
+    return list(result.to_pydata())
 
 
 class SvCSGBooleanNodeMK2(bpy.types.Node, SverchCustomTreeNode):
@@ -52,6 +58,8 @@ class SvCSGBooleanNodeMK2(bpy.types.Node, SverchCustomTreeNode):
     bl_idname = 'SvCSGBooleanNodeMK2'
     bl_label = 'CSG Boolean 2'
     bl_icon = 'MOD_BOOLEAN'
+    sv_disk_cache = True
+    sv_thread_safe = True
 
     mode_options = [
         ("ITX", "Intersect", "", 0),
@@ -111,24 +119,19 @@ class SvCSGBooleanNodeMK2(bpy.types.Node, SverchCustomTreeNode):
         VertA, PolA, VertB, PolB, VertN, PolN = self.inputs
         SMode = self.selected_mode
         out = []
-        recursionlimit = sys.getrecursionlimit()
-        sys.setrecursionlimit(10000)
         if not self.nest_objs:
             for v1, p1, v2, p2 in zip(*mlr([VertA.sv_get(), PolA.sv_get(), VertB.sv_get(), PolB.sv_get()])):
                 out.append(Boolean(v1, p1, v2, p2, SMode))
         else:
             vnest, pnest = VertN.sv_get(), PolN.sv_get()
-            First = Boolean(vnest[0], pnest[0], vnest[1], pnest[1], SMode)
             if not self.out_last:
+                First = Boolean(vnest[0], pnest[0], vnest[1], pnest[1], SMode)
                 out.append(First)
                 for i in range(2, len(vnest)):
                     out.append(Boolean(First[0], First[1], vnest[i], pnest[i], SMode))
                     First = out[-1]
             else:
-                for i in range(2, len(vnest)):
-                    First = Boolean(First[0], First[1], vnest[i], pnest[i], SMode)
-                out.append(First)
-        sys.setrecursionlimit(recursionlimit)
+                out.append(BooleanAll(vnest, pnest, SMode))
         OutV.sv_set([i[0] for i in out])
         if OutP.is_linked:
             OutP.sv_set([i[1] for i in out])
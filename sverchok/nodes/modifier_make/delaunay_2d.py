@@ -30,6 +30,7 @@ class DelaunayTriangulation2DNode(bpy.types.Node, SverchCustomTreeNode):
     bl_label = 'Delaunay 2D'
     bl_icon = 'OUTLINER_OB_EMPTY'
     sv_icon = 'SV_DELAUNAY'
+    sv_disk_cache = True
 
     def sv_init(self, context):
         self.inputs.new('SvVerticesSocket', "Vertices")
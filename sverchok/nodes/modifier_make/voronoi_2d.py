@@ -226,6 +226,7 @@ class Voronoi2DNode(bpy.types.Node, SverchCustomTreeNode):
     bl_label = 'Voronoi 2D'
     bl_icon = 'OUTLINER_OB_EMPTY'
     sv_icon = 'SV_VORONOI'
+    sv_disk_cache = True
 
     clip: FloatProperty(
         name='clip', description='Clipping Distance',
@@ -136,6 +136,7 @@ class SvScalarMathNodeMK4(bpy.types.Node, SverchCustomTreeNode):
     bl_idname = 'SvScalarMathNodeMK4'
     bl_label = 'Scalar Math'
     sv_icon = 'SV_SCALAR_MATH'
+    sv_batch_safe = True
 
     def mode_change(self, context):
         self.update_sockets()
@@ -22,6 +22,7 @@ from mathutils import Vector
 from bpy.props import FloatProperty, BoolProperty
 from sverchok.node_tree import SverchCustomTreeNode
 from sverchok.data_structure import (updateNode, second_as_first_cycle)
+from sverchok.utils.sv_bvh_utils import object_queries, transform_points
 
 
 class SvPointOnMeshNodeMK2(bpy.types.Node, SverchCustomTreeNode):
@@ -60,26 +61,22 @@ class SvPointOnMeshNodeMK2(bpy.types.Node, SverchCustomTreeNode):
         max_dist = second_as_first_cycle(obj, md.sv_get()[0])
 
         for i, i2 in zip(obj, max_dist):
-            if sm1:
-                Out.append([i.closest_point_on_mesh(i.matrix_local.inverted() @ Vector(p), i2) for p in point])
-            else:
-                Out.append([i.closest_point_on_mesh(p, i2) for p in point])
+            points = transform_points(i.matrix_local.inverted(), point) if sm1 else point
+            hits, _ = object_queries(lambda p: i.closest_point_on_mesh(p, i2), points)
+            Out.append(hits)
 
         if P.is_linked:
             if sm2:
-                out = []
-                for i, i2 in zip(obj, Out):
-                    out.append([(i.matrix_world * i3[1])[:] for i3 in i2])
-                P.sv_set(out)
+                P.sv_set([transform_points(i.matrix_world, hits.location).tolist() for i, hits in zip(obj, Out)])
             else:
-                P.sv_set([[i2[1][:] for i2 in o] for o in Out])
+                P.sv_set([hits.location.tolist() for hits in Out])
 
         if S.is_linked:
-            S.sv_set([[i2[0] for i2 in o] for o in Out])
+            S.sv_set([hits.hit.tolist() for hits in Out])
         if N.is_linked:
-            N.sv_set([[i2[2][:] for i2 in o] for o in Out])
+            N.sv_set([hits.normal.tolist() for hits in Out])
         if I.is_linked:
-            I.sv_set([[i2[3] for i2 in o] for o in Out])
+            I.sv_set([hits.index.tolist() for hits in Out])
 
 
 def register():
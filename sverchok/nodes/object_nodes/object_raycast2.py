@@ -23,6 +23,7 @@ from mathutils.bvhtree import BVHTree
 from bpy.props import BoolProperty
 from sverchok.node_tree import SverchCustomTreeNode
 from sverchok.data_structure import (updateNode, match_long_repeat)
+from sverchok.utils.sv_bvh_utils import bvh_ray_cast, object_queries, transform_points
 
 
 class FakeObj(object):
@@ -36,15 +37,10 @@ class FakeObj(object):
         self.BVH = BVHTree.FromPolygons(vertices, polygons)
         obj.to_mesh_clear()
 
-    def ray_cast(self, a, b):
-        # obj.ray_cast returns  Return (result, location, normal, index
-        # bvh.ray_cast returns: Vector location, Vector normal, int index, float distance
-        #         ^--- therefor needs adjusting
-        tv = self.BVH.ray_cast(a, b)
-        if tv[0] == None:
-            return [False, (0, 0, 0), (1, 0, 0), -1]
-        else:
-            return [True, tv[0], tv[1], tv[2]]
+    def ray_cast_all(self, origins, directions):
+        hits = bvh_ray_cast(self.BVH, origins, directions)
+        hits.normal[~hits.hit] = (1, 0, 0)
+        return hits
 
 
 class SvOBJRayCastNodeMK2(bpy.types.Node, SverchCustomTreeNode):
@@ -76,33 +72,30 @@ class SvOBJRayCastNodeMK2(bpy.types.Node, SverchCustomTreeNode):
     def process(self):
         o,s,e = self.inputs
         S,P,N,I = self.outputs
-        outfin,OutLoc,obj,sm1,sm2 = [],[],o.sv_get(),self.mode,self.mode2
+        outfin,obj,sm1,sm2 = [],o.sv_get(),self.mode,self.mode2
         st, en = match_long_repeat([s.sv_get()[0], e.sv_get()[0]])
         for OB in obj:
-            if OB.type != 'MESH':
-                OB = FakeObj(OB)
+            origins, directions = st, en
             if sm1:
                 obm = OB.matrix_local.inverted()
-                outfin.append([OB.ray_cast(obm @ Vector(i), obm @ Vector(i2)) for i,i2 in zip(st,en)])
+                origins, directions = transform_points(obm, st), transform_points(obm, en)
+            if OB.type != 'MESH':
+                hits = FakeObj(OB).ray_cast_all(origins, directions)
             else:
-                outfin.append([OB.ray_cast(i,i2) for i,i2 in zip(st,en)])
+                hits, _ = object_queries(OB.ray_cast, origins, directions)
+            outfin.append(hits)
+
         if S.is_linked:
-            S.sv_set([[i[0] for i in i2] for i2 in outfin])
-
-        # do not reuse variable names, inside loops inside loops that's begging for obfuscation.
-        if sm2:
-            if P.is_linked:
-                for i,i2 in zip(obj,outfin):
-                    omw = i.matrix_world
-                    OutLoc.append([(omw*i[1])[:] for i in i2])
-                P.sv_set(OutLoc)
-        else:
-            if P.is_linked:
-                P.sv_set([[i[1][:] for i in i2] for i2 in outfin])
+            S.sv_set([hits.hit.tolist() for hits in outfin])
+        if P.is_linked:
+            if sm2:
+                P.sv_set([transform_points(OB.matrix_world, hits.location).tolist() for OB, hits in zip(obj, outfin)])
+            else:
+                P.sv_set([hits.location.tolist() for hits in outfin])
         if N.is_linked:
-            N.sv_set([[i[2][:] for i in i2] for i2 in outfin])
+            N.sv_set([hits.normal.tolist() for hits in outfin])
         if I.is_linked:
-            I.sv_set([[i[3] for i in i2] for i2 in outfin])
+            I.sv_set([hits.index.tolist() for hits in outfin])
 
 
 def register():
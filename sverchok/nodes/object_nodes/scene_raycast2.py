@@ -19,6 +19,7 @@
 import bpy
 from sverchok.node_tree import SverchCustomTreeNode
 from sverchok.data_structure import (updateNode, match_long_repeat)
+from sverchok.utils.sv_bvh_utils import object_queries
 
 
 class SvSCNRayCastNodeMK2(bpy.types.Node, SverchCustomTreeNode):
@@ -41,24 +42,22 @@ class SvSCNRayCastNodeMK2(bpy.types.Node, SverchCustomTreeNode):
 
     def process(self):
         P,N,S,I,O,M = self.outputs
-        rc = []
         st = self.inputs['origin'].sv_get()[0]
         en = self.inputs['direction'].sv_get()[0]
         st, en = match_long_repeat([st, en])
-        for i,i2 in zip(st,en):
-            rc.append(bpy.context.scene.ray_cast(i, i2))
+        hits, rest = object_queries(bpy.context.scene.ray_cast, st, en)
         if P.is_linked:
-            P.sv_set([[i[1][:] for i in rc]])
+            P.sv_set([hits.location.tolist()])
         if N.is_linked:
-            N.sv_set([[i[2][:] for i in rc]])
+            N.sv_set([hits.normal.tolist()])
         if S.is_linked:
-            S.sv_set([[i[0] for i in rc]])
+            S.sv_set([hits.hit.tolist()])
         if I.is_linked:
-            I.sv_set([[i[3] for i in rc]])
+            I.sv_set([hits.index.tolist()])
         if O.is_linked:
-            O.sv_set([i[4] for i in rc])
+            O.sv_set([i[0] for i in rest])
         if M.is_linked:
-            M.sv_set([i[5] for i in rc])
+            M.sv_set([i[1] for i in rest])
 
 
 def register():
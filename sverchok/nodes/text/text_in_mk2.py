@@ -19,20 +19,23 @@
 # made by: Linus Yng, haxed by zeffii to mk2
 # pylint: disable=c0326
 
-import locale
 import io
 import sys
-import csv
-import collections
 import json
 import ast
+import os
 import sverchok
 
+import numpy as np
+
 import bpy
 from bpy.props import BoolProperty, EnumProperty, StringProperty, IntProperty
 
 from sverchok.node_tree import SverchCustomTreeNode
 from sverchok.data_structure import node_id, multi_socket, updateNode
+from sverchok.utils.sv_text_stream import (
+    CsvOptions, read_csv_file, read_csv_string, file_signature, text_signature,
+    default_cache_dir, row_range)
 
 from sverchok.utils.sv_text_io_common import (
     FAIL_COLOR, READY_COLOR, TEXT_IO_CALLBACK,
@@ -56,6 +59,11 @@ class SvTextInFileImporterOp(bpy.types.Operator):
 
     def execute(self, context):
         n = self.node
+        if n.stream_file:
+            # read later straight from disk, without copying the file into a text datablock
+            n.file = self.filepath
+            n.text = os.path.basename(self.filepath)
+            return {'FINISHED'}
         t = bpy.data.texts.load(self.filepath)
         n.text = t.name
         return {'FINISHED'}
@@ -82,6 +90,7 @@ def pop_all_data(node, n_id):
     node.csv_data.pop(n_id, None)
     node.list_data.pop(n_id, None)
     node.json_data.pop(n_id, None)
+    node.data_signatures.pop(n_id, None)
 
 
 class SvTextInNodeMK2(bpy.types.Node, SverchCustomTreeNode, CommonTextMixinIO):
@@ -97,6 +106,8 @@ class SvTextInNodeMK2(bpy.types.Node, SverchCustomTreeNode, CommonTextMixinIO):
     csv_data = {}
     list_data = {}
     json_data = {}
+    # signatures of sources of loaded data, to skip parsing unchanged sources
+    data_signatures = {}
 
     # general settings
     n_id: StringProperty(default='')
@@ -162,12 +173,37 @@ class SvTextInNodeMK2(bpy.types.Node, SverchCustomTreeNode, CommonTextMixinIO):
     # to have one socket output
     one_sock: BoolProperty(name='one socket', default=False)
 
+    # read external file (self.file) directly instead of text datablock
+    stream_file: BoolProperty(
+        name='stream file', default=False,
+        description="Read file from disk without loading it into a text datablock; CSV columns of numbers are memory mapped")
+
+    # rows of CSV data to output
+    row_start: IntProperty(name='start row', default=0, min=0, update=updateNode)
+    row_count: IntProperty(
+        name='rows', default=0, min=0, update=updateNode,
+        description="Number of rows to output, 0 for all rows")
+    rows_per_frame: BoolProperty(
+        name='per frame', default=False, update=updateNode,
+        description="Output next rows on each frame: rows from start + frame * rows")
+
+    output_numpy: BoolProperty(
+        name='Output NumPy', default=False, update=updateNode,
+        description="Output columns of numbers as NumPy arrays")
+
     def draw_buttons_ext(self, context, layout):
         if self.textmode == 'CSV':
             layout.prop(self, 'force_input')
             layout.prop(self, 'csv_skip_header_lines', text='Skip n header lines')
             layout.label(text="extra mode")
             layout.prop(self, "csv_extended_mode", toggle=True)
+            layout.label(text="Rows")
+            row = layout.row(align=True)
+            row.prop(self, 'row_start', text='Start')
+            row.prop(self, 'row_count', text='Count')
+            layout.prop(self, 'rows_per_frame')
+        if self.textmode in {'CSV', 'JSON'}:
+            layout.prop(self, 'output_numpy')
 
     def draw_buttons(self, context, layout):
 
@@ -187,8 +223,12 @@ class SvTextInNodeMK2(bpy.types.Node, SverchCustomTreeNode, CommonTextMixinIO):
 
         else:
             row = col.row(align=True)
-            row.prop_search(self, 'text', bpy.data, 'texts', text="Read")
+            if self.stream_file:
+                row.prop(self, 'file', text="Read")
+            else:
+                row.prop_search(self, 'text', bpy.data, 'texts', text="Read")
             row.operator("node.sv_textin_file_importer", text='', icon='EMPTY_SINGLE_ARROW')
+            col.prop(self, 'stream_file', toggle=True)
 
             row = col.row(align=True)
             row.prop(self, 'textmode', expand=True)
@@ -292,13 +332,21 @@ class SvTextInNodeMK2(bpy.types.Node, SverchCustomTreeNode, CommonTextMixinIO):
         self.use_custom_color = True
         self.color = READY_COLOR
         csv_data = self.csv_data[n_id]
+        frame = bpy.context.scene.frame_current if self.rows_per_frame else None
+
+        def get_column(values):
+            values = values[row_range(len(values), self.row_start, self.row_count, frame)]
+            if isinstance(values, np.ndarray):
+                return np.array(values) if self.output_numpy else values.tolist()
+            return values
+
         if not self.one_sock:
             for name in csv_data.keys():
                 if name in self.outputs and self.outputs[name].is_linked:
-                    self.outputs[name].sv_set([csv_data[name]])
+                    self.outputs[name].sv_set([get_column(csv_data[name])])
         else:
             name = 'one_sock'
-            self.outputs['one_sock'].sv_set(list(csv_data.values()))
+            self.outputs['one_sock'].sv_set([get_column(values) for values in csv_data.values()])
 
     def reload_csv(self):
         n_id = node_id(self)
@@ -318,90 +366,59 @@ class SvTextInNodeMK2(bpy.types.Node, SverchCustomTreeNode, CommonTextMixinIO):
                 self.outputs.new('SvStringsSocket', name)
 
 
-    def load_csv_data(self):
-        n_id = node_id(self)
-
-        csv_data = collections.OrderedDict()
-
-        if n_id in self.csv_data:
-            del self.csv_data[n_id]
-
-        f = io.StringIO(bpy.data.texts[self.text].as_string())
-
+    def csv_options(self):
         # setup CSV options
-
         if self.csv_dialect == 'user':
             if self.csv_delimiter == 'CUSTOM':
                 d = self.csv_custom_delimiter
             else:
                 d = self.csv_delimiter
-
-            reader = csv.reader(f, delimiter=d)
+            dialect = ''
         elif self.csv_dialect == 'semicolon':
             self.csv_decimalmark = ','
-            reader = csv.reader(f, delimiter=';')
+            d, dialect = ';', ''
         else:
-            reader = csv.reader(f, dialect=self.csv_dialect)
+            d, dialect = '', self.csv_dialect
             self.csv_decimalmark = '.'
 
         # setup parse decimalmark
+        if self.csv_decimalmark == 'CUSTOM':
+            decimalmark = self.csv_custom_decimalmark or '.'
+        else:
+            decimalmark = self.csv_decimalmark
+
+        return CsvOptions(
+            dialect=dialect, delimiter=d, decimalmark=decimalmark,
+            header=self.csv_header, skip_lines=self.csv_skip_header_lines,
+            force_input=self.force_input, extended=self.csv_extended_mode)
+
+    def source_signature(self):
+        """signature of current source, to skip parsing it again if it did not change"""
+        if self.stream_file:
+            return file_signature(bpy.path.abspath(self.file))
+        return text_signature(bpy.data.texts[self.text].as_string())
 
-        if self.csv_decimalmark == ',':
-            get_number = lambda s: float(s.replace(',', '.'))
-        elif self.csv_decimalmark == 'LOCALE':
-            get_number = locale.atof
-        elif self.csv_decimalmark == 'CUSTOM':
-            if self.csv_custom_decimalmark:
-                get_number = lambda s: float(s.replace(self.csv_custom_decimalmark, '.'))
-        else:  # . default
-            get_number = float
-
-        # some csv contain a number of must-skip lines, these csv break the csv standard. but we still
-        # want to be able to read them :)
-        if self.csv_skip_header_lines:
-            for _ in range(self.csv_skip_header_lines):
-                next(reader)
-
-        # load data
-        for i, row in enumerate(reader):
-
-            if i == 0:  # setup names
-                if self.csv_header:
-                    for name in row:
-                        tmp = name
-                        c = 1
-                        while tmp in csv_data:
-                            tmp = name+str(c)
-                            c += 1
-                        csv_data[str(tmp)] = []
-                    continue  # first row is names
-                else:
-                    for j in range(len(row)):
-                        csv_data["Col "+str(j)] = []
-
-            for j, name in enumerate(csv_data):
-                if not self.csv_extended_mode:
-                    try:
-                        n = get_number(row[j])
-                        csv_data[name].append(n)
-                    except Exception as err:
-                        error = str(err)
-
-                        if "could not convert string to float" in error:
-                            if self.force_input:
-                                csv_data[name].append(row[j])
-                        else:
-                            print('unhandled error:', error)
-
-                else:
-                    csv_data[name].append(row[j])
+    def load_csv_data(self):
+        n_id = node_id(self)
+        options = self.csv_options()
+
+        if n_id in self.csv_data:
+            if self.data_signatures.get(n_id) == (self.source_signature(), options):
+                return
+            del self.csv_data[n_id]
+
+        if self.stream_file:
+            signature, csv_data = read_csv_file(bpy.path.abspath(self.file), options, default_cache_dir())
+        else:
+            signature, csv_data = read_csv_string(bpy.data.texts[self.text].as_string(), options)
 
         if csv_data:
-            if not csv_data[list(csv_data.keys())[0]]:
+            if not len(csv_data[list(csv_data.keys())[0]]):
                 return
 
             self.current_text = self.text
             self.csv_data[n_id] = csv_data
+            self.data_signatures[n_id] = (signature, options)
 
 
     #
@@ -428,7 +445,11 @@ class SvTextInNodeMK2(bpy.types.Node, SverchCustomTreeNode, CommonTextMixinIO):
         if n_id in self.list_data:
             del self.list_data[n_id]
 
-        f = bpy.data.texts[self.text].as_string()
+        if self.stream_file:
+            with open(bpy.path.abspath(self.file)) as source:
+                f = source.read()
+        else:
+            f = bpy.data.texts[self.text].as_string()
 
         try:
             data = ast.literal_eval(f)
@@ -513,13 +534,20 @@ class SvTextInNodeMK2(bpy.types.Node, SverchCustomTreeNode, CommonTextMixinIO):
     def load_json_data(self):
         json_data = {}
         n_id = node_id(self)
+        signature = self.source_signature()
         # reset data
         if n_id in self.json_data:
+            if self.data_signatures.get(n_id) == (signature, None):
+                return
             del self.json_data[n_id]
 
-        f = io.StringIO(bpy.data.texts[self.text].as_string())
         try:
-            json_data = json.load(f)
+            if self.stream_file:
+                with open(bpy.path.abspath(self.file)) as f:
+                    json_data = json.load(f)
+            else:
+                f = io.StringIO(bpy.data.texts[self.text].as_string())
+                json_data = json.load(f)
         except:
             print("Failed to load JSON data")
 
@@ -530,6 +558,7 @@ class SvTextInNodeMK2(bpy.types.Node, SverchCustomTreeNode, CommonTextMixinIO):
 
         self.current_text = self.text
         self.json_data[n_id] = json_data
+        self.data_signatures[n_id] = (signature, None)
 
     def update_json(self):
         n_id = node_id(self)
@@ -551,6 +580,8 @@ class SvTextInNodeMK2(bpy.types.Node, SverchCustomTreeNode, CommonTextMixinIO):
         for item in json_data:
             if item in self.outputs and self.outputs[item].is_linked:
                 out = json_data[item][1]
+                if self.output_numpy and json_data[item][0] == 'v':
+                    out = [np.array(vertices, dtype=np.float64) for vertices in out]
                 self.outputs[item].sv_set(out)
 
 
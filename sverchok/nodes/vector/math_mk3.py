@@ -92,6 +92,7 @@ class SvVectorMathNodeMK3(bpy.types.Node, SverchCustomTreeNode):
     bl_idname = 'SvVectorMathNodeMK3'
     bl_label = 'Vector Math'
     bl_icon = 'THREE_DOTS'
+    sv_batch_safe = True
     sv_icon = 'SV_VECTOR_MATH'
 
     @throttled
@@ -128,6 +129,10 @@ class SvVectorMathNodeMK3(bpy.types.Node, SverchCustomTreeNode):
         description='Output NumPy arrays',
         default=False, update=updateNode)
 
+    @property
+    def sv_array_aware(self):
+        return self.implementation == "NumPy"
+
     def draw_label(self):
         text = self.current_op
         if text in {'SCALAR', '1/SCALAR'}:
@@ -201,7 +206,9 @@ class SvVectorMathNodeMK3(bpy.types.Node, SverchCustomTreeNode):
             recurse_func = self.implementation_func_dict[self.implementation][2]
 
         if self.implementation == 'NumPy':
-            params.append(self.output_numpy)
+            # arrays of objects in, arrays out; they are converted for nodes which need lists
+            arrays_in = level == 2 and any(isinstance(data[0], np.ndarray) for data in params[:num_inputs] if data)
+            params.append(self.output_numpy or arrays_in)
         result = recurse_func(*params)
         outputs[0].sv_set(result)
 
@@ -21,7 +21,7 @@ from bpy.props import FloatProperty, BoolProperty, StringProperty, EnumProperty
 from sverchok.node_tree import SverchCustomTreeNode
 from sverchok.data_structure import updateNode, fullList, fullList_deep_copy, numpy_match_long_repeat
 from sverchok.utils.sv_itertools import sv_zip_longest
-from numpy import array
+from numpy import array, ndarray
 
 class SvVectorFromCursor(bpy.types.Operator):
     "Vector from 3D Cursor"
@@ -65,6 +65,8 @@ class GenVectorsNode(bpy.types.Node, SverchCustomTreeNode):
     bl_idname = 'GenVectorsNode'
     bl_label = 'Vector in'
     sv_icon = 'SV_VECTOR_IN'
+    sv_batch_safe = True
+    sv_array_aware = True
 
     x_: FloatProperty(name='X', description='X', default=0.0, precision=3, update=updateNode)
     y_: FloatProperty(name='Y', description='Y', default=0.0, precision=3, update=updateNode)
@@ -128,12 +130,16 @@ class GenVectorsNode(bpy.types.Node, SverchCustomTreeNode):
         Z_ = inputs['Z'].sv_get()
         series_vec = []
         max_obj = max(map(len, (X_, Y_, Z_)))
-        pack_func = numpy_pack_vecs if self.implementation == 'NumPy' else python_pack_vecs
+        arrays_in = any(isinstance(data[0], ndarray) for data in (X_, Y_, Z_) if data)
         fullList_main = fullList_deep_copy if self.advanced_mode else fullList
         fullList_main(X_, max_obj)
         fullList_main(Y_, max_obj)
         fullList_main(Z_, max_obj)
-        series_vec = pack_func(X_, Y_, Z_, self.output_numpy)
+        if self.implementation == 'NumPy' or arrays_in:
+            # (N, 3) arrays out, nodes which are not array aware get them as lists
+            series_vec = numpy_pack_vecs(X_, Y_, Z_, True)
+        else:
+            series_vec = python_pack_vecs(X_, Y_, Z_, self.output_numpy)
 
 
         self.outputs['Vectors'].sv_set(series_vec)
@@ -36,6 +36,8 @@ class VectorsOutNode(bpy.types.Node, SverchCustomTreeNode):
     bl_idname = 'VectorsOutNode'
     bl_label = 'Vector out'
     sv_icon = 'SV_VECTOR_OUT'
+    sv_batch_safe = True
+    sv_array_aware = True
     output_numpy: BoolProperty(
         name='Output NumPy',
         description='Output NumPy arrays',
@@ -58,12 +60,10 @@ class VectorsOutNode(bpy.types.Node, SverchCustomTreeNode):
 
             data = dataCorrect_np(xyz)
             X, Y, Z = [], [], []
-            if self.output_numpy:
-                unpack_func = unpack_np if isinstance(data[0], ndarray) else unpack_list_to_np
-            else:
-                unpack_func = unpack_list
+            list_func = unpack_list_to_np if self.output_numpy else unpack_list
             for obj in data:
-                x_, y_, z_ = unpack_func(obj)
+                # arrays stay arrays, they are converted for nodes which need lists
+                x_, y_, z_ = unpack_np(obj) if isinstance(obj, ndarray) else list_func(obj)
                 X.append(x_)
                 Y.append(y_)
                 Z.append(z_)
@@ -18,8 +18,6 @@
 
 # MK2
 import numpy as np
-import itertools
-import collections
 import random
 from random import random as rnd_float
 
@@ -29,10 +27,9 @@ from mathutils import Matrix, Vector
 
 from sverchok.node_tree import SverchCustomTreeNode
 from sverchok.data_structure import dataCorrect, fullList, updateNode
-from sverchok.utils.sv_bmesh_utils import bmesh_from_pydata
+from sverchok.utils.sv_mesh_utils import write_mesh, mesh_islands, mesh_join_np
 from sverchok.utils.sv_viewer_utils import natural_plus_one, greek_alphabet
 from sverchok.utils.sv_obj_helper import SvObjHelper, CALLBACK_OP, get_random_init_v2
-from sverchok.utils.modules.sv_bmesh_ops import find_islands_treemap
 
 # this implements a customized version of this import
 # from sverchok.nodes.object_nodes.vertex_colors_mk3 import set_vertices
@@ -48,43 +45,27 @@ def get_random_colors(n):
     return [[rnd_float(),]*3 + [1.0] for i in range(n)]
 
 def set_vertices(obj, islands):
-
-    vcols = obj.data.vertex_colors
+    """
+    Colour vertices of obj randomly per island;
+    islands is an array of island index per vertex.
+    """
     loops = obj.data.loops
     loop_count = len(loops)
 
     # [x] generate random colors set for each island
-    num_colors = len(islands)
+    num_colors = int(islands.max()) + 1 if len(islands) else 0
 
     # [ ] set seed here
-    random_colors = get_random_colors(num_colors)
+    random_colors = np.array(get_random_colors(num_colors), dtype=np.float32).reshape((-1, 4))
 
     # [x] acquire vertex color layer from object
     vertex_color = get_vertex_color_layer(obj)
 
-    # [x] generate mapping from index to island color
-    # this is the slower part
-    islands_lookup = {}
-    for isle_num, isle_set in islands.items():
-        for vert_idx in isle_set:
-            islands_lookup[vert_idx] = isle_num
-
-    vertex_index = np.zeros(loop_count, dtype=int)
+    vertex_index = np.zeros(loop_count, dtype=np.int32)
     loops.foreach_get("vertex_index", vertex_index)
 
-    num_components = 4  # ( r g b , not a )
-    colors = np.empty(loop_count * num_components, dtype=np.float32)
-    colors.shape = (loop_count, num_components)
-
-    idx_lookup = collections.defaultdict(list)
-    for idx, v_idx in enumerate(vertex_index):
-        idx_lookup[v_idx].append(idx)
-
-    for idx, island in islands_lookup.items():
-        colors[idx_lookup[idx]] = random_colors[island]
-
-    colors.shape = (loop_count * num_components,)
-    vertex_color.data.foreach_set("color", colors)
+    colors = random_colors[islands[vertex_index]]
+    vertex_color.data.foreach_set("color", colors.ravel())
     obj.data.update()
 
 
@@ -127,21 +108,20 @@ def make_bmesh_geometry(node, obj_index, context, verts, *topology):
         vertices, this mode can be switched to to increase efficiency
     '''
     if node.fixed_verts and difference == 0:
-        f_v = list(itertools.chain.from_iterable(verts))
+        f_v = np.asarray(verts, dtype=np.float32).ravel()
         mesh.vertices.foreach_set('co', f_v)
         mesh.update()
     else:
 
-        ''' get bmesh, write bmesh to obj, free bmesh'''
-        bm = bmesh_from_pydata(verts, edges, faces, normal_update=node.calc_normals)
-        bm.to_mesh(sv_object.data)
-        if node.randomize_vcol_islands:
-            islands = find_islands_treemap(bm)
-        bm.free()
-
+        ''' write arrays to mesh, keeping topology if it did not change '''
+        write_mesh(mesh, verts, edges, faces)
         sv_object.hide_select = False
 
+    if node.calc_normals:
+        mesh.calc_normals()
+
     if node.randomize_vcol_islands:
+        islands = mesh_islands(len(mesh.vertices), edges, faces)
         set_vertices(sv_object, islands)
 
     if matrix:
@@ -174,38 +154,34 @@ def make_bmesh_geometry_merged(node, obj_index, context, yielder_object):
     sv_object['madeby'] = node.name
     sv_object['basedata_name'] = node.basedata_name
 
-    vert_count = 0
-    big_verts = []
-    big_edges = []
-    big_faces = []
-
+    verts_s, edges_s, faces_s = [], [], []
     for result in yielder_object:
 
         verts, topology = result
         edges, faces, matrix = topology
 
+        verts = np.asarray(verts, dtype=np.float64).reshape((-1, 3))
         if matrix:
             # matrix = matrix_sanitizer(matrix)
-            verts = [matrix @ Vector(v) for v in verts]
-
-        big_verts.extend(verts)
-        big_edges.extend([[a + vert_count, b + vert_count] for a, b in edges])
-        big_faces.extend([[j + vert_count for j in f] for f in faces])
+            matrix = np.array(matrix)
+            verts = verts @ matrix[:3, :3].T + matrix[:3, 3]
 
-        vert_count += len(verts)
+        verts_s.append(verts)
+        edges_s.append(edges)
+        faces_s.append(faces)
 
+    big_verts, big_edges, big_faces = mesh_join_np(verts_s, edges_s, faces_s)
 
     if node.fixed_verts and len(sv_object.data.vertices) == len(big_verts):
         mesh = sv_object.data
-        f_v = list(itertools.chain.from_iterable(big_verts))
+        f_v = big_verts.astype(np.float32).ravel()
         mesh.vertices.foreach_set('co', f_v)
         mesh.update()
     else:
-        ''' get bmesh, write bmesh to obj, free bmesh'''
-        bm = bmesh_from_pydata(big_verts, big_edges, big_faces, normal_update=node.calc_normals)
-        bm.to_mesh(sv_object.data)
-        bm.free()
+        write_mesh(sv_object.data, big_verts, big_edges, big_faces)
 
+    if node.calc_normals:
+        sv_object.data.calc_normals()
     sv_object.hide_select = False
     sv_object.matrix_local = Matrix.Identity(4)
 
@@ -217,6 +193,7 @@ class SvBmeshViewerNodeV28(bpy.types.Node, SverchCustomTreeNode, SvObjHelper):
     bl_label = 'Viewer BMesh'
     bl_icon = 'OUTLINER_OB_MESH'
     sv_icon = 'SV_BMESH_VIEWER'
+    sv_array_aware = True
 
     grouping: BoolProperty(default=False)
     merge: BoolProperty(default=False, update=updateNode)
@@ -326,7 +303,7 @@ class SvBmeshViewerNodeV28(bpy.types.Node, SverchCustomTreeNode, SvObjHelper):
                 def keep_yielding():
                     # this will yield all in one go.
                     for idx, Verts in enumerate(mverts):
-                        if not Verts:
+                        if not len(Verts):
                             continue
 
                         data = get_edges_faces_matrices(idx)
@@ -337,7 +314,7 @@ class SvBmeshViewerNodeV28(bpy.types.Node, SverchCustomTreeNode, SvObjHelper):
 
             else:
                 for obj_index, Verts in enumerate(mverts):
-                    if not Verts:
+                    if not len(Verts):
                         continue
 
                     data = get_edges_faces_matrices(obj_index)
@@ -0,0 +1,16 @@
+#!/bin/bash
+
+# Run node tree benchmarks from benchmarks/benchmarks.json.
+# Arguments are passed to the runner, e.g.
+#
+# $ BLENDER=~/soft/blender-2.81/blender ./run_benchmarks.sh --save results.json --baseline benchmarks/baseline.json
+#
+# Baseline timings are machine specific and not committed: when the baseline
+# file does not exist it is created from this run, --update-baseline rewrites it.
+#
+
+set -e
+
+BLENDER=${BLENDER:-blender}
+
+$BLENDER -b --addons sverchok --python utils/benchmark.py --python-exit-code 1 -- "$@"
@@ -0,0 +1,13 @@
+#!/bin/bash
+
+# Evaluate a node tree over a grid of node properties in background Blender instances.
+# Arguments are passed to the driver, e.g.
+#
+# $ BLENDER=~/soft/blender-2.81/blender ./run_sweep.sh sweep.json --workers 8 --out results/
+#
+
+set -e
+
+BLENDER=${BLENDER:-blender}
+
+python3 utils/parameter_sweep.py --blender "$BLENDER" "$@"
@@ -7,7 +7,7 @@ from bpy.props import BoolProperty, FloatVectorProperty, EnumProperty, IntProper
 from sverchok import data_structure
 from sverchok.core import handlers
 from sverchok.core import update_system
-from sverchok.utils import sv_panels_tools, logging
+from sverchok.utils import sv_panels_tools, logging, disk_cache
 from sverchok.utils.sv_gist_tools import TOKEN_HELP_URL
 from sverchok.ui import color_def
 
@@ -113,7 +113,8 @@ class SverchokPreferences(AddonPreferences):
     profiling_sections = [
         ("NONE", "Disable", "Disable profiling", 0),
         ("MANUAL", "Marked methods only", "Profile only methods that are marked with @profile decorator", 1),
-        ("UPDATE", "Node tree update", "Profile whole node tree update process", 2)
+        ("UPDATE", "Node tree update", "Profile whole node tree update process", 2),
+        ("NODES", "Per node statistics", "Gather time, data size and memory statistics of each node", 3)
     ]
 
     profile_mode: EnumProperty(name = "Profiling mode",
@@ -121,6 +122,10 @@ class SverchokPreferences(AddonPreferences):
             default = "NONE",
             description = "Performance profiling mode")
 
+    profile_memory: BoolProperty(name = "Profile memory",
+            description = "Trace memory allocated by each node in per node profiling mode (slow)",
+            default = False)
+
     developer_mode: BoolProperty(name = "Developer mode",
             description = "Show some additional panels or features useful for Sverchok developers only",
             default = False)
@@ -293,6 +298,22 @@ class SverchokPreferences(AddonPreferences):
     log_file_name: StringProperty(name = "File path", default = os.path.join(datafiles, "sverchok.log"))
 
 
+    # disk cache of node outputs
+    disk_cache_enabled: BoolProperty(name = "Disk cache",
+            description = "Store outputs of heavy nodes on disk and reuse them between sessions",
+            default = False,
+            update = disk_cache.reset_disk_cache)
+
+    disk_cache_path: StringProperty(name = "Cache directory",
+            default = os.path.join(datafiles, "cache"),
+            subtype = 'DIR_PATH',
+            update = disk_cache.reset_disk_cache)
+
+    disk_cache_size: IntProperty(name = "Cache size (MB)",
+            description = "Least recently used entries are removed when the cache gets bigger",
+            default = 2048, min = 1,
+            update = disk_cache.reset_disk_cache)
+
     # updating sverchok
     dload_archive_name: StringProperty(name="archive name", default="b28_prelease_master") # default = "master"
     dload_archive_path: StringProperty(name="archive path", default="https://github.com/nortikin/sverchok/archive/")
@@ -339,6 +360,8 @@ class SverchokPreferences(AddonPreferences):
             col2box = col2.box()
             col2box.label(text="Debug:")
             col2box.prop(self, "profile_mode")
+            if self.profile_mode == "NODES":
+                col2box.prop(self, "profile_memory")
             col2box.prop(self, "show_debug")
             col2box.prop(self, "heat_map")
             col2box.prop(self, "developer_mode")
@@ -360,6 +383,13 @@ class SverchokPreferences(AddonPreferences):
 
             log_box.prop(self, "log_to_console")
 
+            cache_box = col2.box()
+            cache_box.label(text="Disk cache:")
+            cache_box.prop(self, "disk_cache_enabled")
+            if self.disk_cache_enabled:
+                cache_box.prop(self, "disk_cache_path")
+                cache_box.prop(self, "disk_cache_size")
+
         if self.selected_tab == "Node Defaults":
 
             row = layout.row()
@@ -0,0 +1,59 @@
+import unittest
+
+import numpy as np
+
+from sverchok.utils.testing import SverchokTestCase
+from sverchok.utils.sv_bvh_utils import (
+        ray_crossings, points_inside_mesh, triangulate, rotation_to_z, object_queries)
+
+cube_verts = [(x, y, z) for x in (0, 1) for y in (0, 1) for z in (0, 1)]
+cube_faces = [[0, 1, 3, 2], [4, 6, 7, 5], [0, 4, 5, 1], [2, 3, 7, 6], [0, 2, 6, 4], [1, 5, 7, 3]]
+
+# 20 x 20 x 20 points around the cube, none of them on its faces
+grid_coords = np.linspace(-0.45, 1.45, 20)
+grid_points = np.array([(x, y, z) for x in grid_coords for y in grid_coords for z in grid_coords])
+grid_inside = ((grid_points > 0) & (grid_points < 1)).all(axis=1)
+
+
+class PointsInsideTests(SverchokTestCase):
+    def test_triangulate(self):
+        triangles = triangulate(cube_verts, cube_faces)
+        self.assertEqual(triangles.shape, (12, 3, 3))
+
+    def test_crossings(self):
+        crossings = ray_crossings(grid_points, triangulate(cube_verts, cube_faces))
+        self.assertTrue(((crossings % 2 == 1) == grid_inside).all())
+
+    def test_shared_edges(self):
+        # rays going exactly through diagonals of the quads and through edges of the cube
+        points = np.array([[0.5, 0.5, -1.0], [0.25, 0.25, 0.5], [0.0, 0.5, 0.5], [1.0, 1.0, 0.5]])
+        crossings = ray_crossings(points, triangulate(cube_verts, cube_faces))
+        self.assertEqual(crossings[:2].tolist(), [2, 1])
+        self.assertEqual(crossings[2] % 2, crossings[3] % 2)
+
+    def test_rotation(self):
+        direction = np.array([0.3, -0.4, 0.8])
+        rotation = rotation_to_z(direction)
+        self.assertTrue(np.allclose(rotation @ rotation.T, np.eye(3)))
+        self.assertTrue(np.allclose(rotation @ (direction / np.linalg.norm(direction)), [0, 0, 1]))
+
+    def test_voted(self):
+        directions = [(0.3, -0.4, 0.8), (-0.6, 0.2, 0.5), (0.1, 0.7, -0.6)]
+        mask = points_inside_mesh(grid_points, cube_verts, cube_faces, directions, threads=1)
+        self.assertTrue((mask == grid_inside).all())
+        mask = points_inside_mesh(grid_points, cube_verts, cube_faces, directions, threads=4)
+        self.assertTrue((mask == grid_inside).all())
+
+    def test_object_queries(self):
+        def ray_cast(origin, direction):
+            # plane z = 0 facing up
+            if direction[2] >= 0 or origin[2] <= 0:
+                return False, (0, 0, 0), (0, 0, 0), -1
+            t = -origin[2] / direction[2]
+            return True, (origin[0] + t * direction[0], origin[1] + t * direction[1], 0.0), (0, 0, 1), 0
+
+        hits, rest = object_queries(ray_cast, [(0, 0, 1), (0, 0, -1)], [(0, 0, -1)])
+        self.assertEqual(hits.hit.tolist(), [True, False])
+        self.assertEqual(hits.distance[0], 1.0)
+        self.assertEqual(hits.index.tolist(), [0, -1])
+        self.assertEqual(rest, [[], []])
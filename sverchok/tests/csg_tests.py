@@ -0,0 +1,60 @@
+import numpy as np
+
+from sverchok.utils.testing import SverchokTestCase
+from sverchok.utils.csg_core import CSG, CSGMesh
+
+
+def cube(center, size=1.0):
+    h = size / 2.0
+    x, y, z = center
+    verts = [(x + dx * h, y + dy * h, z + dz * h) for dx in (-1, 1) for dy in (-1, 1) for dz in (-1, 1)]
+    faces = [[0, 1, 3, 2], [4, 6, 7, 5], [0, 4, 5, 1], [2, 3, 7, 6], [0, 2, 6, 4], [1, 5, 7, 3]]
+    return verts, faces
+
+
+def volume(verts, faces):
+    verts = np.array(verts)
+    result = 0.0
+    for face in faces:
+        for i in range(1, len(face) - 1):
+            a, b, c = verts[face[0]], verts[face[i]], verts[face[i + 1]]
+            result += np.dot(a, np.cross(b, c)) / 6.0
+    return result
+
+
+def legacy_volume(csg):
+    result = 0.0
+    for polygon in csg.toPolygons():
+        points = [np.array(list(v.pos)) for v in polygon.vertices]
+        for i in range(1, len(points) - 1):
+            result += np.dot(points[0], np.cross(points[i], points[i + 1])) / 6.0
+    return result
+
+
+cube_a = cube((0, 0, 0))
+cube_b = cube((0.5, 0.5, 0.5))
+
+
+class CSGMeshTests(SverchokTestCase):
+
+    def test_operations(self):
+        expected = dict(union=1.875, subtract=0.875, intersect=0.125)
+        for operation, value in expected.items():
+            mesh = getattr(CSGMesh.from_pydata(*cube_a), operation)(CSGMesh.from_pydata(*cube_b))
+            self.assertAlmostEqual(volume(*mesh.to_pydata()), value, places=6, msg=operation)
+
+    def test_same_as_legacy(self):
+        for operation in ("union", "subtract", "intersect"):
+            legacy = getattr(CSG.Obj_from_pydata(*cube_a), operation)(CSG.Obj_from_pydata(*cube_b))
+            mesh = getattr(CSGMesh.from_pydata(*cube_a), operation)(CSGMesh.from_pydata(*cube_b))
+            self.assertAlmostEqual(volume(*mesh.to_pydata()), legacy_volume(legacy), places=6, msg=operation)
+
+    def test_welded_vertices(self):
+        verts, faces = CSGMesh.from_pydata(*cube_a).union(CSGMesh.from_pydata(*cube_b)).to_pydata()
+        self.assertEqual(len(verts), len(set(map(tuple, verts))))
+        self.assertEqual(set(i for face in faces for i in face), set(range(len(verts))))
+
+    def test_union_all(self):
+        cubes = [CSGMesh.from_pydata(*cube((x, 0, 0))) for x in (0, 0.5, 1.0, 5.0)]
+        verts, faces = CSGMesh.union_all(cubes).to_pydata()
+        self.assertAlmostEqual(volume(verts, faces), 3.0, places=6)
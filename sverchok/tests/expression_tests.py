@@ -0,0 +1,66 @@
+import unittest
+
+from sverchok.utils.testing import SverchokTestCase
+from sverchok.utils.expression import (
+        SvExpression, compile_expression, forget_expressions, get_variables, safe_eval)
+
+
+xs = [0.5 * i for i in range(1, 50)]
+ys = [float(i % 7) + 1.0 for i in range(1, 50)]
+
+
+def per_element(string, **variables):
+    names = list(variables.keys())
+    return [safe_eval(string, dict(zip(names, values))) for values in zip(*variables.values())]
+
+
+class ExpressionTests(SverchokTestCase):
+
+    def test_variables(self):
+        self.assertEqual(get_variables("x + sin(y) * pi"), {'x', 'y'})
+        self.assertEqual(get_variables("[g*g for g in lst]"), {'lst'})
+        self.assertEqual(get_variables("  "), set())
+
+    def test_vectorizable(self):
+        self.assertTrue(SvExpression("sin(x) * y + x ** 2").vectorizable)
+        self.assertTrue(SvExpression("log(x, 2) - atan2(y, x)").vectorizable)
+        self.assertFalse(SvExpression("Vector((x, y, 0)).length").vectorizable)
+        self.assertFalse(SvExpression("[g*g for g in lst]").vectorizable)
+        self.assertFalse(SvExpression("0 < x < 1").vectorizable)
+
+    def test_same_results(self):
+        for string in ["sin(x) * y + x ** 2", "log(x, 2) - atan2(y, x)", "floor(x) % 3",
+                       "x / y > 1", "sqrt(x*x + y*y)", "pi", "x // y"]:
+            expr = SvExpression(string)
+            expected = per_element(string, x=xs, y=ys)
+            result = expr.eval_all({'x': xs, 'y': ys}, len(xs))
+            self.assertEqual(len(result), len(expected))
+            for value, expected_value in zip(result, expected):
+                self.assertAlmostEqual(value, expected_value, places=9, msg=string)
+                self.assertEqual(type(value), type(expected_value), string)
+
+    def test_fallback(self):
+        # numpy would give inf here; per element evaluation raises as before
+        expr = SvExpression("1 / (x - 1)")
+        self.assertIsNone(expr.eval_arrays({'x': [0.0, 1.0, 2.0]}, 3))
+        with self.assertRaises(ZeroDivisionError):
+            expr.eval_all({'x': [0.0, 1.0, 2.0]}, 3)
+        # integers would overflow in numpy
+        expr = SvExpression("x ** 40")
+        self.assertEqual(expr.eval_all({'x': [3, 5]}, 2), [3 ** 40, 5 ** 40])
+        # not numbers
+        expr = SvExpression("x * 2")
+        self.assertEqual(expr.eval_all({'x': ["a", "b"]}, 2), ["aa", "bb"])
+        # ragged lists can't be converted to an array
+        self.assertEqual(expr.eval_all({'x': [[1, 2], [3]]}, 2), [[1, 2, 1, 2], [3, 3]])
+
+    def test_cache(self):
+        first = compile_expression("x + 1", owner="test")
+        self.assertIs(compile_expression("x + 1", owner="test"), first)
+        forget_expressions("test")
+        self.assertIsNot(compile_expression("x + 1", owner="test"), first)
+        forget_expressions("test")
+
+    def test_syntax_error(self):
+        with self.assertRaises(Exception):
+            compile_expression("x +")
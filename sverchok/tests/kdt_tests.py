@@ -0,0 +1,123 @@
+import unittest
+
+import numpy as np
+from mathutils import kdtree
+
+from sverchok.utils.testing import SverchokTestCase
+from sverchok.utils.sv_KDT_utils import (
+        BACKEND_SCIPY, BACKEND_MATHUTILS, get_kdtree, clear_kdtree_cache,
+        closest_edges, kdt_find_n, kdt_find_range, cKDTree)
+
+
+def reference_edges(verts, mindist, maxdist, max_num, skip):
+    """kdt_closest_edges as it was, one find_range per vertex"""
+    kd = kdtree.KDTree(len(verts))
+    for i, xyz in enumerate(verts):
+        kd.insert(xyz, i)
+    kd.balance()
+    e = set()
+    for i, vtx in enumerate(verts):
+        num_edges = 0
+        for edge_idx, (_, index, dist) in enumerate(kd.find_range(vtx, maxdist)):
+            if edge_idx < skip or dist <= mindist or i == index:
+                continue
+            edge = tuple(sorted([i, index]))
+            if edge not in e:
+                e.add(edge)
+                num_edges += 1
+            if num_edges == max_num:
+                break
+    return e
+
+
+verts = np.array([
+    (0.129, 0.499, 0.601), (0.029, 0.148, 0.928), (0.07, 0.13, 0.948), (0.622, 0.369, 0.511),
+    (0.663, 0.275, 0.138), (0.788, 0.67, 0.512), (0.817, 0.549, 0.981), (0.205, 0.554, 0.484),
+    (0.353, 0.592, 0.235), (0.802, 0.867, 0.129), (0.467, 0.277, 0.083), (0.896, 0.43, 0.148),
+    (0.673, 0.202, 0.901), (0.217, 0.033, 0.201), (0.346, 0.469, 0.906), (0.697, 0.339, 0.017),
+    (0.16, 0.996, 0.46), (0.691, 0.055, 0.034), (0.846, 0.588, 0.309), (0.317, 0.089, 0.173),
+    (0.025, 0.839, 0.466), (0.127, 0.739, 0.196), (0.062, 0.598, 0.896), (0.027, 0.805, 0.19),
+    (0.093, 0.018, 0.293), (0.727, 0.493, 0.853), (0.217, 0.315, 0.258), (0.978, 0.941, 0.341),
+    (0.436, 0.314, 0.747), (0.04, 0.067, 0.404), (0.245, 0.845, 0.742), (0.546, 0.661, 0.692),
+    (0.781, 0.928, 0.15), (0.626, 0.144, 0.443), (0.786, 0.895, 0.759), (0.035, 0.359, 0.163),
+    (0.999, 0.144, 0.244), (0.357, 0.061, 0.87), (0.636, 0.16, 0.498), (0.079, 0.611, 0.232),
+    (0.039, 0.115, 0.555), (0.637, 0.325, 0.643), (0.352, 0.131, 0.315), (0.395, 0.913, 0.116),
+    (0.086, 0.562, 0.963), (0.907, 0.7, 0.067), (0.806, 0.683, 0.144), (0.465, 0.049, 0.802),
+    (0.719, 0.805, 0.76), (0.267, 0.79, 0.249), (0.138, 0.39, 0.498), (0.286, 0.606, 0.603),
+    (0.24, 0.623, 0.357), (0.735, 0.29, 0.799), (0.415, 0.553, 0.673), (0.518, 0.258, 0.979),
+    (0.096, 0.325, 0.549), (0.029, 0.155, 0.799), (0.784, 0.637, 0.902), (0.756, 0.299, 0.645)])
+
+points = np.array([
+    (0.34, 0.75, 0.385), (0.153, 0.876, 0.69), (0.745, 0.56, 0.783), (0.448, 0.566, 0.063),
+    (0.555, 0.815, 0.706), (0.803, 0.496, 0.881), (0.108, 0.876, 0.371), (0.091, 0.619, 0.455)])
+
+# 6 clusters of 5 vertices each, clusters are far from each other
+cluster_centers = np.array([
+    (4.28, 8.52, 1.38), (6.17, 4.14, 5.28), (4.99, 1.34, 5.12),
+    (8.62, 1.71, 0.11), (0.68, 4.6, 9.74), (0.44, 9.91, 5.36)])
+cluster_offsets = np.array([
+    (0.0012, 0.00419, 0.00207), (0.00714, 0.00542, 0.00288), (0.00255, 0.00867, 0.00766),
+    (0.00436, 0.00406, 0.00737), (0.00971, 0.0008, 0.00159)])
+
+backends = [BACKEND_MATHUTILS] if cKDTree is None else [BACKEND_MATHUTILS, BACKEND_SCIPY]
+
+
+def brute_force(point):
+    distances = np.linalg.norm(verts - point, axis=1)
+    order = np.argsort(distances)
+    return order, distances[order]
+
+
+class KDTreeTests(SverchokTestCase):
+    def tearDown(self):
+        clear_kdtree_cache()
+        super().tearDown()
+
+    def test_cache(self):
+        tree = get_kdtree(verts)
+        self.assertIs(get_kdtree(verts.tolist()), tree)
+        self.assertIsNot(get_kdtree(verts + 1), tree)
+
+    def test_query(self):
+        for backend in backends:
+            tree = get_kdtree(verts, backend)
+            indices, distances = tree.query(points, 5, max_distance=0.3)
+            for point, idx, dist in zip(points, indices, distances):
+                order, expected = brute_force(point)
+                count = (expected[:5] <= 0.3).sum()
+                self.assertEqual(idx[:count].tolist(), order[:count].tolist())
+                self.assertTrue(np.allclose(dist[:count], expected[:count]))
+                self.assertTrue((idx[count:] == -1).all())
+
+    def test_query_range(self):
+        for backend in backends:
+            tree = get_kdtree(verts, backend)
+            radius = np.linspace(0.1, 0.4, len(points))
+            indices, distances, offsets = tree.query_range(points, radius)
+            for i, (point, r) in enumerate(zip(points, radius)):
+                order, expected = brute_force(point)
+                count = (expected <= r).sum()
+                self.assertEqual(indices[offsets[i]:offsets[i+1]].tolist(), order[:count].tolist())
+
+    def test_find(self):
+        coordinates, indices, distances = kdt_find_n(verts, points[:3].tolist(), [1, 2, 3])
+        self.assertEqual([len(item) for item in indices], [1, 2, 3])
+        self.assertEqual(coordinates[2][0], verts[indices[2][0]].tolist())
+        _, indices, distances = kdt_find_range(verts, points.tolist(), [0.0])
+        self.assertTrue(all(len(item) == 0 for item in indices))
+
+    def test_edges(self):
+        cases = [(0.0, 0.3, 4, 0), (0.15, 0.35, 3, 1), (0.0, 0.4, 1, 2)]
+        for backend in backends:
+            for mindist, maxdist, max_num, skip in cases:
+                edges = closest_edges(verts, mindist, maxdist, max_num, skip, backend)
+                expected = reference_edges(verts.tolist(), mindist, maxdist, max_num, skip)
+                self.assertEqual(set(map(tuple, edges.tolist())), expected)
+
+    def test_edges_many_near(self):
+        # most neighbors are in mindist, so that first k found are not enough
+        near_verts = (cluster_centers[:, None, :] + cluster_offsets).reshape(-1, 3)
+        for backend in backends:
+            edges = closest_edges(near_verts, 0.02, 5.0, 2, 0, backend)
+            expected = reference_edges(near_verts.tolist(), 0.02, 5.0, 2, 0)
+            self.assertEqual(set(map(tuple, edges.tolist())), expected)
@@ -0,0 +1,47 @@
+import unittest
+
+from sverchok.utils.testing import SverchokTestCase
+from sverchok.data_structure import match_long_repeat, match_long_cycle, match_short
+from sverchok.utils.lazy_lists import (
+        SvLazyList, REPEAT, CYCLE, lazy_match_long_repeat, lazy_match_long_cycle, lazy_match_short,
+        rotate_view, lazy_levels, lazy_to_lists)
+
+
+class LazyListTests(SverchokTestCase):
+    def test_views(self):
+        self.assertEqual(list(SvLazyList([1, 2, 3], 5, REPEAT)), [1, 2, 3, 3, 3])
+        self.assertEqual(list(SvLazyList([1, 2, 3], 5, CYCLE)), [1, 2, 3, 1, 2])
+        self.assertEqual(list(SvLazyList([1, 2, 3], 2, REPEAT)), [1, 2])
+        view = SvLazyList([1, 2, 3], 7, CYCLE, 2)
+        self.assertEqual([view[i] for i in range(len(view))], list(view))
+        self.assertEqual(view[-1], list(view)[-1])
+        self.assertEqual(view[1:4], list(view)[1:4])
+        with self.assertRaises(IndexError):
+            view[7]
+
+    def test_match(self):
+        cases = [[[1, 2, 3, 4, 5], [10, 11]], [[1], [10, 11, 12]], [[1, 2], []], [(1, 2), [3]]]
+        for lazy, plain in [(lazy_match_long_repeat, match_long_repeat),
+                            (lazy_match_long_cycle, match_long_cycle),
+                            (lazy_match_short, match_short)]:
+            for lsts in cases:
+                self.assertEqual(lazy_to_lists(lazy_levels(lazy(lsts), 0)), plain(lsts), plain.__name__)
+
+    def test_rotate(self):
+        self.assertEqual(list(rotate_view([1, 2, 3, 4], 1)), [4, 1, 2, 3])
+        self.assertEqual(list(rotate_view([1, 2, 3, 4], -5)), [2, 3, 4, 1])
+        self.assertEqual(rotate_view((1, 2), 2), [1, 2])
+
+    def test_materialize(self):
+        matrix = [[1, 0], [0, 1]]
+        verts = [(0, 0, 0)] * 4
+        matched = lazy_match_long_repeat([[matrix], verts])
+        data = lazy_levels([matched[0], [matched[1]]], 1)
+        plain = lazy_to_lists(data)
+        self.assertIs(type(plain), list)
+        self.assertIs(type(plain[0]), list)
+        self.assertEqual(plain, [[matrix] * 4, [verts]])
+        # materialized once
+        self.assertIs(lazy_to_lists(data), plain)
+        # other data is not touched
+        self.assertIs(lazy_to_lists(verts), verts)
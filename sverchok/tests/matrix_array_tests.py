@@ -0,0 +1,100 @@
+import unittest
+
+import numpy as np
+
+from sverchok.utils.testing import SverchokTestCase
+from sverchok.utils.array_data import SvRaggedArray, tile_ragged
+from sverchok.utils.matrix_array import (
+        SvMatrixArray, axis_angle_matrices, rotation_difference_matrices, translation_matrices,
+        scale_matrices, compose, invert, interpolate, decompose, apply_to_vertices, matrix_def_array)
+
+
+def rotation_z(angle):
+    c, s = np.cos(angle), np.sin(angle)
+    return np.array([[c, -s, 0, 0], [s, c, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]])
+
+
+locations = np.array([[0, 0, 0], [1, 2, 3], [-4.5, 0.5, 2], [3, -1, -2.5], [0.2, 4, -0.7], [-2, -3, 1]])
+axes = np.array([[0, 0, 1], [1, 0, 0], [1, 1, 0], [-0.3, 0.8, 0.5], [0.6, -0.2, -0.9], [1, 1, 1]])
+angles = np.array([0.5, -1.2, 3.0, 0.1, -2.5, 1.7])
+scales = np.array([[1, 1, 1], [2, 2, 2], [0.5, 1, 1.5], [1.2, 0.7, 1.9], [0.6, 0.6, 2], [1.5, 1.1, 0.8]])
+trs = translation_matrices(locations) @ axis_angle_matrices(axes, angles) @ scale_matrices(scales)
+
+
+class MatrixArrayTests(SverchokTestCase):
+
+    def test_rotation(self):
+        matrices = axis_angle_matrices([[0, 0, 2]], [np.pi / 2])
+        self.assertTrue(np.allclose(matrices[0], rotation_z(np.pi / 2)))
+        # zero axis gives identity, as Matrix.Rotation does
+        self.assertTrue(np.allclose(axis_angle_matrices([[0, 0, 0]], [1.0])[0], np.eye(4)))
+
+    def test_rotation_difference(self):
+        vectors_from = np.array([[1, 0, 0], [0, 1, 0], [0, 0, 3], [1, 1, 0]], dtype=float)
+        vectors_to = np.array([[0, 1, 0], [0, 2, 0], [0, 0, -1], [-1, -1, 0]], dtype=float)
+        matrices = rotation_difference_matrices(vectors_from, vectors_to)
+        for matrix, v_from, v_to in zip(matrices, vectors_from, vectors_to):
+            v_from, v_to = v_from / np.linalg.norm(v_from), v_to / np.linalg.norm(v_to)
+            self.assertTrue(np.allclose(matrix[:3, :3] @ v_from, v_to))
+            self.assertTrue(np.allclose(matrix[:3, :3] @ matrix[:3, :3].T, np.eye(3)))
+
+    def test_matrix_def(self):
+        loc = [locations.tolist()]
+        scale = [scales[:3].tolist()]
+        rot = [axes.tolist()]
+        angle = [np.degrees(angles).tolist()]
+        result = matrix_def_array(np.eye(4)[None].repeat(6, axis=0), loc, scale, rot, angle, [[]])
+        # the last scale is repeated
+        expected = trs.copy()
+        expected[3:] = (translation_matrices(locations) @ axis_angle_matrices(axes, angles)
+                        @ scale_matrices(scales[[2]]))[3:]
+        self.assertTrue(np.allclose(result, expected))
+
+    def test_compose_invert(self):
+        product = compose(trs, trs[:1])
+        self.assertTrue(np.allclose(product, trs @ trs[0]))
+        self.assertTrue(np.allclose(compose(trs, invert(trs)), np.eye(4)))
+        self.assertEqual(len(compose(trs, np.empty((0, 4, 4)))), 0)
+
+    def test_decompose(self):
+        translations, rotations, scales = decompose(trs)
+        self.assertTrue(np.allclose(translations, locations))
+        self.assertTrue(np.allclose(scales, scales))
+        self.assertTrue(np.allclose(rotations, axis_angle_matrices(axes, angles)[:, :3, :3]))
+
+    def test_interpolate(self):
+        a = translation_matrices([[0, 0, 0]]) @ scale_matrices([[1, 1, 1]])
+        b = translation_matrices([[2, 4, 6]]) @ rotation_z(np.pi / 2)[None] @ scale_matrices([[3, 3, 3]])
+        self.assertTrue(np.allclose(interpolate(a, b, 0.0), a))
+        self.assertTrue(np.allclose(interpolate(a, b, 1.0), b))
+        half = interpolate(a, b, 0.5)[0]
+        expected = translation_matrices([[1, 2, 3]])[0] @ rotation_z(np.pi / 4) @ scale_matrices([[2, 2, 2]])[0]
+        self.assertTrue(np.allclose(half, expected))
+        self.assertTrue(np.allclose(interpolate(trs, trs, 0.3), trs))
+
+    def test_interpolate_non_uniform_scale(self):
+        # Matrix.lerp decomposes A = U @ P and returns U(t) @ P(t)
+        stretch = scale_matrices([[1, 3, 1]])
+        a = stretch
+        b = rotation_z(np.pi / 2)[None] @ stretch
+        half = interpolate(a, b, 0.5)[0]
+        expected = rotation_z(np.pi / 4) @ stretch[0]
+        self.assertTrue(np.allclose(half, expected))
+
+    def test_apply(self):
+        verts = np.array([[1, 0, 0], [0, 1, 0], [1, 2, 3]], dtype=float)
+        moved = apply_to_vertices(trs, verts)
+        expected = np.array([[(m @ np.append(v, 1))[:3] for v in verts] for m in trs])
+        self.assertTrue(np.allclose(moved, expected))
+
+    def test_socket_data(self):
+        data = SvMatrixArray(trs)
+        self.assertEqual(len(data), 6)
+        self.assertEqual(len(data[2:5]), 3)
+        self.assertIs(data.to_matrices(), data.to_matrices())
+        self.assertEqual(len(list(data)), 6)
+
+    def test_tile_ragged(self):
+        faces = SvRaggedArray.from_lists([[0, 1, 2], [2, 3]])
+        tiled = tile_ragged(faces, 3, 4)
+        self.assertEqual(tiled.to_lists(), [[0, 1, 2], [2, 3], [4, 5, 6], [6, 7], [8, 9, 10], [10, 11]])
@@ -0,0 +1,45 @@
+import unittest
+
+import numpy as np
+
+from sverchok.utils.testing import SverchokTestCase
+from sverchok.utils.array_data import SvRaggedArray
+from sverchok.utils.sv_mesh_utils import (
+        polygons_to_arrays, polygon_loop_pairs, connected_components, mesh_islands,
+        valid_polygons)
+
+
+class MeshIslandsTests(SverchokTestCase):
+    def test_polygon_arrays(self):
+        faces = [[0, 1, 2], [2, 3, 4, 5]]
+        for data in (faces, SvRaggedArray.from_lists(faces)):
+            loops, starts, totals = polygons_to_arrays(data)
+            self.assertEqual(loops.tolist(), [0, 1, 2, 2, 3, 4, 5])
+            self.assertEqual(starts.tolist(), [0, 3])
+            self.assertEqual(totals.tolist(), [3, 4])
+            pairs = polygon_loop_pairs(loops, starts, totals)
+            self.assertEqual(pairs.tolist(), [[0, 1], [1, 2], [2, 0], [2, 3], [3, 4], [4, 5], [5, 2]])
+
+    def test_valid_polygons(self):
+        faces = [[0, 1, 2], [1, 1, 2], [0, 1], [3, 4, 5, 3], [2, 3, 4, 5]]
+        valid = valid_polygons(*polygons_to_arrays(faces))
+        self.assertEqual(valid.tolist(), [True, False, False, False, True])
+
+    def test_connected_components(self):
+        pairs = np.array([[5, 4], [4, 3], [0, 1], [7, 6], [6, 5]])
+        labels = connected_components(9, pairs)
+        self.assertEqual(labels.tolist(), [0, 0, 1, 2, 2, 2, 2, 2, 3])
+
+    def test_long_chain(self):
+        count = 1000
+        # vertices of the chain are shuffled, 379 and 1000 are coprime
+        order = np.arange(count) * 379 % count
+        pairs = np.stack((order[:-1], order[1:]), axis=1)
+        self.assertTrue((connected_components(count, pairs) == 0).all())
+
+    def test_mesh_islands(self):
+        # two triangles sharing a vertex, a separate quad, edge and a lone vertex
+        faces = [[0, 1, 2], [2, 3, 4], [5, 6, 7, 8]]
+        edges = [[9, 10]]
+        islands = mesh_islands(12, edges, faces)
+        self.assertEqual(islands.tolist(), [0, 0, 0, 0, 0, 1, 1, 1, 1, 2, 2, 3])
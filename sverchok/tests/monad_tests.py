@@ -0,0 +1,69 @@
+import json
+
+from sverchok.core.monad import get_monad_update_list
+from sverchok.utils.testing import SverchokTestCase
+from sverchok.utils.sv_IO_panel_tools import import_tree
+
+
+def batch_monad_layout(reference_path, name):
+    """
+    monad_1.json with the monad replaced by Group Inputs -> Scalar Math (x * 2) -> Group Outputs
+    """
+    with open(reference_path) as source:
+        layout = json.load(source)
+    group = layout["groups"].pop("Monad")
+    if isinstance(group, str):
+        group = json.loads(group)
+    cls_name = "SvGroupNode" + name.replace(" ", "")
+
+    inputs_node = group["nodes"]["Group Inputs Exp"]
+    inputs_node["outputs"] = [["x", "SvStringsSocket"]]
+    outputs_node = group["nodes"]["Group Outputs Exp"]
+    outputs_node["inputs"] = [["out", "SvStringsSocket"]]
+    scalar_node = dict(inputs_node, bl_idname="SvScalarMathNodeMK4", params={"current_op": "MUL", "y_": 2.0})
+    del scalar_node["outputs"]
+    group["nodes"] = {"Group Inputs Exp": inputs_node, "Scalar Math": scalar_node, "Group Outputs Exp": outputs_node}
+    group["update_lists"] = [["Group Inputs Exp", 0, "Scalar Math", 0], ["Scalar Math", 0, "Group Outputs Exp", 0]]
+    group["cls_bl_idname"] = cls_name
+    layout["groups"] = {name: group}
+
+    monad_node = layout["nodes"]["Monad"]
+    monad_node["params"]["monad"] = name
+    monad_node["params"]["all_props"] = {"cls_bl_idname": cls_name, "float_props": {}, "int_props": {}, "name": name}
+    monad_node["params"]["cls_dict"] = {"cls_bl_idname": cls_name,
+                                        "input_template": [["x", "SvStringsSocket", {}]],
+                                        "output_template": [["out", "SvStringsSocket"]]}
+    layout["nodes"] = {"Monad": monad_node}
+    layout["update_lists"] = []
+    return layout
+
+
+class MonadUpdateListTest(SverchokTestCase):
+
+    def test_batch(self):
+        layout = batch_monad_layout(self.get_reference_file_path("monad_1.json"), "Batch Monad")
+        with self.temporary_node_tree("ImportedTree") as new_tree:
+            import_tree(new_tree, nodes_json=layout)
+            node = new_tree.nodes["Monad"]
+            ul, batch_safe = get_monad_update_list(node.monad)
+            self.assertTrue(batch_safe)
+
+            data_in = [[[1.0], [2.0, 3.0]]]
+            expected = [[[2.0], [4.0, 6.0]]]
+            self.assertEqual(node.process_elements(ul, data_in), expected)
+            self.assertEqual(node.process_batch(ul, data_in), expected)
+
+    def test_relink(self):
+        layout = batch_monad_layout(self.get_reference_file_path("monad_1.json"), "Relink Monad")
+        with self.temporary_node_tree("ImportedTree") as new_tree:
+            import_tree(new_tree, nodes_json=layout)
+            monad = new_tree.nodes["Monad"].monad
+            ul, _ = get_monad_update_list(monad)
+            self.assertIn("Scalar Math", ul)
+
+            # the same nodes and number of links, but Scalar Math is bypassed
+            nodes = monad.nodes
+            monad.links.remove(nodes["Scalar Math"].outputs[0].links[0])
+            monad.links.new(nodes["Group Inputs Exp"].outputs[0], nodes["Group Outputs Exp"].inputs[0])
+            ul, _ = get_monad_update_list(monad)
+            self.assertNotIn("Scalar Math", ul)
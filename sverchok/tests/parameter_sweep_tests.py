@@ -0,0 +1,42 @@
+import json
+import os
+import tempfile
+import unittest
+
+from sverchok.utils.testing import SverchokTestCase
+from sverchok.utils.parameter_sweep import (
+        expand_grid, format_result, parse_result, load_sweep, summarize, worker_command)
+
+
+class ParameterSweepTests(SverchokTestCase):
+    def test_expand_grid(self):
+        variants = expand_grid({"A": {"x": [1, 2], "y": [0.5]}, "B": {"n": [3, 4, 5]}})
+        self.assertEqual(len(variants), 6)
+        self.assertEqual(variants[0], {"A": {"x": 1, "y": 0.5}, "B": {"n": 3}})
+        self.assertEqual(variants[1], {"A": {"x": 1, "y": 0.5}, "B": {"n": 4}})
+        self.assertEqual(variants[-1], {"A": {"x": 2, "y": 0.5}, "B": {"n": 5}})
+        self.assertEqual(expand_grid({}), [{}])
+
+    def test_result_lines(self):
+        result = {"index": 3, "process_time": 0.25}
+        self.assertEqual(parse_result(format_result(result) + "\n"), result)
+        self.assertIsNone(parse_result("Read prefs: userpref.blend\n"))
+
+    def test_load_sweep(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sweep.json")
+            with open(path, "w") as output:
+                json.dump({"blend": "tower.blend", "grid": {}}, output)
+            spec = load_sweep(path)
+            self.assertEqual(spec["blend"], os.path.join(directory, "tower.blend"))
+            command = worker_command("blender", spec, path, directory)
+            self.assertEqual(command[:3], ["blender", "-b", spec["blend"]])
+            self.assertEqual(command[-3:], ["worker", path, directory])
+
+    def test_summary(self):
+        results = [{"index": 0, "process_time": 1.0, "save_time": 0.5, "worker": 0},
+                   {"index": 1, "error": "worker exited"}]
+        lines = summarize(results, 2.0)
+        self.assertEqual(len(lines), 3)
+        self.assertIn("FAILED", lines[1])
+        self.assertTrue(lines[-1].startswith("1 of 2 variants"))
@@ -0,0 +1,35 @@
+import numpy as np
+
+from sverchok.utils.testing import SverchokTestCase
+from sverchok.utils.pulga_physics_core import cross_indices3, grid_pairs
+
+# 8 x 8 x 8 lattice with step 0.45: with radius 0.5 only the neighbours
+# along the axes touch, that is 3 * 7 * 8 * 8 pairs
+lattice = np.array([(x, y, z) for x in range(8) for y in range(8) for z in range(8)]) * 0.45
+lattice_pairs = 3 * 7 * 8 * 8
+
+
+def pairs_set(pairs):
+    return set(map(tuple, pairs.tolist()))
+
+
+class PulgaBroadPhaseTests(SverchokTestCase):
+    def test_grid_pairs(self):
+        pairs, tested = grid_pairs(lattice, 0.5)
+        self.assertEqual(len(pairs), lattice_pairs)
+        self.assertTrue((pairs[:, 0] < pairs[:, 1]).all())
+        distances = np.linalg.norm(lattice[pairs[:, 0]] - lattice[pairs[:, 1]], axis=1)
+        self.assertTrue(np.allclose(distances, 0.45))
+        self.assertLess(tested, len(lattice) * (len(lattice) - 1) // 2)
+
+    def test_cell_size(self):
+        expected = pairs_set(grid_pairs(lattice, 0.5)[0])
+        self.assertEqual(pairs_set(grid_pairs(lattice, 0.5, 0.2)[0]), expected)
+        self.assertEqual(pairs_set(grid_pairs(lattice, 0.5, 1.0)[0]), expected)
+        # too small cells are enlarged
+        self.assertEqual(pairs_set(grid_pairs(lattice, 0.5, 1e-9)[0]), expected)
+
+    def test_cross_indices(self):
+        pairs = cross_indices3(5)
+        self.assertEqual(len(pairs), 10)
+        self.assertTrue((pairs[:, 0] < pairs[:, 1]).all())
@@ -0,0 +1,98 @@
+
+import numpy as np
+
+from sverchok.utils.testing import *
+from sverchok.core.socket_data import sv_data_hash, sv_deep_copy, get_socket_lists
+from sverchok.utils.array_data import SvRaggedArray, concatenate_ragged, arrays_to_lists, ragged_arange
+
+class SocketDataHashTests(SverchokTestCase):
+    def test_equal_data_same_hash(self):
+        data1 = [[(1.0, 2.0, 3.0), (4.0, 5.0, 6.0)]]
+        data2 = [[(1.0, 2.0, 3.0), (4.0, 5.0, 6.0)]]
+        self.assertEqual(sv_data_hash(data1), sv_data_hash(data2))
+
+    def test_changed_data_new_hash(self):
+        data1 = [[(1.0, 2.0, 3.0), (4.0, 5.0, 6.0)]]
+        data2 = [[(1.0, 2.0, 3.0), (4.0, 5.0, 6.000001)]]
+        self.assertNotEqual(sv_data_hash(data1), sv_data_hash(data2))
+
+    def test_numpy_arrays(self):
+        arr = np.arange(12, dtype=np.float64).reshape((4, 3))
+        self.assertEqual(sv_data_hash([arr]), sv_data_hash([arr.copy()]))
+        self.assertNotEqual(sv_data_hash([arr]), sv_data_hash([arr.astype(np.float32)]))
+
+    def test_arrays_inside_lists(self):
+        # repr() of large arrays is truncated
+        arr = np.zeros(10000)
+        changed = arr.copy()
+        changed[5000] = 1.0
+        self.assertNotEqual(sv_data_hash([1.0, arr, 2.0]), sv_data_hash([1.0, changed, 2.0]))
+
+    def test_unhashable_data(self):
+        self.assertIsNone(sv_data_hash([[object()]]))
+
+class SocketDataCopyTests(SverchokTestCase):
+    def test_deep_copy_lists(self):
+        data = [[[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]]]
+        copied = sv_deep_copy(data)
+        self.assertEqual(copied, data)
+        copied[0][0][0] = 10.0
+        self.assertEqual(data[0][0][0], 1.0)
+
+    def test_deep_copy_shares_tuples(self):
+        data = [[(1.0, 2.0, 3.0), (4.0, 5.0, 6.0)]]
+        copied = sv_deep_copy(data)
+        self.assertEqual(copied, data)
+        self.assertIsNot(copied[0], data[0])
+        self.assertIs(copied[0][0], data[0][0])
+        copied[0].append((7.0, 8.0, 9.0))
+        self.assertEqual(len(data[0]), 2)
+
+    def test_deep_copy_lists_between_tuples(self):
+        data = [[(0, 0, 0), [1, 1, 1], (2, 2, 2)]]
+        copied = sv_deep_copy(data)
+        copied[0][1][0] = 10
+        self.assertEqual(data[0][1], [1, 1, 1])
+
+class RaggedArrayTests(SverchokTestCase):
+    def test_ragged_round_trip(self):
+        faces = [[0, 1, 2], [2, 3, 4, 5], [5, 6, 7]]
+        ragged = SvRaggedArray.from_lists(faces)
+        self.assertEqual(len(ragged), 3)
+        self.assertEqual(ragged[1].tolist(), [2, 3, 4, 5])
+        self.assertEqual(ragged.to_lists(), faces)
+
+    def test_concatenate_ragged(self):
+        first = SvRaggedArray.from_lists([[0, 1, 2]])
+        second = SvRaggedArray.from_lists([[0, 1], [1, 2, 3, 0]])
+        joined = concatenate_ragged([first, second], [0, 3])
+        self.assertEqual(joined.to_lists(), [[0, 1, 2], [3, 4], [4, 5, 6, 3]])
+
+    def test_ragged_arange(self):
+        self.assertEqual(ragged_arange([2, 0, 3]).tolist(), [0, 1, 0, 1, 2])
+        self.assertEqual(len(ragged_arange([])), 0)
+
+    def test_arrays_to_lists(self):
+        data = [SvRaggedArray.from_lists([[0, 1], [1, 2]])]
+        self.assertEqual(arrays_to_lists(data), [[[0, 1], [1, 2]]])
+
+    def test_numpy_arrays_to_lists(self):
+        data = [np.array([[0.0, 1.0, 2.0], [3.0, 4.0, 5.0]])]
+        self.assertEqual(arrays_to_lists(data), [[(0.0, 1.0, 2.0), (3.0, 4.0, 5.0)]])
+
+    def test_socket_lists_converted_once(self):
+        data = [np.zeros((2, 3))]
+        lists = get_socket_lists("TestingTree", "socket", data, True)
+        self.assertIs(get_socket_lists("TestingTree", "socket", data, True), lists)
+        self.assertIsNot(get_socket_lists("TestingTree", "socket", [np.zeros((2, 3))], True), lists)
+
+class ArraySocketDataTests(EmptyTreeTestCase):
+    def test_arrays_into_not_array_aware_node(self):
+        join = create_node("SvMeshJoinNode")
+        sort = create_node("SvVertSortNode")
+        self.tree.links.new(join.outputs['Vertices'], sort.inputs['Vertices'])
+        join.outputs['Vertices'].sv_set([np.array([[0.0, 1.0, 2.0], [3.0, 4.0, 5.0]])])
+        data = sort.inputs['Vertices'].sv_get()
+        self.assertEqual(data, [[(0.0, 1.0, 2.0), (3.0, 4.0, 5.0)]])
+        self.assertIsInstance(data[0], list)
+
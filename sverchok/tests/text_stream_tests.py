@@ -0,0 +1,94 @@
+import locale
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from sverchok.utils.testing import SverchokTestCase
+from sverchok.utils.sv_text_stream import (
+        CsvOptions, read_csv_file, read_csv_string, row_range, chunk_rows)
+
+
+def options(**kwargs):
+    values = dict(dialect='excel', delimiter='', decimalmark='.', header=True,
+                  skip_lines=0, force_input=False, extended=False)
+    values.update(kwargs)
+    return CsvOptions(**values)
+
+
+class CsvStreamTests(SverchokTestCase):
+    def test_columns(self):
+        _, columns = read_csv_string("x,y,x\n1,2.5,3\n4,5,6\n", options())
+        self.assertEqual(list(columns.keys()), ['x', 'y', 'x1'])
+        self.assertIsInstance(columns['y'], np.ndarray)
+        self.assertEqual(columns['y'].tolist(), [2.5, 5.0])
+
+    def test_no_header(self):
+        _, columns = read_csv_string("some header\n1;2,5\n3;4\n", options(
+            header=False, skip_lines=1, delimiter=';', decimalmark=','))
+        self.assertEqual(list(columns.keys()), ['Col 0', 'Col 1'])
+        self.assertEqual(columns['Col 1'].tolist(), [2.5, 4.0])
+
+    def test_locale(self):
+        point = locale.localeconv()['decimal_point']
+        _, columns = read_csv_string("x;y\n1{}5;2\n".format(point), options(delimiter=';', decimalmark='LOCALE'))
+        self.assertEqual(columns['x'].tolist(), [1.5])
+
+    def test_strings(self):
+        text = "a,b\n1,x\n2,3\n"
+        _, columns = read_csv_string(text, options())
+        self.assertEqual(columns['b'].tolist(), [3.0])
+        _, columns = read_csv_string(text, options(force_input=True))
+        self.assertEqual(columns['b'], ['x', 3.0])
+        _, columns = read_csv_string(text, options(extended=True))
+        self.assertEqual(columns['a'], ['1', '2'])
+
+    def test_file_cache(self):
+        count = chunk_rows + 10
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "points.csv")
+            with open(path, "w") as output:
+                output.write("x,y\n")
+                output.writelines("{},{}\n".format(i, i * 0.5) for i in range(count))
+            cache_dir = os.path.join(directory, "cache")
+            signature, columns = read_csv_file(path, options(), cache_dir)
+            self.assertIsInstance(columns['y'], np.memmap)
+            self.assertEqual(len(columns['y']), count)
+            self.assertEqual(columns['y'][-1], (count - 1) * 0.5)
+            del columns
+
+            signature2, columns = read_csv_file(path, options(), cache_dir)
+            self.assertEqual(signature, signature2)
+            self.assertEqual(columns['x'][:3].tolist(), [0.0, 1.0, 2.0])
+            del columns
+
+    def test_file_cache_entries(self):
+        def entries(cache_dir):
+            return sorted(os.path.relpath(os.path.join(root, name), cache_dir)
+                          for root, dirs, files in os.walk(cache_dir) for name in files if name == "meta.json")
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "points.csv")
+            with open(path, "w") as output:
+                output.write("x,y\n1,2\n")
+            cache_dir = os.path.join(directory, "cache")
+            read_csv_file(path, options(), cache_dir)
+            read_csv_file(path, options(header=False, force_input=True), cache_dir)
+            read_csv_file(path, options(skip_lines=1, header=False), cache_dir)
+            # the same file parsed with other options is cached too
+            self.assertEqual(len(entries(cache_dir)), 2)
+            read_csv_file(path, options(), cache_dir)
+            self.assertEqual(len(entries(cache_dir)), 2)
+
+            with open(path, "w") as output:
+                output.write("x,y\n3,4,5\n")
+            _, columns = read_csv_file(path, options(), cache_dir)
+            self.assertEqual(columns['x'].tolist(), [3.0])
+            # the previous version of the file is removed
+            self.assertEqual(len(entries(cache_dir)), 1)
+
+    def test_row_range(self):
+        self.assertEqual(row_range(10, 2, 0), slice(2, 10))
+        self.assertEqual(row_range(10, 2, 3), slice(2, 5))
+        self.assertEqual(row_range(10, 2, 3, frame=2), slice(8, 11))
@@ -1,6 +1,9 @@
 
 import unittest
 import json
+import os
+import tempfile
+import zipfile
 from os.path import join, dirname, basename
 from glob import glob
 from pathlib import Path
@@ -8,7 +11,8 @@ from pathlib import Path
 import sverchok
 from sverchok.old_nodes import is_old
 from sverchok.utils.testing import *
-from sverchok.utils.sv_IO_panel_tools import import_tree
+from sverchok.utils.sv_IO_panel_tools import (
+        import_tree, write_compact, read_compact, pack_blobs, unpack_blobs, BLOB_KEY)
 from sverchok.utils.sv_examples_utils import examples_paths
 
 class ScriptUvImportTest(SverchokTestCase):
@@ -50,6 +54,45 @@ class MonadImportTest(SverchokTestCase):
                 import_tree(new_tree, self.get_reference_file_path("monad_1.json"))
             self.assert_node_input_equals("ImportedTree", "Monad", "Num X", [[4]])
 
+class CompactImportTest(SverchokTestCase):
+
+    def test_blobs(self):
+        script = "x = 1\n" * 100
+        layout = {"nodes": {"A": {"script_str": script}, "B": {"script_str": script, "name": "B"}}}
+        blobs = {}
+        packed = pack_blobs(layout, blobs)
+        self.assertEqual(len(blobs), 1)
+        self.assertEqual(list(packed["nodes"]["A"]["script_str"]), [BLOB_KEY])
+        self.assertEqual(packed["nodes"]["B"]["name"], "B")
+        self.assertEqual(unpack_blobs(packed, blobs), layout)
+
+    def test_compact_round_trip(self):
+        with open(self.get_reference_file_path("profile.json")) as source:
+            layout = json.load(source)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile.svz")
+            write_compact(layout, path)
+            with zipfile.ZipFile(path) as archive:
+                self.assertTrue(any(name.startswith("blobs/") for name in archive.namelist()))
+            self.assertEqual(read_compact(path), layout)
+
+    def test_compact_import(self):
+        with open(self.get_reference_file_path("script_uv.json")) as source:
+            layout = json.load(source)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "script_uv.svz")
+            write_compact(layout, path)
+            with self.temporary_node_tree("ImportedTree") as new_tree:
+                with self.assert_logs_no_errors():
+                    import_tree(new_tree, path)
+                self.assert_nodes_linked("ImportedTree", "Scripted Node Lite", "verts", "UV Connection", "vertices")
+                self.assertFalse(new_tree.skip_tree_update)
+                self.assertFalse(new_tree.is_frozen())
+            # updates suspended by the caller stay suspended
+            with self.temporary_node_tree("ImportedTree") as new_tree:
+                new_tree.skip_tree_update = True
+                import_tree(new_tree, path)
+                self.assertTrue(new_tree.skip_tree_update)
 
 # to keep automated tests from breaking, i've collected a list of examples that need to be skipped
 # because they 
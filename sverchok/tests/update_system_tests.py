@@ -1,10 +1,11 @@
 
 import collections
+import threading
 import unittest
 
 from sverchok.utils.testing import *
 from sverchok.utils.logging import debug, info
-from sverchok.core.update_system import make_dep_dict, make_update_list
+from sverchok.core.update_system import make_dep_dict, make_update_list, schedule_nodes
 #from sverchok.tests.mocks import *
 
 class UpdateSystemTests(ReferenceTreeTestCase):
@@ -36,3 +37,47 @@ class UpdateSystemTests(ReferenceTreeTestCase):
                 dep_idx = result.index(dep)
                 self.assertTrue(dep_idx < node_idx)
 
+
+class ScheduleNodesTests(SverchokTestCase):
+
+    dependencies = {'B': {'A'}, 'C': {'A'}, 'D': {'B', 'C'}}
+
+    def run_nodes(self, on_worker=lambda name: True, failing=()):
+        order = []
+        threads = {}
+        errors = {}
+
+        def work(name):
+            threads[name] = threading.get_ident()
+            if name in failing:
+                raise ValueError(name)
+            return name
+
+        def dispatch(name):
+            return (lambda: work(name)), on_worker(name)
+
+        schedule_nodes(['A', 'B', 'C', 'D'], self.dependencies, dispatch,
+                       lambda name, result: order.append(result),
+                       lambda name, err: errors.setdefault(name, err), threads=2)
+        return order, threads, errors
+
+    def test_order(self):
+        order, _, errors = self.run_nodes()
+        self.assertEqual(errors, {})
+        self.assertEqual(sorted(order), ['A', 'B', 'C', 'D'])
+        for name, deps in self.dependencies.items():
+            for dep in deps:
+                self.assertLess(order.index(dep), order.index(name))
+
+    def test_exception(self):
+        order, threads, errors = self.run_nodes(failing={'B'})
+        self.assertEqual(list(errors), ['B'])
+        self.assertIsInstance(errors['B'], ValueError)
+        self.assertEqual(sorted(order), ['A', 'C'])
+        self.assertNotIn('D', threads)
+
+    def test_main_thread_nodes(self):
+        order, threads, _ = self.run_nodes(on_worker=lambda name: name != 'C')
+        self.assertEqual(sorted(order), ['A', 'B', 'C', 'D'])
+        self.assertEqual(threads['C'], threading.get_ident())
+        self.assertNotEqual(threads['A'], threading.get_ident())
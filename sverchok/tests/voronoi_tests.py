@@ -0,0 +1,57 @@
+import unittest
+
+import numpy as np
+
+from sverchok.utils.testing import SverchokTestCase
+from sverchok.utils.voronoi import (
+        Site, computeVoronoiDiagram, computeVoronoiArrays, computeDelaunayTriangulation,
+        clipVoronoiEdges, has_qhull, ENGINE_FORTUNE, ENGINE_QHULL)
+
+
+def edges_by_sites(diagram):
+    result = dict()
+    for (_, v1, v2), sites in zip(diagram.edges.tolist(), diagram.edge_sites.tolist()):
+        ends = frozenset(tuple(np.round(diagram.vertices[v], 6)) if v >= 0 else None for v in (v1, v2))
+        result[frozenset(sites)] = ends
+    return result
+
+
+# sunflower pattern inside the unit square: no four sites on one circle
+golden_angle = np.pi * (3 - np.sqrt(5))
+points = np.array([(0.5 + 0.5 * np.sqrt((i + 0.5) / 200) * np.cos(i * golden_angle),
+                    0.5 + 0.5 * np.sqrt((i + 0.5) / 200) * np.sin(i * golden_angle)) for i in range(200)])
+
+
+class VoronoiTests(SverchokTestCase):
+    def test_fortune_context(self):
+        sites = [Site(x, y) for x, y in points.tolist()]
+        context = computeVoronoiDiagram(sites, engine=ENGINE_FORTUNE)
+        self.assertEqual(len(context.edges), len(context.lines))
+        self.assertEqual(len(context.edges), len(context.edge_sites))
+        self.assertEqual(set(context.polygons.keys()), set(range(len(sites))))
+
+    def test_triangles_clockwise(self):
+        for engine in (ENGINE_FORTUNE, ENGINE_QHULL):
+            triangles = np.array(computeDelaunayTriangulation(points, engine=engine))
+            p0, p1, p2 = (points[triangles[:, i]] for i in range(3))
+            e1, e2 = p1 - p0, p2 - p0
+            self.assertTrue((e1[:, 0] * e2[:, 1] - e1[:, 1] * e2[:, 0] < 0).all(), engine)
+
+    @unittest.skipUnless(has_qhull, "scipy is not available")
+    def test_engines_agree(self):
+        fortune = computeVoronoiArrays(points, engine=ENGINE_FORTUNE)
+        qhull = computeVoronoiArrays(points, engine=ENGINE_QHULL)
+        self.assertEqual(edges_by_sites(fortune), edges_by_sites(qhull))
+
+    def test_degenerate_input(self):
+        line = np.array([(float(i), 0.0) for i in range(5)])
+        diagram = computeVoronoiArrays(line)
+        self.assertTrue((diagram.edges[:, 1:] == -1).all())
+        self.assertEqual(len(computeVoronoiArrays([]).edges), 0)
+
+    def test_clip_edges(self):
+        diagram = computeVoronoiArrays(points)
+        vertices, edges = clipVoronoiEdges(diagram, 0.0, 0.0, 1.0, 1.0)
+        self.assertTrue((vertices >= -1e-9).all() and (vertices <= 1 + 1e-9).all())
+        self.assertEqual(set(np.unique(edges)), set(range(len(vertices))))
+
@@ -67,9 +67,11 @@ class SV_PT_IOLayoutsMenu(bpy.types.Panel):
             row1 = col.row(align=True)
             row1.scale_y = 1.4
             row1.prop(io_props, 'compress_output', text='Zip', toggle=True)
+            row1.prop(io_props, 'compact_output', text='Compact', toggle=True)
             imp = row1.operator('node.tree_exporter', text='Export', icon='FILE_BACKUP')
             imp.id_tree = ntree.name
             imp.compress = io_props.compress_output
+            imp.compact = io_props.compact_output
 
             row1b = col.row(align=True)
             exp = row1b.operator('node.tree_export_to_gist', text='Export to gist', icon='URL')
@@ -304,6 +304,8 @@ class SV_PT_ToolsMenu(bpy.types.Panel):
                 row = profile_col.row(align=True)
                 row.operator("node.sverchok_profile_dump", text="Dump data", icon="TEXT")
                 row.operator("node.sverchok_profile_save", text="Save data", icon="FILE_TICK")
+                if addon.preferences.profile_mode == "NODES":
+                    profile_col.operator("node.sverchok_profile_save_trace", text="Save trace", icon="TIME")
                 profile_col.operator("node.sverchok_profile_reset", text="Reset data", icon="X")
 
     def draw_interaction_template(self, layout):
@@ -421,6 +423,13 @@ class SV_PT_ToolsMenu(bpy.types.Panel):
                 split.scale_x = little_width
                 split.prop(tree, 'use_fake_user', toggle=True, text='F')
 
+        current_tree = context.space_data.node_tree
+        col = layout.column(align=True)
+        col.prop(current_tree, 'sv_incremental')
+        row = col.row(align=True)
+        row.prop(current_tree, 'sv_parallel', toggle=True)
+        row.prop(current_tree, 'sv_threads')
+
         if context.scene.sv_new_version:
             row = layout.row()
             row.alert = True
@@ -0,0 +1,159 @@
+# This file is part of project Sverchok. It's copyrighted by the contributors
+# recorded in the version control history of the file, available from
+# its original location https://github.com/nortikin/sverchok/commit/master
+#
+# SPDX-License-Identifier: GPL3
+# License-Filename: LICENSE
+
+"""
+Array-backed socket data.
+
+Vertices of one object are passed as contiguous (N, 3) float arrays,
+edges and polygons of one object as SvRaggedArray: one flat index array
+plus an offsets array, polygon i being indices[offsets[i]:offsets[i+1]].
+
+Nodes which can work with such data declare
+
+    sv_array_aware = True
+
+in their class. For all other nodes the update system converts
+SvRaggedArray items, and numpy arrays output by array aware nodes,
+to python lists when the node reads the socket; the converted data is
+kept next to the array data of the output socket (see
+core.socket_data.get_socket_lists), so the conversion is done once
+however many nodes read it.
+"""
+
+import numpy as np
+
+
+class SvRaggedArray(object):
+    """
+    Ragged list of index lists (edges or polygons of one object).
+    """
+    def __init__(self, indices, offsets):
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self._lists = None
+
+    @classmethod
+    def from_lists(cls, lists):
+        sizes = np.fromiter((len(item) for item in lists), dtype=np.int64, count=len(lists))
+        offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+        if len(lists) and (sizes == sizes[0]).all():
+            indices = np.array(lists, dtype=np.int32).ravel()
+        else:
+            indices = np.fromiter((i for item in lists for i in item), dtype=np.int32, count=offsets[-1])
+        return cls(indices, offsets)
+
+    @classmethod
+    def from_array(cls, array):
+        """Build from (M, K) array, f.ex. edges or quads"""
+        array = np.asarray(array)
+        count, size = array.shape
+        return cls(array.ravel(), np.arange(0, (count + 1) * size, size))
+
+    @property
+    def sizes(self):
+        return np.diff(self.offsets)
+
+    def is_uniform(self):
+        sizes = self.sizes
+        return len(sizes) == 0 or (sizes == sizes[0]).all()
+
+    def as_array(self):
+        """return (M, K) array, only for arrays of items of the same size"""
+        if not self.is_uniform():
+            raise ValueError("Items of ragged array have different sizes")
+        size = self.offsets[1] if len(self) else 0
+        return self.indices.reshape((len(self), size))
+
+    def shifted(self, offset):
+        """return a copy with all indices increased by offset"""
+        return SvRaggedArray(self.indices + offset, self.offsets)
+
+    def to_lists(self):
+        """return list of lists of ints; computed once and cached"""
+        if self._lists is None:
+            if self.is_uniform():
+                self._lists = self.as_array().tolist()
+            else:
+                flat = self.indices.tolist()
+                bounds = self.offsets.tolist()
+                self._lists = [flat[start:end] for start, end in zip(bounds, bounds[1:])]
+        return self._lists
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx):
+        return self.indices[self.offsets[idx]:self.offsets[idx + 1]]
+
+    def __iter__(self):
+        return iter(self.to_lists())
+
+    def __repr__(self):
+        return f"SvRaggedArray({len(self)} items, {len(self.indices)} indices)"
+
+
+def concatenate_ragged(arrays, index_offsets=None):
+    """
+    Join several ragged arrays into one.
+    If index_offsets is given, indices of arrays[i] are increased by index_offsets[i].
+    """
+    if not arrays:
+        return SvRaggedArray([], [0])
+    if index_offsets is None:
+        indices = np.concatenate([array.indices for array in arrays])
+    else:
+        indices = np.concatenate([array.indices + offset for array, offset in zip(arrays, index_offsets)])
+    position_offsets = np.cumsum([0] + [len(array.indices) for array in arrays[:-1]])
+    offsets = np.concatenate([array.offsets[:-1] + shift for array, shift in zip(arrays, position_offsets)]
+                             + [[len(indices)]])
+    return SvRaggedArray(indices, offsets)
+
+
+def tile_ragged(array, count, index_step):
+    """
+    Join count copies of one ragged array, indices of copy i increased
+    by i * index_step; f.ex. faces of count instances of one mesh.
+    """
+    size = len(array.indices)
+    indices = (array.indices[None, :] + (np.arange(count) * index_step)[:, None]).ravel()
+    offsets = (array.offsets[None, :-1] + (np.arange(count) * size)[:, None]).ravel()
+    return SvRaggedArray(indices, np.append(offsets, count * size))
+
+
+def ragged_arange(counts):
+    """concatenated ranges 0 .. count-1 for each of counts, f.ex. [2, 3] -> [0, 1, 0, 1, 2]"""
+    counts = np.asarray(counts, dtype=np.int64)
+    starts = np.cumsum(counts) - counts
+    return np.arange(np.sum(counts), dtype=np.int64) - np.repeat(starts, counts)
+
+
+def has_array_data(data, numpy_arrays=True):
+    """check if the socket data holds SvRaggedArray (or numpy array) items at object level"""
+    types = (SvRaggedArray, np.ndarray) if numpy_arrays else SvRaggedArray
+    return isinstance(data, (list, tuple)) and bool(data) and (isinstance(data[0], types) or isinstance(data[-1], types))
+
+
+def array_to_lists(array):
+    """numpy array as sverchok lists, rows of 2d arrays (f.ex. vertices) as tuples"""
+    if array.ndim == 2:
+        return list(map(tuple, array.tolist()))
+    return array.tolist()
+
+
+def arrays_to_lists(data, numpy_arrays=True):
+    """
+    Convert object level SvRaggedArray items, and numpy array items
+    if numpy_arrays is set, to lists, for nodes which are not array aware.
+    Other data is returned as is.
+    """
+    if not has_array_data(data, numpy_arrays):
+        return data
+    return [item.to_lists() if isinstance(item, SvRaggedArray)
+            else array_to_lists(item) if numpy_arrays and isinstance(item, np.ndarray)
+            else item
+            for item in data]
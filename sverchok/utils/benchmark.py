@@ -0,0 +1,281 @@
+# This file is part of project Sverchok. It's copyrighted by the contributors
+# recorded in the version control history of the file, available from
+# its original location https://github.com/nortikin/sverchok/commit/master
+#
+# SPDX-License-Identifier: GPL3
+# License-Filename: LICENSE
+
+"""
+Benchmarks for performance sensitive parts of Sverchok.
+
+Run from blender python console or script, f.ex.
+
+    from sverchok.utils.benchmark import benchmark_fanout_copy
+    for line in benchmark_fanout_copy():
+        print(line)
+
+compares the old and the current deep copy of socket data on a wide fan-out tree.
+
+Scaling of Voronoi engines (pure python FORTUNE is only run up to fortune_limit sites):
+
+    from sverchok.utils.benchmark import benchmark_voronoi
+    for line in benchmark_voronoi():
+        print(line)
+
+Interpolation of matrix arrays, checked against a time target:
+
+    from sverchok.utils.benchmark import benchmark_matrix_interpolate
+    for line in benchmark_matrix_interpolate():
+        print(line)
+
+Node tree benchmarks are described in benchmarks/benchmarks.json:
+each benchmark names a json layout and a set of scales, a scale being
+a dict of node property overrides. Run them headless with
+
+    $ ./run_benchmarks.sh --save results.json --baseline benchmarks/baseline.json
+
+Timings depend on the machine, so the baseline is not kept in the repository:
+the first run with --baseline pointing to a missing file saves its results
+there. To record a new baseline after an intended change, run with
+
+    $ ./run_benchmarks.sh --baseline benchmarks/baseline.json --update-baseline
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+
+def legacy_deep_copy(lst):
+    """sv_deep_copy as it was before copying a level of tuples by one slice, for comparison"""
+    if isinstance(lst, (list, tuple)):
+        if lst and not isinstance(lst[0], (list, tuple)):
+            return lst[:]
+        return [legacy_deep_copy(l) for l in lst]
+    return lst
+
+
+def measure(func, *args, **kwargs):
+    """
+    Call func, return (result, seconds, peak of allocated memory in bytes)
+    """
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        duration = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, duration, peak
+
+
+def benchmark_fanout_copy(runs=3):
+    """
+    Run the fanout_copy tree (one Random Vector output read with
+    deepcopy=True by 8 List Length nodes) with the old and the current
+    sv_deep_copy. Yields one line of report per scale: best tree time,
+    time spent in the reading nodes and peak memory of the tree.
+    """
+    from sverchok.core import socket_data
+
+    spec = load_benchmarks()["fanout_copy"]
+    layout_path = os.path.join(get_benchmarks_path(), spec["layout"])
+    current_copy = socket_data.sv_deep_copy
+    for scale, overrides in spec["scales"].items():
+        report = [f"fanout_copy [{scale}]:"]
+        for name, copy_func in (("legacy", legacy_deep_copy), ("current", current_copy)):
+            socket_data.sv_deep_copy = copy_func
+            try:
+                result = run_tree_benchmark(layout_path, overrides, runs)
+            finally:
+                socket_data.sv_deep_copy = current_copy
+            readers = sum(stats["time"] for node, stats in result["nodes"].items() if "/List Length" in node)
+            report.append(f"{name} {result['time']:.4f} s (readers {readers:.4f} s), "
+                          f"peak {result['peak_memory'] / 2**20:.1f} MiB")
+        yield " ".join(report)
+
+
+def benchmark_voronoi(site_counts=(1000, 10000, 100000, 1000000), fortune_limit=100000, seed=0):
+    """
+    Time Voronoi diagram of uniformly distributed sites, for all available
+    engines, as arrays and clipped by the unit square.
+    Yields one line of report per sites count.
+    """
+    from sverchok.utils import voronoi
+
+    engines = [voronoi.ENGINE_FORTUNE]
+    if voronoi.has_qhull:
+        engines.append(voronoi.ENGINE_QHULL)
+
+    rng = np.random.default_rng(seed)
+    for count in site_counts:
+        sites = rng.random((count, 2))
+        report = [f"{count} sites:"]
+        for engine in engines:
+            if engine == voronoi.ENGINE_FORTUNE and count > fortune_limit:
+                continue
+            diagram, duration, peak = measure(voronoi.computeVoronoiArrays, sites, engine)
+            _, clip_duration, _ = measure(voronoi.clipVoronoiEdges, diagram, 0.0, 0.0, 1.0, 1.0)
+            report.append(f"{engine} {duration:.4f} s (+{clip_duration:.4f} s clip), {peak / 2**20:.1f} MiB")
+        yield " ".join(report)
+
+
+def random_matrices(rng, count):
+    """(count, 4, 4) array of rotations with random non uniform scale and translation"""
+    from sverchok.utils.matrix_array import axis_angle_matrices
+
+    matrices = axis_angle_matrices(rng.normal(size=(count, 3)), rng.uniform(0.0, np.pi, count))
+    matrices[:, :3, :3] *= rng.uniform(0.5, 2.0, (count, 1, 3))
+    matrices[:, :3, 3] = rng.normal(size=(count, 3))
+    return matrices
+
+
+def benchmark_matrix_interpolate(counts=(1000, 10000, 200000), target=1.0, runs=3, seed=0):
+    """
+    Time matrix_array.interpolate of two arrays of random matrices.
+    Yields one line of report per matrices count, marked SLOW
+    when the best of runs takes more than target seconds.
+    """
+    from sverchok.utils.matrix_array import interpolate
+
+    rng = np.random.default_rng(seed)
+    for count in counts:
+        matrices_a, matrices_b = random_matrices(rng, count), random_matrices(rng, count)
+        factors = rng.random(count)
+        durations = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            interpolate(matrices_a, matrices_b, factors)
+            durations.append(time.perf_counter() - start)
+        status = "OK" if min(durations) < target else "SLOW"
+        yield f"{count} matrices: {min(durations):.4f} s (target {target:.1f} s) {status}"
+
+
+def get_benchmarks_path():
+    import sverchok
+    return os.path.join(os.path.dirname(sverchok.__file__), "benchmarks")
+
+
+def load_benchmarks(path=None):
+    if path is None:
+        path = os.path.join(get_benchmarks_path(), "benchmarks.json")
+    with open(path) as source:
+        return json.load(source)
+
+
+def run_tree_benchmark(layout_path, overrides, runs=3):
+    """
+    Import json layout into a new tree, apply node property overrides
+    ({node name: {property: value}}), process the tree runs times.
+    Returns dict with best total time, peak memory and per node statistics.
+    Tracing memory slows python down several times, so the timed runs are done
+    without it and peak memory and node statistics come from one more run.
+    """
+    import bpy
+    from sverchok.core.update_system import build_update_list, process_tree
+    from sverchok.utils.profile import start_node_profiling, stop_node_profiling
+    from sverchok.utils.sv_IO_panel_tools import import_tree
+
+    ng = bpy.data.node_groups.new("Benchmark", "SverchCustomTreeType")
+    try:
+        ng.sv_process = False
+        import_tree(ng, layout_path)
+        for node_name, properties in overrides.items():
+            node = ng.nodes[node_name]
+            for name, value in properties.items():
+                setattr(node, name, value)
+        ng.sv_process = True
+        build_update_list(ng)
+
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            process_tree(ng)
+            times.append(time.perf_counter() - start)
+
+        node_profile = start_node_profiling(trace_memory=True)
+        try:
+            process_tree(ng)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            stop_node_profiling()
+    finally:
+        bpy.data.node_groups.remove(ng)
+
+    return {"time": min(times), "peak_memory": peak, "nodes": node_profile.to_dict()}
+
+
+def run_benchmarks(benchmarks, names=None, runs=3):
+    """
+    Run benchmarks (as returned by load_benchmarks), all or only ones listed in names.
+    Returns {benchmark name: {scale name: result of run_tree_benchmark}}
+    """
+    results = {}
+    for name, spec in benchmarks.items():
+        if names and name not in names:
+            continue
+        layout_path = os.path.join(get_benchmarks_path(), spec["layout"])
+        results[name] = {}
+        for scale, overrides in spec["scales"].items():
+            result = run_tree_benchmark(layout_path, overrides, runs)
+            results[name][scale] = result
+            print(f"{name} [{scale}]: {result['time']:.4f} s, peak {result['peak_memory'] / 2**20:.1f} MiB")
+    return results
+
+
+def compare_benchmarks(baseline, results, tolerance=0.2):
+    """
+    Return list of (benchmark, scale, baseline time, current time)
+    for runs that got slower than baseline by more than tolerance (fraction).
+    """
+    regressions = []
+    for name, scales in results.items():
+        for scale, result in scales.items():
+            base = baseline.get(name, {}).get(scale)
+            if base and result["time"] > base["time"] * (1 + tolerance):
+                regressions.append((name, scale, base["time"], result["time"]))
+    return regressions
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Run Sverchok node tree benchmarks")
+    parser.add_argument("names", nargs="*", help="benchmarks to run, all by default")
+    parser.add_argument("--runs", type=int, default=3, help="runs per scale, best time is taken")
+    parser.add_argument("--save", help="save results to this json file")
+    parser.add_argument("--baseline", help="compare results with this json file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown, as fraction")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="save results to the baseline file instead of comparing with it")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(load_benchmarks(), args.names, args.runs)
+    if args.save:
+        with open(args.save, "w") as output:
+            json.dump(results, output, indent=2)
+
+    if args.baseline and (args.update_baseline or not os.path.exists(args.baseline)):
+        with open(args.baseline, "w") as output:
+            json.dump(results, output, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if args.baseline:
+        with open(args.baseline) as source:
+            baseline = json.load(source)
+        regressions = compare_benchmarks(baseline, results, args.tolerance)
+        for name, scale, base_time, new_time in regressions:
+            print(f"REGRESSION {name} [{scale}]: {base_time:.4f} s -> {new_time:.4f} s")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    # blender passes script arguments after "--"
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    sys.exit(main(argv))
@@ -1,4 +1,7 @@
 import math
+
+import numpy as np
+
 from sverchok.utils.csg_geom import *
 
 
@@ -84,3 +87,220 @@ class CSG(object):
             polygons.append(CSGPolygon(polyg))
 
         return CSG.fromPolygons(polygons)
+
+
+class CSGTree(object):
+    """
+    Array version of CSGNode: BSP tree with polygons kept in one CSGPolygonSet.
+    Nodes are numbered, node 0 is the root; fronts[i] and backs[i] are indices
+    of child nodes or -1. All tree walks are done with explicit stacks,
+    so deep trees do not hit the recursion limit.
+    """
+    def __init__(self, pool, polygons=None):
+        self.pool = pool
+        self.normals = []
+        self.ws = []
+        self.fronts = []
+        self.backs = []
+        self.polygons = CSGPolygonSet.empty()
+        if polygons is not None:
+            self.build(polygons)
+
+    def new_node(self, normal, w):
+        self.normals.append(normal)
+        self.ws.append(w)
+        self.fronts.append(-1)
+        self.backs.append(-1)
+        return len(self.normals) - 1
+
+    def invert(self):
+        """
+        Convert solid space to empty space and empty space to solid space.
+        """
+        self.polygons = self.polygons.flipped()
+        self.normals = [-normal for normal in self.normals]
+        self.ws = [-w for w in self.ws]
+        self.fronts, self.backs = self.backs, self.fronts
+
+    def clipPolygons(self, polygons):
+        """
+        Remove all polygons in `polygons` that are inside this BSP tree.
+        """
+        if not self.normals:
+            return polygons
+        result = []
+        stack = [(0, polygons)]
+        while stack:
+            node, polygons = stack.pop()
+            if not len(polygons):
+                continue
+            coplanar_front, coplanar_back, front, back = split_polygon_set(
+                        self.pool, polygons, self.normals[node], self.ws[node])
+            front = CSGPolygonSet.concatenate([coplanar_front, front])
+            if self.fronts[node] >= 0:
+                stack.append((self.fronts[node], front))
+            else:
+                result.append(front)
+            if self.backs[node] >= 0:
+                stack.append((self.backs[node], CSGPolygonSet.concatenate([coplanar_back, back])))
+        return CSGPolygonSet.concatenate(result)
+
+    def clipTo(self, tree):
+        """
+        Remove all polygons in this BSP tree that are inside the other BSP tree.
+        """
+        self.polygons = tree.clipPolygons(self.polygons)
+
+    def allPolygons(self):
+        return self.polygons
+
+    def build(self, polygons):
+        if not len(polygons):
+            return
+        if not self.normals:
+            self.new_node(polygons.normals[0], polygons.ws[0])
+        coplanar = [self.polygons]
+        stack = [(0, polygons)]
+        while stack:
+            node, polygons = stack.pop()
+            coplanar_front, coplanar_back, front, back = split_polygon_set(
+                        self.pool, polygons, self.normals[node], self.ws[node])
+            coplanar.extend((coplanar_front, coplanar_back))
+            for children, part in ((self.fronts, front), (self.backs, back)):
+                if len(part):
+                    if children[node] < 0:
+                        children[node] = self.new_node(part.normals[0], part.ws[0])
+                    stack.append((children[node], part))
+        self.polygons = CSGPolygonSet.concatenate(coplanar)
+
+
+class CSGMesh(object):
+    """
+    Array-backed counterpart of CSG: a solid given by vertex array and
+    CSGPolygonSet. Operations give the same result as CSG ones, but polygons
+    are classified against a plane all at once, with numpy.
+
+    Example:
+        result = CSGMesh.from_pydata(verts_a, faces_a).subtract(CSGMesh.from_pydata(verts_b, faces_b))
+        verts, faces = result.to_pydata()
+    """
+    def __init__(self, verts, polygons):
+        self.verts = verts
+        self.polygons = polygons
+
+    @classmethod
+    def from_pydata(cls, verts, faces):
+        pool = CSGVertexPool(verts)
+        return cls(pool.verts, CSGPolygonSet.from_pydata(pool, faces))
+
+    def to_pydata(self):
+        """
+        Vertices and faces as lists. Vertices with equal coordinates are welded,
+        vertices are numbered in order of their first use by faces.
+        """
+        polygons = self.polygons
+        if not len(polygons):
+            return [], []
+        used = self.verts[polygons.indices]
+        unique, first, inverse = np.unique(used, axis=0, return_index=True, return_inverse=True)
+        order = np.argsort(first)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        polygons = CSGPolygonSet(rank[inverse.ravel()], polygons.offsets, polygons.normals, polygons.ws, polygons.tags)
+        return unique[order].tolist(), polygons.to_lists()
+
+    def bounds(self):
+        if not len(self.polygons):
+            return None
+        used = self.verts[self.polygons.indices]
+        return used.min(axis=0), used.max(axis=0)
+
+    def _trees(self, other):
+        pool = CSGVertexPool(np.concatenate((self.verts, other.verts)))
+        a = CSGTree(pool, self.polygons)
+        b = CSGTree(pool, other.polygons.shifted(len(self.verts)))
+        return pool, a, b
+
+    def union(self, other):
+        pool, a, b = self._trees(other)
+        a.clipTo(b)
+        b.clipTo(a)
+        b.invert()
+        b.clipTo(a)
+        b.invert()
+        a.build(b.allPolygons())
+        return CSGMesh(pool.verts, a.allPolygons())
+
+    def subtract(self, other):
+        pool, a, b = self._trees(other)
+        a.invert()
+        a.clipTo(b)
+        b.clipTo(a)
+        b.invert()
+        b.clipTo(a)
+        b.invert()
+        a.build(b.allPolygons())
+        a.invert()
+        return CSGMesh(pool.verts, a.allPolygons())
+
+    def intersect(self, other):
+        pool, a, b = self._trees(other)
+        a.invert()
+        b.clipTo(a)
+        b.invert()
+        a.clipTo(b)
+        b.clipTo(a)
+        a.build(b.allPolygons())
+        a.invert()
+        return CSGMesh(pool.verts, a.allPolygons())
+
+    @staticmethod
+    def join(meshes):
+        """ put meshes together without any boolean processing """
+        shifts = np.cumsum([0] + [len(mesh.verts) for mesh in meshes[:-1]])
+        verts = np.concatenate([mesh.verts for mesh in meshes])
+        polygons = CSGPolygonSet.concatenate([mesh.polygons.shifted(shift) for mesh, shift in zip(meshes, shifts)])
+        return CSGMesh(verts, polygons)
+
+    @staticmethod
+    def union_all(meshes):
+        """
+        Union of any number of meshes. Meshes with overlapping bounding boxes
+        are united pairwise in a balanced order, so that big intermediate results
+        are clipped as few times as possible; groups of meshes which do not
+        overlap each other are just joined.
+        """
+        meshes = [mesh for mesh in meshes if len(mesh.polygons)]
+        if not meshes:
+            return CSGMesh(np.zeros((0, 3)), CSGPolygonSet.empty())
+
+        # connected groups of meshes with overlapping bounding boxes
+        bounds = [mesh.bounds() for mesh in meshes]
+        group = list(range(len(meshes)))
+
+        def find(i):
+            while group[i] != i:
+                group[i] = group[group[i]]
+                i = group[i]
+            return i
+
+        eps = CSGPlane.EPSILON
+        for i in range(len(meshes)):
+            for j in range(i + 1, len(meshes)):
+                (min_i, max_i), (min_j, max_j) = bounds[i], bounds[j]
+                if (min_i <= max_j + eps).all() and (min_j <= max_i + eps).all():
+                    group[find(i)] = find(j)
+
+        groups = dict()
+        for i, mesh in enumerate(meshes):
+            groups.setdefault(find(i), []).append(mesh)
+
+        results = []
+        for members in groups.values():
+            while len(members) > 1:
+                united = [a.union(b) for a, b in zip(members[::2], members[1::2])]
+                if len(members) % 2:
+                    united.append(members[-1])
+                members = united
+            results.append(members[0])
+        return CSGMesh.join(results)
@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 
 class CSGVector(object):
 
@@ -349,3 +351,222 @@ class CSGNode(object):
             if not self.back:
                 self.back = CSGNode()
             self.back.build(back)
+
+
+class CSGVertexPool(object):
+
+    """
+    class CSGVertexPool
+
+    Growing array of vertex positions shared by all polygons of a CSG operation.
+    Polygons refer to vertices by index, so vertices created when a polygon
+    is split are shared with the polygons around it.
+    """
+
+    def __init__(self, verts):
+        self.verts = np.array(verts, dtype=np.float64).reshape((-1, 3))
+
+    def __len__(self):
+        return len(self.verts)
+
+    def extend(self, points):
+        if points:
+            self.verts = np.concatenate((self.verts, np.array(points, dtype=np.float64)))
+
+
+class CSGPolygonSet(object):
+
+    """
+    class CSGPolygonSet
+
+    Convex polygons as arrays: polygon i has vertex indices
+    `indices[offsets[i]:offsets[i+1]]`, plane `normals[i]`, `ws[i]`, and an
+    integer `tags[i]`, which plays the role of `shared` of CSGPolygon: it is
+    kept by all fragments split from the polygon.
+    """
+
+    def __init__(self, indices, offsets, normals, ws, tags):
+        self.indices = indices
+        self.offsets = offsets
+        self.normals = normals
+        self.ws = ws
+        self.tags = tags
+
+    @classmethod
+    def empty(cls):
+        return cls(np.zeros(0, dtype=np.int64), np.zeros(1, dtype=np.int64),
+                   np.zeros((0, 3)), np.zeros(0), np.zeros(0, dtype=np.int64))
+
+    @classmethod
+    def from_pydata(cls, pool, faces, tag=0):
+        """
+        Polygons from lists of indices into pool. Polygons with less than three
+        vertices or with zero area are skipped.
+        """
+        faces = [face for face in faces if len(face) >= 3]
+        if not faces:
+            return cls.empty()
+        sizes = np.array([len(face) for face in faces], dtype=np.int64)
+        offsets = np.zeros(len(faces) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+        indices = np.fromiter((i for face in faces for i in face), dtype=np.int64, count=offsets[-1])
+
+        # Newell's normal, the same as CSGPlane.fromPoints for planar convex polygons
+        positions = np.arange(len(indices))
+        following = positions + 1
+        following[offsets[1:] - 1] = offsets[:-1]
+        points = pool.verts[indices]
+        normals = np.add.reduceat(np.cross(points, points[following]), offsets[:-1])
+        lengths = np.linalg.norm(normals, axis=1)
+        good = lengths > 0
+        normals[good] /= lengths[good, None]
+        ws = np.einsum('ij,ij->i', normals, points[offsets[:-1]])
+        tags = np.full(len(faces), tag, dtype=np.int64)
+        polygons = cls(indices, offsets, normals, ws, tags)
+        if not good.all():
+            polygons = polygons.select(good)
+        return polygons
+
+    @classmethod
+    def from_lists(cls, faces, normals, ws, tags):
+        if not faces:
+            return cls.empty()
+        sizes = np.array([len(face) for face in faces], dtype=np.int64)
+        offsets = np.zeros(len(faces) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+        indices = np.fromiter((i for face in faces for i in face), dtype=np.int64, count=offsets[-1])
+        return cls(indices, offsets, np.array(normals).reshape((-1, 3)), np.array(ws), np.array(tags, dtype=np.int64))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def sizes(self):
+        return np.diff(self.offsets)
+
+    def select(self, mask):
+        """ subset of polygons by boolean mask """
+        sizes = self.sizes
+        if mask.all():
+            return self
+        offsets = np.zeros(np.count_nonzero(mask) + 1, dtype=np.int64)
+        np.cumsum(sizes[mask], out=offsets[1:])
+        return CSGPolygonSet(self.indices[np.repeat(mask, sizes)], offsets,
+                             self.normals[mask], self.ws[mask], self.tags[mask])
+
+    def flipped(self):
+        """ polygons with reversed orientation """
+        if not len(self):
+            return self
+        polygon = np.repeat(np.arange(len(self)), self.sizes)
+        reverse = self.offsets[polygon] + self.offsets[polygon + 1] - 1 - np.arange(len(self.indices))
+        return CSGPolygonSet(self.indices[reverse], self.offsets, -self.normals, -self.ws, self.tags)
+
+    def shifted(self, offset):
+        return CSGPolygonSet(self.indices + offset, self.offsets, self.normals, self.ws, self.tags)
+
+    def to_lists(self):
+        flat = self.indices.tolist()
+        bounds = self.offsets.tolist()
+        return [flat[start:end] for start, end in zip(bounds, bounds[1:])]
+
+    @staticmethod
+    def concatenate(sets):
+        sets = [s for s in sets if len(s)]
+        if not sets:
+            return CSGPolygonSet.empty()
+        if len(sets) == 1:
+            return sets[0]
+        shifts = np.cumsum([0] + [len(s.indices) for s in sets[:-1]])
+        offsets = np.concatenate([s.offsets[:-1] + shift for s, shift in zip(sets, shifts)]
+                                 + [[shifts[-1] + len(sets[-1].indices)]])
+        return CSGPolygonSet(np.concatenate([s.indices for s in sets]), offsets,
+                             np.concatenate([s.normals for s in sets]),
+                             np.concatenate([s.ws for s in sets]),
+                             np.concatenate([s.tags for s in sets]))
+
+
+def split_polygon_set(pool, polygons, normal, w):
+    """
+    Array version of `CSGPlane.splitPolygon` for all polygons of the set at once.
+    Returns four CSGPolygonSet: coplanar front, coplanar back, front and back.
+    Only polygons spanning the plane are split one by one; new vertices on an
+    edge are created once and shared by both polygons of that edge.
+    """
+    COPLANAR = 0
+    FRONT = 1
+    BACK = 2
+    SPANNING = 3
+
+    empty = CSGPolygonSet.empty()
+    if not len(polygons):
+        return empty, empty, empty, empty
+
+    verts = pool.verts
+    distances = verts[polygons.indices] @ normal - w
+    types = np.where(distances > CSGPlane.EPSILON, FRONT,
+                     np.where(distances < -CSGPlane.EPSILON, BACK, COPLANAR)).astype(np.int8)
+    polygon_types = np.bitwise_or.reduceat(types, polygons.offsets[:-1])
+
+    coplanar = polygon_types == COPLANAR
+    facing = polygons.normals @ normal > 0
+    coplanar_front = polygons.select(coplanar & facing)
+    coplanar_back = polygons.select(coplanar & ~facing)
+    front = polygons.select(polygon_types == FRONT)
+    back = polygons.select(polygon_types == BACK)
+
+    spanning = np.flatnonzero(polygon_types == SPANNING)
+    if not len(spanning):
+        return coplanar_front, coplanar_back, front, back
+
+    offsets = polygons.offsets
+    indices = polygons.indices.tolist()
+    types = types.tolist()
+    distances = distances.tolist()
+    new_points = []
+    edge_points = dict()
+    next_index = len(pool)
+    front_faces, back_faces, parents_front, parents_back = [], [], [], []
+    for p in spanning.tolist():
+        start, end = int(offsets[p]), int(offsets[p + 1])
+        count = end - start
+        f = []
+        b = []
+        for k in range(start, end):
+            k_next = start + (k - start + 1) % count
+            vi, vj = indices[k], indices[k_next]
+            ti, tj = types[k], types[k_next]
+            if ti != BACK:
+                f.append(vi)
+            if ti != FRONT:
+                b.append(vi)
+            if (ti | tj) == SPANNING:
+                key = (vi, vj) if vi < vj else (vj, vi)
+                v = edge_points.get(key)
+                if v is None:
+                    if vi < vj:
+                        di, dj = distances[k], distances[k_next]
+                    else:
+                        di, dj = distances[k_next], distances[k]
+                    t = di / (di - dj)
+                    v0, v1 = verts[key[0]], verts[key[1]]
+                    new_points.append(v0 + (v1 - v0) * t)
+                    v = next_index
+                    next_index += 1
+                    edge_points[key] = v
+                f.append(v)
+                b.append(v)
+        if len(f) >= 3:
+            front_faces.append(f)
+            parents_front.append(p)
+        if len(b) >= 3:
+            back_faces.append(b)
+            parents_back.append(p)
+    pool.extend(new_points)
+
+    def fragments(faces, parents):
+        return CSGPolygonSet.from_lists(faces, polygons.normals[parents], polygons.ws[parents], polygons.tags[parents])
+
+    front = CSGPolygonSet.concatenate([front, fragments(front_faces, parents_front)])
+    back = CSGPolygonSet.concatenate([back, fragments(back_faces, parents_back)])
+    return coplanar_front, coplanar_back, front, back
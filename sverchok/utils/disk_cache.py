@@ -0,0 +1,351 @@
+# This file is part of project Sverchok. It's copyrighted by the contributors
+# recorded in the version control history of the file, available from
+# its original location https://github.com/nortikin/sverchok/commit/master
+#
+# SPDX-License-Identifier: GPL3
+# License-Filename: LICENSE
+
+"""
+Persistent content-addressed cache of node outputs.
+
+Nodes opt in by declaring
+
+    sv_disk_cache = True
+
+in their class, and bump
+
+    sv_cache_version = 1
+
+whenever a change of process() makes entries stored before it invalid.
+When the cache is enabled in preferences, the update system builds a key
+from sverchok version, node type and cache version, node properties and
+hashes of input data;
+if outputs for this key are stored on disk, they are loaded instead of
+calling node.process(), otherwise the node is processed and its outputs
+are stored.
+
+Numeric data is stored as .npy files; nested lists of numbers (with
+tuples at the innermost level, like vertices) are loaded back as such,
+edges and polygons are loaded as SvRaggedArray, which non array-aware
+nodes get converted to lists on read. Arrays are loaded memory-mapped,
+read-only, for nodes declaring sv_array_aware, and as copies otherwise.
+Outputs holding anything else (Vectors, Matrices, objects...) are not
+cached: the cache directory may be shared, so nothing is unpickled from it.
+The total size of the cache directory is kept under a limit by removing
+least recently used entries.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+import bpy
+
+import sverchok
+from sverchok.core.socket_data import socket_data_cache, sv_data_hash, SvSetSocket
+from sverchok.utils.array_data import SvRaggedArray
+from sverchok.utils.logging import debug, exception
+
+# node properties which do not affect the result
+skip_properties = {'n_id'}
+
+_disk_cache = None
+
+
+def node_cache_key(node):
+    """
+    Hex key of sverchok version, node type, node properties and input data,
+    or None if some input data can't be hashed.
+    """
+    hasher = hashlib.blake2b(digest_size=20)
+    hasher.update(repr(tuple(sverchok.bl_info['version'])).encode())
+    hasher.update(node.bl_idname.encode())
+    hasher.update(repr(getattr(node, "sv_cache_version", 0)).encode())
+
+    for prop in node.bl_rna.properties:
+        if not prop.is_runtime or prop.identifier in skip_properties:
+            continue
+        value = getattr(node, prop.identifier)
+        if hasattr(value, "__len__") and not isinstance(value, str):
+            value = tuple(value)
+        hasher.update(f"{prop.identifier}={value!r};".encode())
+
+    tree_data = socket_data_cache.get(node.id_data.name, {})
+    for socket in node.inputs:
+        hasher.update(socket.identifier.encode())
+        if socket.is_linked:
+            other = socket.other
+            if other is None or other.socket_id not in tree_data:
+                return None
+            digest = sv_data_hash(tree_data[other.socket_id])
+            if digest is None:
+                return None
+            hasher.update(digest)
+        elif getattr(socket, "use_prop", False) and hasattr(socket, "prop"):
+            hasher.update(repr(tuple(socket.prop)).encode())
+
+    return hasher.hexdigest()
+
+
+def _list_kind(item, ndim):
+    """
+    "list" if item is nested lists of ndim levels of python numbers of one type,
+    "tuples" if the innermost level is tuples, None if tolist() can't restore it
+    """
+    level = [item]
+    tuples = False
+    for depth in range(ndim):
+        types = set(map(type, level))
+        if types == {tuple} and depth == ndim - 1 and depth > 0:
+            tuples = True
+        elif types != {list}:
+            return None
+        level = [x for container in level for x in container]
+    types = set(map(type, level))
+    if len(types) > 1 or not types <= {int, float, bool}:
+        return None
+    return "tuples" if tuples else "list"
+
+
+def _to_tuples(items, depth):
+    if depth == 1:
+        return list(map(tuple, items))
+    return [_to_tuples(item, depth - 1) for item in items]
+
+
+def _encode_item(item, path, name):
+    """Store one object of socket data, return its description"""
+    if isinstance(item, SvRaggedArray):
+        np.save(os.path.join(path, name + "_i.npy"), item.indices)
+        np.save(os.path.join(path, name + "_o.npy"), item.offsets)
+        return "ragged"
+    if isinstance(item, np.ndarray):
+        if item.dtype.hasobject:
+            raise TypeError
+        np.save(os.path.join(path, name + ".npy"), item)
+        return "array"
+    try:
+        array = np.array(item)
+    except ValueError:
+        # ragged lists, with recent numpy versions
+        array = None
+    if array is not None and array.dtype.kind in "biuf":
+        kind = _list_kind(item, array.ndim)
+        if kind is None:
+            # Vectors, Matrices or mixed types would come back as plain lists
+            raise TypeError
+        np.save(os.path.join(path, name + ".npy"), array)
+        return kind
+    if item and all(type(i) is list and all(type(j) is int for j in i) for i in item):
+        return _encode_item(SvRaggedArray.from_lists(item), path, name)
+    raise TypeError
+
+
+def _entry_size(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path))
+
+
+def _decode_item(kind, path, name, copy=True):
+    """Load one object of socket data; arrays are read-only memory maps unless copy is set"""
+    mmap_mode = None if copy else 'r'
+    load = lambda file: np.load(file, mmap_mode=mmap_mode, allow_pickle=False)
+    if kind == "ragged":
+        return SvRaggedArray(load(os.path.join(path, name + "_i.npy")),
+                             load(os.path.join(path, name + "_o.npy")))
+    if kind == "array":
+        return load(os.path.join(path, name + ".npy"))
+    array = np.load(os.path.join(path, name + ".npy"), mmap_mode='r', allow_pickle=False)
+    if kind == "tuples":
+        return _to_tuples(array.tolist(), array.ndim - 1)
+    return array.tolist()
+
+
+class DiskCache(object):
+    def __init__(self, directory, max_size):
+        self.directory = directory
+        self.max_size = max_size
+        # total size of entries, counted once and then updated on store
+        self.size = None
+
+    def entry_path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def has_entry(self, key):
+        return os.path.exists(os.path.join(self.entry_path(key), "meta.json"))
+
+    def load(self, node, key):
+        """Set outputs of node from cache entry, return False if there is no entry"""
+        path = self.entry_path(key)
+        meta_path = os.path.join(path, "meta.json")
+        if not self.has_entry(key):
+            return False
+        with open(meta_path) as meta_file:
+            meta = json.load(meta_file)
+        if any(s.is_linked and s.identifier not in meta for s in node.outputs):
+            return False
+
+        # memory maps can't be written to, only array aware nodes get them
+        copy = not getattr(node, "sv_array_aware", False)
+        outputs = {}
+        for identifier, kinds in meta.items():
+            if not isinstance(kinds, list):
+                # pickled outputs of entries stored by older versions
+                return False
+            outputs[identifier] = [_decode_item(kind, path, f"{identifier}_{i}", copy) for i, kind in enumerate(kinds)]
+
+        for socket in node.outputs:
+            if socket.identifier in outputs:
+                SvSetSocket(socket, outputs[socket.identifier])
+        # mark the entry as recently used
+        os.utime(meta_path)
+        return True
+
+    def store(self, node, key):
+        tree_data = socket_data_cache.get(node.id_data.name, {})
+        tmp_path = tempfile.mkdtemp(dir=self.directory)
+        try:
+            meta = {}
+            for socket in node.outputs:
+                if socket.socket_id not in tree_data:
+                    continue
+                data = tree_data[socket.socket_id]
+                identifier = socket.identifier
+                try:
+                    meta[identifier] = [_encode_item(item, tmp_path, f"{identifier}_{i}") for i, item in enumerate(data)]
+                except (TypeError, ValueError):
+                    debug("Output %s of %s can't be stored in disk cache", identifier, node.name)
+                    shutil.rmtree(tmp_path, ignore_errors=True)
+                    return
+            with open(os.path.join(tmp_path, "meta.json"), "w") as meta_file:
+                json.dump(meta, meta_file)
+
+            if self.size is None:
+                self.size = sum(size for _, size, _ in self.entries())
+            path = self.entry_path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if os.path.exists(path):
+                self.size -= _entry_size(path)
+                shutil.rmtree(path, ignore_errors=True)
+            size = _entry_size(tmp_path)
+            os.rename(tmp_path, path)
+            self.size += size
+        except Exception:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+        if self.size > self.max_size:
+            self.evict()
+
+    def entries(self):
+        """list of (last use time, size, path) of all cache entries"""
+        result = []
+        for prefix in os.listdir(self.directory):
+            prefix_path = os.path.join(self.directory, prefix)
+            if not os.path.isdir(prefix_path) or len(prefix) != 2:
+                continue
+            for key in os.listdir(prefix_path):
+                path = os.path.join(prefix_path, key)
+                meta_path = os.path.join(path, "meta.json")
+                if not os.path.exists(meta_path):
+                    continue
+                result.append((os.path.getmtime(meta_path), _entry_size(path), path))
+        return result
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits into max_size.
+        Scans the whole directory, so that entries stored by other
+        processes sharing it are counted too.
+        """
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+        self.size = total
+
+    def clear(self):
+        for _, _, path in self.entries():
+            shutil.rmtree(path, ignore_errors=True)
+        self.size = None
+
+
+def get_disk_cache():
+    """DiskCache configured in preferences, or None if disk cache is disabled"""
+    global _disk_cache
+    if _disk_cache is None:
+        from sverchok.utils.context_managers import sv_preferences
+        with sv_preferences() as prefs:
+            if not prefs.disk_cache_enabled:
+                _disk_cache = False
+            else:
+                directory = bpy.path.abspath(prefs.disk_cache_path)
+                os.makedirs(directory, exist_ok=True)
+                _disk_cache = DiskCache(directory, prefs.disk_cache_size * 2**20)
+    return _disk_cache or None
+
+
+def reset_disk_cache(self=None, context=None):
+    """update callback of preferences: re-read disk cache settings on next use"""
+    global _disk_cache
+    _disk_cache = None
+
+
+def cache_entry(node, cache):
+    """
+    Key of node in cache, or None if the node doesn't use the cache
+    or some input data can't be hashed. Reads node and socket properties,
+    so it has to be called from the main thread.
+    """
+    if cache is None or not getattr(node, "sv_disk_cache", False):
+        return None
+    return node_cache_key(node)
+
+
+def load_cached(node, cache, key):
+    """Set outputs of node from cache entry, return False if there is no usable entry"""
+    try:
+        if cache.load(node, key):
+            debug("Loaded %s from disk cache", node.name)
+            return True
+    except Exception as err:
+        exception("Can't load disk cache entry of %s: %s", node.name, err)
+    return False
+
+
+def store_cached(node, cache, key):
+    """Store outputs of processed node in cache entry"""
+    try:
+        cache.store(node, key)
+    except Exception as err:
+        exception("Can't store disk cache entry of %s: %s", node.name, err)
+
+
+def process_cached(node, cache=None):
+    """
+    Process node through disk cache, if the node opted in and cache is enabled
+    (cache is the configured one if not given). Returns True if node was
+    processed (or loaded from cache), False otherwise.
+    """
+    if not getattr(node, "sv_disk_cache", False):
+        return False
+    if cache is None:
+        cache = get_disk_cache()
+    key = cache_entry(node, cache)
+    if key is None:
+        return False
+
+    process_entry(node, cache, key)
+    return True
+
+
+def process_entry(node, cache, key):
+    """Load outputs of node from cache entry, or process node and store them there"""
+    if not load_cached(node, cache, key):
+        node.process()
+        store_cached(node, cache, key)
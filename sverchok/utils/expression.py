@@ -0,0 +1,331 @@
+# This file is part of project Sverchok. It's copyrighted by the contributors
+# recorded in the version control history of the file, available from
+# its original location https://github.com/nortikin/sverchok/commit/master
+#
+# SPDX-License-Identifier: GPL3
+# License-Filename: LICENSE
+
+"""
+Formulas compiled once and evaluated over whole arrays.
+
+    expr = compile_expression("sin(x) * r", owner=node_id(node))
+    values = expr.eval_all({'x': xs, 'r': rs}, len(xs))
+
+A formula is parsed and compiled once and kept in cache per owner (node)
+and formula string. If it uses only arithmetic and functions which have
+numpy counterparts, and all variables are 1D numeric sequences, it is
+evaluated for all elements in one go; otherwise, or if numpy evaluation
+fails (division by zero, domain errors and so on), it is evaluated
+element by element, exactly as before.
+"""
+
+import ast
+from math import (
+        acos, acosh, asin, asinh, atan, atan2,
+        atanh, ceil, copysign, cos, cosh, degrees,
+        erf, erfc, exp, expm1, fabs, factorial, floor,
+        fmod, frexp, fsum, gamma, hypot, isfinite, isinf,
+        isnan, ldexp, lgamma, log, log10, log1p, log2, modf,
+        pow, radians, sin, sinh, sqrt, tan, tanh, trunc, e, pi)
+
+import numpy as np
+from mathutils import Vector, Matrix
+
+from sverchok.utils import logging
+
+
+def make_functions_dict(*functions):
+    return dict([(function.__name__, function) for function in functions])
+
+# Standard functions which for some reasons are not in the math module
+def sign(x):
+    if x < 0:
+        return -1
+    elif x > 0:
+        return 1
+    else:
+        return 0
+
+# Functions
+safe_names = make_functions_dict(
+        # From math module
+        acos, acosh, asin, asinh, atan, atan2,
+        atanh, ceil, copysign, cos, cosh, degrees,
+        erf, erfc, exp, expm1, fabs, factorial, floor,
+        fmod, frexp, fsum, gamma, hypot, isfinite, isinf,
+        isnan, ldexp, lgamma, log, log10, log1p, log2, modf,
+        pow, radians, sin, sinh, sqrt, tan, tanh, trunc,
+        # Additional functions
+        abs, sign,
+        # From mathutlis module
+        Vector, Matrix,
+        # Python type conversions
+        tuple, list, str
+    )
+# Constants
+safe_names['e'] = e
+safe_names['pi'] = pi
+
+
+def _log(x, base=None):
+    if base is None:
+        return np.log(x)
+    return np.log(x) / np.log(base)
+
+def _as_int(function):
+    def wrapper(*args):
+        return function(*args).astype(np.int64)
+    return wrapper
+
+def _as_float(function):
+    def wrapper(x, *args):
+        return function(np.asarray(x, dtype=np.float64), *args)
+    return wrapper
+
+# numpy counterparts of safe_names, giving the same results for numbers
+vector_names = dict(
+        acos=np.arccos, acosh=np.arccosh, asin=np.arcsin, asinh=np.arcsinh,
+        atan=np.arctan, atan2=np.arctan2, atanh=np.arctanh,
+        ceil=_as_int(np.ceil), copysign=np.copysign, cos=np.cos, cosh=np.cosh,
+        degrees=np.degrees, exp=np.exp, expm1=np.expm1, fabs=np.fabs,
+        floor=_as_int(np.floor), fmod=_as_float(np.fmod), hypot=np.hypot,
+        isfinite=np.isfinite, isinf=np.isinf, isnan=np.isnan, ldexp=np.ldexp,
+        log=_log, log10=np.log10, log1p=np.log1p, log2=np.log2,
+        pow=np.float_power, radians=np.radians, sin=np.sin, sinh=np.sinh,
+        sqrt=np.sqrt, tan=np.tan, tanh=np.tanh, trunc=_as_int(np.trunc),
+        abs=np.abs, sign=_as_int(np.sign),
+        e=e, pi=pi)
+
+# exceptions meaning "this can't be evaluated with numpy, evaluate per element"
+vector_errors = (FloatingPointError, ValueError, TypeError, ZeroDivisionError, OverflowError, IndexError)
+
+# integer numpy arrays overflow silently where python ints do not
+_int_unsafe_ops = (ast.Pow, ast.LShift, ast.Mult)
+
+_vector_nodes = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Name, ast.Constant, ast.Load,
+                 ast.operator, ast.unaryop, ast.cmpop)
+
+
+class VariableCollector(ast.NodeVisitor):
+    """
+    Visitor class to collect free variable names from the expression.
+    The problem is that one doesn't just select all names from expression:
+    there can be local-only variables.
+
+    For example, in
+
+        [g*g for g in lst]
+
+    only "lst" should be considered as a free variable, "g" should be not,
+    as it is bound by list comprehension scope.
+
+    This implementation is not exactly complete (at least, dictionary comprehensions
+    are not supported yet). But it works for most cases.
+
+    Please refer to ast.NodeVisitor class documentation for general reference.
+    """
+    def __init__(self):
+        self.variables = set()
+        # Stack of local variables
+        # It is not enough to track just a plain set of names,
+        # since one name can be re-introduced in the nested scope
+        self.local_vars = []
+
+    def push(self, local_vars):
+        self.local_vars.append(local_vars)
+
+    def pop(self):
+        return self.local_vars.pop()
+
+    def is_local(self, name):
+        """
+        Check if name is local variable
+        """
+
+        for stack_frame in self.local_vars:
+            if name in stack_frame:
+                return True
+        return False
+
+    def visit_SetComp(self, node):
+        local_vars = set()
+        for generator in node.generators:
+            if isinstance(generator.target, ast.Name):
+                local_vars.add(generator.target.id)
+        self.push(local_vars)
+        self.generic_visit(node)
+        self.pop()
+
+    def visit_ListComp(self, node):
+        local_vars = set()
+        for generator in node.generators:
+            if isinstance(generator.target, ast.Name):
+                local_vars.add(generator.target.id)
+        self.push(local_vars)
+        self.generic_visit(node)
+        self.pop()
+
+    def visit_Lambda(self, node):
+        local_vars = set()
+        arguments = node.args
+        for arg in arguments.args:
+            local_vars.add(arg.id)
+        if arguments.vararg:
+            local_vars.add(arguments.vararg.arg)
+        self.push(local_vars)
+        self.generic_visit(node)
+        self.pop()
+
+    def visit_Name(self, node):
+        name = node.id
+        if not self.is_local(name):
+            self.variables.add(name)
+
+        self.generic_visit(node)
+
+
+def is_vectorizable(root, variables):
+    """
+    Check that expression uses only operations which work on numpy arrays
+    the same way as on numbers: arithmetic, single comparisons and calls
+    of functions from vector_names.
+    """
+    for node in ast.walk(root):
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in vector_names or node.keywords:
+                return False
+        elif isinstance(node, ast.Compare):
+            if len(node.ops) > 1:
+                return False
+        elif isinstance(node, ast.Name):
+            if node.id not in variables and node.id not in vector_names:
+                return False
+        elif not isinstance(node, _vector_nodes):
+            return False
+    return True
+
+
+class SvExpression(object):
+    """
+    Parsed and compiled formula.
+    """
+    def __init__(self, string):
+        self.string = string.strip()
+        try:
+            root = ast.parse(self.string, mode='eval')
+        except SyntaxError as e:
+            logging.exception(e)
+            raise Exception("Invalid expression syntax: " + str(e))
+        visitor = VariableCollector()
+        visitor.visit(root)
+        self.names = visitor.variables
+        self.variables = self.names.difference(safe_names.keys())
+        self.code = compile(root, "<expression>", 'eval')
+        self.vectorizable = is_vectorizable(root, self.variables)
+        self.int_unsafe = any(isinstance(node, _int_unsafe_ops) for node in ast.walk(root))
+
+    def __repr__(self):
+        return "SvExpression({!r})".format(self.string)
+
+    def eval(self, variables):
+        """
+        Evaluate for one set of variable values, allowing only functions
+        known to be "safe" to be used.
+        """
+        env = dict(safe_names)
+        env.update(variables)
+        env["__builtins__"] = {}
+        return eval(self.code, env)
+
+    def eval_arrays(self, arrays, count):
+        """
+        Evaluate with numpy for arrays of variable values.
+        Returns array of count values, or None if that is not possible.
+        """
+        if not self.vectorizable:
+            return None
+        env = dict(vector_names)
+        for name in self.variables:
+            if name not in arrays:
+                return None
+            try:
+                # ragged values can't be converted, they are evaluated one by one
+                array = np.asarray(arrays[name])
+            except vector_errors:
+                return None
+            if array.ndim > 1 or array.dtype.kind not in 'biuf':
+                return None
+            if self.int_unsafe and array.dtype.kind in 'iu':
+                return None
+            env[name] = array
+        env["__builtins__"] = {}
+        try:
+            with np.errstate(divide='raise', invalid='raise', over='raise', under='ignore'):
+                result = eval(self.code, env)
+        except vector_errors:
+            return None
+        result = np.asarray(result)
+        if result.ndim == 0 and result.dtype.kind in 'biuf':
+            return np.full(count, result)
+        if result.shape != (count,):
+            return None
+        return result
+
+    def eval_all(self, variables, count):
+        """
+        Evaluate for count sets of values; variables is a dict of name: sequence of values.
+        Returns list of count results.
+        """
+        result = self.eval_arrays(variables, count)
+        if result is not None:
+            return result.tolist()
+        names = [name for name in self.variables if name in variables]
+        columns = [variables[name] for name in names]
+        return [self.eval(dict(zip(names, values))) for values in zip(*columns)] if names \
+                else [self.eval({}) for _ in range(count)]
+
+
+# owner: {formula string: SvExpression}
+expression_cache = dict()
+max_expressions_per_owner = 32
+
+
+def compile_expression(string, owner=None):
+    """
+    SvExpression for the formula, compiled once per owner (f.ex. node id) and string.
+    """
+    expressions = expression_cache.setdefault(owner, dict())
+    expression = expressions.get(string)
+    if expression is None:
+        if len(expressions) >= max_expressions_per_owner:
+            # formulas are edited one by one; forget the oldest one
+            del expressions[next(iter(expressions))]
+        expression = SvExpression(string)
+        expressions[string] = expression
+    return expression
+
+
+def forget_expressions(owner):
+    expression_cache.pop(owner, None)
+
+
+def get_variables(string):
+    """
+    Get set of free variables used by formula
+    """
+    string = string.strip()
+    if not len(string):
+        return set()
+    root = ast.parse(string, mode='eval')
+    visitor = VariableCollector()
+    visitor.visit(root)
+    result = visitor.variables
+    return result.difference(safe_names.keys())
+
+
+def safe_eval(string, variables):
+    """
+    Evaluate expression, allowing only functions known to be "safe"
+    to be used.
+    """
+    return compile_expression(string).eval(variables)
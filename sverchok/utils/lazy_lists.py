@@ -0,0 +1,203 @@
+# This file is part of project Sverchok. It's copyrighted by the contributors
+# recorded in the version control history of the file, available from
+# its original location https://github.com/nortikin/sverchok/commit/master
+#
+# SPDX-License-Identifier: GPL3
+# License-Filename: LICENSE
+
+"""
+Lazy list levels for list matching and repeating.
+
+When a short list is matched against a long one, the padded list is not
+built: SvLazyList is a read-only view which gives items of the base list
+by index, repeating its last item or cycling it. A single matrix matched
+against a million vertices is then one view instead of a million item list.
+
+Nodes which only read their inputs by len(), indexing and iteration can
+work with such views; they declare
+
+    sv_lazy_aware = True
+
+in their class, and mark data with lazy levels they output with
+lazy_levels(data, depth). For all other nodes the update system
+materializes views into python lists when the node reads the socket,
+so that they get exactly the same data as before.
+"""
+
+import itertools
+
+REPEAT = 'REPEAT'
+CYCLE = 'CYCLE'
+
+
+class SvLazyList(object):
+    """
+    Read-only list of count items of base: item i is base[start + i],
+    with indices past the end of base taken as the last one (REPEAT)
+    or wrapped around (CYCLE). Base must not be empty.
+    """
+    __slots__ = ('base', 'count', 'mode', 'start', '_list')
+
+    def __init__(self, base, count, mode=REPEAT, start=0):
+        self.base = base
+        self.count = count
+        self.mode = mode
+        self.start = start % len(base) if mode == CYCLE else start
+        self._list = None
+
+    def _base_index(self, idx):
+        idx += self.start
+        if self.mode == CYCLE:
+            return idx % len(self.base)
+        return min(idx, len(self.base) - 1)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(self.count))]
+        if idx < 0:
+            idx += self.count
+        if not 0 <= idx < self.count:
+            raise IndexError("SvLazyList index out of range")
+        return self.base[self._base_index(idx)]
+
+    def __iter__(self):
+        if self._list is not None:
+            return iter(self._list)
+        base = self.base
+        size = len(base)
+        if self.mode == CYCLE:
+            items = itertools.islice(itertools.cycle(base), self.start, self.start + self.count)
+        elif self.start + self.count <= size:
+            items = itertools.islice(base, self.start, self.start + self.count)
+        else:
+            head = itertools.islice(base, self.start, size)
+            items = itertools.chain(head, itertools.repeat(base[-1], self.count - max(size - self.start, 0)))
+        return items
+
+    def __eq__(self, other):
+        if isinstance(other, (SvLazyList, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def to_list(self):
+        """list of the items (not copied); computed once and cached"""
+        if self._list is None:
+            self._list = list(self)
+        return self._list
+
+    def __repr__(self):
+        return f"SvLazyList({self.base!r}, {self.count}, {self.mode!r}, {self.start})"
+
+
+class SvLazyLevels(list):
+    """
+    Socket data which holds SvLazyList views at levels up to depth
+    (0 meaning items of this list, 1 items of its items and so on).
+    """
+    def __init__(self, items, depth):
+        super().__init__(items)
+        self.depth = depth
+        self.lists = None
+
+
+def lazy_levels(data, depth):
+    """mark data as holding views up to depth (see SvLazyLevels)"""
+    return SvLazyLevels(data, max(depth, lazy_depth(data)))
+
+
+def lazy_depth(data):
+    """depth of views in data, -1 if it has none"""
+    return data.depth if isinstance(data, SvLazyLevels) else -1
+
+
+def has_lazy_data(data):
+    return isinstance(data, (SvLazyLevels, SvLazyList))
+
+
+def _materialize(data, depth):
+    if isinstance(data, SvLazyList):
+        items = data.to_list()
+    elif isinstance(data, (list, tuple)):
+        items = data
+    else:
+        return data
+    if depth > 0:
+        items = [_materialize(item, depth - 1) for item in items]
+    elif isinstance(data, SvLazyLevels):
+        items = list(items)
+    if isinstance(data, tuple):
+        return tuple(items)
+    return items
+
+
+def lazy_to_lists(data):
+    """
+    Convert views in data to python lists, for nodes which are not
+    lazy aware. Other data is returned as is.
+    """
+    if isinstance(data, SvLazyLevels):
+        # computed once for all nodes reading the socket
+        if data.lists is None:
+            data.lists = _materialize(data, data.depth + 1)
+        return data.lists
+    if isinstance(data, SvLazyList):
+        return _materialize(data, 1)
+    return data
+
+
+def is_list(data):
+    """check for list, tuple or a view"""
+    return isinstance(data, (list, tuple, SvLazyList))
+
+
+def _as_list(lst):
+    # matching functions of data_structure always give lists
+    return list(lst) if isinstance(lst, tuple) else lst
+
+
+def repeat_last_view(lst, count):
+    """lst padded with its last item to count items, as a view if needed"""
+    if len(lst) == count:
+        return _as_list(lst)
+    return SvLazyList(lst, count, REPEAT)
+
+
+def cycle_view(lst, count):
+    """lst cycled to count items, as a view if needed"""
+    if len(lst) == count:
+        return _as_list(lst)
+    return SvLazyList(lst, count, CYCLE)
+
+
+def rotate_view(lst, shift):
+    """view of lst rotated right by shift, as collections.deque.rotate does"""
+    if not lst or shift % len(lst) == 0:
+        return _as_list(lst)
+    return SvLazyList(lst, len(lst), CYCLE, -shift)
+
+
+def lazy_match_long_repeat(lsts):
+    """match_long_repeat giving views instead of padded copies of the shorter lists"""
+    if not lsts or not all(len(l) for l in lsts):
+        return []
+    max_l = max(len(l) for l in lsts)
+    return [repeat_last_view(l, max_l) for l in lsts]
+
+
+def lazy_match_long_cycle(lsts):
+    """match_long_cycle giving views instead of cycled copies of the shorter lists"""
+    if not lsts or not all(len(l) for l in lsts):
+        return []
+    max_l = max(len(l) for l in lsts)
+    return [cycle_view(l, max_l) for l in lsts]
+
+
+def lazy_match_short(lsts):
+    """match_short giving views of the beginning of the longer lists"""
+    if not lsts or not all(len(l) for l in lsts):
+        return []
+    min_l = min(len(l) for l in lsts)
+    return [repeat_last_view(l, min_l) for l in lsts]
@@ -0,0 +1,371 @@
+# This file is part of project Sverchok. It's copyrighted by the contributors
+# recorded in the version control history of the file, available from
+# its original location https://github.com/nortikin/sverchok/commit/master
+#
+# SPDX-License-Identifier: GPL3
+# License-Filename: LICENSE
+
+"""
+Array-backed matrix socket data.
+
+A list of matrices is passed as SvMatrixArray: one contiguous (N, 4, 4)
+float array, row-major as mathutils.Matrix is indexed (m[i][j] is row i,
+column j; translation in the last column). Functions below compose,
+invert, interpolate and apply such arrays without python loops.
+
+Nodes which can work with such data declare
+
+    sv_matrix_aware = True
+
+in their class. For all other nodes (and for implicit conversions to
+other socket types) the update system converts SvMatrixArray to a list
+of mathutils.Matrix when the node reads the socket; the conversion is
+done once per array and cached.
+"""
+
+import numpy as np
+from mathutils import Matrix
+
+
+class SvMatrixArray(object):
+    """
+    List of 4x4 matrices stored as (N, 4, 4) array.
+    Items are given as mathutils.Matrix, to read the array use .array.
+    """
+    __slots__ = ('array', '_matrices')
+
+    def __init__(self, array):
+        self.array = np.asarray(array, dtype=np.float64).reshape((-1, 4, 4))
+        self._matrices = None
+
+    @classmethod
+    def from_matrices(cls, matrices):
+        """build from list of mathutils.Matrix or nested lists"""
+        return cls(matrices_to_array(matrices))
+
+    def to_matrices(self):
+        """return list of mathutils.Matrix; computed once and cached"""
+        if self._matrices is None:
+            self._matrices = [Matrix(m) for m in self.array.tolist()]
+        return self._matrices
+
+    def __len__(self):
+        return len(self.array)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return SvMatrixArray(self.array[idx])
+        if self._matrices is not None:
+            return self._matrices[idx]
+        return Matrix(self.array[idx].tolist())
+
+    def __iter__(self):
+        return iter(self.to_matrices())
+
+    def __repr__(self):
+        return f"SvMatrixArray({len(self)} matrices)"
+
+
+def has_matrix_array(data):
+    return isinstance(data, SvMatrixArray)
+
+
+def matrices_to_lists(data):
+    """
+    Convert SvMatrixArray to list of mathutils.Matrix, for nodes which
+    are not matrix aware. Other data is returned as is.
+    """
+    if isinstance(data, SvMatrixArray):
+        return data.to_matrices()
+    return data
+
+
+def matrices_to_array(matrices):
+    """(N, 4, 4) array of SvMatrixArray, array or list of matrices"""
+    if isinstance(matrices, SvMatrixArray):
+        return matrices.array
+    if isinstance(matrices, np.ndarray):
+        return matrices.reshape((-1, 4, 4)).astype(np.float64, copy=False)
+    if len(matrices) == 0:
+        return np.empty((0, 4, 4))
+    if isinstance(matrices[0], Matrix):
+        return np.array([[row[:] for row in m] for m in matrices], dtype=np.float64)
+    return np.array(matrices, dtype=np.float64).reshape((-1, 4, 4))
+
+
+def repeat_last_index(size, count):
+    """indices 0, 1, .. size-1, size-1, .. of count items, as match_long_repeat pads lists"""
+    return np.minimum(np.arange(count), size - 1)
+
+
+def identity_matrices(count):
+    return np.broadcast_to(np.eye(4), (count, 4, 4)).copy()
+
+
+def translation_matrices(locations):
+    locations = np.asarray(locations, dtype=np.float64).reshape((-1, 3))
+    matrices = identity_matrices(len(locations))
+    matrices[:, :3, 3] = locations
+    return matrices
+
+
+def scale_matrices(scales):
+    scales = np.asarray(scales, dtype=np.float64).reshape((-1, 3))
+    matrices = identity_matrices(len(scales))
+    matrices[:, 0, 0], matrices[:, 1, 1], matrices[:, 2, 2] = scales.T
+    return matrices
+
+
+def _normalized(vectors):
+    lengths = np.linalg.norm(vectors, axis=1)
+    safe = np.where(lengths > 0, lengths, 1.0)
+    return vectors / safe[:, None], lengths
+
+
+def axis_angle_matrices(axes, angles):
+    """rotation matrices as Matrix.Rotation(angle, 4, axis), angles in radians"""
+    axes, lengths = _normalized(np.asarray(axes, dtype=np.float64).reshape((-1, 3)))
+    angles = np.where(lengths > 0, np.broadcast_to(np.asarray(angles, dtype=np.float64), lengths.shape), 0.0)
+    x, y, z = axes.T
+    cos, sin = np.cos(angles), np.sin(angles)
+    t = 1.0 - cos
+    matrices = identity_matrices(len(axes))
+    matrices[:, 0, 0] = t * x * x + cos
+    matrices[:, 0, 1] = t * x * y - sin * z
+    matrices[:, 0, 2] = t * x * z + sin * y
+    matrices[:, 1, 0] = t * x * y + sin * z
+    matrices[:, 1, 1] = t * y * y + cos
+    matrices[:, 1, 2] = t * y * z - sin * x
+    matrices[:, 2, 0] = t * x * z - sin * y
+    matrices[:, 2, 1] = t * y * z + sin * x
+    matrices[:, 2, 2] = t * z * z + cos
+    return matrices
+
+
+def _ortho_vectors(vectors):
+    # the same choice of perpendicular vector as Blender's ortho_v3_v3
+    x, y, z = vectors.T
+    ax, ay, az = np.abs(vectors).T
+    dominant = np.where(ax > ay, np.where(ax > az, 0, 2), np.where(ay > az, 1, 2))
+    ortho = np.empty_like(vectors)
+    ortho[:] = np.where((dominant == 0)[:, None], np.stack([-y - z, x, x], axis=1), ortho)
+    ortho[:] = np.where((dominant == 1)[:, None], np.stack([y, -x - z, y], axis=1), ortho)
+    ortho[:] = np.where((dominant == 2)[:, None], np.stack([z, z, -x - y], axis=1), ortho)
+    return ortho
+
+
+def rotation_difference_matrices(vectors_from, vectors_to):
+    """rotation matrices as vector_from.rotation_difference(vector_to).to_matrix().to_4x4()"""
+    vectors_from, _ = _normalized(np.asarray(vectors_from, dtype=np.float64).reshape((-1, 3)))
+    vectors_to, _ = _normalized(np.asarray(vectors_to, dtype=np.float64).reshape((-1, 3)))
+    axes, lengths = _normalized(np.cross(vectors_from, vectors_to))
+    dots = np.einsum('ij,ij->i', vectors_from, vectors_to)
+    angles = np.arccos(np.clip(dots, -1.0, 1.0))
+    degenerate = lengths <= np.finfo(np.float32).eps
+    opposite = degenerate & (dots <= 0.0)
+    if opposite.any():
+        axes[opposite] = _ortho_vectors(vectors_from[opposite])
+        angles[opposite] = np.pi
+    angles[degenerate & ~opposite] = 0.0
+    return axis_angle_matrices(axes, angles)
+
+
+def compose(*matrix_lists):
+    """
+    Products A @ B @ .. of matrix arrays, shorter arrays padded with
+    their last matrix as match_long_repeat does.
+    """
+    arrays = [matrices_to_array(matrices) for matrices in matrix_lists]
+    if any(len(array) == 0 for array in arrays):
+        return np.empty((0, 4, 4))
+    count = max(len(array) for array in arrays)
+    result = arrays[0][repeat_last_index(len(arrays[0]), count)]
+    for array in arrays[1:]:
+        result = np.matmul(result, array[repeat_last_index(len(array), count)])
+    return result
+
+
+def invert(matrices):
+    """inverted matrices; raises ValueError for singular ones, as Matrix.inverted() does"""
+    return np.linalg.inv(matrices_to_array(matrices))
+
+
+def _matrices_to_quaternions(rotations):
+    """(N, 4) quaternions (w, x, y, z) of (N, 3, 3) rotation matrices"""
+    (m00, m01, m02), (m10, m11, m12), (m20, m21, m22) = np.moveaxis(rotations, 0, -1)
+    trace = m00 + m11 + m22
+    # Shepperd's method: choose the largest of w, x, y, z to divide by;
+    # all four variants are computed for all matrices and picked from,
+    # that is cheaper than indexing by masks
+    diagonal = np.stack([trace, m00 - m11 - m22, m11 - m00 - m22, m22 - m00 - m11])
+    choice = np.argmax(np.stack([trace, m00, m11, m22]), axis=0)
+    s = np.sqrt(np.maximum(1.0 + diagonal, 0.0)) * 2.0
+    s = np.where(s > 0, s, 1.0)
+    a, b, c = m21 - m12, m02 - m20, m10 - m01
+    d, e, f = m01 + m10, m02 + m20, m12 + m21
+    variants = np.stack([
+        np.stack([0.25 * s[0], a / s[0], b / s[0], c / s[0]]),
+        np.stack([a / s[1], 0.25 * s[1], d / s[1], e / s[1]]),
+        np.stack([b / s[2], d / s[2], 0.25 * s[2], f / s[2]]),
+        np.stack([c / s[3], e / s[3], f / s[3], 0.25 * s[3]])])
+    quaternions = np.take_along_axis(variants, choice[None, None, :], axis=0)[0].T
+    return quaternions / np.linalg.norm(quaternions, axis=1)[:, None]
+
+
+def _quaternions_to_matrices(quaternions):
+    """(N, 3, 3) rotation matrices of (N, 4) unit quaternions (w, x, y, z)"""
+    w, x, y, z = quaternions.T
+    return np.stack([
+        np.stack([1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)], axis=1),
+        np.stack([2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)], axis=1),
+        np.stack([2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)], axis=1)], axis=1)
+
+
+def _slerp(q0, q1, factors):
+    dots = np.einsum('ij,ij->i', q0, q1)
+    # shortest way around
+    q1 = np.where((dots < 0)[:, None], -q1, q1)
+    dots = np.abs(dots)
+    angles = np.arccos(np.clip(dots, -1.0, 1.0))
+    sin = np.sin(angles)
+    close = sin < 1e-6
+    safe = np.where(close, 1.0, sin)
+    w0 = np.where(close, 1.0 - factors, np.sin((1.0 - factors) * angles) / safe)
+    w1 = np.where(close, factors, np.sin(factors * angles) / safe)
+    return w0[:, None] * q0 + w1[:, None] * q1
+
+
+def _polar_decompose(matrices, iterations=30, tolerance=1e-12):
+    """(N, 3, 3) matrices as rotation @ stretch, the rotation without axis flip"""
+    # scaled Newton iteration Q = (g Q + inverse(Q).T / g) / 2 converges
+    # to the orthogonal factor much faster than batched SVD.
+    # Q is kept as 9 rows of N components, arithmetic on whole rows
+    # is much faster than on the (N, 3, 3) layout
+    count = len(matrices)
+    rotations = np.ascontiguousarray(matrices.reshape((count, 9)).T)
+    singular = np.zeros(count, dtype=bool)
+    flip = np.zeros(count, dtype=bool)
+    # badly conditioned matrices need more steps, so only the ones
+    # not converged yet are iterated further
+    active = np.arange(count)
+    current = rotations
+    for step in range(iterations):
+        a, b, c, d, e, f, g, h, i = current
+        # cofactor matrix, that is inverse transposed times determinant
+        cofactors = np.array([e * i - f * h, f * g - d * i, d * h - e * g,
+                              c * h - b * i, a * i - c * g, b * g - a * h,
+                              b * f - c * e, c * d - a * f, a * e - b * d])
+        dets = a * cofactors[0] + b * cofactors[1] + c * cofactors[2]
+        if step == 0:
+            # Q keeps the sign of determinant of the matrix
+            flip = dets < 0
+        degenerate = np.abs(dets) < 1e-12
+        singular[active[degenerate]] = True
+        dets[degenerate] = 1.0
+        gamma = np.abs(dets) ** (-1.0 / 3.0)
+        updated = current * (0.5 * gamma)
+        cofactors *= 0.5 / (gamma * dets)
+        updated += cofactors
+        difference = updated - current
+        going = (np.einsum('ij,ij->j', difference, difference) >= tolerance ** 2) & ~degenerate
+        if not going.all():
+            done = ~going
+            rotations[:, active[done]] = updated[:, done]
+            active = active[going]
+            updated = updated[:, going]
+        current = updated
+        if not len(active):
+            break
+    rotations[:, active] = current
+    rotations = np.ascontiguousarray(rotations.T).reshape((count, 3, 3))
+    if singular.any():
+        u, s, vt = np.linalg.svd(matrices[singular])
+        rotations[singular] = u @ vt
+        flip[singular] = np.linalg.det(rotations[singular]) < 0
+    stretches = np.swapaxes(rotations, 1, 2) @ matrices
+    rotations[flip] *= -1
+    stretches[flip] *= -1
+    return rotations, stretches
+
+
+def interpolate(matrices_a, matrices_b, factors):
+    """
+    Interpolation of matrix arrays of the same length, as Matrix.lerp does:
+    rotations by quaternion slerp, scale/shear and translation linearly.
+    """
+    a = matrices_to_array(matrices_a)
+    b = matrices_to_array(matrices_b)
+    factors = np.broadcast_to(np.asarray(factors, dtype=np.float64), (len(a),))
+    rotation_a, stretch_a = _polar_decompose(a[:, :3, :3])
+    rotation_b, stretch_b = _polar_decompose(b[:, :3, :3])
+    quaternions = _slerp(_matrices_to_quaternions(rotation_a), _matrices_to_quaternions(rotation_b), factors)
+    quaternions /= np.linalg.norm(quaternions, axis=1)[:, None]
+    f = factors[:, None, None]
+    stretch = stretch_a * (1.0 - f) + stretch_b * f
+    result = identity_matrices(len(a))
+    result[:, :3, :3] = _quaternions_to_matrices(quaternions) @ stretch
+    result[:, :3, 3] = a[:, :3, 3] * (1.0 - f[:, 0]) + b[:, :3, 3] * f[:, 0]
+    return result
+
+
+def apply_to_vertices(matrices, vertices):
+    """
+    Matrices applied to points, as matrix @ Vector(v) does.
+    vertices is (V, 3), the same for all matrices, or (N, V, 3);
+    returns (N, V, 3) array.
+    """
+    matrices = matrices_to_array(matrices)
+    vertices = np.asarray(vertices, dtype=np.float64)
+    if vertices.ndim == 2:
+        return np.einsum('nij,vj->nvi', matrices[:, :3, :3], vertices) + matrices[:, None, :3, 3]
+    return np.einsum('nij,nvj->nvi', matrices[:, :3, :3], vertices) + matrices[:, None, :3, 3]
+
+
+def decompose(matrices):
+    """
+    Translations (N, 3), rotation matrices (N, 3, 3) and scales (N, 3)
+    of matrices, as Matrix.decompose() gives them.
+    """
+    matrices = matrices_to_array(matrices)
+    basis = matrices[:, :3, :3]
+    scales = np.linalg.norm(basis, axis=1)
+    negative = np.linalg.det(basis) < 0
+    scales[negative] *= -1
+    safe = np.where(scales != 0, scales, 1.0)
+    rotations = _quaternions_to_matrices(_matrices_to_quaternions(basis / safe[:, None, :]))
+    return matrices[:, :3, 3].copy(), rotations, scales
+
+
+def matrix_def_array(orig, loc, scale, rot, angle, vec_angle=[[]]):
+    """
+    Array version of data_structure.matrixdef: each of orig matrices
+    multiplied by translation, rotation (by axis and angle in degrees or by
+    rotation difference of two vectors) and scale of the first object of
+    loc, scale, rot, angle, vec_angle, shorter lists padded with their last item.
+    """
+    result = matrices_to_array(orig).copy()
+    count = len(result)
+
+    def first_object(data):
+        items = data[0] if len(data) else []
+        return np.asarray(items, dtype=np.float64) if len(items) else None
+
+    loc, scale, rot = first_object(loc), first_object(scale), first_object(rot)
+    angle, vec_angle = first_object(angle), first_object(vec_angle)
+
+    if loc is not None:
+        result = result @ translation_matrices(loc.reshape((-1, 3))[repeat_last_index(len(loc), count)])
+    if vec_angle is not None and rot is not None:
+        rot = rot.reshape((-1, 3))[repeat_last_index(len(rot), count)]
+        vec_angle = vec_angle.reshape((-1, 3))[repeat_last_index(len(vec_angle), count)]
+        result = result @ rotation_difference_matrices(rot, vec_angle)
+    elif rot is not None:
+        rot = rot.reshape((-1, 3))[repeat_last_index(len(rot), count)]
+        if angle is None:
+            angle = np.zeros(count)
+        else:
+            angle = np.radians(angle.ravel()[repeat_last_index(len(angle.ravel()), count)])
+        result = result @ axis_angle_matrices(rot, angle)
+    if scale is not None:
+        result = result @ scale_matrices(scale.reshape((-1, 3))[repeat_last_index(len(scale), count)])
+    return result
@@ -0,0 +1,362 @@
+# This file is part of project Sverchok. It's copyrighted by the contributors
+# recorded in the version control history of the file, available from
+# its original location https://github.com/nortikin/sverchok/commit/master
+#
+# SPDX-License-Identifier: GPL3
+# License-Filename: LICENSE
+
+"""
+Headless evaluation of a node tree over a grid of node property values.
+
+A sweep is described by a json file:
+
+    {
+        "layout": "tower.json",          (or "blend": "tower.blend", "tree": "NodeTree")
+        "grid": {
+            "Floors": {"int_": [10, 20, 40]},
+            "Twist": {"float_": [0.0, 0.5]}
+        },
+        "outputs": [["Mesh Out", "Vertices"], ["Mesh Out", "Polygons"]],
+        "bake": ["Viewer Draw"]
+    }
+
+Every combination of grid values is a variant (6 in this example). Variants
+are evaluated by a pool of background Blender instances; each instance
+loads the tree once, then takes variants one by one, sets the properties,
+processes the tree and
+
+  * for "outputs", saves data of these sockets to variant_NNNN.npz,
+    one array per object (index lists as flat "indices" and "offsets");
+  * for "bake", bakes these viewer nodes into objects, as the Bake button
+    does, and saves them to variant_NNNN.blend.
+
+Results and timings of all variants are written to results.json in the
+output directory. Paths in the sweep file are relative to the file.
+
+    $ ./run_sweep.sh sweep.json --workers 8 --out results/
+
+The driver itself does not need Blender; it can as well be run with plain
+python as utils/parameter_sweep.py.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+
+RESULT_PREFIX = "SV_SWEEP_RESULT "
+
+
+def expand_grid(grid):
+    """
+    All combinations of values of the grid {node name: {property: [values]}},
+    as list of overrides {node name: {property: value}}; last property changes fastest.
+    """
+    keys = [(node_name, name) for node_name, properties in grid.items() for name in properties]
+    value_lists = [grid[node_name][name] for node_name, name in keys]
+    variants = []
+    for values in itertools.product(*value_lists):
+        overrides = {}
+        for (node_name, name), value in zip(keys, values):
+            overrides.setdefault(node_name, {})[name] = value
+        variants.append(overrides)
+    return variants
+
+
+def variant_name(index):
+    return "variant_{:04d}".format(index)
+
+
+def load_sweep(path):
+    """read sweep json, making paths in it absolute"""
+    with open(path) as source:
+        spec = json.load(source)
+    base = os.path.dirname(os.path.abspath(path))
+    for key in ("layout", "blend"):
+        if spec.get(key):
+            spec[key] = os.path.join(base, spec[key])
+    if not spec.get("layout") and not spec.get("blend"):
+        raise ValueError("Sweep must name a json layout or a blend file")
+    return spec
+
+
+def format_result(result):
+    return RESULT_PREFIX + json.dumps(result)
+
+
+def parse_result(line):
+    """result dict printed by a worker, or None for other output"""
+    if line.startswith(RESULT_PREFIX):
+        return json.loads(line[len(RESULT_PREFIX):])
+    return None
+
+
+def summarize(results, duration):
+    """lines of report: one per variant and totals"""
+    lines = []
+    done = [result for result in results if not result.get("error")]
+    for result in results:
+        name = variant_name(result["index"])
+        if result.get("error"):
+            lines.append(f"{name}: FAILED {result['error']}")
+        else:
+            lines.append(f"{name}: process {result['process_time']:.3f} s, "
+                         f"save {result['save_time']:.3f} s, worker {result.get('worker', '?')}")
+    lines.append(f"{len(done)} of {len(results)} variants in {duration:.2f} s"
+                 + (f", {len(done) / duration:.2f} variants/s" if duration > 0 else ""))
+    return lines
+
+
+#####################################
+# worker, runs inside Blender       #
+#####################################
+
+def _load_tree(spec):
+    import bpy
+    from sverchok.utils.sv_IO_panel_tools import import_tree
+
+    if spec.get("layout"):
+        ng = bpy.data.node_groups.new("Sweep", "SverchCustomTreeType")
+        ng.sv_process = False
+        import_tree(ng, spec["layout"])
+        return ng
+    trees = [ng for ng in bpy.data.node_groups if ng.bl_idname == "SverchCustomTreeType"]
+    if spec.get("tree"):
+        return bpy.data.node_groups[spec["tree"]]
+    if not trees:
+        raise LookupError("No Sverchok tree in " + bpy.data.filepath)
+    return trees[0]
+
+
+def _array_items(key, data):
+    """flat dict of arrays for the socket data, one or two arrays per object"""
+    import numpy as np
+    from sverchok.utils.array_data import SvRaggedArray
+    from sverchok.utils.lazy_lists import lazy_to_lists
+
+    arrays = {}
+    for i, item in enumerate(lazy_to_lists(data)):
+        name = f"{key}:{i}"
+        if isinstance(item, SvRaggedArray):
+            arrays[name + ":indices"], arrays[name + ":offsets"] = item.indices, item.offsets
+            continue
+        try:
+            array = np.asarray(item)
+            if array.dtype.hasobject:
+                raise ValueError
+            arrays[name] = array
+        except ValueError:
+            ragged = SvRaggedArray.from_lists(item)
+            arrays[name + ":indices"], arrays[name + ":offsets"] = ragged.indices, ragged.offsets
+    return arrays
+
+
+def export_outputs(ng, outputs, path):
+    import numpy as np
+    from sverchok.core.socket_data import get_output_socket_data
+
+    arrays = {}
+    for node_name, socket_name in outputs:
+        data = get_output_socket_data(ng.nodes[node_name], socket_name)
+        arrays.update(_array_items(f"{node_name}:{socket_name}", data))
+    np.savez(path, **arrays)
+
+
+def bake_viewers(ng, node_names, path):
+    """bake viewer nodes into objects, save them to path, remove them again"""
+    import bpy
+
+    objects_before = set(bpy.data.objects)
+    try:
+        for node_name in node_names:
+            bpy.ops.node.sverchok_mesh_baker_mk3(idname=node_name, idtree=ng.name)
+        bpy.ops.wm.save_as_mainfile(filepath=path, copy=True)
+    finally:
+        for obj in set(bpy.data.objects) - objects_before:
+            mesh = obj.data
+            bpy.data.objects.remove(obj)
+            if mesh is not None and mesh.users == 0:
+                bpy.data.meshes.remove(mesh)
+
+
+def run_variant(ng, spec, overrides, out_dir, index):
+    from sverchok.core.update_system import process_tree
+
+    start = time.perf_counter()
+    # one update for all properties of the variant
+    ng.sv_process = False
+    for node_name, properties in overrides.items():
+        node = ng.nodes[node_name]
+        for name, value in properties.items():
+            setattr(node, name, value)
+    ng.sv_process = True
+    process_tree(ng)
+    process_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    files = []
+    name = os.path.join(out_dir, variant_name(index))
+    if spec.get("outputs"):
+        export_outputs(ng, spec["outputs"], name + ".npz")
+        files.append(name + ".npz")
+    if spec.get("bake"):
+        bake_viewers(ng, spec["bake"], name + ".blend")
+        files.append(name + ".blend")
+    save_time = time.perf_counter() - start
+
+    return {"index": index, "overrides": overrides, "process_time": process_time,
+            "save_time": save_time, "files": files}
+
+
+def worker_main(spec_path, out_dir):
+    """
+    Serve variants listed by index on stdin, one per line, until an empty line;
+    print result of each one to stdout.
+    """
+    import traceback
+    from sverchok.core.update_system import build_update_list
+
+    spec = load_sweep(spec_path)
+    variants = expand_grid(spec.get("grid", {}))
+    start = time.perf_counter()
+    ng = _load_tree(spec)
+    ng.sv_process = True
+    build_update_list(ng)
+    print(format_result({"ready": True, "setup_time": time.perf_counter() - start}), flush=True)
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            break
+        index = int(line)
+        try:
+            result = run_variant(ng, spec, variants[index], out_dir, index)
+        except Exception as e:
+            traceback.print_exc()
+            result = {"index": index, "overrides": variants[index], "error": repr(e)}
+        print(format_result(result), flush=True)
+    return 0
+
+
+#####################################
+# driver                            #
+#####################################
+
+def worker_command(blender, spec, spec_path, out_dir):
+    command = [blender, "-b"]
+    if spec.get("blend"):
+        command.append(spec["blend"])
+    command += ["--addons", "sverchok", "--python", os.path.abspath(__file__), "--python-exit-code", "1",
+                "--", "worker", os.path.abspath(spec_path), os.path.abspath(out_dir)]
+    return command
+
+
+def _read_result(process):
+    for line in process.stdout:
+        result = parse_result(line)
+        if result is not None:
+            return result
+    return None
+
+
+def _serve(command, todo, results, worker_id, log):
+    """run one Blender instance, feed it variants from todo until none are left"""
+    process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                               stderr=log, universal_newlines=True, bufsize=1)
+    try:
+        if _read_result(process) is None:
+            return
+        while True:
+            try:
+                index = todo.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                process.stdin.write(f"{index}\n")
+                process.stdin.flush()
+                result = _read_result(process)
+            except OSError:
+                result = None
+            if result is None:
+                results.append({"index": index, "error": "worker exited", "worker": worker_id})
+                return
+            result["worker"] = worker_id
+            results.append(result)
+        process.stdin.write("\n")
+        process.stdin.flush()
+    except OSError:
+        pass
+    finally:
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        process.wait()
+
+
+def run_sweep(spec_path, out_dir, workers=None, blender="blender", indices=None):
+    """
+    Evaluate variants of the sweep (all or listed ones) in a pool of background
+    Blender instances. Returns (list of results ordered by variant, seconds).
+    """
+    spec = load_sweep(spec_path)
+    variants = expand_grid(spec.get("grid", {}))
+    if indices is None:
+        indices = range(len(variants))
+    workers = max(1, min(workers or os.cpu_count() or 1, len(indices)))
+    os.makedirs(out_dir, exist_ok=True)
+
+    todo = queue.Queue()
+    for index in indices:
+        todo.put(index)
+    results = []
+    command = worker_command(blender, spec, spec_path, out_dir)
+
+    start = time.perf_counter()
+    with open(os.path.join(out_dir, "workers.log"), "w") as log:
+        threads = [threading.Thread(target=_serve, args=(command, todo, results, i, log))
+                   for i in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    duration = time.perf_counter() - start
+
+    # variants no worker could take, f.ex. when Blender failed to start
+    done = {result["index"] for result in results}
+    results.extend({"index": index, "overrides": variants[index], "error": "not evaluated"}
+                   for index in indices if index not in done)
+    results.sort(key=lambda result: result["index"])
+    with open(os.path.join(out_dir, "results.json"), "w") as output:
+        json.dump({"duration": duration, "variants": results}, output, indent=2)
+    return results, duration
+
+
+def main(argv):
+    if argv and argv[0] == "worker":
+        return worker_main(argv[1], argv[2])
+
+    parser = argparse.ArgumentParser(description="Evaluate Sverchok tree over a grid of node properties")
+    parser.add_argument("sweep", help="sweep json file")
+    parser.add_argument("--out", default="sweep_results", help="output directory")
+    parser.add_argument("--workers", type=int, default=None, help="number of Blender instances, cores by default")
+    parser.add_argument("--blender", default=os.environ.get("BLENDER", "blender"), help="Blender executable")
+    parser.add_argument("--variants", help="comma separated indices of variants to evaluate, all by default")
+    args = parser.parse_args(argv)
+
+    indices = [int(i) for i in args.variants.split(",")] if args.variants else None
+    results, duration = run_sweep(args.sweep, args.out, args.workers, args.blender, indices)
+    for line in summarize(results, duration):
+        print(line)
+    return 1 if any(result.get("error") for result in results) else 0
+
+
+if __name__ == "__main__":
+    # blender passes script arguments after "--"
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    sys.exit(main(argv))
@@ -17,9 +17,16 @@
 # ##### END GPL LICENSE BLOCK #####
 
 import cProfile
+import json
 import pstats
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
 from io import StringIO
 
+import numpy as np
+
 import bpy
 from bpy.props import BoolProperty, EnumProperty
 
@@ -144,6 +151,8 @@ def save_stats(path):
 
 def have_gathered_stats():
     global _global_profile
+    if _last_node_profile is not None and _last_node_profile.stats:
+        return True
     if _global_profile is None:
         return False
     if _global_profile.getstats():
@@ -151,6 +160,238 @@ def have_gathered_stats():
     else:
         return False
 
+#####################################
+# per node profiling                #
+#####################################
+
+# Global NodeProfile, while node profiling is running
+_node_profile = None
+# NodeProfile of the last profiling session, for dump and export
+_last_node_profile = None
+
+def data_size(data):
+    """
+    Number of values in socket data; arrays are counted by their size.
+    """
+    if isinstance(data, np.ndarray):
+        return data.size
+    if isinstance(data, (list, tuple)):
+        if not data:
+            return 0
+        first = data[0]
+        if not isinstance(first, (list, tuple, np.ndarray)):
+            return len(data)
+        if isinstance(first, tuple) and first and not isinstance(first[0], (list, tuple)):
+            return len(data) * len(first)
+        return sum(data_size(item) for item in data)
+    indices = getattr(data, "indices", None)
+    if isinstance(indices, np.ndarray):
+        return indices.size
+    return 1
+
+class NodeProfile(object):
+    """
+    Statistics of node processing gathered by the update system:
+    wall time, size of input and output data, memory allocated
+    (if trace_memory is set) and number of calls per node,
+    accumulated over any number of tree updates / frames.
+    Also keeps the timeline of calls for trace export.
+    """
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.stats = defaultdict(lambda: {"calls": 0, "time": 0.0, "max_time": 0.0,
+                                          "data_in": 0, "data_out": 0, "memory": 0})
+        self.events = []
+        self.origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def start(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stop(self):
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def process_node(self, node, process=None):
+        """Call process(node), node.process() by default, recording statistics"""
+        from sverchok.core.socket_data import socket_data_cache
+
+        tree_data = socket_data_cache.get(node.id_data.name, {})
+
+        def sockets_size(sockets, use_other):
+            size = 0
+            for socket in sockets:
+                if not socket.is_linked:
+                    continue
+                source = socket.other if use_other else socket
+                if source is None:
+                    continue
+                data = tree_data.get(source.socket_id)
+                if data is not None:
+                    size += data_size(data)
+            return size
+
+        data_in = sockets_size(node.inputs, True)
+        if self.trace_memory:
+            memory_before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            if process is None:
+                node.process()
+            else:
+                process(node)
+        finally:
+            duration = time.perf_counter() - start
+            memory = tracemalloc.get_traced_memory()[0] - memory_before if self.trace_memory else 0
+            data_out = sockets_size(node.outputs, False)
+            self.add(node.id_data.name, node.name, node.bl_idname, start, duration,
+                     data_in, data_out, memory)
+
+    def add(self, tree_name, node_name, bl_idname, start, duration, data_in=0, data_out=0, memory=0):
+        with self._lock:
+            item = self.stats[(tree_name, node_name)]
+            item["bl_idname"] = bl_idname
+            item["calls"] += 1
+            item["time"] += duration
+            item["max_time"] = max(item["max_time"], duration)
+            item["data_in"] = data_in
+            item["data_out"] = data_out
+            item["memory"] += memory
+            self.events.append((tree_name, node_name, bl_idname, start - self.origin, duration,
+                                threading.get_ident()))
+
+    def to_dict(self):
+        """Statistics as json-friendly dict: {"tree/node": {...}}"""
+        return {f"{tree}/{node}": dict(item) for (tree, node), item in self.stats.items()}
+
+    def report(self, sort="time"):
+        """Text table of statistics, sorted by the specified column"""
+        lines = [f"{'Node':40} {'Calls':>6} {'Time':>10} {'Max':>10} {'In':>10} {'Out':>10} {'Memory':>12}"]
+        items = sorted(self.stats.items(), key=lambda kv: kv[1][sort], reverse=True)
+        for (tree, node), item in items:
+            lines.append(f"{tree + '/' + node:40} {item['calls']:>6} {item['time']:>10.4f} {item['max_time']:>10.4f} "
+                         f"{item['data_in']:>10} {item['data_out']:>10} {item['memory']:>12}")
+        return "\n".join(lines)
+
+    def chrome_trace(self):
+        """Events in Chrome trace format (chrome://tracing, perfetto)"""
+        events = []
+        for tree, node, bl_idname, start, duration, thread in self.events:
+            events.append({"name": node, "cat": bl_idname, "ph": "X",
+                           "ts": start * 1e6, "dur": duration * 1e6,
+                           "pid": tree, "tid": thread})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def speedscope(self):
+        """Events in speedscope evented format, one profile per thread"""
+        frames = []
+        frame_index = {}
+        by_thread = defaultdict(list)
+        for tree, node, bl_idname, start, duration, thread in self.events:
+            key = f"{tree}/{node}"
+            if key not in frame_index:
+                frame_index[key] = len(frames)
+                frames.append({"name": key, "file": bl_idname})
+            by_thread[thread].append((start, duration, frame_index[key]))
+
+        profiles = []
+        for thread, events in by_thread.items():
+            events.sort()
+            profile_events = []
+            for start, duration, frame in events:
+                profile_events.append({"type": "O", "frame": frame, "at": start})
+                profile_events.append({"type": "C", "frame": frame, "at": start + duration})
+            profiles.append({"type": "evented", "name": f"Thread {thread}", "unit": "seconds",
+                             "startValue": events[0][0], "endValue": events[-1][0] + events[-1][1],
+                             "events": profile_events})
+        return {"$schema": "https://www.speedscope.app/file-format-schema.json",
+                "shared": {"frames": frames}, "profiles": profiles,
+                "exporter": "sverchok"}
+
+    def save(self, path, format="CHROME"):
+        """Save trace (CHROME, SPEEDSCOPE) or statistics (STATS) as json"""
+        if format == "CHROME":
+            data = self.chrome_trace()
+        elif format == "SPEEDSCOPE":
+            data = self.speedscope()
+        else:
+            data = self.to_dict()
+        with open(path, "w") as output:
+            json.dump(data, output)
+        info("Node profile saved to %s", path)
+
+def start_node_profiling(trace_memory=False):
+    """Start gathering per node statistics"""
+    global _node_profile
+    _node_profile = NodeProfile(trace_memory)
+    _node_profile.start()
+    return _node_profile
+
+def stop_node_profiling():
+    """Stop gathering per node statistics, return gathered NodeProfile"""
+    global _node_profile
+    global _last_node_profile
+    node_profile = _node_profile
+    _node_profile = None
+    if node_profile is not None:
+        node_profile.stop()
+        _last_node_profile = node_profile
+    return node_profile
+
+def get_node_profile():
+    """NodeProfile which is currently gathering statistics, or None"""
+    return _node_profile
+
+def profile_tree(ng, frames=None, runs=1, trace_memory=True):
+    """
+    Headless API: process node tree (for each of frames, if specified)
+    runs times, return NodeProfile with gathered statistics.
+
+    blender -b file.blend --python-expr "import bpy
+    from sverchok.utils.profile import profile_tree
+    profile_tree(bpy.data.node_groups['NodeTree']).save('/tmp/trace.json')"
+    """
+    from sverchok.core.update_system import process_tree
+
+    scene = bpy.context.scene
+    node_profile = start_node_profiling(trace_memory)
+    try:
+        for _ in range(runs):
+            if frames is None:
+                process_tree(ng)
+            else:
+                for frame in frames:
+                    scene.frame_set(frame)
+                    process_tree(ng)
+    finally:
+        stop_node_profiling()
+    return node_profile
+
+def load_node_stats(path):
+    with open(path) as source:
+        return json.load(source)
+
+def compare_node_stats(baseline, current, tolerance=0.2, min_time=0.001):
+    """
+    Compare two statistics dicts (NodeProfile.to_dict() or load_node_stats()).
+    Return list of (node key, baseline time per call, current time per call)
+    for nodes that became slower by more than tolerance (fraction);
+    nodes faster than min_time seconds per call are ignored as noise.
+    """
+    regressions = []
+    for key, item in current.items():
+        base = baseline.get(key)
+        if not base or not base["calls"] or not item["calls"]:
+            continue
+        base_time = base["time"] / base["calls"]
+        new_time = item["time"] / item["calls"]
+        if new_time < min_time:
+            continue
+        if new_time > base_time * (1 + tolerance):
+            regressions.append((key, base_time, new_time))
+    return regressions
+
 class SvProfilingToggle(bpy.types.Operator):
     """Toggle profiling on/off"""
     bl_idname = "node.sverchok_profile_toggle"
@@ -163,6 +404,13 @@ class SvProfilingToggle(bpy.types.Operator):
         is_currently_enabled = not is_currently_enabled
         info("Profiling is set to %s", is_currently_enabled)
 
+        with sv_preferences() as prefs:
+            if prefs.profile_mode == "NODES":
+                if is_currently_enabled:
+                    start_node_profiling(prefs.profile_memory)
+                else:
+                    stop_node_profiling()
+
         return {'FINISHED'}
 
 class SvProfileDump(bpy.types.Operator):
@@ -188,6 +436,8 @@ class SvProfileDump(bpy.types.Operator):
             default = True)
 
     def execute(self, context):
+        if _last_node_profile is not None:
+            info("Node profiling results:\n" + _last_node_profile.report())
         dump_stats(sort = self.sort, strip_dirs = self.strip_dirs)
         return {'FINISHED'}
     
@@ -211,6 +461,37 @@ class SvProfileSave(bpy.types.Operator):
         context.window_manager.fileselect_add(self)
         return {'RUNNING_MODAL'}
 
+class SvProfileSaveTrace(bpy.types.Operator):
+    """Save per node profiling results as json trace"""
+    bl_idname = "node.sverchok_profile_save_trace"
+    bl_label = "Save node profiling trace"
+    bl_options = {'INTERNAL'}
+
+    formats = [
+            ("CHROME", "Chrome trace", "Chrome trace event format (chrome://tracing, perfetto)", 0),
+            ("SPEEDSCOPE", "Speedscope", "Speedscope evented profile format", 1),
+            ("STATS", "Statistics", "Per node statistics, can be compared with compare_node_stats()", 2)
+        ]
+
+    format: EnumProperty(name = "Format",
+            description = "File format",
+            items = formats,
+            default = "CHROME")
+
+    filepath: bpy.props.StringProperty(subtype="FILE_PATH")
+
+    @classmethod
+    def poll(cls, context):
+        return _last_node_profile is not None
+
+    def execute(self, context):
+        _last_node_profile.save(self.filepath, self.format)
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
 class SvProfileReset(bpy.types.Operator):
     """Reset profiling statistics"""
     bl_idname = "node.sverchok_profile_reset"
@@ -219,11 +500,13 @@ class SvProfileReset(bpy.types.Operator):
 
     def execute(self, context):
         global _global_profile
+        global _last_node_profile
         _global_profile = None
+        _last_node_profile = None
         info("Profiling statistics data cleared.")
         return {'FINISHED'}
     
-classes = [SvProfilingToggle, SvProfileDump, SvProfileSave, SvProfileReset]
+classes = [SvProfilingToggle, SvProfileDump, SvProfileSave, SvProfileSaveTrace, SvProfileReset]
 
 def register():
     for class_name in classes:
@@ -7,21 +7,118 @@
 
 import numpy as np
 
-def cross_indices3(n):
-    '''create crossed indices'''
+from sverchok.utils.array_data import ragged_arange
 
-    nu = np.sum(np.arange(n, dtype=np.int64))
-    ind = np.zeros((nu, 2), dtype=np.int16)
-    c = 0
-    for i in range(n-1):
-        l = n-i-1
-        np_i = np.full(n-i-1, i, dtype=np.int32)
-        np_j = np.arange(i+1, n, dtype=np.int32)
-        np_a = np.stack((np_i, np_j), axis=-1)
-        ind[c:c+l, :] = np_a
-        c += l
 
-    return ind
+def cross_indices3(n):
+    '''create crossed indices'''
+    return np.stack(np.triu_indices(n, 1), axis=-1).astype(np.int32)
+
+
+# limits of grid_pairs: cells searched each way from a cell, cells along an axis
+max_grid_reach = 4
+max_grid_cells = 2 ** 20
+
+
+def half_neighbour_offsets(reach):
+    '''cell offsets in [-reach, reach]^3 lexicographically greater than (0, 0, 0)'''
+    r = np.arange(-reach, reach + 1)
+    offsets = np.stack(np.meshgrid(r, r, r, indexing='ij'), axis=-1).reshape(-1, 3)
+    positive = (offsets[:, 0] > 0) | ((offsets[:, 0] == 0) & ((offsets[:, 1] > 0) | ((offsets[:, 1] == 0) & (offsets[:, 2] > 0))))
+    return offsets[positive]
+
+
+def grid_pairs(verts, radius, cell_size=0.0):
+    '''
+    pairs of points closer than radius, found with uniform grid (spatial hash)
+    cell_size 0 means radius; too small cells are enlarged so that at most
+    max_grid_reach cells are searched each way and cell keys fit in int64
+    returns (pairs array (M, 2) with i < j, number of candidate pairs tested)
+    '''
+    v_len = len(verts)
+    if v_len < 2 or radius <= 0:
+        return np.zeros((0, 2), dtype=np.int64), 0
+    if cell_size <= 0:
+        cell_size = radius
+    extent = np.max(verts.max(axis=0) - verts.min(axis=0))
+    cell_size = max(cell_size, radius / max_grid_reach, extent / max_grid_cells)
+    reach = int(np.ceil(radius / cell_size))
+
+    cells = np.floor((verts - verts.min(axis=0)) / cell_size).astype(np.int64) + reach
+    dims = cells.max(axis=0) + reach + 1
+    keys = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+    order = np.argsort(keys, kind='stable')
+    cell_keys, starts, sizes = np.unique(keys[order], return_index=True, return_counts=True)
+    ends = starts + sizes
+    cell_of = np.repeat(np.arange(len(cell_keys)), sizes)
+    points = np.arange(v_len)
+
+    firsts = []
+    seconds = []
+    # pairs inside of the same cell
+    counts = ends[cell_of] - points - 1
+    first = np.repeat(points, counts)
+    firsts.append(first)
+    seconds.append(first + 1 + ragged_arange(counts))
+    # pairs with half of neighbour cells, so that each pair is found once
+    for offset in half_neighbour_offsets(reach):
+        neighbour_keys = cell_keys + (offset[0] * dims[1] + offset[1]) * dims[2] + offset[2]
+        found_id = np.minimum(np.searchsorted(cell_keys, neighbour_keys), len(cell_keys) - 1)
+        found = cell_keys[found_id] == neighbour_keys
+        counts = np.where(found, sizes[found_id], 0)[cell_of]
+        first = np.repeat(points, counts)
+        firsts.append(first)
+        seconds.append(np.repeat(starts[found_id][cell_of], counts) + ragged_arange(counts))
+
+    first = order[np.concatenate(firsts)]
+    second = order[np.concatenate(seconds)]
+    tested = len(first)
+    dif_v = verts[first] - verts[second]
+    close = np.einsum('ij,ij->i', dif_v, dif_v) < radius * radius
+    first, second = first[close], second[close]
+    pairs = np.stack((np.minimum(first, second), np.maximum(first, second)), axis=-1)
+    return pairs, tested
+
+
+def kdtree_pairs(verts, radius):
+    '''
+    pairs of points closer than radius, found with KD-tree
+    (SciPy cKDTree if available, mathutils.kdtree otherwise)
+    returns (pairs array (M, 2) with i < j, number of pairs found)
+    '''
+    try:
+        from scipy.spatial import cKDTree
+    except ImportError:
+        cKDTree = None
+    if cKDTree is not None:
+        pairs = cKDTree(verts).query_pairs(radius, output_type='ndarray').astype(np.int64)
+        return pairs, len(pairs)
+
+    from mathutils.kdtree import KDTree
+    tree = KDTree(len(verts))
+    for i, v in enumerate(verts.tolist()):
+        tree.insert(v, i)
+    tree.balance()
+    pairs = [(i, j) for i, v in enumerate(verts.tolist()) for _, j, _ in tree.find_range(v, radius) if j > i]
+    pairs = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+    return pairs, len(pairs)
+
+
+def broad_phase_pairs(ps):
+    '''candidate pairs of particles which can touch each other'''
+    method, cell_size = ps.params['broad_phase']
+    radius = 2 * np.max(ps.rads)
+    if method == 'KDTREE':
+        return kdtree_pairs(ps.verts, radius)
+    return grid_pairs(ps.verts, radius, cell_size)
+
+
+def accumulate_pair_forces(result, id0, id1, force0, force1):
+    '''add forces of pairs to the resultant of each particle'''
+    v_len = len(result)
+    for axis in range(3):
+        result[:, axis] += np.bincount(id0, force0[:, axis], minlength=v_len)
+        result[:, axis] += np.bincount(id1, force1[:, axis], minlength=v_len)
 
 
 def numpy_match_long_repeat(p):
@@ -75,20 +172,27 @@ def self_react(params):
     ps, collision, sum_rad, gates, att_params, fit_params = params
     use_collide, use_attract, use_grow = gates
     indexes = ps.params['indexes']
-    if use_grow:
+    if indexes is None:
+        indexes, tested = broad_phase_pairs(ps)
         sum_rad = ps.rads[indexes[:, 0]] + ps.rads[indexes[:, 1]]
-        if use_attract:
-            att_params[2] = ps.mass[indexes[:, 0]] * ps.mass[indexes[:, 1]]
+    else:
+        tested = len(indexes)
+        if use_grow:
+            sum_rad = ps.rads[indexes[:, 0]] + ps.rads[indexes[:, 1]]
+            if use_attract:
+                att_params[2] = ps.mass[indexes[:, 0]] * ps.mass[indexes[:, 1]]
     dif_v = ps.verts[indexes[:, 0], :] - ps.verts[indexes[:, 1], :]
     dist = np.linalg.norm(dif_v, axis=1)
     mask = sum_rad > dist
 
     index_inter = indexes[mask]
+    if ps.params['pairs_stats'] is not None:
+        ps.params['pairs_stats'].append((ps.v_len, tested, len(index_inter)))
     some_collisions = use_collide and len(index_inter) > 0
     some_attractions = use_attract and(len(index_inter) < len(indexes))
 
     if some_collisions or some_attractions:
-        result = np.zeros((ps.v_len, ps.v_len, 3), dtype=np.float64)
+        result = np.zeros((ps.v_len, 3), dtype=np.float64)
         dist_cor = np.clip(dist, 1e-6, 1e4)
         normal_v = dif_v/dist_cor[:, np.newaxis]
 
@@ -98,7 +202,7 @@ def self_react(params):
             antimask = np.invert(mask)
             attract_force(result, dist_cor, antimask, indexes, normal_v, att_params)
 
-        ps.r += np.sum(result, axis=1)
+        ps.r += result
 
     if use_grow:
         fit_force(ps, index_inter, fit_params)
@@ -117,8 +221,7 @@ def self_collision_force(result, dist, sum_rad, index_inter, mask, normal_v, sel
     sf = self_collision[:, np.newaxis]
     len0, len1 = [sf[id1], sf[id0]] if variable_coll else [sf, sf]
 
-    result[id0, id1, :] = -no * le * len0
-    result[id1, id0, :] = no * le * len1
+    accumulate_pair_forces(result, id0, id1, -no * le * len0, no * le * len1)
 
 
 def attract_force(result, dist, mask, index, norm_v, att_params):
@@ -137,15 +240,14 @@ def attract_force(result, dist, mask, index, norm_v, att_params):
     att = attract
     len0, len1 = [att[id1], att[id0]] if variable_att else [att, att]
 
-    result[id0, id1, :] = - direction * len0
-    result[id1, id0, :] = direction * len1
+    accumulate_pair_forces(result, id0, id1, - direction * len0, direction * len1)
 
 
 def fit_force(ps, index_inter, fit_params):
     '''the untouched particles will grow, the ones that collide will shrink'''
     grow, min_rad, max_rad = fit_params
     touch = np.unique(index_inter)
-    free = np.setdiff1d(np.arange(ps.v_len, dtype=np.int16), touch)
+    free = np.setdiff1d(ps.index, touch)
     v_grow = len(grow) > 1
     grow_un, grow_tou = [grow[free], grow[touch]] if v_grow else [grow, grow]
     ps.rads[free] += grow_un*0.1
@@ -172,8 +274,14 @@ def self_react_setup(ps, dicti, forces_composite):
     if not use_self_react:
         return
 
-    ps.params['indexes'] = cross_indices3(ps.v_len)
-    sum_rad = ps.rads[ps.params['indexes'][:, 0]] + ps.rads[ps.params['indexes'][:, 1]]
+    # attraction acts between all particles; collisions and fitting only
+    # between touching ones, so these look for pairs with the broad phase
+    if use_attract or ps.params['broad_phase'][0] == 'ALL':
+        ps.params['indexes'] = cross_indices3(ps.v_len)
+        sum_rad = ps.rads[ps.params['indexes'][:, 0]] + ps.rads[ps.params['indexes'][:, 1]]
+    else:
+        ps.params['indexes'] = None
+        sum_rad = None
 
     att_params = att_setup(use_attract, ps, np_attract, att_decay)
     fit_params = fit_setup(use_grow, np_grow, min_rad, max_rad)
@@ -796,8 +904,12 @@ def local_dict(dictionaries, name):
     return [dictionaries[0][name], dictionaries[1][name], dictionaries[2][name]]
 
 
-def pulga_system_init(params, parameters, gates, out_lists, cache):
-    '''the main function of the engine'''
+def pulga_system_init(params, parameters, gates, out_lists, cache, pairs_stats=None):
+    '''
+    the main function of the engine
+    if pairs_stats list is given, (particles, pairs tested, pairs touching)
+    of self reacting is appended to it on each iteration
+    '''
 
     dictionaries = [FUNC_DICT, gates, {}]
     fill_params_dict(dictionaries[2], parameters, params)
@@ -805,6 +917,8 @@ def pulga_system_init(params, parameters, gates, out_lists, cache):
     force_parameters = []
     forces_composite = [force_map, force_parameters]
     ps = PulgaSystem(dictionaries[2]["main"])
+    ps.params['broad_phase'] = gates.get("broad_phase", ['GRID', 0.0])
+    ps.params['pairs_stats'] = pairs_stats
     for force in FORCE_CHAIN:
         INIT_FUNC_DICT[force](ps, local_dict(dictionaries, force), forces_composite)
 
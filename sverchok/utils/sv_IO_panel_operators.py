@@ -20,7 +20,9 @@ from sverchok.utils.sv_IO_panel_tools import (
     create_dict_of_tree,
     load_json_from_gist,
     import_tree,
-    write_json)
+    write_json,
+    write_compact,
+    COMPACT_EXTENSION)
 from sverchok.utils.sv_gist_tools import show_token_help, TOKEN_HELP_URL
 from sverchok.utils.logging import debug, info, warning, error, exception
 
@@ -40,18 +42,21 @@ class SvNodeTreeExporter(bpy.types.Operator):
         maxlen=1024, default="", subtype='FILE_PATH')
 
     filter_glob: StringProperty(
-        default="*.json",
+        default="*.json;*.svz",
         options={'HIDDEN'})
 
     id_tree: StringProperty()
     compress: BoolProperty()
+    compact: BoolProperty()
 
     def execute(self, context):
         ng = bpy.data.node_groups[self.id_tree]
 
         destination_path = self.filepath
-        if not destination_path.lower().endswith('.json'):
-            destination_path += '.json'
+        compact = self.compact or destination_path.lower().endswith(COMPACT_EXTENSION)
+        extension = COMPACT_EXTENSION if compact else '.json'
+        if not destination_path.lower().endswith(extension):
+            destination_path += extension
 
         # future: should check if filepath is a folder or ends in \
 
@@ -62,12 +67,15 @@ class SvNodeTreeExporter(bpy.types.Operator):
             warning(msg)
             return {'CANCELLED'}
 
-        write_json(layout_dict, destination_path)
+        if compact:
+            write_compact(layout_dict, destination_path)
+        else:
+            write_json(layout_dict, destination_path)
         msg = 'exported to: ' + destination_path
         self.report({"INFO"}, msg)
         info(msg)
 
-        if self.compress:
+        if self.compress and not compact:
             comp_mode = zipfile.ZIP_DEFLATED
 
             # destination path = /a../b../c../somename.json
@@ -145,7 +153,7 @@ class SvNodeTreeImporter(bpy.types.Operator):
         maxlen=1024, default="", subtype='FILE_PATH')
 
     filter_glob: StringProperty(
-        default="*.json",
+        default="*.json;*.zip;*.svz",
         options={'HIDDEN'})
 
     id_tree: StringProperty()
@@ -23,6 +23,11 @@ class SvIOPanelProperties(bpy.types.PropertyGroup):
         name='compress_output',
         description='option to also compress the json, will generate both')
 
+    compact_output: BoolProperty(
+        default=0,
+        name='compact_output',
+        description='export compact .svz file (zipped json, scripts and texts stored once) instead of .json')
+
     gist_id: StringProperty(
         name='new_gist_id',
         default="Enter Gist ID here",
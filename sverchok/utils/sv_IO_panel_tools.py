@@ -20,6 +20,7 @@ import os
 from os.path import basename, dirname
 from time import gmtime, strftime
 import zipfile
+import hashlib
 import json
 import re
 import urllib
@@ -41,7 +42,15 @@ PROFILE_NODES = {'SvProfileNode', 'SvProfileNodeMK2'}
 
 _EXPORTER_REVISION_ = '0.079'
 
+# compact layout files: zip of single line json, long strings stored once as blobs
+COMPACT_EXTENSION = '.svz'
+COMPACT_LAYOUT_NAME = 'layout.json'
+BLOB_DIR = 'blobs/'
+BLOB_KEY = '__sv_blob__'
+BLOB_MIN_SIZE = 256
+
 IO_REVISION_HISTORY = r"""
+0.079 (no revision change) - compact .svz container for the same json, see write_compact.
 0.079 only to suggest that exports will be compatible with socketnames currently in sv.
 0.072 export now stores the absolute node location (incase framed-n)
 0.072 new route for node.storage_get/set_data. no change to json format
@@ -121,6 +130,59 @@ def write_json(layout_dict, destination_path):
         node_tree.writelines(m)
 
 
+def pack_blobs(data, blobs, min_size=None):
+    '''
+    copy of json data with strings of min_size characters or more replaced by
+    {BLOB_KEY: hash}; the strings are collected in blobs by hash, once each.
+    '''
+    if min_size is None:
+        min_size = BLOB_MIN_SIZE
+    if isinstance(data, str):
+        if len(data) < min_size:
+            return data
+        key = hashlib.blake2b(data.encode(), digest_size=16).hexdigest()
+        blobs[key] = data
+        return {BLOB_KEY: key}
+    elif isinstance(data, dict):
+        return {k: pack_blobs(v, blobs, min_size) for k, v in data.items()}
+    elif isinstance(data, (list, tuple)):
+        return [pack_blobs(v, blobs, min_size) for v in data]
+    return data
+
+
+def unpack_blobs(data, blobs):
+    ''' inverse of pack_blobs '''
+    if isinstance(data, dict):
+        if len(data) == 1 and BLOB_KEY in data:
+            return blobs[data[BLOB_KEY]]
+        return {k: unpack_blobs(v, blobs) for k, v in data.items()}
+    elif isinstance(data, list):
+        return [unpack_blobs(v, blobs) for v in data]
+    return data
+
+
+def write_compact(layout_dict, destination_path):
+    '''
+    compact (.svz) layout: deflated zip of the layout as single line json,
+    with long strings (scripts, texts, profiles) stored once each in blobs/
+    '''
+    blobs = {}
+    packed = pack_blobs(layout_dict, blobs)
+    with zipfile.ZipFile(destination_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(COMPACT_LAYOUT_NAME, json.dumps(packed, separators=(',', ':')))
+        for key, blob in blobs.items():
+            archive.writestr(BLOB_DIR + key, blob)
+
+
+def read_compact(fullpath):
+    ''' layout dict from file written by write_compact '''
+    with zipfile.ZipFile(fullpath, 'r') as archive:
+        packed = json.loads(archive.read(COMPACT_LAYOUT_NAME).decode())
+        blobs = {name[len(BLOB_DIR):]: archive.read(name).decode()
+                 for name in archive.namelist() if name.startswith(BLOB_DIR)}
+    return unpack_blobs(packed, blobs)
+
+
 def has_state_switch_protection(node, k):
     ''' explict for debugging '''
 
@@ -452,6 +514,9 @@ def perform_svtextin_node_object(node, node_ref):
     if not current_text:
         info("`%s' doesn't store a current_text in params", node.name)
 
+    elif params.get('stream_file'):
+        debug('%s reads external file %s - no text block needed', node.name, params.get('file'))
+
     elif not current_text in texts:
         new_text = texts.new(current_text)
         text_line_entry = node_ref['text_lines']
@@ -665,7 +730,11 @@ def center_nodes(nodes_json_dict, target_center=None):
         node = nodes_json_dict[key]
         node['location'] = [x - x0 + x1 for x, x0, x1 in zip(node['location'], average_location, target_center)]
 
-def import_tree(ng, fullpath='', nodes_json=None, create_texts=True, center=None):
+def import_tree(ng, fullpath='', nodes_json=None, create_texts=True, center=None, suspend_updates=True):
+    '''
+    import layout from .json, .zip or compact .svz file, or from nodes_json.
+    with suspend_updates the tree is not updated until all nodes and links exist.
+    '''
 
     nodes = ng.nodes
     ng.use_fake_user = True
@@ -710,26 +779,42 @@ def import_tree(ng, fullpath='', nodes_json=None, create_texts=True, center=None
             center_nodes(nodes_to_import, center)
         groups_to_import = nodes_json.get('groups', {})
 
-        add_groups(groups_to_import)  # this return is not used yet
-        name_remap = add_nodes(ng, nodes_to_import, nodes, create_texts)
+        # the caller may have suspended updates of the tree itself
+        previous_skip = ng.skip_tree_update
+        if suspend_updates:
+            # nodes are neither processed while their properties are set
+            # nor is the update list rebuilt for every node and link added
+            ng.freeze(hard=True)
+            ng.skip_tree_update = True
 
-        # now connect them / prevent unnecessary updates
-        ng.freeze(hard=True)
-        make_links(update_lists, name_remap)
+        try:
+            add_groups(groups_to_import)  # this return is not used yet
+            name_remap = add_nodes(ng, nodes_to_import, nodes, create_texts)
+
+            # now connect them / prevent unnecessary updates
+            ng.freeze(hard=True)
+            make_links(update_lists, name_remap)
 
-        # set frame parents '''
-        place_frames(ng, nodes_json, name_remap)
+            # set frame parents '''
+            place_frames(ng, nodes_json, name_remap)
 
-        # clean up
-        old_nodes.scan_for_old(ng)
-        ng.unfreeze(hard=True)
+            # clean up
+            old_nodes.scan_for_old(ng)
+        finally:
+            ng.skip_tree_update = previous_skip
+            ng.unfreeze(hard=True)
 
+        # update list is built and the tree processed once
         ng.update()
         ng.update_tag()
 
-    # ---- read files (.json or .zip) or straight json data -----
+    # ---- read files (.svz, .json or .zip) or straight json data -----
+
+    if fullpath.endswith(COMPACT_EXTENSION):
+        nodes_json = read_compact(fullpath)
+        generate_layout(fullpath, nodes_json)
 
-    if fullpath.endswith('.zip'):
+    elif fullpath.endswith('.zip'):
         nodes_json = get_file_obj_from_zip(fullpath)
         generate_layout(fullpath, nodes_json)
 
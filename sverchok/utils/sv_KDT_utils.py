@@ -5,12 +5,166 @@
 # SPDX-License-Identifier: GPL3
 # License-Filename: LICENSE
 
+"""
+KD-trees over vertices, cached by content and queried in batches.
+
+    tree = get_kdtree(verts)
+    indices, distances = tree.query(points, 3)
+    indices, distances, offsets = tree.query_range(points, radius)
+
+Trees are kept in a small cache keyed on hash of vertex data, so a tree
+is built once for the same vertices however many nodes and updates
+query it. With SciPy installed, trees are scipy.spatial.cKDTree and
+batch queries run in all available threads; otherwise mathutils.kdtree
+is used, queried point by point.
+"""
+
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
 from mathutils import kdtree
+
 from sverchok.data_structure import match_long_repeat as mlr
 
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+BACKEND_SCIPY = 'SCIPY'
+BACKEND_MATHUTILS = 'MATHUTILS'
+
+# number of threads for scipy queries, -1 means all cores
+workers = -1
+# queries are made in chunks of this many points to keep memory bounded
+query_chunk = 2**18
+
+max_cached_trees = 8
+# (backend, vertex data hash): SvKDTree
+kdtree_cache = OrderedDict()
+
+
+def default_backend():
+    return BACKEND_SCIPY if cKDTree is not None else BACKEND_MATHUTILS
+
+
+def as_vertex_array(verts):
+    verts = np.asarray(verts, dtype=np.float64)
+    if verts.size == 0:
+        return np.empty((0, 3))
+    return verts.reshape(-1, verts.shape[-1])
+
+
+def _array_hash(array):
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(str(array.shape).encode())
+    hasher.update(np.ascontiguousarray(array).tobytes())
+    return hasher.digest()
+
+
+class SvKDTree(object):
+    """
+    KD-tree over (N, 3) array of vertices.
+    Missing results (less than k vertices found) have index -1 and distance inf.
+    """
+    def __init__(self, verts, backend=None):
+        self.verts = as_vertex_array(verts)
+        self.backend = backend or default_backend()
+        if self.backend == BACKEND_SCIPY:
+            self.tree = cKDTree(self.verts)
+        else:
+            self.tree = create_mathutils_kdt(self.verts.tolist())
+
+    def __len__(self):
+        return len(self.verts)
+
+    def query(self, points, k, max_distance=np.inf):
+        """
+        k closest vertices for each point, ordered by distance, not farther than max_distance.
+        Returns (indices, distances), both of shape (len(points), k).
+        """
+        points = as_vertex_array(points)
+        indices = np.full((len(points), k), -1, dtype=np.int64)
+        distances = np.full((len(points), k), np.inf)
+        if k < 1 or not len(self.verts):
+            return indices, distances
+
+        if self.backend == BACKEND_SCIPY:
+            # cKDTree excludes vertices at exactly max_distance, mathutils does not
+            bound = np.nextafter(max_distance, np.inf)
+            for start in range(0, len(points), query_chunk):
+                chunk = slice(start, start + query_chunk)
+                dist, idx = self.tree.query(points[chunk], k=k, distance_upper_bound=bound, workers=workers)
+                dist = dist.reshape(-1, k)
+                idx = idx.reshape(-1, k)
+                found = idx < len(self.verts)
+                indices[chunk][found] = idx[found]
+                distances[chunk][found] = dist[found]
+        else:
+            for i, point in enumerate(points.tolist()):
+                for j, (_, index, dist) in enumerate(self.tree.find_n(point, k)):
+                    if dist > max_distance:
+                        break
+                    indices[i, j] = index
+                    distances[i, j] = dist
+        return indices, distances
+
+    def query_range(self, points, radius):
+        """
+        All vertices not farther than radius (one for all points or one per point)
+        from each point, ordered by distance. Returns flat arrays (indices, distances)
+        and offsets: results for point i are at offsets[i]:offsets[i+1].
+        """
+        points = as_vertex_array(points)
+        radius = np.broadcast_to(np.asarray(radius, dtype=np.float64), (len(points),))
+        if not len(self.verts) or not len(points):
+            return np.empty(0, dtype=np.int64), np.empty(0), np.zeros(len(points) + 1, dtype=np.int64)
+
+        if self.backend == BACKEND_SCIPY:
+            found = self.tree.query_ball_point(points, radius, workers=workers)
+            sizes = np.fromiter((len(item) for item in found), dtype=np.int64, count=len(found))
+            indices = np.fromiter((i for item in found for i in item), dtype=np.int64, count=sizes.sum())
+            groups = np.repeat(np.arange(len(points)), sizes)
+            distances = np.linalg.norm(self.verts[indices] - points[groups], axis=1)
+            order = np.lexsort((distances, groups))
+            indices = indices[order]
+            distances = distances[order]
+        else:
+            results = [self.tree.find_range(point, r) for point, r in zip(points.tolist(), radius.tolist())]
+            sizes = np.fromiter((len(item) for item in results), dtype=np.int64, count=len(results))
+            indices = np.fromiter((index for item in results for _, index, _ in item), dtype=np.int64, count=sizes.sum())
+            distances = np.fromiter((dist for item in results for _, _, dist in item), dtype=np.float64, count=sizes.sum())
+
+        offsets = np.zeros(len(points) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+        return indices, distances, offsets
+
+
+def get_kdtree(verts, backend=None):
+    """
+    SvKDTree for the vertices; built once for the same vertex data.
+    """
+    verts = as_vertex_array(verts)
+    backend = backend or default_backend()
+    key = (backend, _array_hash(verts))
+    tree = kdtree_cache.get(key)
+    if tree is None:
+        tree = SvKDTree(verts, backend)
+        kdtree_cache[key] = tree
+        if len(kdtree_cache) > max_cached_trees:
+            kdtree_cache.popitem(last=False)
+    else:
+        kdtree_cache.move_to_end(key)
+    return tree
+
+
+def clear_kdtree_cache():
+    kdtree_cache.clear()
+
+
 # documentation/blender_python_api_2_70_release/mathutils.kdtree.html
-def create_kdt(verts):
-    '''Basic kdt setup'''
+def create_mathutils_kdt(verts):
     size = len(verts)
     kd = kdtree.KDTree(size)
     for i, xyz in enumerate(verts):
@@ -20,26 +174,67 @@ def create_kdt(verts):
     return kd
 
 
+def create_kdt(verts):
+    '''Basic kdt setup (mathutils kdtree, cached)'''
+    return get_kdtree(verts, BACKEND_MATHUTILS).tree
+
+
+def _split(array, offsets):
+    values = array.tolist()
+    return [values[start:end] for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+
+
+def kdt_find_n(verts, v_find, nums, backend=None):
+    '''
+    For each vertex of v_find, the N closest vertices ordered by distance.
+    Returns lists (per vertex of v_find) of coordinates, indices and distances.
+    '''
+    tree = get_kdtree(verts, backend)
+    points, nums = mlr([v_find, nums])
+    nums = np.maximum(np.asarray(nums, dtype=np.int64), 0)
+    k = int(nums.max()) if len(nums) else 0
+    indices, distances = tree.query(points, k)
+    indices[np.arange(k) >= nums[:, None]] = -1
+    found = indices >= 0
+    offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+    np.cumsum(found.sum(axis=1), out=offsets[1:])
+    indices = indices[found]
+    return (_split(tree.verts[indices], offsets),
+            _split(indices, offsets),
+            _split(distances[found], offsets))
+
+
+def kdt_find_range(verts, v_find, dists, backend=None):
+    '''
+    For each vertex of v_find, vertices in desired distance ordered by distance.
+    Returns lists (per vertex of v_find) of coordinates, indices and distances.
+    '''
+    tree = get_kdtree(verts, backend)
+    points, dists = mlr([v_find, dists])
+    indices, distances, offsets = tree.query_range(points, dists)
+    return (_split(tree.verts[indices], offsets),
+            _split(indices, offsets),
+            _split(distances, offsets))
+
+
 def kdt_closest_verts_range(verts, v_find, dists, out):
     '''Find vertices in desired distance'''
-    kd = create_kdt(verts)
-    out.extend([kd.find_range(vert, dist) for vert, dist in zip(*mlr([v_find, dists]))])
+    out.extend([list(zip(*found)) for found in zip(*kdt_find_range(verts, v_find, dists))])
 
 
 def kdt_closest_verts_find_n(verts, v_find, nums, out):
     '''Find  the N closest vertices ordered by distance'''
-    kd = create_kdt(verts)
-    out.extend([kd.find_n(vert, num) for vert, num in zip(*mlr([v_find, nums]))])
+    out.extend([list(zip(*found)) for found in zip(*kdt_find_n(verts, v_find, nums))])
 
 
 def kdt_closest_path(verts, radius, start_index, result, cycle):
     '''Creates path joining each vertice with the closest free neighbor'''
     kd = create_kdt(verts)
-    edges = [[]]
     edge_set = set()
-    seen = set()
     seen_end = set()
     r = radius
+    # vertices below this index are all seen
+    first_unseen = 0
 
     idx = start_index
 
@@ -56,51 +251,96 @@ def kdt_closest_path(verts, radius, start_index, result, cycle):
             idx = index
             found = True
             break
-        if not found and id <  len(verts):
-            for id_new in range(len(verts)):
-                if id_new not in seen_end:
-                    idx = id_new
-                    break
+        if not found:
+            while first_unseen < len(verts) and first_unseen in seen_end:
+                first_unseen += 1
+            if first_unseen < len(verts):
+                idx = first_unseen
     if cycle:
         edge_set.add(tuple(sorted([start_index, idx])))
 
     result.append(list(edge_set))
 
 
-def kdt_closest_edges(verts, socket_inputs, egdes_output):
-    '''Join verts pairs by defining distance range and number of connections'''
-    mindist, maxdist, maxNum, skip = socket_inputs
+def closest_edges(verts, mindist, maxdist, max_num, skip=0, backend=None):
+    '''
+    Join verts pairs by defining distance range and number of connections.
+    Each vertex, in order, takes its neighbors in maxdist ordered by distance,
+    skips first skip of them (itself usually being the first one), and those
+    in mindist, and joins up to max_num of them that are not joined to it yet.
+    Returns (M, 2) array of edges, i < j.
+    '''
+    tree = get_kdtree(verts, backend)
+    count = len(tree)
+    mindist, maxdist = abs(mindist), abs(maxdist)
+    max_num = max(max_num, 1)
+    skip = max(skip, 0)
+    # enough neighbors unless many of them are in mindist or already joined
+    k = skip + 2 * max_num + 2
 
-    # make kdtree
-    kd = create_kdt(verts)
+    # joined pairs as i * count + j, i < j
+    joined = set()
+    edges = []
+    for start in range(0, count, query_chunk):
+        own = np.arange(start, min(start + query_chunk, count))
+        truncated, candidates = _candidates(tree, own, k, mindist, maxdist, skip)
+        # neighbors of later vertices can't be joined yet, so rows having max_num
+        # of them surely have enough; for others find more neighbors at once
+        short = truncated & ((candidates > own[:, None]).sum(axis=1) < max_num)
+        rows = candidates.tolist()
+        truncated[:] = False
+        if short.any():
+            more_truncated, more = _candidates(tree, own[short], 2 * k, mindist, maxdist, skip)
+            for row, neighbors in zip(np.flatnonzero(short).tolist(), more.tolist()):
+                rows[row] = neighbors
+            truncated[short] = more_truncated
 
-    # set minimum values
-    maxNum = max(maxNum, 1)
-    skip = max(skip, 0)
+        for i, neighbors, is_truncated in zip(own.tolist(), rows, truncated.tolist()):
+            num_edges = _join_neighbors(i, neighbors, count, max_num, 0, joined, edges)
+            if num_edges < max_num and is_truncated:
+                # rare case of too many neighbors in mindist or joined already
+                far, far_distances, _ = tree.query_range(tree.verts[i:i+1], maxdist)
+                seen = set(neighbors)
+                rest = [j for j, dist in list(zip(far.tolist(), far_distances.tolist()))[skip:]
+                        if j not in seen and j != i and dist > mindist]
+                _join_neighbors(i, rest, count, max_num, num_edges, joined, edges)
 
-    # makes edges
-    e = set()
+    return np.array(edges, dtype=np.int64).reshape(-1, 2)
 
-    for i, vtx in enumerate(verts):
-        num_edges = 0
 
-        # this always returns closest first followed by next closest, etc.
-        #              co  index  dist
-        for edge_idx, (_, index, dist) in enumerate(kd.find_range(vtx, abs(maxdist))):
+def _candidates(tree, own, k, mindist, maxdist, skip):
+    """
+    k nearest neighbors in maxdist of vertices own, with -1 in place of skipped ones;
+    and flags of rows where more than k neighbors may be in maxdist
+    """
+    indices, distances = tree.query(tree.verts[own], k, maxdist)
+    truncated = indices[:, -1] >= 0
+    valid = (indices >= 0) & (distances > mindist) & (indices != own[:, None])
+    valid[:, :skip] = False
+    return truncated, np.where(valid, indices, -1)
 
-            if skip > 0:
-                if edge_idx < skip:
-                    continue
 
-            if (dist <= abs(mindist)) or (i == index):
+def _join_neighbors(i, neighbors, count, max_num, num_edges, joined, edges):
+    for j in neighbors:
+        if j < 0:
+            continue
+        if j < i:
+            # only vertex j could have joined i already
+            if j * count + i in joined:
                 continue
+            edges.append((j, i))
+        else:
+            # remember for vertex j
+            joined.add(i * count + j)
+            edges.append((i, j))
+        num_edges += 1
+        if num_edges == max_num:
+            break
+    return num_edges
 
-            edge = tuple(sorted([i, index]))
-            if not edge in e:
-                e.add(edge)
-                num_edges += 1
-
-            if num_edges == maxNum:
-                break
 
-    egdes_output.sv_set([list(e)])
+def kdt_closest_edges(verts, socket_inputs, egdes_output):
+    '''Join verts pairs by defining distance range and number of connections'''
+    mindist, maxdist, maxNum, skip = socket_inputs
+    edges = closest_edges(verts, mindist, maxdist, maxNum, skip)
+    egdes_output.sv_set([edges.tolist()])
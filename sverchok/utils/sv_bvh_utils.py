@@ -0,0 +1,271 @@
+# This file is part of project Sverchok. It's copyrighted by the contributors
+# recorded in the version control history of the file, available from
+# its original location https://github.com/nortikin/sverchok/commit/master
+#
+# SPDX-License-Identifier: GPL3
+# License-Filename: LICENSE
+
+"""
+Ray casting and nearest point queries for arrays of points.
+
+Functions take (N, 3) arrays (or lists of triples) of points and return
+arrays, so that nodes do not have to unpack query results one by one:
+
+    hits = bvh_ray_cast(bvh, origins, directions)
+    hits.hit        # (N,) bool
+    hits.location   # (N, 3) float, zeros where nothing was hit
+    hits.normal     # (N, 3) float
+    hits.index      # (N,) int, -1 where nothing was hit
+    hits.distance   # (N,) float, inf where nothing was hit
+
+mathutils BVHTree and Object queries take one point per call, so
+bvh_ray_cast, bvh_find_nearest and object_queries still call them once
+per point; only packing of results into arrays is done at once.
+
+points_inside_mesh() classifies points without BVH at all: it counts how
+many triangles a ray from each point crosses (odd count means inside),
+with a 2D grid over points to find candidate triangles, all in numpy.
+With several ray directions, each point is decided by a vote, and points
+for which the vote is already decided are not tested with other directions.
+"""
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+import numpy as np
+
+from sverchok.utils.array_data import ragged_arange
+
+RayHits = namedtuple('RayHits', ['hit', 'location', 'normal', 'index', 'distance'])
+
+# votes of ray directions needed to consider point inside, by number of directions
+inside_votes = {1: 1, 2: 1, 3: 2, 4: 3, 5: 4, 6: 4}
+
+
+def _as_points(points):
+    return np.asarray(points, dtype=np.float64).reshape((-1, 3))
+
+
+def _empty_hits(count):
+    return RayHits(np.zeros(count, dtype=bool), np.zeros((count, 3)), np.zeros((count, 3)),
+                   np.full(count, -1, dtype=np.int64), np.full(count, np.inf))
+
+
+def _collect_hits(results, count):
+    """RayHits of list of (location, normal, index, distance), location None for no hit"""
+    hits = _empty_hits(count)
+    found = [result for result in results if result[0] is not None]
+    if found:
+        hits.hit[:] = [result[0] is not None for result in results]
+        locations, normals, indices, distances = zip(*found)
+        hits.location[hits.hit] = [location[:] for location in locations]
+        hits.normal[hits.hit] = [normal[:] for normal in normals]
+        hits.index[hits.hit] = indices
+        hits.distance[hits.hit] = distances
+    return hits
+
+
+def bvh_ray_cast(bvh, origins, directions, distance=None):
+    """
+    mathutils BVHTree.ray_cast for each pair of origin and direction
+    (arrays of the same length, or one of them of length 1).
+    """
+    origins, directions = np.broadcast_arrays(_as_points(origins), _as_points(directions))
+    ray_cast = bvh.ray_cast
+    args = () if distance is None else (distance,)
+    results = [ray_cast(origin, direction, *args) for origin, direction in zip(origins.tolist(), directions.tolist())]
+    return _collect_hits(results, len(origins))
+
+
+def bvh_find_nearest(bvh, points, distance=None):
+    """mathutils BVHTree.find_nearest for each point"""
+    points = _as_points(points)
+    find_nearest = bvh.find_nearest
+    args = () if distance is None else (distance,)
+    results = [find_nearest(point, *args) for point in points.tolist()]
+    return _collect_hits(results, len(points))
+
+
+def object_queries(query, *arrays):
+    """
+    Call query for each set of arguments taken from arrays, query being
+    a method which returns (result, location, normal, index, ...), like
+    Object.ray_cast, Object.closest_point_on_mesh or Scene.ray_cast.
+    Returns RayHits (distance from the first argument to location)
+    and list of remaining items of each result (f.ex. objects and matrices).
+    """
+    arrays = np.broadcast_arrays(*[_as_points(array) for array in arrays])
+    count = len(arrays[0])
+    results = [query(*args) for args in zip(*[array.tolist() for array in arrays])]
+    hits = _collect_hits([(location if result else None, normal, index, 0.0)
+                          for result, location, normal, index, *_ in results], count)
+    hits.distance[hits.hit] = np.linalg.norm(hits.location[hits.hit] - arrays[0][hits.hit], axis=1)
+    return hits, [other for _, _, _, _, *other in results]
+
+
+def transform_points(matrix, points):
+    """apply 4x4 matrix (mathutils.Matrix or array) to (N, 3) array of points"""
+    matrix = np.array(matrix, dtype=np.float64)
+    return _as_points(points) @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+def transform_directions(matrix, directions):
+    """apply 4x4 matrix to (N, 3) array of directions, without translation"""
+    matrix = np.array(matrix, dtype=np.float64)
+    return _as_points(directions) @ matrix[:3, :3].T
+
+
+def triangulate(verts, faces):
+    """(T, 3, 3) array of triangles of faces (fan triangulation of ngons)"""
+    verts = _as_points(verts)
+    triangles = []
+    for face in faces:
+        face = list(face)
+        triangles.extend((face[0], face[i], face[i + 1]) for i in range(1, len(face) - 1))
+    if not triangles:
+        return np.empty((0, 3, 3))
+    return verts[np.array(triangles, dtype=np.int64)]
+
+
+def rotation_to_z(direction):
+    """orthonormal 3x3 matrix which maps direction to +Z"""
+    z = np.asarray(direction, dtype=np.float64)
+    z = z / np.linalg.norm(z)
+    helper = np.array([1.0, 0.0, 0.0]) if abs(z[0]) < 0.9 else np.array([0.0, 1.0, 0.0])
+    x = np.cross(helper, z)
+    x /= np.linalg.norm(x)
+    y = np.cross(z, x)
+    return np.stack((x, y, z))
+
+
+def _chunks(weights, limit):
+    """slices of consecutive items with total weight about limit (at least one item)"""
+    bounds = np.searchsorted(np.cumsum(weights), np.arange(limit, np.sum(weights) + limit, limit), side='right')
+    start = 0
+    for end in bounds.tolist():
+        end = max(end, start + 1)
+        if start >= len(weights):
+            break
+        yield slice(start, end)
+        start = end
+
+
+def _covers(e, dx, dy):
+    """edge function test with top-left rule: of two triangles sharing an edge exactly one covers it"""
+    return (e > 0) | ((e == 0) & ((dy > 0) | ((dy == 0) & (dx > 0))))
+
+
+def ray_crossings(points, triangles, max_pairs=2**22):
+    """
+    Number of triangles crossed by the ray going from each point in +Z direction.
+    """
+    points = _as_points(points)
+    count = len(points)
+    crossings = np.zeros(count, dtype=np.int64)
+    if count == 0 or len(triangles) == 0:
+        return crossings
+
+    # orient all triangles counter clockwise in XY projection, drop degenerate ones
+    a, b, c = triangles[:, 0], triangles[:, 1], triangles[:, 2]
+    area = (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])
+    flip = area < 0
+    b, c = np.where(flip[:, None], c, b), np.where(flip[:, None], b, c)
+    area = np.abs(area)
+    valid = area > 0
+    a, b, c, area = a[valid], b[valid], c[valid], area[valid]
+
+    # 2D grid of points in XY, about two points per cell
+    low = points[:, :2].min(axis=0)
+    high = points[:, :2].max(axis=0)
+    extent = np.maximum(high - low, 1e-12)
+    cell_size = max(np.sqrt(extent[0] * extent[1] / count * 2), extent.max() / count)
+    dims = np.floor(extent / cell_size).astype(np.int64) + 1
+    point_cells = np.floor((points[:, :2] - low) / cell_size).astype(np.int64)
+    point_cells = np.minimum(point_cells, dims - 1)
+    cell_ids = point_cells[:, 0] * dims[1] + point_cells[:, 1]
+    order = np.argsort(cell_ids, kind='stable')
+    cell_counts = np.bincount(cell_ids, minlength=dims[0] * dims[1])
+    cell_starts = np.cumsum(cell_counts) - cell_counts
+
+    # cells covered by bounding boxes of triangles; drop triangles outside the grid or below all points
+    tri_low = np.minimum(np.minimum(a, b), c)
+    tri_high = np.maximum(np.maximum(a, b), c)
+    inside = ((tri_high[:, :2] >= low) & (tri_low[:, :2] <= high)).all(axis=1) & (tri_high[:, 2] > points[:, 2].min())
+    a, b, c, area = a[inside], b[inside], c[inside], area[inside]
+    cell_low = np.clip(np.floor((tri_low[inside, :2] - low) / cell_size).astype(np.int64), 0, dims - 1)
+    cell_high = np.clip(np.floor((tri_high[inside, :2] - low) / cell_size).astype(np.int64), 0, dims - 1)
+    spans = cell_high - cell_low + 1
+    tri_cell_counts = spans[:, 0] * spans[:, 1]
+
+    for tri_slice in _chunks(tri_cell_counts, max_pairs):
+        # (triangle, cell) pairs
+        tris = np.repeat(np.arange(tri_slice.start, tri_slice.stop), tri_cell_counts[tri_slice])
+        local = ragged_arange(tri_cell_counts[tri_slice])
+        cells = ((cell_low[tris, 0] + local // spans[tris, 1]) * dims[1]
+                 + cell_low[tris, 1] + local % spans[tris, 1])
+        pair_counts = cell_counts[cells]
+        for pair_slice in _chunks(pair_counts, max_pairs):
+            # (triangle, point) pairs
+            sizes = pair_counts[pair_slice]
+            tri = np.repeat(tris[pair_slice], sizes)
+            pts = order[np.repeat(cell_starts[cells[pair_slice]], sizes) + ragged_arange(sizes)]
+            p = points[pts]
+            ta, tb, tc = a[tri], b[tri], c[tri]
+            e_ab = (tb[:, 0] - ta[:, 0]) * (p[:, 1] - ta[:, 1]) - (tb[:, 1] - ta[:, 1]) * (p[:, 0] - ta[:, 0])
+            e_bc = (tc[:, 0] - tb[:, 0]) * (p[:, 1] - tb[:, 1]) - (tc[:, 1] - tb[:, 1]) * (p[:, 0] - tb[:, 0])
+            e_ca = (ta[:, 0] - tc[:, 0]) * (p[:, 1] - tc[:, 1]) - (ta[:, 1] - tc[:, 1]) * (p[:, 0] - tc[:, 0])
+            covered = (_covers(e_ab, tb[:, 0] - ta[:, 0], tb[:, 1] - ta[:, 1])
+                       & _covers(e_bc, tc[:, 0] - tb[:, 0], tc[:, 1] - tb[:, 1])
+                       & _covers(e_ca, ta[:, 0] - tc[:, 0], ta[:, 1] - tc[:, 1]))
+            # height of the triangle above the point, by barycentric coordinates
+            z = (e_bc * ta[:, 2] + e_ca * tb[:, 2] + e_ab * tc[:, 2]) / area[tri]
+            crossed = covered & (z > p[:, 2])
+            crossings += np.bincount(pts[crossed], minlength=count)
+    return crossings
+
+
+def _parallel_crossings(points, triangles, threads):
+    if threads <= 1 or len(points) < 2 * 65536:
+        return ray_crossings(points, triangles)
+    parts = np.array_split(np.arange(len(points)), threads)
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(lambda part: ray_crossings(points[part], triangles), parts))
+    return np.concatenate(results)
+
+
+def points_inside_mesh(points, verts, faces, directions, threads=0):
+    """
+    Mask of points which are inside closed mesh, by parity of ray crossings
+    for each of directions; a point is inside if enough directions agree
+    (see inside_votes). Points are split between threads (0 means number of CPUs).
+    """
+    points = _as_points(points)
+    triangles = triangulate(verts, faces)
+    threads = threads or os.cpu_count() or 1
+    needed = inside_votes.get(len(directions), len(directions) // 2 + 1)
+
+    votes = np.zeros(len(points), dtype=np.int64)
+    undecided = np.arange(len(points))
+    for done, direction in enumerate(directions):
+        remaining = len(directions) - done
+        # early exit: vote of these points can't change any more
+        open_vote = (votes[undecided] < needed) & (votes[undecided] + remaining >= needed)
+        undecided = undecided[open_vote]
+        if len(undecided) == 0:
+            break
+        rotation = rotation_to_z(direction)
+        crossings = _parallel_crossings(points[undecided] @ rotation.T, triangles @ rotation.T, threads)
+        votes[undecided] += crossings % 2
+    return votes >= needed
+
+
+def points_inside_by_normals(bvh, points):
+    """
+    Mask of points for which the nearest point of mesh surface is in front
+    of the surface normal, that is, the point is inside.
+    """
+    points = _as_points(points)
+    hits = bvh_find_nearest(bvh, points)
+    dots = np.einsum('ij,ij->i', hits.location - points, hits.normal)
+    return hits.hit & (dots >= 0.0)
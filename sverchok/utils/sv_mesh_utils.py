@@ -16,7 +16,10 @@
 #
 # ##### END GPL LICENSE BLOCK #####
 
+import numpy as np
+
 from sverchok.data_structure import fullList_deep_copy
+from sverchok.utils.array_data import SvRaggedArray, concatenate_ragged
 
 def mesh_join(vertices_s, edges_s, faces_s):
     '''Given list of meshes represented by lists of vertices, edges and faces,
@@ -38,6 +41,28 @@ def mesh_join(vertices_s, edges_s, faces_s):
     return result_vertices, result_edges, result_faces
 
 
+def mesh_join_np(vertices_s, edges_s, faces_s):
+    '''Array version of mesh_join: vertices are (N, 3) arrays,
+    edges and faces are SvRaggedArray (or lists, which are converted).
+    Returns (N, 3) array and two SvRaggedArray.'''
+
+    def as_ragged(items):
+        return items if isinstance(items, SvRaggedArray) else SvRaggedArray.from_lists(items)
+
+    vertices_s = [np.asarray(vertices, dtype=np.float64).reshape((-1, 3)) for vertices in vertices_s]
+    counts = [len(vertices) for vertices in vertices_s]
+    offsets = np.cumsum([0] + counts[:-1])
+    if len(edges_s) == 0:
+        edges_s = [[]] * len(faces_s)
+    if len(faces_s) == 0:
+        faces_s = [[]] * len(edges_s)
+
+    result_vertices = np.concatenate(vertices_s) if vertices_s else np.empty((0, 3))
+    result_edges = concatenate_ragged([as_ragged(edges) for edges in edges_s], offsets[:len(edges_s)])
+    result_faces = concatenate_ragged([as_ragged(faces) for faces in faces_s], offsets[:len(faces_s)])
+    return result_vertices, result_edges, result_faces
+
+
 def mesh_join_ext(vertices_s, edges_s, faces_s, wrap=False):
     '''Given list of meshes represented by lists of vertices, edges and faces,
     produce one joined mesh.'''
@@ -71,3 +96,138 @@ def mesh_join_ext(vertices_s, edges_s, faces_s, wrap=False):
         return [result_vertices], [result_edges], [result_faces]
 
     return result_vertices, result_edges, result_faces
+
+
+def polygons_to_arrays(faces):
+    '''Flat loop vertex indices, loop starts and loop totals of polygons,
+    given as list of lists or SvRaggedArray, as needed by Mesh.foreach_set.'''
+    if not isinstance(faces, SvRaggedArray):
+        faces = SvRaggedArray.from_lists(faces)
+    return faces.indices, faces.offsets[:-1].astype(np.int32), faces.sizes.astype(np.int32)
+
+
+def edges_to_array(edges):
+    '''(M, 2) int32 array of edges, given as list of pairs or SvRaggedArray.'''
+    if isinstance(edges, SvRaggedArray):
+        return edges.as_array().astype(np.int32).reshape((-1, 2))
+    return np.array(edges, dtype=np.int32).reshape((-1, 2))
+
+
+def polygon_loop_pairs(loops, loop_starts, loop_totals):
+    '''(L, 2) array of vertex pairs of all polygon sides.'''
+    following = np.arange(1, len(loops) + 1)
+    following[loop_starts + loop_totals - 1] = loop_starts
+    return np.stack((loops, loops[following]), axis=1)
+
+
+def connected_components(count, pairs):
+    '''Index of connected component of each of count vertices, linked by
+    (K, 2) array of pairs. Components are numbered in order of their lowest vertex.'''
+    labels = np.arange(count)
+    if len(pairs):
+        first, second = pairs[:, 0], pairs[:, 1]
+        while True:
+            label_first, label_second = labels[first], labels[second]
+            if (label_first == label_second).all():
+                break
+            lowest = np.minimum(label_first, label_second)
+            # attach roots of both ends to the lower one, then shorten paths to roots
+            np.minimum.at(labels, label_first, lowest)
+            np.minimum.at(labels, label_second, lowest)
+            while True:
+                roots = labels[labels]
+                if (roots == labels).all():
+                    break
+                labels = roots
+    return np.unique(labels, return_inverse=True)[1]
+
+
+def mesh_islands(vertex_count, edges, faces):
+    '''Island index of each vertex of mesh given by edges and faces
+    (lists or SvRaggedArray), without building BMesh.'''
+    pairs = [edges_to_array(edges)]
+    if len(faces):
+        pairs.append(polygon_loop_pairs(*polygons_to_arrays(faces)))
+    return connected_components(vertex_count, np.concatenate(pairs))
+
+
+def _same_topology(mesh, vertex_count, edges, loops, loop_totals):
+    if (len(mesh.vertices), len(mesh.loops), len(mesh.polygons)) != (vertex_count, len(loops), len(loop_totals)):
+        return False
+    if len(mesh.edges) < len(edges):
+        return False
+    if len(loops):
+        current = np.empty(len(loops), dtype=np.int32)
+        mesh.loops.foreach_get('vertex_index', current)
+        if not np.array_equal(current, loops):
+            return False
+        current = np.empty(len(loop_totals), dtype=np.int32)
+        mesh.polygons.foreach_get('loop_total', current)
+        if not np.array_equal(current, loop_totals):
+            return False
+    elif len(mesh.edges) != len(edges):
+        return False
+    if len(edges):
+        # explicit edges are kept first when edges of polygons are calculated
+        current = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+        mesh.edges.foreach_get('vertices', current)
+        if not np.array_equal(current[:edges.size], edges.ravel()):
+            return False
+    return True
+
+
+def valid_polygons(loops, loop_starts, loop_totals):
+    '''Boolean mask of polygons with at least 3 vertices and no vertex repeated,
+    which are the only ones Blender meshes accept.'''
+    valid = loop_totals >= 3
+    polygon_ids = np.repeat(np.arange(len(loop_totals)), loop_totals)
+    order = np.lexsort((loops, polygon_ids))
+    sorted_loops, sorted_ids = loops[order], polygon_ids[order]
+    repeated = (sorted_loops[1:] == sorted_loops[:-1]) & (sorted_ids[1:] == sorted_ids[:-1])
+    valid[sorted_ids[1:][repeated]] = False
+    return valid
+
+
+def write_mesh(mesh, vertices, edges, faces):
+    '''Write geometry into Blender mesh datablock with foreach_set and flat arrays.
+    vertices are list of triples or (N, 3) array, edges and faces are lists or
+    SvRaggedArray. Edges and polygons which repeat a vertex, and polygons of less
+    than 3 vertices, are skipped. If the mesh already has the same topology,
+    only vertex locations are updated. Returns True if topology was rebuilt.'''
+    co = np.asarray(vertices, dtype=np.float32).reshape(-1)
+    vertex_count = len(co) // 3
+    edges = edges_to_array(edges) if len(edges) else np.empty((0, 2), dtype=np.int32)
+    if len(faces):
+        loops, loop_starts, loop_totals = polygons_to_arrays(faces)
+    else:
+        loops = loop_starts = loop_totals = np.empty(0, dtype=np.int32)
+    for indices in (edges, loops):
+        if indices.size and (indices.min() < 0 or indices.max() >= vertex_count):
+            raise IndexError("vertex index out of range")
+    # degenerate edges and polygons are dropped, as BMesh did not create them
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    valid = valid_polygons(loops, loop_starts, loop_totals)
+    if not valid.all():
+        loops = loops[np.repeat(valid, loop_totals)]
+        loop_totals = loop_totals[valid]
+        loop_starts = (np.cumsum(loop_totals) - loop_totals).astype(np.int32)
+
+    if _same_topology(mesh, vertex_count, edges, loops, loop_totals):
+        mesh.vertices.foreach_set('co', co)
+        mesh.update()
+        return False
+
+    mesh.clear_geometry()
+    mesh.vertices.add(vertex_count)
+    mesh.vertices.foreach_set('co', co)
+    if len(edges):
+        mesh.edges.add(len(edges))
+        mesh.edges.foreach_set('vertices', edges.ravel())
+    if len(loops):
+        mesh.loops.add(len(loops))
+        mesh.loops.foreach_set('vertex_index', loops)
+        mesh.polygons.add(len(loop_totals))
+        mesh.polygons.foreach_set('loop_start', loop_starts)
+        mesh.polygons.foreach_set('loop_total', loop_totals)
+    mesh.update(calc_edges=True)
+    return True
@@ -54,6 +54,9 @@ class CommonTextMixinIO(object):
 
         node_dict['current_text'] = self.text
         node_dict['textmode'] = self.textmode
+        if getattr(self, 'stream_file', False):
+            # data is read from external file, which is stored as property
+            return
         if self.textmode == 'JSON':
             # add the json as full member to the tree :)
             text_str = texts[self.text].as_string()
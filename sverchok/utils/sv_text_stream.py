@@ -0,0 +1,302 @@
+# This file is part of project Sverchok. It's copyrighted by the contributors
+# recorded in the version control history of the file, available from
+# its original location https://github.com/nortikin/sverchok/commit/master
+#
+# SPDX-License-Identifier: GPL3
+# License-Filename: LICENSE
+
+"""
+Streaming reader of CSV data into typed columns, used by Text In+.
+
+The source (a file on disk or a string) is read in chunks of rows; columns
+of numbers are converted chunk by chunk into float64 numpy arrays, so that
+the whole file is never held as python lists. When cache_dir is given,
+numeric columns are written to raw binary files there and returned as
+read-only memory maps; the next read of the same unchanged file with the
+same options maps these files without parsing anything.
+
+Columns which are not numbers (with force_input or extended mode) are
+kept as python lists of strings, as before.
+
+Sources are identified by signature: for files, size, modification time
+and hash of the first and last megabyte (hashing gigabytes of data on
+every update would cost as much as parsing them); for strings, hash of
+the whole string.
+"""
+
+import csv
+import hashlib
+import io
+import json
+import locale
+import os
+import shutil
+import tempfile
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+chunk_rows = 65536
+sample_size = 2**20
+parse_prefix = "parse_"
+
+CsvOptions = namedtuple('CsvOptions', [
+        'dialect',        # csv dialect name, used if delimiter is empty
+        'delimiter',
+        'decimalmark',    # '.', ',', 'LOCALE' or custom mark
+        'header',         # first row holds names of columns
+        'skip_lines',     # number of lines to skip before data (or header)
+        'force_input',    # keep values which are not numbers as strings
+        'extended'])      # keep all values as strings
+
+
+def file_signature(path):
+    """signature of file: size, mtime and hash of its first and last megabyte"""
+    stat = os.stat(path)
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    with open(path, 'rb') as source:
+        hasher.update(source.read(sample_size))
+        if stat.st_size > sample_size:
+            source.seek(max(sample_size, stat.st_size - sample_size))
+            hasher.update(source.read(sample_size))
+    return hasher.hexdigest()
+
+
+def text_signature(string):
+    return hashlib.blake2b(string.encode(), digest_size=16).hexdigest()
+
+
+def default_cache_dir():
+    return os.path.join(tempfile.gettempdir(), "sverchok_csv_cache")
+
+
+def _number_parser(decimalmark):
+    """function converting string to float for decimalmark option"""
+    # locale.atof also accepts numbers with grouping separators, like "1,234.5"
+    if decimalmark == 'LOCALE':
+        return locale.atof
+    if not decimalmark or decimalmark == '.':
+        return float
+    return lambda value: float(value.replace(decimalmark, '.'))
+
+
+def _parse_many(values, parse):
+    """float64 array of strings, raises ValueError if any of them is not a number"""
+    return np.fromiter(map(parse, values), dtype=np.float64, count=len(values))
+
+
+def _make_reader(stream, options):
+    if options.delimiter:
+        return csv.reader(stream, delimiter=options.delimiter)
+    return csv.reader(stream, dialect=options.dialect)
+
+
+def _column_names(row, header):
+    names = []
+    if header:
+        for name in row:
+            tmp = name
+            c = 1
+            while tmp in names:
+                tmp = name + str(c)
+                c += 1
+            names.append(str(tmp))
+    else:
+        names = ["Col " + str(j) for j in range(len(row))]
+    return names
+
+
+class _Column(object):
+    """Values of one column, numeric ones in float64 chunks (in memory or in a file)"""
+    def __init__(self, path=None):
+        self.path = path
+        self.file = open(path, 'wb') if path else None
+        self.chunks = []
+        self.count = 0
+        self.values = None  # python list, once some value is not a number
+
+    def add_numbers(self, array):
+        if self.values is not None:
+            self.values.extend(array.tolist())
+        elif self.file:
+            array.tofile(self.file)
+        else:
+            self.chunks.append(array)
+        self.count += len(array)
+
+    def add_values(self, values):
+        if self.values is None:
+            self.values = self.numbers().tolist()
+            self.close(remove=True)
+        self.values.extend(values)
+
+    def numbers(self):
+        if self.file:
+            self.file.flush()
+            return np.fromfile(self.path, dtype=np.float64)
+        return np.concatenate(self.chunks) if self.chunks else np.empty(0)
+
+    def close(self, remove=False):
+        if self.file:
+            self.file.close()
+            self.file = None
+            if remove:
+                os.remove(self.path)
+                self.path = None
+
+    def result(self):
+        if self.values is not None:
+            return self.values
+        if self.path:
+            self.close()
+            if self.count == 0:
+                return np.empty(0)
+            return np.memmap(self.path, dtype=np.float64, mode='r', shape=(self.count,))
+        return self.numbers()
+
+
+def _add_chunk(columns, rows, options, parse):
+    for j, column in enumerate(columns):
+        values = [row[j] for row in rows if j < len(row)]
+        if options.extended:
+            column.add_values(values)
+            continue
+        if column.values is None:
+            try:
+                column.add_numbers(_parse_many(values, parse))
+                continue
+            except ValueError:
+                pass
+        parsed = []
+        for value in values:
+            try:
+                parsed.append(parse(value))
+            except ValueError:
+                if options.force_input:
+                    parsed.append(value)
+        if column.values is None and all(isinstance(value, float) for value in parsed):
+            column.add_numbers(np.array(parsed, dtype=np.float64))
+        else:
+            column.add_values(parsed)
+
+
+def parse_csv(stream, options, directory=None):
+    """
+    Read csv from text stream into OrderedDict of column name: values.
+    If directory is given, numeric columns are stored there and memory mapped.
+    """
+    reader = _make_reader(stream, options)
+    parse = _number_parser(options.decimalmark)
+
+    # some csv contain a number of must-skip lines, these csv break the csv standard. but we still
+    # want to be able to read them :)
+    for _ in range(options.skip_lines):
+        next(reader, None)
+
+    first = next(reader, None)
+    if first is None:
+        return OrderedDict()
+    names = _column_names(first, options.header)
+    paths = [os.path.join(directory, "{}.f8".format(j)) if directory else None for j in range(len(names))]
+    columns = [_Column(path) for path in paths]
+
+    rows = [] if options.header else [first]
+    try:
+        for row in reader:
+            rows.append(row)
+            if len(rows) >= chunk_rows:
+                _add_chunk(columns, rows, options, parse)
+                rows = []
+        if rows:
+            _add_chunk(columns, rows, options, parse)
+    finally:
+        for column in columns:
+            column.close()
+    return OrderedDict((name, column.result()) for name, column in zip(names, columns))
+
+
+def _entry_dir(cache_dir, path, options):
+    """directory of cached versions of source and name of entry for options"""
+    source_key = hashlib.blake2b(os.path.abspath(path).encode(), digest_size=8).hexdigest()
+    options_key = hashlib.blake2b(repr(tuple(options)).encode(), digest_size=8).hexdigest()
+    return os.path.join(cache_dir, source_key), options_key
+
+
+def _remove_stale(source_dir, signature):
+    """
+    Remove cached versions of a source other than signature, and unfinished
+    parses of this version; entries parsed with other options are kept.
+    Files still memory mapped can't always be removed, errors are ignored.
+    """
+    if not os.path.isdir(source_dir):
+        return
+    for name in os.listdir(source_dir):
+        if name != signature:
+            shutil.rmtree(os.path.join(source_dir, name), ignore_errors=True)
+    signature_dir = os.path.join(source_dir, signature)
+    if os.path.isdir(signature_dir):
+        for name in os.listdir(signature_dir):
+            if name.startswith(parse_prefix):
+                shutil.rmtree(os.path.join(signature_dir, name), ignore_errors=True)
+
+
+def _load_entry(entry_path):
+    with open(os.path.join(entry_path, "meta.json")) as meta_file:
+        meta = json.load(meta_file)
+    columns = OrderedDict()
+    for j, (name, count) in enumerate(meta):
+        path = os.path.join(entry_path, "{}.f8".format(j))
+        columns[name] = np.memmap(path, dtype=np.float64, mode='r', shape=(count,)) if count else np.empty(0)
+    return columns
+
+
+def read_csv_file(path, options, cache_dir=None, encoding='utf-8'):
+    """
+    Read csv file, returns (signature, columns). With cache_dir, columns are
+    memory mapped and stored for next reads of the same file.
+    """
+    signature = file_signature(path)
+    if cache_dir is None:
+        with open(path, newline='', encoding=encoding) as stream:
+            return signature, parse_csv(stream, options)
+
+    source_dir, options_key = _entry_dir(cache_dir, path, options)
+    signature_dir = os.path.join(source_dir, signature)
+    entry_path = os.path.join(signature_dir, options_key)
+    if os.path.exists(os.path.join(entry_path, "meta.json")):
+        return signature, _load_entry(entry_path)
+
+    # files still memory mapped can't always be removed,
+    # so each parse gets a new directory
+    _remove_stale(source_dir, signature)
+    os.makedirs(signature_dir, exist_ok=True)
+    parse_path = tempfile.mkdtemp(prefix=parse_prefix, dir=signature_dir)
+    with open(path, newline='', encoding=encoding) as stream:
+        columns = parse_csv(stream, options, parse_path)
+    if all(isinstance(values, np.ndarray) for values in columns.values()):
+        with open(os.path.join(parse_path, "meta.json"), "w") as meta_file:
+            json.dump([(name, len(values)) for name, values in columns.items()], meta_file)
+        try:
+            os.rename(parse_path, entry_path)
+        except OSError:
+            # an old entry is left in place, this parse is simply not reused
+            pass
+    return signature, columns
+
+
+def read_csv_string(string, options):
+    """Read csv from string, returns (signature, columns)"""
+    return text_signature(string), parse_csv(io.StringIO(string), options)
+
+
+def row_range(count, start, length, frame=None):
+    """
+    slice of rows to output: length rows from start (all rows if length is 0);
+    with frame, the range moves by length rows per frame.
+    """
+    if length <= 0:
+        return slice(start, count)
+    if frame is not None:
+        start += frame * length
+    return slice(start, start + length)
@@ -100,13 +100,41 @@ Algorithmica 2, 153-174.
 #        Returns a list of 3-tuples: the indices of the points that form a
 #        Delaunay triangle.
 #
+#   computeVoronoiArrays(points):
+#
+#        Same diagram as numpy arrays (see VoronoiArrays), for large inputs.
+#        Points may also be given as an (N, 2) or (N, 3) array.
+#
+#   clipVoronoiEdges(diagram, xmin, ymin, xmax, ymax):
+#
+#        Segments of a VoronoiArrays diagram clipped by a box.
+#
+# Both engines are available: FORTUNE is the sweep line algorithm below,
+# QHULL uses scipy.spatial when scipy is installed. FORTUNE is the default:
+# Qhull merges duplicate sites, so the two engines may give different
+# diagrams for the same input.
+# Qhull can't handle degenerate input (less than 4 points, all points on
+# one line), such input is processed by FORTUNE.
+#
 #############################################################################
 import math
 import sys
 import getopt
+
+import numpy as np
+
+try:
+    from scipy.spatial import Delaunay as QhullDelaunay
+    has_qhull = True
+except ImportError:
+    has_qhull = False
+
 TOLERANCE = 1e-9
 BIG_FLOAT = 1e38
 
+ENGINE_FORTUNE = 'FORTUNE'
+ENGINE_QHULL = 'QHULL'
+
 
 def cmp(x,y):
     return x.__cmp__(y)
@@ -123,6 +151,32 @@ class Context(object):
         self.edges     = []    # edge 3-tuple: (line index, vertex 1 index, vertex 2 index)   if either vertex index is -1, the edge extends to infiinity
         self.triangles = []    # 3-tuple of vertex indices
         self.polygons  = {}    # a dict of site:[edges] pairs
+        self.edge_sites = []   # 2-tuple of indices of sites separated by the edge, per edge
+        self.sites = None      # (N, 2) array of input points, set by computeVoronoiArrays
+
+    @classmethod
+    def from_arrays(cls, diagram):
+        context = cls()
+        context.triangulate = True
+        context.vertices = [tuple(v) for v in diagram.vertices.tolist()]
+        context.lines = [tuple(l) for l in diagram.lines.tolist()]
+        context.edges = [tuple(e) for e in diagram.edges.tolist()]
+        context.edge_sites = [tuple(s) for s in diagram.edge_sites.tolist()]
+        context.triangles = [tuple(t) for t in diagram.triangles.tolist()]
+        for edge, (site1, site2) in zip(context.edges, context.edge_sites):
+            context.polygons.setdefault(site1, []).append(edge)
+            context.polygons.setdefault(site2, []).append(edge)
+        context.sites = diagram.sites
+        return context
+
+    def to_arrays(self, sites):
+        return VoronoiArrays(
+                    sites,
+                    np.array(self.vertices, dtype=np.float64).reshape((-1, 2)),
+                    np.array(self.lines, dtype=np.float64).reshape((-1, 3)),
+                    np.array(self.edges, dtype=np.int64).reshape((-1, 3)),
+                    np.array(self.edge_sites, dtype=np.int64).reshape((-1, 2)),
+                    np.array(self.triangles, dtype=np.int64).reshape((-1, 3)))
 
     def circle(self,x,y,rad):
         pass
@@ -183,6 +237,7 @@ class Context(object):
         self.polygons[edge.reg[0].sitenum].append((edge.edgenum,sitenumL,sitenumR))
         self.polygons[edge.reg[1].sitenum].append((edge.edgenum,sitenumL,sitenumR))
         self.edges.append((edge.edgenum,sitenumL,sitenumR))
+        self.edge_sites.append((edge.reg[0].sitenum, edge.reg[1].sitenum))
         if(not self.triangulate):
             if self.plot:
                 self.clip_line(edge)
@@ -193,6 +248,7 @@ class Context(object):
 
 #------------------------------------------------------------------
 def voronoi(siteList,context):
+    Edge.EDGE_NUM = 0
     try:
       edgeList  = EdgeList(siteList.xmin,siteList.xmax,len(siteList))
       priorityQ = PriorityQueue(siteList.ymin,siteList.ymax,len(siteList))
@@ -342,6 +398,8 @@ def isEqual(a,b,relativeError=TOLERANCE):
 
 #------------------------------------------------------------------
 class Site(object):
+    __slots__ = ('x', 'y', 'sitenum')
+
     def __init__(self,x=0.0,y=0.0,sitenum=0):
         self.x = x
         self.y = y
@@ -388,6 +446,8 @@ class Edge(object):
     EDGE_NUM = 0
     DELETED = {}   # marker value
 
+    __slots__ = ('a', 'b', 'c', 'ep', 'reg', 'edgenum')
+
     def __init__(self):
         self.a = 0.0
         self.b = 0.0
@@ -442,6 +502,8 @@ class Edge(object):
 
 #------------------------------------------------------------------
 class Halfedge(object):
+    __slots__ = ('left', 'right', 'qnext', 'edge', 'pm', 'vertex', 'ystar')
+
     def __init__(self,edge=None,pm=Edge.LE):
         self.left  = None   # left Halfedge in the edge list
         self.right = None   # right Halfedge in the edge list
@@ -724,7 +786,7 @@ class SiteList(object):
             if pt.y < self.__ymin: self.__ymin = pt.y
             if pt.x > self.__xmax: self.__xmax = pt.x
             if pt.y > self.__ymax: self.__ymax = pt.y
-        self.__sites.sort()
+        self.__sites.sort(key=lambda s: (s.y, s.x))
 
     def setSiteNumber(self,site):
         site.sitenum = self.__sitenum
@@ -767,7 +829,194 @@ class SiteList(object):
 
  
 #------------------------------------------------------------------
-def computeVoronoiDiagram(points):
+class VoronoiArrays(object):
+    """ Voronoi diagram and Delaunay triangulation as numpy arrays:
+
+           sites:      (N, 2) float, input points
+           vertices:   (V, 2) float, vertices of the diagram
+           lines:      (L, 3) float, (a, b, c) of line equations a*x + b*y = c
+           edges:      (E, 3) int, (line index, vertex 1 index, vertex 2 index);
+                       vertex index is -1 where the edge extends to infinity
+           edge_sites: (E, 2) int, indices of two sites separated by each edge
+           triangles:  (T, 3) int, Delaunay triangles, clockwise
+    """
+    def __init__(self, sites, vertices, lines, edges, edge_sites, triangles):
+        self.sites = sites
+        self.vertices = vertices
+        self.lines = lines
+        self.edges = edges
+        self.edge_sites = edge_sites
+        self.triangles = triangles
+
+    def __repr__(self):
+        return "VoronoiArrays(%d sites, %d vertices, %d edges, %d triangles)" % (
+                    len(self.sites), len(self.vertices), len(self.edges), len(self.triangles))
+
+def default_engine():
+    # Qhull drops duplicate sites, which FORTUNE keeps; the results differ
+    # then, so QHULL is only used when asked for
+    return ENGINE_FORTUNE
+
+def points_to_array(points):
+    """ (N, 2) float array from point objects with x and y fields or from array-like """
+    if isinstance(points, np.ndarray):
+        return np.ascontiguousarray(points[:, :2], dtype=np.float64).reshape((-1, 2))
+    if len(points) and not hasattr(points[0], 'x'):
+        return np.array([p[:2] for p in points], dtype=np.float64).reshape((-1, 2))
+    return np.array([(p.x, p.y) for p in points], dtype=np.float64).reshape((-1, 2))
+
+def bisector_lines(sites1, sites2):
+    """ (a, b, c) of lines bisecting pairs of sites, the same as Edge.bisect gives """
+    d = sites2 - sites1
+    dx, dy = d[:, 0], d[:, 1]
+    c = np.einsum('ij,ij->i', sites1, d) + (dx*dx + dy*dy) * 0.5
+    x_fixed = np.abs(dx) > np.abs(dy)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a = np.where(x_fixed, 1.0, dx / dy)
+        b = np.where(x_fixed, dy / dx, 1.0)
+        c = np.where(x_fixed, c / dx, c / dy)
+    return np.column_stack((a, b, c))
+
+def qhull_triangulation(sites):
+    """ Delaunay triangles, clockwise as FORTUNE gives them, and their neighbours:
+        neighbours[t, k] is the triangle across the side opposite to vertex k
+        of triangle t, or -1 at the convex hull.
+    """
+    delaunay = QhullDelaunay(sites)
+    triangles = delaunay.simplices.astype(np.int64)
+    neighbours = delaunay.neighbors.astype(np.int64)
+    p0, p1, p2 = sites[triangles[:, 0]], sites[triangles[:, 1]], sites[triangles[:, 2]]
+    e1, e2 = p1 - p0, p2 - p0
+    ccw = e1[:, 0] * e2[:, 1] - e1[:, 1] * e2[:, 0] > 0
+    triangles[ccw] = triangles[ccw][:, [0, 2, 1]]
+    neighbours[ccw] = neighbours[ccw][:, [0, 2, 1]]
+    return triangles, neighbours
+
+def circumcenters(sites, triangles):
+    a = sites[triangles[:, 0]]
+    b = sites[triangles[:, 1]] - a
+    c = sites[triangles[:, 2]] - a
+    b2 = (b * b).sum(axis=1)
+    c2 = (c * c).sum(axis=1)
+    d = 2.0 * (b[:, 0] * c[:, 1] - b[:, 1] * c[:, 0])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = (c[:, 1] * b2 - b[:, 1] * c2) / d
+        y = (b[:, 0] * c2 - c[:, 0] * b2) / d
+    return a + np.column_stack((x, y))
+
+def qhull_voronoi(sites):
+    # Voronoi diagram is dual to Delaunay triangulation: vertex i of the diagram
+    # is the circumcenter of triangle i, and each side of a triangle gives the edge
+    # between circumcenters of the triangle and of its neighbour (-1 at the hull).
+    triangles, neighbours = qhull_triangulation(sites)
+    vertices = circumcenters(sites, triangles)
+
+    count = len(triangles)
+    own = np.repeat(np.arange(count, dtype=np.int64), 3)
+    across = neighbours.ravel()
+    opposite = np.tile(np.arange(3), count)
+    # each inner side is shared by two triangles, take it once
+    single = across < own
+    own, across, opposite = own[single], across[single], opposite[single]
+
+    edge_sites = np.column_stack((triangles[own, (opposite + 1) % 3], triangles[own, (opposite + 2) % 3]))
+    lines = bisector_lines(sites[edge_sites[:, 0]], sites[edge_sites[:, 1]])
+    edges = np.column_stack((np.arange(len(own), dtype=np.int64), own, across))
+    return VoronoiArrays(sites, vertices, lines, edges, edge_sites, triangles)
+
+def fortune_voronoi(points):
+    if isinstance(points, np.ndarray) or (len(points) and not hasattr(points[0], 'x')):
+        points = [Site(x, y) for x, y in points_to_array(points).tolist()]
+    context = Context()
+    context.triangulate = True
+    if len(points):
+        voronoi(SiteList(points), context)
+    return context
+
+def computeVoronoiArrays(points, engine=None):
+    """ Takes a list of point objects (which must have x and y fields),
+        or an (N, 2) / (N, 3) array of coordinates.
+        Returns VoronoiArrays.
+    """
+    sites = points_to_array(points)
+    if engine is None:
+        engine = default_engine()
+    if engine == ENGINE_QHULL and len(sites) >= 3:
+        try:
+            return qhull_voronoi(sites)
+        except (RuntimeError, ValueError):
+            # QhullError is a RuntimeError; degenerate input, f.ex. all points on one line
+            pass
+    return fortune_voronoi(sites).to_arrays(sites)
+
+def clipVoronoiEdges(diagram, xmin, ymin, xmax, ymax):
+    """ Clip edges of the diagram (VoronoiArrays) by the box, including
+        edges which extend to infinity.
+        Returns (vertices, edges): (K, 2) float array and (M, 2) int array.
+        Vertices of the diagram inside the box are shared by edges,
+        each clipped edge gets its own vertex on the box boundary.
+    """
+    sites = diagram.sites
+    edges = diagram.edges
+    if not len(edges):
+        return np.zeros((0, 2)), np.zeros((0, 2), dtype=np.int64)
+
+    vertices = diagram.vertices if len(diagram.vertices) else np.zeros((1, 2))
+    v1, v2 = edges[:, 1], edges[:, 2]
+    finite1, finite2 = v1 >= 0, v2 >= 0
+    both = finite1 & finite2
+    p1 = vertices[np.where(finite1, v1, 0)]
+    p2 = vertices[np.where(finite2, v2, 0)]
+
+    # infinite edges go along bisector of two sites, away from the center of all sites
+    s1, s2 = sites[diagram.edge_sites[:, 0]], sites[diagram.edge_sites[:, 1]]
+    midpoints = (s1 + s2) * 0.5
+    normals = s2 - s1
+    directions = np.column_stack((-normals[:, 1], normals[:, 0]))
+    outward = np.einsum('ij,ij->i', midpoints - sites.mean(axis=0), directions)
+    directions[outward < 0] *= -1
+
+    start_index = np.where(finite1, v1, np.where(finite2, v2, -1))
+    end_index = np.where(both, v2, -1)
+    origins = np.where(finite1[:, None], p1, np.where(finite2[:, None], p2, midpoints))
+    directions = np.where(both[:, None], p2 - p1, directions)
+    t_start = np.where(start_index >= 0, 0.0, -np.inf)
+    t_end = np.where(both, 1.0, np.inf)
+
+    # Liang-Barsky clipping of all edges at once
+    keep = np.ones(len(edges), dtype=bool)
+    for axis, low, high in ((0, xmin, xmax), (1, ymin, ymax)):
+        o, d = origins[:, axis], directions[:, axis]
+        parallel = d == 0
+        keep &= ~parallel | ((o >= low) & (o <= high))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ta = (low - o) / d
+            tb = (high - o) / d
+        t_start = np.where(parallel, t_start, np.maximum(t_start, np.minimum(ta, tb)))
+        t_end = np.where(parallel, t_end, np.minimum(t_end, np.maximum(ta, tb)))
+    keep &= t_start <= t_end
+
+    origins, directions = origins[keep], directions[keep]
+    t_start, t_end = t_start[keep], t_end[keep]
+    start_index = np.where(t_start == 0.0, start_index[keep], -1)
+    end_index = np.where(t_end == 1.0, end_index[keep], -1)
+
+    # new vertices on the boundary are numbered after the diagram vertices
+    n = len(vertices)
+    new_start = start_index < 0
+    new_end = end_index < 0
+    start_points = origins[new_start] + t_start[new_start, None] * directions[new_start]
+    end_points = origins[new_end] + t_end[new_end, None] * directions[new_end]
+    start_index[new_start] = n + np.arange(len(start_points))
+    end_index[new_end] = n + len(start_points) + np.arange(len(end_points))
+
+    all_points = np.concatenate((vertices, start_points, end_points))
+    pairs = np.column_stack((start_index, end_index))
+    used, inverse = np.unique(pairs, return_inverse=True)
+    return all_points[used], inverse.reshape((-1, 2))
+
+#------------------------------------------------------------------
+def computeVoronoiDiagram(points, engine=None):
     """ Takes a list of point objects (which must have x and y fields).
         Returns a Context object.
 
@@ -781,31 +1030,29 @@ def computeVoronoiDiagram(points):
                v1 or v2 is -1, the line extends to infinity.
            (4) context.polygons: a dict of site:[edges] pairs
     """
-
-    siteList = SiteList(points)
-    context  = Context()
-    context.triangulate = True
-    voronoi(siteList,context)
-    return context
+    if engine is None:
+        engine = default_engine()
+    if engine == ENGINE_QHULL:
+        return Context.from_arrays(computeVoronoiArrays(points, engine))
+    return fortune_voronoi(points)
 
 #------------------------------------------------------------------
-def computeDelaunayTriangulation(points):
+def computeDelaunayTriangulation(points, engine=None):
     """ Takes a list of point objects (which must have x and y fields).
         Returns a list of 3-tuples: the indices of the points that form a
         Delaunay triangle.
     """
-#   original function in comment    
-#    siteList = SiteList(points)
-#     context  = Context()
-#     context.triangulate = true
-#     voronoi(siteList,context)
-#     return context.triangles
-    
-    siteList = SiteList(points)
-    context  = Context()
-    context.triangulate = True
-    voronoi(siteList,context)
-    return context.triangles
+    if engine is None:
+        engine = default_engine()
+    if engine == ENGINE_QHULL:
+        sites = points_to_array(points)
+        if len(sites) >= 3:
+            try:
+                triangles, _ = qhull_triangulation(sites)
+                return [tuple(t) for t in triangles.tolist()]
+            except (RuntimeError, ValueError):
+                pass
+    return fortune_voronoi(points).triangles
 
 #-----------------------------------------------------------------------------
 # if __name__=="__main__":